@@ -1,4 +1,44 @@
-from .model import database_logger, path, ping, pinger  # noqa: N999
-from .view import view
+import importlib  # noqa: N999
+from types import ModuleType
 
-__all__ = ["database_logger", "pinger", "path", "ping", "view"]
+# The submodules are imported on first access, so that importing the
+# package, e.g. for the headless daemon, does not import Qt
+_SUBMODULES = {
+    "database_logger": ".model.database_logger",
+    "icmp": ".model.icmp",
+    "path": ".model.path",
+    "ping": ".model.ping",
+    "pinger": ".model.pinger",
+    "scheduler": ".model.scheduler",
+    "view": ".view.view",
+}
+
+__all__ = [
+    "database_logger",
+    "icmp",
+    "pinger",
+    "path",
+    "ping",
+    "scheduler",
+    "view",
+]
+
+
+def __getattr__(name: str) -> ModuleType:
+    """
+    Imports a submodule listed in `__all__` on first access.
+
+    Args:
+        name (str): The attribute requested.
+
+    Returns:
+        ModuleType: The submodule.
+
+    Raises:
+        AttributeError: If the name is not a submodule of the package.
+    """
+    if name not in _SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_SUBMODULES[name], __name__)
+    globals()[name] = module
+    return module
@@ -1,4 +1,13 @@
-from .main import main  # noqa: N999
+import sys  # noqa: N999
 
 if __name__ == "__main__":
+    if "--headless" in sys.argv[1:]:
+        # Qt is never imported in headless mode
+        from .daemon import main as run_daemon
+
+        sys.argv.remove("--headless")
+        sys.exit(run_daemon())
+
+    from .main import main
+
     main()
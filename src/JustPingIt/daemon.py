@@ -0,0 +1,491 @@
+import argparse
+import signal
+import sys
+import threading
+import time
+import tomllib
+from dataclasses import dataclass
+from types import FrameType
+from typing import Any, TextIO
+
+from JustPingIt.model.backends import BACKEND_NAMES, ProbeBackend, open_backend
+from JustPingIt.model.database_logger import STORAGE_MODES, DatabaseLogger
+from JustPingIt.model.ping import MISSED, Ping
+from JustPingIt.model.profiles import PROFILES
+from JustPingIt.model.scheduler import PingScheduler
+from JustPingIt.model.sweep import sweep
+from JustPingIt.model.targets import TargetSet, split_entries
+
+# ----------------- Helper Classes -----------------
+
+
+@dataclass(frozen=True)
+class TargetConfig:
+    """
+    A host probed by the daemon.
+
+    Attributes:
+        address (str): The IP address, hostname or "host:port" TCP target
+        to probe.
+        interval (float): Seconds between two probes.
+        timeout (float): Seconds to wait for a reply.
+    """
+
+    address: str
+    interval: float = 1
+    timeout: float = 3
+
+
+@dataclass
+class ProbeCounters:
+    """
+    Counters of the probes sent since the last stats line.
+
+    Attributes:
+        sent (int): Probes completed.
+        successes (int): Probes answered.
+        missed (int): Scheduled probes never sent.
+        rtt_sum (int): Sum of the round-trip times, in microseconds.
+        rtt_count (int): Number of round-trip times summed.
+    """
+
+    sent: int = 0
+    successes: int = 0
+    missed: int = 0
+    rtt_sum: int = 0
+    rtt_count: int = 0
+
+
+# ----------------- Helper Functions -----------------
+
+
+def load_config(path: str) -> dict[str, Any]:
+    """
+    Reads a TOML configuration file, e.g.::
+
+        db = "/var/lib/justpingit/ping_log.db"
+        backend = "icmp"
+        interval = 5
+        stats_interval = 60
+        targets_file = "/etc/justpingit/targets.txt"
+
+        [[targets]]
+        address = "10.0.0.1"
+        interval = 1
+        timeout = 2
+
+        [[targets]]
+        address = "10.0.1.0/24"
+        interval = 10
+
+    Args:
+        path (str): The file.
+
+    Returns:
+        dict[str, Any]: The settings.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If it is not valid TOML.
+    """
+    with open(path, "rb") as file:
+        return tomllib.load(file)
+
+
+def build_targets(
+    addresses: list[str],
+    config_targets: list[Any],
+    interval: float,
+    timeout: float,
+) -> list[TargetConfig]:
+    """
+    Merges the targets of the command line and of the configuration file.
+    Entries of the file are either an address or a table with an `address`
+    and optional `interval` and `timeout`. An address may be a CIDR range,
+    expanded to one target per host.
+
+    Args:
+        addresses (list[str]): The addresses given on the command line.
+        config_targets (list[Any]): The `targets` of the configuration.
+        interval (float): The default seconds between two probes.
+        timeout (float): The default seconds to wait for a reply.
+
+    Returns:
+        list[TargetConfig]: One target per address, the last one winning.
+
+    Raises:
+        ValueError: If an entry is malformed, a range too large or a
+        duration not positive.
+    """
+    targets: dict[str, TargetConfig] = {}
+    for entry in [*config_targets, *addresses]:
+        if isinstance(entry, str):
+            entry = {"address": entry}
+        if not isinstance(entry, dict) or not entry.get("address"):
+            raise ValueError(f"Invalid target {entry!r}")
+        address = str(entry["address"])
+        target_interval = float(entry.get("interval", interval))
+        target_timeout = float(entry.get("timeout", timeout))
+        if target_interval <= 0 or target_timeout <= 0:
+            raise ValueError(f"Invalid durations for {address}")
+        for host in TargetSet.from_entries([address]):
+            targets[host] = TargetConfig(host, target_interval, target_timeout)
+    return list(targets.values())
+
+
+# ----------------- Core Classes -----------------
+
+
+class ProbeDaemon:
+    """
+    Probes targets without any user interface: a `PingScheduler` runs on
+    the calling thread and logs every result through a buffered
+    `DatabaseLogger`, and a stats line is printed periodically. Neither Qt
+    nor any GUI module is imported.
+
+    SIGTERM and SIGINT stop the scheduler; the pings still queued are then
+    written before `run` returns.
+
+    Attributes:
+        logger (DatabaseLogger): The logger receiving every result.
+        scheduler (PingScheduler): The scheduler probing the targets.
+        stats_interval (float): Seconds between two stats lines, 0 to
+        disable them.
+        out (TextIO): Where the stats lines are printed.
+    Methods:
+        run() -> int:
+            Probes until stopped, then flushes the logger.
+        stop():
+            Stops probing. Safe to call from any thread or signal handler.
+        stats_line() -> str:
+            Formats and resets the counters.
+    """
+
+    def __init__(
+        self,
+        logger: DatabaseLogger,
+        targets: list[TargetConfig],
+        backend: ProbeBackend | None = None,
+        stats_interval: float = 60,
+        out: TextIO = sys.stdout,
+    ) -> None:
+        """
+        Initializes the daemon and schedules the targets.
+
+        Args:
+            logger (DatabaseLogger): The logger receiving every result.
+            targets (list[TargetConfig]): The hosts to probe.
+            backend (ProbeBackend, optional): The probe backend. When None,
+            the system `ping` command is used.
+            stats_interval (float, optional): Seconds between two stats
+            lines, 0 to disable them.
+            out (TextIO, optional): Where the stats lines are printed.
+        """
+        self.logger = logger
+        self.stats_interval = stats_interval
+        self.out = out
+        self.scheduler = PingScheduler(
+            logger, on_result=self._count, backend=backend
+        )
+        for target in targets:
+            self.scheduler.add_target(
+                target.address, target.interval, target.timeout
+            )
+        self._counters = ProbeCounters()
+        self._counters_lock = threading.Lock()
+        self._last_stats = time.monotonic()
+        self._late_reported = 0
+        self._stopped = threading.Event()
+
+    def _count(self, ping: Ping) -> None:
+        """
+        Counts a probe result.
+
+        Args:
+            ping (Ping): The result.
+        """
+        with self._counters_lock:
+            counters = self._counters
+            if ping.result == MISSED:
+                counters.missed += 1
+                return
+            counters.sent += 1
+            if ping.result == "Success":
+                counters.successes += 1
+            if ping.rtt_us is not None:
+                counters.rtt_sum += ping.rtt_us
+                counters.rtt_count += 1
+
+    def stats_line(self) -> str:
+        """
+        Formats the probes counted since the previous line, the ticks the
+        scheduler missed or sent late, and the state of the write-behind
+        queue, then resets the counters. The loss is computed over the
+        probes actually sent.
+
+        Returns:
+            str: The stats line.
+        """
+        now = time.monotonic()
+        with self._counters_lock:
+            counters, self._counters = self._counters, ProbeCounters()
+        elapsed = max(now - self._last_stats, 1e-9)
+        self._last_stats = now
+        late_ticks = self.scheduler.late_ticks
+        late = late_ticks - self._late_reported
+        self._late_reported = late_ticks
+        loss = 0.0
+        if counters.sent:
+            loss = 100 * (counters.sent - counters.successes) / counters.sent
+        rtt = "-"
+        if counters.rtt_count:
+            rtt = f"{counters.rtt_sum / counters.rtt_count / 1000:.2f}ms"
+        writer = self.logger.writer_stats()
+        return (
+            f"{time.strftime('%Y-%m-%d %H:%M:%S')} "
+            f"targets={len(self.scheduler.targets)} "
+            f"probes={counters.sent} rate={counters.sent / elapsed:.1f}/s "
+            f"loss={loss:.1f}% rtt_avg={rtt} "
+            f"missed={counters.missed} late={late} "
+            f"written={writer.written} pending={writer.pending} "
+            f"dropped={writer.dropped} errors={writer.errors}"
+        )
+
+    def _report(self) -> None:
+        """
+        Main loop of the stats thread.
+        """
+        while not self._stopped.wait(self.stats_interval):
+            print(self.stats_line(), file=self.out, flush=True)
+
+    def stop(self) -> None:
+        """
+        Stops probing. `run` then flushes the logger and returns.
+        """
+        self._stopped.set()
+        self.scheduler.stop()
+
+    def _on_signal(self, signum: int, frame: FrameType | None) -> None:
+        """
+        Stops the daemon on SIGTERM or SIGINT.
+
+        Args:
+            signum (int): The signal received.
+            frame (FrameType | None): The interrupted frame.
+        """
+        self.stop()
+
+    def run(self) -> int:
+        """
+        Probes the targets until `stop` is called or a SIGTERM or SIGINT is
+        received, then writes the pings still queued.
+
+        Returns:
+            int: The exit status.
+        """
+        previous = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous[signum] = signal.signal(signum, self._on_signal)
+        reporter = None
+        if self.stats_interval > 0:
+            reporter = threading.Thread(
+                target=self._report, name="ProbeDaemon stats", daemon=True
+            )
+            reporter.start()
+        try:
+            self.scheduler.run_forever()
+        finally:
+            self._stopped.set()
+            if reporter is not None:
+                reporter.join()
+            self.logger.close()
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        print(self.stats_line(), file=self.out, flush=True)
+        return 0
+
+
+# ----------------- Daemon Entry -----------------
+
+
+def run_sweep(targets: list[TargetConfig], backend_name: str) -> int:
+    """
+    Probes every target once, concurrently, and prints the live ones.
+
+    Args:
+        targets (list[TargetConfig]): The targets. The timeout of the first
+        one is used for all.
+        backend_name (str): The probe backend, one of `BACKEND_NAMES`.
+
+    Returns:
+        int: The exit status: 0 if a host answered, 1 if none did, 2 for
+        invalid settings or no target.
+    """
+    if not targets:
+        print("Error: no target to sweep", file=sys.stderr)
+        return 2
+    try:
+        backend = open_backend(backend_name)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    try:
+        result = sweep(
+            [target.address for target in targets],
+            backend,
+            timeout=targets[0].timeout,
+        )
+    finally:
+        backend.close()
+    for ping in result.live:
+        rtt = "-" if ping.rtt_us is None else f"{ping.rtt_us / 1000:.2f}ms"
+        print(f"{ping.ip_address}\t{ping.result}\t{rtt}", flush=True)
+    print(
+        f"{len(result.live)} of {result.probed} hosts up "
+        f"in {result.elapsed:.1f}s with the {backend.name} backend.",
+        file=sys.stderr,
+    )
+    return 0 if result.live else 1
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    Parses the command line of the headless daemon.
+
+    Args:
+        argv (list[str], optional): The arguments. Defaults to `sys.argv`.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m JustPingIt.daemon",
+        description="Pings hosts and logs the results without a GUI.",
+    )
+    parser.add_argument(
+        "targets", nargs="*", metavar="ADDRESS", help="Hosts to ping."
+    )
+    parser.add_argument(
+        "--config", help="A TOML file with the settings and targets."
+    )
+    parser.add_argument(
+        "--targets-file",
+        help="A file listing more addresses, CIDR ranges and hostnames.",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="Probe every target once, print the live ones and exit.",
+    )
+    parser.add_argument(
+        "--db",
+        help="The database file. Defaults to ping_log.db in the working "
+        "directory.",
+    )
+    parser.add_argument(
+        "--interval", type=float, help="Seconds between two probes."
+    )
+    parser.add_argument(
+        "--timeout", type=float, help="Seconds to wait for a reply."
+    )
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        help="Seconds between two stats lines, 0 to disable them.",
+    )
+    parser.add_argument(
+        "--profile", choices=sorted(PROFILES), help="SQLite settings."
+    )
+    parser.add_argument(
+        "--storage", choices=STORAGE_MODES, help="How pings are stored."
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKEND_NAMES,
+        help="How hosts are probed. Defaults to the fastest one available.",
+    )
+    parser.add_argument(
+        "--system-ping",
+        action="store_true",
+        help="Use the system ping command even if ICMP sockets are allowed.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Runs the headless daemon, or a one-shot sweep with `--sweep`. Command
+    line options take precedence over the configuration file.
+
+    Args:
+        argv (list[str], optional): The arguments. Defaults to `sys.argv`.
+
+    Returns:
+        int: The exit status, 2 for invalid settings or no target. See
+        `run_sweep` for the status of a sweep.
+    """
+    args = parse_args(argv)
+    try:
+        config = load_config(args.config) if args.config else {}
+
+        def setting(name: str, default: Any) -> Any:
+            value = getattr(args, name)
+            return config.get(name, default) if value is None else value
+
+        addresses = list(args.targets)
+        targets_file = setting("targets_file", None)
+        if targets_file:
+            with open(targets_file, encoding="utf-8") as file:
+                addresses.extend(split_entries(file.read()))
+        targets = build_targets(
+            addresses,
+            config.get("targets", []),
+            float(setting("interval", 1)),
+            float(setting("timeout", 3)),
+        )
+        stats_interval = float(setting("stats_interval", 60))
+        if args.system_ping or config.get("system_ping", False):
+            backend_name = "system"
+        else:
+            backend_name = str(setting("backend", "auto"))
+        if args.sweep:
+            return run_sweep(targets, backend_name)
+        logger = DatabaseLogger(
+            str(setting("db", "ping_log.db")),
+            buffered=True,
+            profile=str(setting("profile", "balanced")),
+            storage=str(setting("storage", "rows")),
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if not targets:
+        print("Error: no target to ping", file=sys.stderr)
+        logger.close()
+        return 2
+
+    try:
+        backend = open_backend(backend_name)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        logger.close()
+        return 2
+    daemon = ProbeDaemon(
+        logger,
+        targets,
+        backend=backend,
+        stats_interval=stats_interval,
+    )
+    print(
+        f"Pinging {len(targets)} targets with the {backend.name} backend.",
+        flush=True,
+    )
+    try:
+        return daemon.run()
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import argparse
+import sys
+
+from JustPingIt.model.database_logger import DatabaseLogger
+from JustPingIt.model.retention import RetentionPolicy, enforce_retention
+
+# ----------------- Maintenance Entry -----------------
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    Parses the command line of the maintenance command.
+
+    Args:
+        argv (list[str], optional): The arguments. Defaults to `sys.argv`.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m JustPingIt.maintenance",
+        description="Deletes the expired ping logs, shrinks the database and "
+        "rebuilds the rollups.",
+    )
+    parser.add_argument(
+        "--db", help="The database file. Defaults to the application's one."
+    )
+    parser.add_argument(
+        "--days",
+        type=float,
+        default=0,
+        help="Days of logs kept for every target, 0 to keep them forever.",
+    )
+    parser.add_argument(
+        "--keep",
+        action="append",
+        default=[],
+        metavar="ADDRESS=DAYS",
+        help="Days of logs kept for one address, 0 for forever. Repeatable.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=5000,
+        help="Maximum rows deleted per transaction.",
+    )
+    parser.add_argument(
+        "--no-vacuum",
+        action="store_true",
+        help="Keep the freed pages in the database file.",
+    )
+    parser.add_argument(
+        "--rebuild-rollups",
+        action="store_true",
+        help="Recompute the per-minute, hour and day rollups of the logs.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Enforces a retention policy on the ping logs without starting the GUI.
+
+    The expired logs are deleted in chunks, so probes writing to the same
+    database are only blocked briefly, then the freed pages are returned to
+    the file system with an incremental vacuum. With `--rebuild-rollups`
+    the rollups are then recomputed from the remaining logs, one hour at a
+    time.
+
+    Args:
+        argv (list[str], optional): The arguments. Defaults to `sys.argv`.
+
+    Returns:
+        int: The exit status, 2 for an invalid retention policy.
+    """
+    args = parse_args(argv)
+    try:
+        policy = RetentionPolicy.parse(args.days, args.keep)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    db_path = args.db
+    if db_path is None:
+        from JustPingIt.model.path import AppPaths
+
+        db_path = AppPaths().get_db_path()
+
+    logger = DatabaseLogger(db_path)
+    try:
+        deleted = enforce_retention(logger, policy, chunk_size=args.chunk_size)
+        pages = 0 if args.no_vacuum else logger.incremental_vacuum(0)
+        hours = logger.rebuild_rollups() if args.rebuild_rollups else 0
+    finally:
+        logger.close()
+    print(f"Deleted {deleted} expired logs, released {pages} pages.")
+    if args.rebuild_rollups:
+        print(f"Rebuilt the rollups of {hours} hours of logs.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
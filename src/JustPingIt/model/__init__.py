@@ -1,6 +1,60 @@
-from .database_logger import DatabaseLogger  # noqa: N999
-from .path import AppPaths
-from .ping import Ping
-from .pinger import Pinger
+import importlib  # noqa: N999
+from typing import TYPE_CHECKING, Any
 
-__all__ = ["DatabaseLogger", "Pinger", "Ping", "AppPaths"]
+if TYPE_CHECKING:
+    from .backends import ProbeBackend, open_backend
+    from .database_logger import DatabaseLogger, LogFilter
+    from .icmp import IcmpEngine
+    from .path import AppPaths
+    from .ping import Ping
+    from .pinger import MultiPinger, Pinger
+    from .scheduler import PingScheduler
+
+# Module defining each name. They are imported on first access, so the
+# Qt-free modules (logger, scheduler, ICMP engine) can be used headless
+_EXPORTS = {
+    "ProbeBackend": ".backends",
+    "open_backend": ".backends",
+    "DatabaseLogger": ".database_logger",
+    "LogFilter": ".database_logger",
+    "IcmpEngine": ".icmp",
+    "MultiPinger": ".pinger",
+    "Pinger": ".pinger",
+    "PingScheduler": ".scheduler",
+    "Ping": ".ping",
+    "AppPaths": ".path",
+}
+
+__all__ = [
+    "DatabaseLogger",
+    "LogFilter",
+    "IcmpEngine",
+    "MultiPinger",
+    "Pinger",
+    "PingScheduler",
+    "ProbeBackend",
+    "open_backend",
+    "Ping",
+    "AppPaths",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Imports the class or function listed in `__all__` on first access.
+
+    Args:
+        name (str): The attribute requested.
+
+    Returns:
+        Any: The class or function.
+
+    Raises:
+        AttributeError: If the name is not exported by the package.
+    """
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_EXPORTS[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,849 @@
+import asyncio
+import os
+import shutil
+import socket
+import struct
+import subprocess
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from .icmp import AsyncIcmpEngine, IcmpEngine
+from .ping import Ping
+from .resolver import ResolverCache, shared_resolver
+from .system_ping import (
+    parse_ping_output,
+    parse_ping_reply,
+    ping_command,
+    subprocess_options,
+)
+
+# ----------------- Constants -----------------
+
+# Names accepted by `open_backend`; "auto" picks the fastest one available
+BACKEND_NAMES = ("auto", "icmp", "system", "tcp", "fake")
+# Port connected to by the TCP backend for targets without one
+DEFAULT_TCP_PORT = 80
+# SO_LINGER on, with a zero timeout: close() resets the connection
+_RESET = struct.pack("ii", 1, 0)
+
+_PING_GROUP_RANGE = "/proc/sys/net/ipv4/ping_group_range"
+_PROC_STATUS = "/proc/self/status"
+# Bit of CAP_NET_RAW in the capability masks of /proc/<pid>/status
+_CAP_NET_RAW = 13
+
+# ----------------- Helper Classes -----------------
+
+
+@dataclass(frozen=True)
+class HostCapabilities:
+    """
+    What the host allows the probes to use.
+
+    Attributes:
+        ping_group (bool): Unprivileged ICMP datagram sockets are allowed
+        for one of our groups (``net.ipv4.ping_group_range`` on Linux).
+        raw_sockets (bool): Raw sockets can be opened (root or CAP_NET_RAW).
+        ping_binary (str | None): Path of the system `ping` command, if any.
+    """
+
+    ping_group: bool
+    raw_sockets: bool
+    ping_binary: str | None
+
+    @property
+    def icmp(self) -> bool:
+        """
+        Whether a native ICMP engine should be able to open a socket.
+
+        Returns:
+            bool: True if either ICMP socket type is allowed. Always False
+            on Windows, where ICMP sockets do not deliver echo replies
+            reliably.
+        """
+        if sys.platform.startswith("win"):
+            return False
+        return self.ping_group or self.raw_sockets
+
+
+# ----------------- Helper Functions -----------------
+
+
+def ping_group_allowed(path: str = _PING_GROUP_RANGE) -> bool:
+    """
+    Checks whether unprivileged ICMP datagram sockets are allowed for one of
+    the groups of the process. macOS always allows them.
+
+    Args:
+        path (str, optional): The ``ping_group_range`` sysctl file.
+
+    Returns:
+        bool: True if one of our group ids is within the range.
+    """
+    if sys.platform == "darwin":
+        return True
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open(path, encoding="ascii") as file:
+            low, high = (int(value) for value in file.read().split())
+    except (OSError, ValueError):
+        return False
+    groups = {os.getgid(), *os.getgroups()}
+    return any(low <= group <= high for group in groups)
+
+
+def raw_socket_allowed(status_path: str = _PROC_STATUS) -> bool:
+    """
+    Checks whether the process may open raw sockets: it runs as root or,
+    on Linux, holds the CAP_NET_RAW capability.
+
+    Args:
+        status_path (str, optional): The status file of the process.
+
+    Returns:
+        bool: True if raw sockets can be opened.
+    """
+    if not hasattr(os, "geteuid"):
+        return False
+    if os.geteuid() == 0:
+        return True
+    try:
+        with open(status_path, encoding="ascii") as file:
+            for line in file:
+                if line.startswith("CapEff:"):
+                    return bool(int(line.split()[1], 16) >> _CAP_NET_RAW & 1)
+    except (OSError, ValueError):
+        pass
+    return False
+
+
+def detect_capabilities() -> HostCapabilities:
+    """
+    Inspects what the host allows the probes to use.
+
+    Returns:
+        HostCapabilities: The capabilities of this process.
+    """
+    return HostCapabilities(
+        ping_group=ping_group_allowed(),
+        raw_sockets=raw_socket_allowed(),
+        ping_binary=shutil.which("ping"),
+    )
+
+
+def split_tcp_target(address: str) -> tuple[str, int] | None:
+    """
+    Splits a TCP target, "host:port" or "[IPv6]:port".
+
+    Args:
+        address (str): The target.
+
+    Returns:
+        tuple[str, int] | None: The host and port, or None if the target
+        has no port.
+    """
+    host, separator, port = address.rpartition(":")
+    if not separator or not host or not port.isdigit():
+        return None
+    if host.startswith("[") and host.endswith("]"):
+        host = host[1:-1]
+    elif ":" in host:
+        return None  # A bare IPv6 address
+    if not 0 < int(port) < 65536:
+        return None
+    return host, int(port)
+
+
+def _tcp_sockaddr(
+    ip_address: str, port: int
+) -> tuple[socket.AddressFamily, tuple[Any, ...]]:
+    """
+    The socket address of a TCP connection to a resolved host.
+
+    Args:
+        ip_address (str): An IPv4 or IPv6 address literal.
+        port (int): The port.
+
+    Returns:
+        tuple[socket.AddressFamily, tuple[Any, ...]]: The address family
+        and the socket address.
+    """
+    if ":" in ip_address:
+        return socket.AF_INET6, (ip_address, port, 0, 0)
+    return socket.AF_INET, (ip_address, port)
+
+
+def _with_resolution(ping: Ping, host: str, ip_address: str) -> Ping:
+    """
+    Records the address a hostname resolved to in a probe result.
+
+    Args:
+        ping (Ping): The result.
+        host (str): The host probed, as given by the user.
+        ip_address (str): The address it resolved to.
+
+    Returns:
+        Ping: The same result.
+    """
+    if ip_address != host:
+        ping.resolved = ip_address
+    return ping
+
+
+def _elapsed_us(start_ns: int) -> int:
+    """
+    Microseconds elapsed since a `time.perf_counter_ns` reading.
+
+    Args:
+        start_ns (int): The reading.
+
+    Returns:
+        int: The elapsed microseconds.
+    """
+    return (time.perf_counter_ns() - start_ns) // 1000
+
+
+# ----------------- Core Classes -----------------
+
+
+class ProbeBackend(ABC):
+    """
+    A way of probing hosts, shared by `Pinger` threads and the asyncio
+    `PingScheduler`. Backends never raise for an unreachable host: every
+    probe returns a `Ping`, with one of the `RESULTS` of `ping`; "Failure"
+    when no reply arrived in time, unless the backend tells a timeout
+    apart.
+
+    Hostnames are resolved through a `ResolverCache`, shared by default by
+    all the backends of the process, so probes do not wait for the resolver
+    and the address probed is recorded in `Ping.resolved`.
+
+    Attributes:
+        name (str): The name of the backend, as given to `open_backend`.
+        resolver (ResolverCache | None): The cache resolving the hostnames,
+        None if the backend does not resolve them.
+    Methods:
+        ping(address: str, timeout: float = 3) -> Ping:
+            Probes a host, blocking the calling thread.
+        ping_async(address: str, timeout: float = 3) -> Ping:
+            Probes a host without blocking the event loop.
+        prefetch(addresses: Iterable[str]):
+            Starts resolving hosts ahead of their first probe.
+        detach():
+            Releases what the backend bound to the running event loop.
+        close():
+            Releases the backend.
+    """
+
+    name = "base"
+    resolver: ResolverCache | None = None
+
+    @abstractmethod
+    def ping(self, address: str, timeout: float = 3) -> Ping:
+        """
+        Probes a host, blocking the calling thread.
+
+        Args:
+            address (str): The IP address or hostname to probe.
+            timeout (float, optional): Seconds to wait for a reply.
+
+        Returns:
+            Ping: The result, without sequence number.
+        """
+
+    @abstractmethod
+    async def ping_async(self, address: str, timeout: float = 3) -> Ping:
+        """
+        Probes a host without blocking the event loop.
+
+        Args:
+            address (str): The IP address or hostname to probe.
+            timeout (float, optional): Seconds to wait for a reply.
+
+        Returns:
+            Ping: The result, without sequence number.
+        """
+
+    def prefetch(self, addresses: Iterable[str]) -> None:
+        """
+        Starts resolving hosts in the background, so their first probes
+        find the addresses cached.
+
+        Args:
+            addresses (Iterable[str]): The targets about to be probed.
+        """
+        if self.resolver is not None:
+            self.resolver.prefetch(addresses)
+
+    # An optional hook: most backends bind nothing to the event loop
+    def detach(self) -> None:  # noqa: B027
+        """
+        Releases what the backend bound to the running event loop. Called
+        by the scheduler before its loop closes.
+        """
+
+    def close(self) -> None:
+        """
+        Releases the backend.
+        """
+        self.detach()
+
+
+class SystemPingBackend(ProbeBackend):
+    """
+    Runs the system `ping` command once per probe and parses its output.
+    Works everywhere a `ping` binary exists, at the cost of a process per
+    probe.
+    """
+
+    name = "system"
+    resolver: ResolverCache
+
+    def __init__(self, resolver: ResolverCache | None = None) -> None:
+        """
+        Initializes the backend.
+
+        Args:
+            resolver (ResolverCache, optional): The cache resolving the
+            hostnames, `shared_resolver()` by default.
+        """
+        self.resolver = resolver or shared_resolver()
+
+    def ping(self, address: str, timeout: float = 3) -> Ping:
+        """
+        Resolves the host, then runs `ping` on its address and waits for
+        it.
+
+        Args:
+            address (str): The IP address or hostname to ping.
+            timeout (float, optional): Seconds to wait for the command.
+
+        Returns:
+            Ping: "Success" with the round-trip time and TTL parsed from the
+            output, "Failure" if the name could not be resolved or the
+            command failed or timed out.
+        """
+        try:
+            ip_address = self.resolver.resolve(address, timeout)
+        except OSError:
+            return Ping("Failure", address)
+        return _with_resolution(
+            self._run(address, ip_address, timeout), address, ip_address
+        )
+
+    def _run(self, address: str, ip_address: str, timeout: float) -> Ping:
+        """
+        Runs `ping` and waits for it.
+
+        Args:
+            address (str): The target, as given by the caller.
+            ip_address (str): Its address.
+            timeout (float): Seconds to wait for the command.
+
+        Returns:
+            Ping: The result, with the reply details parsed from the output.
+        """
+        try:
+            output = subprocess.check_output(  # noqa: S603
+                ping_command(ip_address),
+                stderr=subprocess.STDOUT,
+                timeout=timeout,
+                **subprocess_options(),
+            ).decode()
+        except subprocess.CalledProcessError:
+            return Ping("Failure", address)
+        except subprocess.TimeoutExpired:
+            return Ping("Failure", address)
+        except Exception as e:
+            print(f"Unexpected error during ping: {e}")
+            return Ping("Failure", address)
+        if parse_ping_output(output) != "Success":
+            return Ping("Failure", address)
+        return Ping("Success", address, *parse_ping_reply(output))
+
+    async def ping_async(self, address: str, timeout: float = 3) -> Ping:
+        """
+        Resolves the host, then runs `ping` on its address as an asyncio
+        subprocess.
+
+        Args:
+            address (str): The IP address or hostname to ping.
+            timeout (float, optional): Seconds to wait for the command.
+
+        Returns:
+            Ping: The result, with the reply details parsed from the output.
+        """
+        try:
+            ip_address = await self.resolver.resolve_async(address)
+        except OSError:
+            return Ping("Failure", address)
+        return _with_resolution(
+            await self._run_async(address, ip_address, timeout),
+            address,
+            ip_address,
+        )
+
+    async def _run_async(
+        self, address: str, ip_address: str, timeout: float
+    ) -> Ping:
+        """
+        Runs `ping` as an asyncio subprocess.
+
+        Args:
+            address (str): The target, as given by the caller.
+            ip_address (str): Its address.
+            timeout (float): Seconds to wait for the command.
+
+        Returns:
+            Ping: The result, with the reply details parsed from the output.
+        """
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *ping_command(ip_address),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                **subprocess_options(),
+            )
+        except OSError:
+            return Ping("Failure", address)
+        try:
+            output, _ = await asyncio.wait_for(process.communicate(), timeout)
+        except TimeoutError:
+            return Ping("Failure", address)
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        text = output.decode(errors="replace")
+        if parse_ping_output(text) != "Success":
+            return Ping("Failure", address)
+        return Ping("Success", address, *parse_ping_reply(text))
+
+
+class IcmpBackend(ProbeBackend):
+    """
+    Sends echo requests over the socket of an `IcmpEngine`, so probes cost
+    no process and any number of them share one socket.
+
+    Attributes:
+        engine (IcmpEngine): The engine owning the socket.
+    """
+
+    name = "icmp"
+    resolver: ResolverCache
+
+    def __init__(
+        self,
+        engine: IcmpEngine | None = None,
+        resolver: ResolverCache | None = None,
+    ) -> None:
+        """
+        Initializes the backend.
+
+        Args:
+            engine (IcmpEngine, optional): The engine to probe with. It is
+            left open by `close`. By default a new engine is opened and
+            owned by the backend.
+            resolver (ResolverCache, optional): The cache resolving the
+            hostnames, `shared_resolver()` by default.
+
+        Raises:
+            OSError: If no ICMP socket can be opened on this host.
+        """
+        self.engine = engine if engine is not None else IcmpEngine()
+        self._owns_engine = engine is None
+        self.resolver = resolver or shared_resolver()
+        self._async: AsyncIcmpEngine | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def ping(self, address: str, timeout: float = 3) -> Ping:
+        """
+        Pings a host and waits for its reply.
+
+        Args:
+            address (str): The IP address or hostname to ping.
+            timeout (float, optional): Seconds to wait for the reply.
+
+        Returns:
+            Ping: "Success" with the round-trip time and TTL if an echo
+            reply arrived in time, "Failure" otherwise.
+        """
+        try:
+            ip_address = self.resolver.resolve(address, timeout)
+        except OSError:
+            return Ping("Failure", address)
+        try:
+            reply = self.engine.ping(ip_address, timeout=timeout)
+        except OSError as e:
+            print(f"Unexpected error during ping: {e}")
+            reply = None
+        if reply is None:
+            ping = Ping("Failure", address)
+        else:
+            ping = Ping("Success", address, reply.rtt_us, reply.ttl)
+        return _with_resolution(ping, address, ip_address)
+
+    async def ping_async(self, address: str, timeout: float = 3) -> Ping:
+        """
+        Pings a host from the running event loop, which watches the engine
+        socket for replies.
+
+        Args:
+            address (str): The IP address or hostname to ping.
+            timeout (float, optional): Seconds to wait for the reply.
+
+        Returns:
+            Ping: "Success" with the round-trip time and TTL if an echo
+            reply arrived in time, "Failure" otherwise.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async is None or self._loop is not loop:
+            self.detach()
+            self._async, self._loop = AsyncIcmpEngine(self.engine, loop), loop
+        try:
+            ip_address = await self.resolver.resolve_async(address)
+        except OSError:
+            return Ping("Failure", address)
+        reply = await self._async.ping(ip_address, timeout)
+        if reply is None:
+            ping = Ping("Failure", address)
+        else:
+            ping = Ping("Success", address, reply.rtt_us, reply.ttl)
+        return _with_resolution(ping, address, ip_address)
+
+    def detach(self) -> None:
+        """
+        Stops watching the engine socket from the event loop.
+        """
+        if self._async is not None:
+            if self._loop is not None and not self._loop.is_closed():
+                self._async.close()
+            self._async, self._loop = None, None
+
+    def close(self) -> None:
+        """
+        Detaches the backend and closes the engine if it opened it.
+        """
+        self.detach()
+        if self._owns_engine:
+            self.engine.close()
+
+
+class TcpBackend(ProbeBackend):
+    """
+    Measures the time to open a TCP connection, for hosts that drop ICMP.
+    Targets are "host:port" (or "[IPv6]:port"); a bare host is connected to
+    on `port`.
+
+    The outcome tells the handshake replies apart: "Success" when the host
+    answered with a SYN-ACK, "Refused" when it answered with a reset (the
+    host is up but nothing listens), "Timeout" when nothing came back and
+    "Failure" for other errors, e.g. an unresolvable name. The round-trip
+    time of the SYN-ACK or reset is recorded, name resolution excluded.
+    Hostnames are resolved to IPv4 addresses; IPv6 targets are given as
+    literals.
+
+    Asynchronous probes use non-blocking sockets watched by the event loop
+    selector, so thousands of connects can be in flight without a thread
+    each; at most `max_in_flight` sockets are open at once. Connections are
+    closed with a reset, leaving no TIME_WAIT state behind.
+
+    Attributes:
+        port (int): The port of the targets without one.
+        max_in_flight (int): Maximum concurrent connects of `ping_async`.
+    """
+
+    name = "tcp"
+    resolver: ResolverCache
+
+    def __init__(
+        self,
+        port: int = DEFAULT_TCP_PORT,
+        max_in_flight: int = 512,
+        resolver: ResolverCache | None = None,
+    ) -> None:
+        """
+        Initializes the backend.
+
+        Args:
+            port (int, optional): The port of the targets without one.
+            max_in_flight (int, optional): Maximum concurrent connects of
+            `ping_async`, to stay within the file descriptor limit.
+            resolver (ResolverCache, optional): The cache resolving the
+            hostnames, `shared_resolver()` by default.
+        """
+        self.port = port
+        self.max_in_flight = max_in_flight
+        self.resolver = resolver or shared_resolver()
+        self._limit: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def endpoint(self, address: str) -> tuple[str, int]:
+        """
+        The host and port a target connects to.
+
+        Args:
+            address (str): A "host:port" target or a bare host.
+
+        Returns:
+            tuple[str, int]: The host and port.
+        """
+        return split_tcp_target(address) or (address, self.port)
+
+    def prefetch(self, addresses: Iterable[str]) -> None:
+        """
+        Starts resolving the hosts of TCP targets in the background.
+
+        Args:
+            addresses (Iterable[str]): The targets about to be probed.
+        """
+        self.resolver.prefetch(
+            self.endpoint(address)[0] for address in addresses
+        )
+
+    def ping(self, address: str, timeout: float = 3) -> Ping:
+        """
+        Connects to the host and resets the connection at once.
+
+        Args:
+            address (str): The target to probe.
+            timeout (float, optional): Seconds to wait for the handshake.
+
+        Returns:
+            Ping: The outcome of the handshake.
+        """
+        host, port = self.endpoint(address)
+        try:
+            ip_address = self.resolver.resolve(host, timeout)
+        except OSError:
+            return Ping("Failure", address)
+        family, sockaddr = _tcp_sockaddr(ip_address, port)
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _RESET)
+                sock.settimeout(timeout)
+                start = time.perf_counter_ns()
+                try:
+                    sock.connect(sockaddr)
+                    ping = Ping("Success", address, _elapsed_us(start))
+                except ConnectionRefusedError:
+                    ping = Ping("Refused", address, _elapsed_us(start))
+        except TimeoutError:
+            ping = Ping("Timeout", address)
+        except OSError:
+            ping = Ping("Failure", address)
+        return _with_resolution(ping, host, ip_address)
+
+    async def ping_async(self, address: str, timeout: float = 3) -> Ping:
+        """
+        Connects to the host with a non-blocking socket on the running
+        event loop, once fewer than `max_in_flight` connects are open.
+
+        Args:
+            address (str): The target to probe.
+            timeout (float, optional): Seconds to wait for the name and the
+            handshake.
+
+        Returns:
+            Ping: The outcome of the handshake.
+        """
+        loop = asyncio.get_running_loop()
+        if self._limit is None or self._loop is not loop:
+            self._limit = asyncio.Semaphore(self.max_in_flight)
+            self._loop = loop
+        host, port = self.endpoint(address)
+        deadline = loop.time() + timeout
+        try:
+            ip_address = await asyncio.wait_for(
+                self.resolver.resolve_async(host), timeout
+            )
+        except TimeoutError:
+            return Ping("Timeout", address)
+        except OSError:
+            return Ping("Failure", address)
+        async with self._limit:
+            try:
+                ping = await asyncio.wait_for(
+                    self._connect(loop, address, ip_address, port),
+                    max(deadline - loop.time(), 0),
+                )
+            except TimeoutError:
+                ping = Ping("Timeout", address)
+        return _with_resolution(ping, host, ip_address)
+
+    async def _connect(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        address: str,
+        ip_address: str,
+        port: int,
+    ) -> Ping:
+        """
+        Opens then resets a connection to a resolved target.
+
+        Args:
+            loop (asyncio.AbstractEventLoop): The running loop.
+            address (str): The target, as given by the caller.
+            ip_address (str): The address of its host.
+            port (int): The port to connect to.
+
+        Returns:
+            Ping: "Success", "Refused" or "Failure".
+        """
+        family, sockaddr = _tcp_sockaddr(ip_address, port)
+        try:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+        except OSError:
+            return Ping("Failure", address)
+        try:
+            sock.setblocking(False)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _RESET)
+            start = time.perf_counter_ns()
+            try:
+                await loop.sock_connect(sock, sockaddr)
+            except ConnectionRefusedError:
+                return Ping("Refused", address, _elapsed_us(start))
+            return Ping("Success", address, _elapsed_us(start))
+        except OSError:
+            return Ping("Failure", address)
+        finally:
+            sock.close()
+
+    def detach(self) -> None:
+        """
+        Forgets the connect limit bound to the event loop.
+        """
+        self._limit, self._loop = None, None
+
+
+class FakeBackend(ProbeBackend):
+    """
+    Answers in-process without touching the network, for tests and demos.
+
+    Attributes:
+        rtt_us (int): The round-trip time of every reply.
+        ttl (int): The TTL of every reply.
+        unreachable (set[str]): Addresses that never reply.
+        probes (int): Number of probes answered so far.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        rtt_us: int = 1000,
+        ttl: int = 64,
+        unreachable: Iterable[str] = (),
+    ) -> None:
+        """
+        Initializes the backend.
+
+        Args:
+            rtt_us (int, optional): The round-trip time of every reply.
+            ttl (int, optional): The TTL of every reply.
+            unreachable (Iterable[str], optional): Addresses that never
+            reply.
+        """
+        self.rtt_us = rtt_us
+        self.ttl = ttl
+        self.unreachable = set(unreachable)
+        self.probes = 0
+
+    def ping(self, address: str, timeout: float = 3) -> Ping:
+        """
+        Answers a probe at once.
+
+        Args:
+            address (str): The address probed.
+            timeout (float, optional): Ignored.
+
+        Returns:
+            Ping: "Failure" for the unreachable addresses, "Success"
+            otherwise.
+        """
+        self.probes += 1
+        if address in self.unreachable:
+            return Ping("Failure", address)
+        return Ping("Success", address, self.rtt_us, self.ttl)
+
+    async def ping_async(self, address: str, timeout: float = 3) -> Ping:
+        """
+        Answers a probe after yielding to the event loop once.
+
+        Args:
+            address (str): The address probed.
+            timeout (float, optional): Ignored.
+
+        Returns:
+            Ping: The same result as `ping`.
+        """
+        await asyncio.sleep(0)
+        return self.ping(address, timeout)
+
+
+# ----------------- Backend Selection -----------------
+
+
+def default_backend(engine: IcmpEngine | None = None) -> ProbeBackend:
+    """
+    The backend of the probes given an optional ICMP engine, for callers
+    that do not choose one.
+
+    Args:
+        engine (IcmpEngine, optional): A native ICMP engine.
+
+    Returns:
+        ProbeBackend: An `IcmpBackend` on the engine, or a
+        `SystemPingBackend` without one.
+    """
+    if engine is not None:
+        return IcmpBackend(engine)
+    return SystemPingBackend()
+
+
+def open_backend(
+    name: str = "auto", capabilities: HostCapabilities | None = None
+) -> ProbeBackend:
+    """
+    Opens a probe backend by name. "auto" picks the fastest one the host
+    supports: native ICMP sockets, then the system `ping` command, then TCP
+    connections.
+
+    Args:
+        name (str, optional): One of `BACKEND_NAMES`.
+        capabilities (HostCapabilities, optional): The capabilities to
+        choose from. Detected by default.
+
+    Returns:
+        ProbeBackend: The backend. Close it when done.
+
+    Raises:
+        ValueError: If the name is unknown.
+        OSError: If the ICMP backend was requested and no ICMP socket can
+        be opened.
+    """
+    if name not in BACKEND_NAMES:
+        raise ValueError(f"Unknown probe backend {name!r}")
+    if name == "icmp":
+        return IcmpBackend()
+    if name == "system":
+        return SystemPingBackend()
+    if name == "tcp":
+        return TcpBackend()
+    if name == "fake":
+        return FakeBackend()
+
+    if capabilities is None:
+        capabilities = detect_capabilities()
+    if capabilities.icmp:
+        try:
+            return IcmpBackend()
+        except OSError:
+            pass  # The sysctl or capability check was too optimistic
+    if capabilities.ping_binary is not None:
+        return SystemPingBackend()
+    return TcpBackend()
@@ -1,82 +1,632 @@
+import queue
 import sqlite3
-from datetime import datetime
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
 
+from . import resolutions, rollups, runs, schema, statistics
 from .ping import Ping
+from .profiles import DatabaseProfile, apply_profile, get_profile, read_pragmas
+from .statistics import TargetStats
+
+LogRow = tuple[int, str, str, str, int | None, int | None, int | None]
+PingRow = tuple[str, int, str, int | None, int | None, int | None]
+# A LogRow followed by its timestamp in epoch milliseconds
+TimedLogRow = tuple[
+    int, str, str, str, int | None, int | None, int | None, int
+]
+# (timestamp in epoch milliseconds, id, index in its run) of the last row
+# of a page; the index is 0 for the rows of 'ping_logs'
+PageToken = tuple[int, int, int]
+# (ip_address, bucket start in epoch milliseconds, count, successes,
+# failures, rtt_count, rtt_min, rtt_max, rtt_sum, rtt_sum_sq, jitter_count,
+# jitter_sum)
+RollupRow = tuple[
+    str, int, int, int, int, int, int | None, int | None, int, int, int, int
+]
+# (id, ip_address, result, start_ms, end_ms, count, rtt_count, rtt_min,
+# rtt_max, rtt_sum, rtt_sum_sq, ttl, first_seq, last_seq)
+RunRow = tuple[
+    int,
+    str,
+    str,
+    int,
+    int,
+    int,
+    int,
+    int | None,
+    int | None,
+    int,
+    int,
+    int | None,
+    int | None,
+    int | None,
+]
+# (ip_address, resolved, since_ms) of an address period of a hostname
+ResolutionRow = tuple[str, str, int]
+
+# How `DatabaseLogger` stores the pings: one row each in 'ping_logs', or
+# runs of identical results in 'ping_runs'
+STORAGE_MODES = ("rows", "runs")
+
+_INSERT_SQL = """
+    INSERT INTO ping_logs (result, timestamp, ip_address, rtt_us, ttl, seq)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+# The epoch milliseconds are rendered as "YYYY-MM-DD HH:MM:SS" local time
+_SELECT_LOGS_SQL = """
+    SELECT
+        id,
+        result,
+        strftime('%Y-%m-%d %H:%M:%S', timestamp / 1000, 'unixepoch',
+                 'localtime'),
+        ip_address,
+        rtt_us,
+        ttl,
+        seq
+    FROM {logs} WHERE 1=1
+"""
+# Same columns followed by the raw epoch milliseconds, for the page tokens
+_SELECT_PAGE_SQL = """
+    SELECT
+        id,
+        result,
+        strftime('%Y-%m-%d %H:%M:%S', timestamp / 1000, 'unixepoch',
+                 'localtime'),
+        ip_address,
+        rtt_us,
+        ttl,
+        seq,
+        timestamp
+    FROM {logs} WHERE 1=1
+"""
+_ORDER_SQL = " ORDER BY timestamp DESC, id DESC"
+_COUNT_LOGS_SQL = "SELECT COUNT(*) FROM {logs} WHERE 1=1"
+_SELECT_ROLLUPS_SQL = """
+    SELECT
+        ip_address,
+        bucket,
+        count,
+        successes,
+        failures,
+        rtt_count,
+        rtt_min,
+        rtt_max,
+        rtt_sum,
+        rtt_sum_sq,
+        jitter_count,
+        jitter_sum
+    FROM ping_rollups
+    WHERE resolution = ? AND bucket >= ? AND bucket < ?
+"""
+# Completed with the filter conditions and " LIMIT ?)"
+_DELETE_CHUNK_SQL = """
+    DELETE FROM ping_logs WHERE id IN (SELECT id FROM ping_logs WHERE 1=1
+"""
+# Completed with the target conditions and " LIMIT ?)"
+_DELETE_OLDER_SQL = """
+    DELETE FROM ping_logs WHERE id IN (SELECT id FROM ping_logs
+    WHERE timestamp < ?
+"""
+_DELETE_OLDER_RUNS_SQL = """
+    DELETE FROM ping_runs WHERE id IN (SELECT id FROM ping_runs
+    WHERE end_ms < ?
+"""
+_SELECT_RESOLUTIONS_SQL = """
+    SELECT ip_address, resolved, since_ms FROM ping_resolutions WHERE 1=1
+"""
+_SELECT_TARGETS_SQL = "SELECT entry FROM ping_targets ORDER BY position"
+_INSERT_TARGET_SQL = "INSERT OR IGNORE INTO ping_targets (entry) VALUES (?)"
+_SELECT_RUNS_SQL = """
+    SELECT
+        id, ip_address, result, start_ms, end_ms, count, rtt_count, rtt_min,
+        rtt_max, rtt_sum, rtt_sum_sq, ttl, first_seq, last_seq
+    FROM ping_runs
+    WHERE end_ms >= ? AND start_ms < ?
+"""
+# Queue markers understood by the writer thread
+_FLUSH = object()
+_STOP = object()
+
+
+@dataclass(frozen=True, slots=True)
+class _Resolution:
+    """
+    A new address of a hostname target, queued for the writer thread with
+    the pings.
+
+    Attributes:
+        row (ResolutionRow): The values to insert in 'ping_resolutions'.
+    """
+
+    row: ResolutionRow
+
+
+def format_epoch_ms(epoch_ms: int) -> str:
+    """
+    Renders epoch milliseconds like the database does.
+
+    Args:
+        epoch_ms (int): The epoch milliseconds.
+
+    Returns:
+        str: "YYYY-MM-DD HH:MM:SS" in local time.
+    """
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(epoch_ms // 1000))
+
+
+def _day_start_ms(day: datetime) -> int:
+    """
+    Converts the local midnight starting a day to epoch milliseconds.
+
+    Args:
+        day (datetime): Any time of the day.
+
+    Returns:
+        int: The epoch milliseconds of the day's local midnight.
+    """
+    midnight = datetime(day.year, day.month, day.day)
+    return int(midnight.timestamp() * 1000)
+
+
+@dataclass(frozen=True)
+class LogFilter:
+    """
+    The filters shared by the log queries.
+
+    Attributes:
+        ip_filter (str): A substring of the IP address (SQL LIKE).
+        result_filter (str): The exact result, e.g. "Success".
+        from_date (datetime | None): Only logs on or after this day.
+        to_date (datetime | None): Only logs on or before this day.
+        max_id (int | None): Only logs with an id up to this one, e.g. the
+        `last_id` of the table when a view was opened, so rows written
+        later do not shift its pages.
+        expand_runs (bool): Also return one row per ping stored in
+        'ping_runs', see `DatabaseLogger` storage modes. Those rows carry
+        the negated id of their run, which `max_id` does not filter.
+    """
+
+    ip_filter: str = ""
+    result_filter: str = ""
+    from_date: datetime | None = None
+    to_date: datetime | None = None
+    max_id: int | None = None
+    expand_runs: bool = False
+
+    def where(self) -> tuple[str, list[str | int]]:
+        """
+        Builds the SQL conditions matching the filters.
+
+        Returns:
+            tuple[str, list[str | int]]: The " AND ..." conditions to append
+            to a WHERE clause, and their parameters.
+        """
+        clause = ""
+        params: list[str | int] = []
+        if self.ip_filter:
+            clause += " AND ip_address LIKE ?"
+            params.append(f"%{self.ip_filter}%")
+        if self.result_filter:
+            clause += " AND result = ?"
+            params.append(self.result_filter)
+        if self.from_date:
+            clause += " AND timestamp >= ?"
+            params.append(_day_start_ms(self.from_date))
+        if self.to_date:
+            clause += " AND timestamp < ?"
+            params.append(_day_start_ms(self.to_date + timedelta(days=1)))
+        if self.max_id is not None:
+            clause += " AND id <= ?"
+            params.append(self.max_id)
+        return clause, params
+
+    def time_range(self) -> tuple[int, int]:
+        """
+        The time range covered by the date filters.
+
+        Returns:
+            tuple[int, int]: Its start and end (excluded), in epoch
+            milliseconds, unbounded on the sides without a filter.
+        """
+        start_ms, end_ms = -(2**63), 2**63 - 1
+        if self.from_date:
+            start_ms = _day_start_ms(self.from_date)
+        if self.to_date:
+            end_ms = _day_start_ms(self.to_date + timedelta(days=1))
+        return start_ms, end_ms
+
+    def run_where(self) -> tuple[str, list[str | int]]:
+        """
+        Builds the SQL conditions selecting the runs that may hold pings
+        matching the filters.
+
+        Returns:
+            tuple[str, list[str | int]]: The " AND ..." conditions on
+            'ping_runs', and their parameters.
+        """
+        clause = ""
+        params: list[str | int] = []
+        if self.ip_filter:
+            clause += " AND ip_address LIKE ?"
+            params.append(f"%{self.ip_filter}%")
+        if self.result_filter:
+            clause += " AND result = ?"
+            params.append(self.result_filter)
+        if self.from_date:
+            clause += " AND end_ms >= ?"
+            params.append(_day_start_ms(self.from_date))
+        if self.to_date:
+            clause += " AND start_ms < ?"
+            params.append(_day_start_ms(self.to_date + timedelta(days=1)))
+        return clause, params
+
+    def matches(self, ping: Ping) -> bool:
+        """
+        Checks a ping not yet read from the database against the filters,
+        as `where` would once it is written. `max_id` is ignored.
+
+        Args:
+            ping (Ping): The ping to check.
+
+        Returns:
+            bool: True if the ping passes every filter.
+        """
+        # LIKE is case-insensitive for ASCII, and so is this match
+        if self.ip_filter.lower() not in ping.ip_address.lower():
+            return False
+        if self.result_filter and ping.result != self.result_filter:
+            return False
+        if self.from_date and ping.epoch_ms < _day_start_ms(self.from_date):
+            return False
+        if self.to_date and ping.epoch_ms >= _day_start_ms(
+            self.to_date + timedelta(days=1)
+        ):
+            return False
+        return True
+
+
+def _logs_query(
+    select: str, log_filter: LogFilter
+) -> tuple[str, list[str | int]]:
+    """
+    Completes a log query with the filter conditions, reading the runs
+    expanded to pings as well when the filter asks for it.
+
+    Args:
+        select (str): The SELECT statement, reading from "{logs}" and
+        ending with a WHERE clause.
+        log_filter (LogFilter): The filters.
+
+    Returns:
+        tuple[str, list[str | int]]: The statement and its parameters.
+    """
+    clause, params = log_filter.where()
+    if not log_filter.expand_runs:
+        return select.format(logs="ping_logs") + clause, params
+    run_clause, run_params = log_filter.run_where()
+    sql = runs.EXPAND_SQL.format(runs=run_clause)
+    return sql + select.format(logs="expanded_logs") + clause, [
+        *run_params,
+        *params,
+    ]
+
+
+@dataclass
+class WriterStats:
+    """
+    Counters describing the write-behind queue of a buffered logger.
+
+    Attributes:
+        enqueued (int): Pings accepted by `log`.
+        written (int): Pings committed to the database.
+        dropped (int): Pings discarded because the queue stayed full.
+        blocked (int): Calls to `log` that had to wait for room in the queue.
+        batches (int): Transactions committed by the writer thread.
+        errors (int): Batches that failed to be written.
+        pending (int): Pings currently waiting in the queue.
+        high_water (int): The largest queue depth observed.
+        last_batch_size (int): Number of pings in the last batch.
+        last_flush_ms (float): Duration of the last batch transaction.
+        max_flush_ms (float): Duration of the slowest batch transaction.
+    """
+
+    enqueued: int = 0
+    written: int = 0
+    dropped: int = 0
+    blocked: int = 0
+    batches: int = 0
+    errors: int = 0
+    pending: int = 0
+    high_water: int = 0
+    last_batch_size: int = 0
+    last_flush_ms: float = 0.0
+    max_flush_ms: float = 0.0
 
 
 class DatabaseLogger:
     """
     A class to handle logging of ping results into a SQLite database.
+
+    In buffered mode, `log` only puts the ping in a bounded queue and a
+    single writer thread commits the queued pings with `executemany`, one
+    transaction every `batch_size` rows or every `flush_interval_ms`
+    milliseconds, whichever comes first.
+
+    Connections are long-lived: every write goes through a single writer
+    connection guarded by a lock, and each reading thread gets its own
+    read-only connection, so the schema, the prepared statements and the
+    page cache survive between calls. `close` releases them all.
+
+    Every connection is configured with a `DatabaseProfile` (journal mode,
+    synchronous level, mmap and cache sizes, temp store) when it opens; with
+    a WAL profile the writer also runs a passive checkpoint periodically.
+
+    Every write also adds the pings to the aggregate tables, in the same
+    transaction (see `rollups.RollupWriter`): per target and per minute,
+    hour and day, the number of pings, successes and failures, round-trip
+    time sums and jitter, hourly and daily round-trip time histograms, and
+    the outages. `statistics` reads them instead of the raw logs. Deleting
+    raw logs leaves the aggregates untouched, so they outlive the retention
+    of the raw data; `rebuild_rollups` recomputes them from the raw logs.
+
+    With the "runs" storage mode, pings are not written to 'ping_logs' but
+    merged into runs of identical results of each target (see
+    `runs.RunWriter`), a few rows per state change of a stable link. Read
+    them back with `fetch_runs`, or as one row per ping through a
+    `LogFilter` with `expand_runs`, e.g. for exports.
+
+    The logs of a hostname target keep the hostname as `ip_address`. The
+    address it resolved to is recorded once per change in
+    'ping_resolutions', see `fetch_resolutions`.
     Attributes:
         db_path (str): The file path to the SQLite database.
+        profile (DatabaseProfile): The SQLite settings in use.
+        buffered (bool): Whether pings are written by the writer thread.
+        batch_size (int): Maximum number of pings per transaction.
+        flush_interval_ms (int): Maximum delay before a queued ping is
+        written.
+        enqueue_timeout (float): Seconds `log` waits for room in a full
+        queue before dropping the ping.
+        maintain_rollups (bool): Whether writes update 'ping_rollups'.
+        storage (str): One of `STORAGE_MODES`.
     Methods:
-        __init__(db_path: str):
+        __init__(db_path: str, buffered: bool = False, ...):
             Initializes the DatabaseLogger and creates the necessary table if
             it doesn't exist.
         log(ping: Ping):
-            Logs a ping result into the database.
+            Logs a ping result into the database, or queues it in buffered
+            mode.
+        flush(timeout: float = None) -> bool:
+            Waits until every queued ping has been written.
+        close():
+            Flushes the queue, stops the writer thread and closes every
+            connection.
+        writer_stats() -> WriterStats:
+            Returns the backpressure counters of the write-behind queue.
+        pragma_report() -> dict:
+            Returns the profile name and the SQLite settings in effect.
+        checkpoint(mode: str = "PASSIVE"):
+            Runs a WAL checkpoint.
         fetch_logs(ip_filter: str = "", result_filter: str = "",
-        from_date: datetime = None, to_date: datetime = None) -> list:
+        from_date: datetime = None, to_date: datetime = None,
+        expand_runs: bool = False) -> list[LogRow]:
             Fetches logs from the database with optional filters for IP
             address, result, and date range.
+        fetch_runs(ip_address: str = None, start_ms: int = None,
+        end_ms: int = None) -> list[RunRow]:
+            Fetches the runs of identical results overlapping a time range.
+        fetch_resolutions(ip_address: str = None) -> list[ResolutionRow]:
+            Fetches the addresses the hostname targets resolved to.
+        saved_targets() -> list[str]:
+            Returns the entries of the saved target set.
+        save_targets(entries: Iterable[str]):
+            Replaces the saved target set.
+        iter_logs(log_filter: LogFilter = None, chunk_size: int = 1000)
+        -> Iterator[LogRow]:
+            Streams the filtered logs without loading them all in memory.
+        iter_log_chunks(log_filter: LogFilter = None, chunk_size: int = 1000)
+        -> Iterator[list[LogRow]]:
+            Streams the filtered logs in chunks of rows.
+        iter_timed_chunks(log_filter: LogFilter = None,
+        chunk_size: int = 1000) -> Iterator[list[TimedLogRow]]:
+            Streams the filtered logs with their epoch milliseconds.
+        count_logs(log_filter: LogFilter = None) -> int:
+            Counts the filtered logs.
+        close_reader():
+            Closes the read connection of the calling thread.
+        fetch_page(log_filter: LogFilter = None, after: PageToken = None,
+        page_size: int = 500) -> tuple[list[LogRow], PageToken | None]:
+            Fetches one page of the filtered logs by keyset pagination.
+        last_id() -> int:
+            Returns the id of the most recently written log.
+        delete_logs(log_filter: LogFilter, chunk_size: int = 5000, ...)
+        -> int:
+            Deletes the filtered logs in bounded chunks.
+        delete_older_than(cutoff_ms: int, ip_address: str = None, ...)
+        -> int:
+            Deletes the logs older than a cutoff in bounded chunks.
+        incremental_vacuum(max_pages: int = 1000) -> int:
+            Returns free pages of the database file to the file system.
         delete_logs_by_ids(ids: list):
             Deletes logs from the database by their IDs.
+        fetch_rollups(resolution: str, ip_address: str = None, ...)
+        -> list[RollupRow]:
+            Fetches the aggregated logs of a time range.
+        rebuild_rollups(...) -> int:
+            Recomputes the rollups from the raw logs.
+        statistics(start: datetime, end: datetime, ip_address: str = None)
+        -> list[TargetStats]:
+            Computes availability, loss, latency, jitter and outages.
     """
 
-    def __init__(self, db_path: str) -> None:
+    def __init__(
+        self,
+        db_path: str,
+        buffered: bool = False,
+        batch_size: int = 500,
+        flush_interval_ms: int = 1000,
+        max_queue: int = 10000,
+        enqueue_timeout: float = 0.5,
+        profile: str | DatabaseProfile = "balanced",
+        maintain_rollups: bool = True,
+        storage: str = "rows",
+    ) -> None:
         """
         Initialize the instance with the specified database path and create
         the necessary database table.
 
         Args:
             db_path (str): The file path to the database.
+            buffered (bool, optional): Queue pings and write them in batches
+            from a writer thread. Defaults to False.
+            batch_size (int, optional): Maximum pings per transaction.
+            flush_interval_ms (int, optional): Maximum delay in milliseconds
+            before a queued ping is written.
+            max_queue (int, optional): Capacity of the write-behind queue.
+            enqueue_timeout (float, optional): Seconds `log` waits for room
+            in a full queue before dropping the ping.
+            profile (str | DatabaseProfile, optional): The SQLite settings,
+            or the name of one of `profiles.PROFILES`: "durable" (SQLite
+            defaults), "balanced" (WAL, synchronous=NORMAL) or "fast".
+            maintain_rollups (bool, optional): Update 'ping_rollups' on
+            every write. Defaults to True.
+            storage (str, optional): "rows" to write every ping to
+            'ping_logs', or "runs" to only store the runs of identical
+            results in 'ping_runs'. Defaults to "rows".
+
+        Raises:
+            ValueError: If the profile name or the storage mode is unknown.
         """
+        if storage not in STORAGE_MODES:
+            raise ValueError(
+                f"Unknown storage mode {storage!r}, "
+                f"expected one of {', '.join(STORAGE_MODES)}"
+            )
         self.db_path = db_path
+        self.profile = get_profile(profile)
+        self.buffered = buffered
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.enqueue_timeout = enqueue_timeout
+        self.maintain_rollups = maintain_rollups
+        self.storage = storage
+        self._rollup_writer: rollups.RollupWriter | None = None
+        self._run_writer: runs.RunWriter | None = None
+        self._resolved: dict[str, str] | None = None
+        self._queue: queue.Queue[object] = queue.Queue(max_queue)
+        self._stats = WriterStats()
+        self._stats_lock = threading.Lock()
+        self._writer: threading.Thread | None = None
+        self._write_conn: sqlite3.Connection | None = None
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._last_checkpoint = time.monotonic()
         self._create_table()
+        if buffered:
+            self._writer = threading.Thread(
+                target=self._writer_loop,
+                name="DatabaseLogger writer",
+                daemon=True,
+            )
+            self._writer.start()
 
-    def _create_connection(self) -> sqlite3.Connection:
+    def _create_connection(
+        self, read_only: bool = False
+    ) -> sqlite3.Connection:
         """
         Establishes a connection to the SQLite database.
 
+        The connection may be used from other threads than the one opening
+        it: the writer connection is serialized by a lock, and reader
+        connections are only shared with `close`. The settings of the
+        logger profile are applied before it is returned.
+
+        Args:
+            read_only (bool, optional): Open the database in read-only mode.
+
         Returns:
             sqlite3.Connection: A connection object to interact with the
             SQLite database.
         """
-        return sqlite3.connect(self.db_path)
+        if read_only:
+            uri = Path(self.db_path).absolute().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(
+                uri,
+                uri=True,
+                check_same_thread=False,
+                cached_statements=256,
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path, check_same_thread=False, cached_statements=256
+            )
+        apply_profile(conn, self.profile, writer=not read_only)
+        return conn
+
+    @contextmanager
+    def _write_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Provides exclusive use of the long-lived writer connection, opening
+        it on first use.
+
+        Yields:
+            sqlite3.Connection: The writer connection.
+        """
+        with self._write_lock:
+            if self._write_conn is None:
+                self._write_conn = self._create_connection()
+            yield self._write_conn
+
+    def _read_connection(self) -> sqlite3.Connection:
+        """
+        Returns the read-only connection of the calling thread, opening it
+        on first use.
+
+        Returns:
+            sqlite3.Connection: The connection of the calling thread.
+        """
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._create_connection(read_only=True)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
 
     def _create_table(self) -> None:
         """
         Creates the 'ping_logs' table in the database if it does not already
-        exist.
+        exist, or upgrades it to the current schema version.
 
         The table includes the following columns:
             - id: An auto-incrementing integer serving as the primary key.
             - result: A text field to store the result of the ping operation.
-            - timestamp: A text field to store the timestamp of the ping
-            operation.
+            - timestamp: An integer field to store the time of the ping
+            operation, in Unix epoch milliseconds.
             - ip_address: A text field to store the IP address that was pinged.
+            - rtt_us: The round-trip time in microseconds, if any.
+            - ttl: The TTL of the reply, if any.
+            - seq: The sequence number of the probe.
 
-        This method establishes a connection to the database, executes the SQL
-        command to create the table, and then closes the connection. If an
-        error occurs during the process, it prints an error message.
+        It is indexed on (ip_address, timestamp) and on (timestamp). Databases
+        created by earlier versions are migrated in place, see
+        `schema.migrate`. If an error occurs during the process, it prints an
+        error message.
 
         Raises:
             Exception: If there is an issue creating the database table.
         """
         try:
-            conn = self._create_connection()
-            with conn:
-                conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS ping_logs (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        result TEXT NOT NULL,
-                        timestamp TEXT NOT NULL,
-                        ip_address TEXT NOT NULL
-                    )
-                """
-                )
-            conn.close()
+            with self._write_connection() as conn:
+                schema.migrate(conn)
         except Exception as e:
             print(f"Error creating database table: {e}")
 
@@ -84,27 +634,318 @@ class DatabaseLogger:
         """
         Logs the details of a ping operation to the database.
 
+        In buffered mode the ping is queued for the writer thread. If the
+        queue is full, the call waits up to `enqueue_timeout` seconds and
+        then drops the ping; both events are counted in `writer_stats`.
+
+        A new address of a hostname target is recorded with the ping, in
+        the same transaction; the following pings of the same address cost
+        nothing more.
+
         Args:
             ping (Ping): An instance of the Ping class containing the result,
-                         timestamp, and IP address of the ping operation.
+                         timestamp, IP address and reply details of the ping
+                         operation.
 
         Raises:
             Exception: If an error occurs while logging to the database,
                        it prints an error message with the exception details.
         """
         try:
-            conn = self._create_connection()
-            with conn:
-                conn.execute(
-                    """
-                    INSERT INTO ping_logs (result, timestamp, ip_address)
-                    VALUES (?, ?, ?)
-                """,
-                    (ping.result, ping.timestamp, ping.ip_address),
-                )
-            conn.close()
+            row = (
+                ping.result,
+                ping.epoch_ms,
+                ping.ip_address,
+                ping.rtt_us,
+                ping.ttl,
+                ping.seq,
+            )
+            resolution = self._new_resolution(ping)
+            if self._writer is not None:
+                if resolution is not None:
+                    self._enqueue(_Resolution(resolution))
+                self._enqueue(row)
+                return
+            with self._write_connection() as conn, conn:
+                self._store(conn, [row])
+                if resolution is not None:
+                    conn.execute(resolutions.INSERT_SQL, resolution)
+            self._maybe_checkpoint()
+        except Exception as e:
+            print(f"Error logging to database: {e}")
+            if self._writer is None:
+                # The writers' state may not match the rolled back data
+                self._rollup_writer = self._run_writer = None
+
+    def _new_resolution(self, ping: Ping) -> ResolutionRow | None:
+        """
+        Checks whether a ping holds a new address of a hostname target,
+        and takes note of it.
+
+        Args:
+            ping (Ping): The ping to log.
+
+        Returns:
+            ResolutionRow | None: The address period to record, None if the
+            target is not a hostname or its address did not change.
+        """
+        if ping.resolved is None:
+            return None
+        if self._resolved is None:
+            self._resolved = resolutions.latest(self._read_connection())
+        if self._resolved.get(ping.ip_address) == ping.resolved:
+            return None
+        self._resolved[ping.ip_address] = ping.resolved
+        return (ping.ip_address, ping.resolved, ping.epoch_ms)
+
+    def _enqueue(self, row: PingRow | _Resolution) -> None:
+        """
+        Puts a ping, or the new address of a hostname target, in the
+        write-behind queue, applying backpressure.
+
+        Args:
+            row (PingRow | _Resolution): The values to insert.
+        """
+        blocked = dropped = False
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            blocked = True
+            try:
+                self._queue.put(row, timeout=self.enqueue_timeout)
+            except queue.Full:
+                dropped = True
+        if isinstance(row, _Resolution):
+            if dropped and self._resolved is not None:
+                # Recorded again with the next ping of the target
+                self._resolved.pop(row.row[0], None)
+            return
+        with self._stats_lock:
+            stats = self._stats
+            stats.blocked += blocked
+            if dropped:
+                stats.dropped += 1
+                return
+            stats.enqueued += 1
+            stats.high_water = max(stats.high_water, self._queue.qsize())
+
+    def _writer_loop(self) -> None:
+        """
+        Main loop of the writer thread.
+
+        Collects queued pings until `batch_size` rows are waiting, the
+        flush interval has elapsed since the first of them, or a flush or
+        stop marker is received, then writes them in one transaction.
+        """
+        interval = self.flush_interval_ms / 1000
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch: list[PingRow | _Resolution] = []
+            markers = 0
+            deadline = time.monotonic() + interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                if item is _FLUSH or item is _STOP:
+                    markers += 1
+                    break
+                batch.append(item)  # type: ignore[arg-type]
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(batch)
+            for _ in range(len(batch) + markers):
+                self._queue.task_done()
+
+    def _write_batch(self, batch: list[PingRow | _Resolution]) -> None:
+        """
+        Writes a batch of pings, and the new addresses of the hostname
+        targets among them, in a single transaction.
+
+        Args:
+            batch (list[PingRow | _Resolution]): The values to insert.
+        """
+        started = time.perf_counter()
+        rows: list[PingRow] = []
+        addresses: list[ResolutionRow] = []
+        for item in batch:
+            if isinstance(item, _Resolution):
+                addresses.append(item.row)
+            else:
+                rows.append(item)
+        try:
+            with self._write_connection() as conn, conn:
+                self._store(conn, rows)
+                conn.executemany(resolutions.INSERT_SQL, addresses)
+            self._maybe_checkpoint()
         except Exception as e:
             print(f"Error logging to database: {e}")
+            # The writers' state may not match the rolled back data
+            self._rollup_writer = self._run_writer = None
+            with self._stats_lock:
+                self._stats.errors += 1
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            stats = self._stats
+            stats.written += len(rows)
+            stats.batches += 1
+            stats.last_batch_size = len(rows)
+            stats.last_flush_ms = elapsed_ms
+            stats.max_flush_ms = max(stats.max_flush_ms, elapsed_ms)
+
+    def _store(self, conn: sqlite3.Connection, batch: list[PingRow]) -> None:
+        """
+        Writes pings as rows or runs, depending on the storage mode, and
+        adds them to the rollups.
+
+        Args:
+            conn (sqlite3.Connection): The writer connection, inside a
+            transaction.
+            batch (list[PingRow]): The values to write.
+        """
+        if self.storage == "runs":
+            if self._run_writer is None:
+                self._run_writer = runs.RunWriter(conn)
+            self._run_writer.add(conn, batch)
+        else:
+            conn.executemany(_INSERT_SQL, batch)
+        self._update_rollups(conn, batch)
+
+    def _update_rollups(
+        self, conn: sqlite3.Connection, batch: list[PingRow]
+    ) -> None:
+        """
+        Adds written pings to the rollups, histograms and outages.
+
+        Args:
+            conn (sqlite3.Connection): The writer connection, inside the
+            transaction inserting the pings.
+            batch (list[PingRow]): The values inserted.
+        """
+        if not self.maintain_rollups:
+            return
+        if self._rollup_writer is None:
+            self._rollup_writer = rollups.RollupWriter(conn)
+        self._rollup_writer.add(conn, (row[:4] for row in batch))
+
+    def _maybe_checkpoint(self) -> None:
+        """
+        Runs a passive WAL checkpoint if the profile interval has elapsed
+        since the previous one.
+        """
+        interval = self.profile.checkpoint_interval_s
+        if interval <= 0 or self.profile.journal_mode != "WAL":
+            return
+        now = time.monotonic()
+        if now - self._last_checkpoint >= interval:
+            self._last_checkpoint = now
+            self.checkpoint()
+
+    def checkpoint(self, mode: str = "PASSIVE") -> tuple[int, int, int]:
+        """
+        Copies the WAL content back into the database file.
+
+        A passive checkpoint never waits for readers or the writer; "FULL",
+        "RESTART" and "TRUNCATE" wait for them, see the SQLite documentation
+        of ``PRAGMA wal_checkpoint``.
+
+        Args:
+            mode (str, optional): The checkpoint mode. Defaults to "PASSIVE".
+
+        Returns:
+            tuple[int, int, int]: The busy flag, the number of pages in the
+            WAL and the number of pages checkpointed, as reported by SQLite
+            (all -1 when the database is not in WAL mode).
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Invalid checkpoint mode {mode!r}")
+        with self._write_connection() as conn:
+            row = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        return int(row[0]), int(row[1]), int(row[2])
+
+    def pragma_report(self) -> dict[str, str | int]:
+        """
+        Reports the profile in use and the SQLite settings in effect on the
+        writer connection, as read back from SQLite.
+
+        Returns:
+            dict[str, str | int]: The profile name and the journal mode,
+            synchronous level, mmap size, cache size and temp store.
+        """
+        with self._write_connection() as conn:
+            report = read_pragmas(conn)
+        return {"profile": self.profile.name, **report}
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Writes every queued ping now and waits for the writer thread.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait. Waits
+            indefinitely by default.
+
+        Returns:
+            bool: True if the queue was fully written, False on timeout.
+            Always True when the logger is not buffered.
+        """
+        if self._writer is None:
+            return True
+        self._queue.put(_FLUSH)
+        if timeout is None:
+            self._queue.join()
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self) -> None:
+        """
+        Flushes the write-behind queue, stops the writer thread and closes
+        the writer and reader connections.
+
+        The logger stays usable: after closing, `log` writes directly to the
+        database and connections are reopened on demand.
+        """
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(_STOP)
+            writer.join()
+        with self._write_lock:
+            if self._write_conn is not None:
+                self._write_conn.close()
+                self._write_conn = None
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+        # Threads still holding a closed connection open a new one
+        self._local = threading.local()
+
+    def writer_stats(self) -> WriterStats:
+        """
+        Returns a snapshot of the write-behind queue counters.
+
+        Returns:
+            WriterStats: The counters. All zero when the logger is not
+            buffered.
+        """
+        with self._stats_lock:
+            stats = WriterStats(**vars(self._stats))
+        stats.pending = self._queue.qsize()
+        return stats
 
     def fetch_logs(
         self,
@@ -112,7 +953,8 @@ class DatabaseLogger:
         result_filter: str = "",
         from_date: datetime | None = None,
         to_date: datetime | None = None,
-    ) -> list[tuple[int, str, str, str]]:
+        expand_runs: bool = False,
+    ) -> list[LogRow]:
         """
         Fetch logs from the ping_logs database table with optional filtering.
         Args:
@@ -126,6 +968,8 @@ class DatabaseLogger:
             to_date (datetime, optional): The end date for filtering logs.
                                           Only logs with a timestamp on or
                                           before this date will be included.
+            expand_runs (bool, optional): Also return one row per ping of
+            the runs stored in "runs" storage mode, see `LogFilter`.
         Returns:
             list: A list of tuples, where each tuple contains the following
             fields:
@@ -134,42 +978,493 @@ class DatabaseLogger:
                   - timestamp (str): The timestamp of the log entry.
                   - ip_address (str): The IP address associated with the log
                   entry.
+                  - rtt_us (int | None): The round-trip time in microseconds.
+                  - ttl (int | None): The TTL of the reply.
+                  - seq (int | None): The sequence number of the probe.
         Notes:
             - Logs are returned in descending order of their timestamp.
             - If an error occurs during database access, an empty list is
             returned, and the error is printed to the console.
         """
+        log_filter = LogFilter(
+            ip_filter,
+            result_filter,
+            from_date,
+            to_date,
+            expand_runs=expand_runs,
+        )
         try:
-            conn = self._create_connection()
-            query = """
-            SELECT id, result, timestamp, ip_address FROM ping_logs WHERE 1=1
-            """
-            params = []
-
-            if ip_filter:
-                query += " AND ip_address LIKE ?"
-                params.append(f"%{ip_filter}%")
-            if result_filter:
-                query += " AND result = ?"
-                params.append(result_filter)
-            if from_date:
-                query += " AND timestamp >= ?"
-                params.append(from_date.strftime("%Y-%m-%d 00:00:00"))
-            if to_date:
-                query += " AND timestamp <= ?"
-                params.append(to_date.strftime("%Y-%m-%d 23:59:59"))
-
-            query += " ORDER BY timestamp DESC"
-
+            conn = self._read_connection()
+            sql, params = _logs_query(_SELECT_LOGS_SQL, log_filter)
             cur = conn.cursor()
-            cur.execute(query, params)
+            cur.execute(sql + _ORDER_SQL, params)
             rows = cur.fetchall()
-            conn.close()
+            cur.close()
             return rows
         except Exception as e:
             print(f"Error fetching logs: {e}")
             return []
 
+    def iter_log_chunks(
+        self, log_filter: LogFilter | None = None, chunk_size: int = 1000
+    ) -> Iterator[list[LogRow]]:
+        """
+        Streams the filtered logs, newest first, in lists of `chunk_size`
+        rows fetched from a single cursor.
+
+        Only one chunk is held in memory. The rows come from a single read
+        transaction, so they are a consistent snapshot of the table; close
+        the generator to end the transaction early.
+
+        Args:
+            log_filter (LogFilter, optional): The filters. Defaults to all
+            logs.
+            chunk_size (int, optional): Number of rows fetched from the
+            cursor at a time.
+
+        Yields:
+            list[LogRow]: The rows, in the same format as `fetch_logs`.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        yield from self._iter_chunks(_SELECT_LOGS_SQL, log_filter, chunk_size)
+
+    def iter_timed_chunks(
+        self, log_filter: LogFilter | None = None, chunk_size: int = 1000
+    ) -> Iterator[list[TimedLogRow]]:
+        """
+        Same as `iter_log_chunks`, with the epoch milliseconds of each log
+        appended to its row, for consumers storing typed timestamps.
+
+        Args:
+            log_filter (LogFilter, optional): The filters. Defaults to all
+            logs.
+            chunk_size (int, optional): Number of rows fetched from the
+            cursor at a time.
+
+        Yields:
+            list[TimedLogRow]: The rows.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        yield from self._iter_chunks(_SELECT_PAGE_SQL, log_filter, chunk_size)
+
+    def _iter_chunks(
+        self, select: str, log_filter: LogFilter | None, chunk_size: int
+    ) -> Iterator[list[Any]]:
+        """
+        Runs a log query and yields its rows `chunk_size` at a time.
+
+        Args:
+            select (str): The SELECT statement, ending with a WHERE clause.
+            log_filter (LogFilter | None): The filters.
+            chunk_size (int): Number of rows fetched at a time.
+
+        Yields:
+            list[Any]: The rows.
+        """
+        sql, params = _logs_query(select, log_filter or LogFilter())
+        cur = self._read_connection().cursor()
+        try:
+            cur.execute(sql + _ORDER_SQL, params)
+            while rows := cur.fetchmany(chunk_size):
+                yield rows
+        finally:
+            cur.close()
+
+    def iter_logs(
+        self, log_filter: LogFilter | None = None, chunk_size: int = 1000
+    ) -> Iterator[LogRow]:
+        """
+        Streams the filtered logs one by one, see `iter_log_chunks`.
+
+        Args:
+            log_filter (LogFilter, optional): The filters. Defaults to all
+            logs.
+            chunk_size (int, optional): Number of rows fetched from the
+            cursor at a time.
+
+        Yields:
+            LogRow: The rows, in the same format as `fetch_logs`.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        for rows in self.iter_log_chunks(log_filter, chunk_size):
+            yield from rows
+
+    def count_logs(self, log_filter: LogFilter | None = None) -> int:
+        """
+        Counts the filtered logs.
+
+        Args:
+            log_filter (LogFilter, optional): The filters. Defaults to all
+            logs.
+
+        Returns:
+            int: The number of matching logs.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        sql, params = _logs_query(_COUNT_LOGS_SQL, log_filter or LogFilter())
+        row = self._read_connection().execute(sql, params).fetchone()
+        return int(row[0])
+
+    def close_reader(self) -> None:
+        """
+        Closes the read connection of the calling thread, if it opened one.
+        Short-lived threads call it before exiting, since `close` would only
+        release their connection when the logger itself is closed.
+        """
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._readers_lock:
+            if conn in self._readers:
+                self._readers.remove(conn)
+        conn.close()
+
+    def fetch_page(
+        self,
+        log_filter: LogFilter | None = None,
+        after: PageToken | None = None,
+        page_size: int = 500,
+    ) -> tuple[list[LogRow], PageToken | None]:
+        """
+        Fetches one page of the filtered logs, newest first, by keyset
+        pagination.
+
+        Instead of an OFFSET, which makes SQLite step over every skipped row,
+        the next page starts right after the (timestamp, id) of the last row
+        of the previous one, so every page costs the same on the
+        (ip_address, timestamp) and (timestamp) indexes however deep it is.
+
+        When the filter expands the runs, they are paged at the run level
+        too: only the runs overlapping the page are read, and only the
+        pings returned are expanded, see `runs.page_pings`. The token then
+        also holds the index of the ping in its run, so a page can start in
+        the middle of one.
+
+        Args:
+            log_filter (LogFilter, optional): The filters. Defaults to all
+            logs.
+            after (PageToken, optional): The token returned with the previous
+            page; None for the first page.
+            page_size (int, optional): Maximum number of rows in the page.
+
+        Returns:
+            tuple[list[LogRow], PageToken | None]: The rows, in the same
+            format as `fetch_logs`, and the token of the next page, None when
+            this page is the last one. On error, an empty page is returned
+            and the error is printed to the console.
+        """
+        log_filter = log_filter or LogFilter()
+        # The rows of 'ping_logs' come from SQL, the pings of the runs from
+        # `runs.page_pings`; both are keyed as the token
+        logs_filter = replace(log_filter, expand_runs=False)
+        sql, params = _logs_query(_SELECT_PAGE_SQL, logs_filter)
+        if after is not None:
+            timestamp, row_id, _ = after
+            sql += " AND timestamp <= ? AND (timestamp < ? OR id < ?)"
+            params += [timestamp, timestamp, row_id]
+        try:
+            conn = self._read_connection()
+            cur = conn.cursor()
+            cur.execute(sql + _ORDER_SQL + " LIMIT ?", [*params, page_size])
+            keyed: list[tuple[PageToken, LogRow]] = [
+                ((row[7], row[0], 0), row[:7]) for row in cur.fetchall()
+            ]
+            cur.close()
+            if log_filter.expand_runs:
+                keyed += self._run_page(conn, log_filter, after, page_size)
+        except Exception as e:
+            print(f"Error fetching logs: {e}")
+            return [], None
+        keyed.sort(key=lambda row: row[0], reverse=True)
+        del keyed[page_size:]
+        token = keyed[-1][0] if len(keyed) == page_size else None
+        return [row for _, row in keyed], token
+
+    @staticmethod
+    def _run_page(
+        conn: sqlite3.Connection,
+        log_filter: LogFilter,
+        after: PageToken | None,
+        page_size: int,
+    ) -> list[tuple[PageToken, LogRow]]:
+        """
+        Reads the pings of the runs that may belong to a page.
+
+        Args:
+            conn (sqlite3.Connection): The read connection.
+            log_filter (LogFilter): The filters.
+            after (PageToken | None): The token of the page.
+            page_size (int): Maximum number of pings in the page.
+
+        Returns:
+            list[tuple[PageToken, LogRow]]: The pings, keyed as the token.
+        """
+        clause, params = log_filter.run_where()
+        start_ms, end_ms = log_filter.time_range()
+        pings = runs.page_pings(
+            conn, clause, params, after, start_ms, end_ms, page_size
+        )
+        keyed: list[tuple[PageToken, LogRow]] = []
+        for key, run in pings:
+            run_id, result, epoch_ms, ip_address, rtt_us, ttl, seq = (
+                run.expanded(key[2])
+            )
+            timestamp = format_epoch_ms(epoch_ms)
+            row = (run_id, result, timestamp, ip_address, rtt_us, ttl, seq)
+            keyed.append((key, row))
+        return keyed
+
+    def last_id(self) -> int:
+        """
+        Returns the id of the most recently written log. Ids only grow, so
+        it bounds the rows existing at the time of the call.
+
+        Returns:
+            int: The largest id in the table, 0 if it is empty or on error.
+        """
+        try:
+            row = (
+                self._read_connection()
+                .execute("SELECT COALESCE(MAX(id), 0) FROM ping_logs")
+                .fetchone()
+            )
+            return int(row[0])
+        except Exception as e:
+            print(f"Error fetching logs: {e}")
+            return 0
+
+    def delete_logs(
+        self,
+        log_filter: LogFilter,
+        chunk_size: int = 5000,
+        progress: Callable[[int, int], None] | None = None,
+        cancel: threading.Event | None = None,
+        pause_s: float = 0.01,
+    ) -> int:
+        """
+        Deletes the filtered logs by predicate, in chunks.
+
+        Each chunk is a single set-based DELETE of at most `chunk_size` rows
+        in its own transaction, so the write lock is only held briefly and
+        `pause_s` is left between chunks for the probes to write. Logs
+        written after the call are never deleted.
+
+        When the filter expands the runs, the pings of 'ping_runs' it
+        matches are removed too, `chunk_size` runs per transaction: runs
+        within the dates are deleted, runs crossing them are trimmed or
+        split, see `runs.delete_runs`.
+
+        The aggregates (rollups, histograms, outages) are kept, as they are
+        for retention: they summarize what was measured, so `statistics`
+        still counts the deleted pings.
+
+        Args:
+            log_filter (LogFilter): The filters of the logs to delete.
+            chunk_size (int, optional): Maximum number of rows deleted per
+            transaction.
+            progress (Callable[[int, int], None], optional): Called after
+            every chunk with the number of rows deleted and the total.
+            cancel (threading.Event, optional): Stops the deletion after the
+            current chunk once set. The chunks already deleted stay deleted.
+            pause_s (float, optional): Seconds to wait between two chunks.
+
+        Returns:
+            int: The number of rows and run pings deleted.
+
+        Raises:
+            sqlite3.Error: If a chunk cannot be deleted. The previous chunks
+            stay deleted.
+        """
+        if log_filter.max_id is None:
+            log_filter = replace(log_filter, max_id=self.last_id())
+        total = self.count_logs(log_filter)
+        expand_runs = log_filter.expand_runs
+        log_filter = replace(log_filter, expand_runs=False)
+        clause, params = log_filter.where()
+        deleted = 0
+        while cancel is None or not cancel.is_set():
+            with self._write_connection() as conn, conn:
+                count = conn.execute(
+                    _DELETE_CHUNK_SQL + clause + " LIMIT ?)",
+                    [*params, chunk_size],
+                ).rowcount
+            deleted += count
+            if progress is not None:
+                progress(deleted, max(total, deleted))
+            if count < chunk_size:
+                break
+            time.sleep(pause_s)
+        if expand_runs:
+            deleted += self._delete_run_pings(
+                log_filter,
+                chunk_size,
+                cancel,
+                pause_s,
+                deleted,
+                total,
+                progress,
+            )
+        return deleted
+
+    def _delete_run_pings(
+        self,
+        log_filter: LogFilter,
+        chunk_size: int,
+        cancel: threading.Event | None,
+        pause_s: float,
+        deleted: int,
+        total: int,
+        progress: Callable[[int, int], None] | None,
+    ) -> int:
+        """
+        Removes the pings of 'ping_runs' matching a filter, for
+        `delete_logs`. Runs written after the call are left alone.
+
+        Args:
+            log_filter (LogFilter): The filters of the logs to delete.
+            chunk_size (int): Maximum number of runs per transaction.
+            cancel (threading.Event | None): Stops after the current chunk
+            once set.
+            pause_s (float): Seconds to wait between two chunks.
+            deleted (int): Rows already deleted from 'ping_logs'.
+            total (int): Rows and run pings matching the filter.
+            progress (Callable[[int, int], None] | None): Called after
+            every chunk with the number of rows deleted and the total.
+
+        Returns:
+            int: The number of run pings removed.
+        """
+        clause, params = log_filter.run_where()
+        start_ms, end_ms = log_filter.time_range()
+        with self._write_connection() as conn:
+            max_id = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM ping_runs"
+            ).fetchone()[0]
+        removed = position = 0
+        while position < max_id and (cancel is None or not cancel.is_set()):
+            with self._write_connection() as conn, conn:
+                count, position = runs.delete_runs(
+                    conn,
+                    position,
+                    max_id,
+                    clause,
+                    params,
+                    start_ms,
+                    end_ms,
+                    chunk_size,
+                )
+                if count:
+                    # The last run of a target may have changed
+                    self._run_writer = None
+            removed += count
+            if progress is not None:
+                done = deleted + removed
+                progress(done, max(total, done))
+            if position < max_id:
+                time.sleep(pause_s)
+        return removed
+
+    def delete_older_than(
+        self,
+        cutoff_ms: int,
+        ip_address: str | None = None,
+        exclude: tuple[str, ...] = (),
+        chunk_size: int = 1000,
+        max_chunks: int | None = None,
+        cancel: threading.Event | None = None,
+        pause_s: float = 0.01,
+    ) -> int:
+        """
+        Deletes the logs written before a cutoff, in chunks.
+
+        Like `delete_logs`, each chunk is a single DELETE of at most
+        `chunk_size` rows in its own transaction, located through the
+        timestamp indexes. The runs of 'ping_runs' ending before the cutoff
+        are deleted the same way afterwards.
+
+        Args:
+            cutoff_ms (int): Logs with a timestamp strictly before these
+            epoch milliseconds are deleted.
+            ip_address (str, optional): Only delete the logs of this exact
+            address.
+            exclude (tuple[str, ...], optional): Addresses whose logs are
+            kept.
+            chunk_size (int, optional): Maximum number of rows deleted per
+            transaction.
+            max_chunks (int, optional): Stops after this many chunks per
+            table, leaving the rest for a later call. Unbounded by default.
+            cancel (threading.Event, optional): Stops the deletion after the
+            current chunk once set.
+            pause_s (float, optional): Seconds to wait between two chunks.
+
+        Returns:
+            int: The number of rows and runs deleted.
+
+        Raises:
+            sqlite3.Error: If a chunk cannot be deleted. The previous chunks
+            stay deleted.
+        """
+        clause = ""
+        params: list[str | int] = [cutoff_ms]
+        if ip_address is not None:
+            clause += " AND ip_address = ?"
+            params.append(ip_address)
+        if exclude:
+            placeholders = ", ".join("?" * len(exclude))
+            clause += f" AND ip_address NOT IN ({placeholders})"
+            params.extend(exclude)
+        deleted = 0
+        for delete_sql in (_DELETE_OLDER_SQL, _DELETE_OLDER_RUNS_SQL):
+            chunks = 0
+            while cancel is None or not cancel.is_set():
+                with self._write_connection() as conn, conn:
+                    count = conn.execute(
+                        delete_sql + clause + " LIMIT ?)",
+                        [*params, chunk_size],
+                    ).rowcount
+                    if count and delete_sql is _DELETE_OLDER_RUNS_SQL:
+                        # The last run of a target may be gone
+                        self._run_writer = None
+                deleted += count
+                chunks += 1
+                if count < chunk_size or chunks == max_chunks:
+                    break
+                time.sleep(pause_s)
+        return deleted
+
+    def incremental_vacuum(self, max_pages: int = 1000) -> int:
+        """
+        Returns up to `max_pages` free pages at the end of the database file
+        to the file system, with ``PRAGMA incremental_vacuum``.
+
+        Deleted rows leave free pages that SQLite reuses for new rows; this
+        shrinks the file a bounded step at a time, so the write lock is
+        never held for a full VACUUM.
+
+        Args:
+            max_pages (int, optional): Maximum number of pages released, 0
+            or less to release every free page.
+
+        Returns:
+            int: The number of pages released.
+        """
+        with self._write_connection() as conn:
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # Each step of the statement releases one page, and `execute`
+            # only steps statements without result columns once
+            conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages)})")
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return int(before - after)
+
     def delete_logs_by_ids(self, ids: list[int]) -> None:
         """
         Deletes log entries from the 'ping_logs' table in the database based
@@ -184,11 +1479,209 @@ class DatabaseLogger:
             be caught and printed.
         """
         try:
-            conn = self._create_connection()
-            with conn:
+            with self._write_connection() as conn, conn:
                 conn.executemany(
                     "DELETE FROM ping_logs WHERE id = ?", [(i,) for i in ids]
                 )
-            conn.close()
         except Exception as e:
             print(f"Error deleting logs: {e}")
+
+    def fetch_runs(
+        self,
+        ip_address: str | None = None,
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+    ) -> list[RunRow]:
+        """
+        Fetches the runs of identical results stored in "runs" storage mode
+        that overlap a time range, oldest first.
+
+        Args:
+            ip_address (str, optional): Only the runs of this exact address.
+            start_ms (int, optional): Only runs ending at or after these
+            epoch milliseconds.
+            end_ms (int, optional): Only runs starting before these epoch
+            milliseconds.
+
+        Returns:
+            list[RunRow]: The runs, ordered by start then address.
+        """
+        sql = _SELECT_RUNS_SQL
+        params: list[str | int] = [
+            -(2**63) if start_ms is None else start_ms,
+            2**63 - 1 if end_ms is None else end_ms,
+        ]
+        if ip_address is not None:
+            sql += " AND ip_address = ?"
+            params.append(ip_address)
+        conn = self._read_connection()
+        rows: list[RunRow] = conn.execute(
+            sql + " ORDER BY start_ms, ip_address", params
+        ).fetchall()
+        return rows
+
+    def fetch_resolutions(
+        self, ip_address: str | None = None
+    ) -> list[ResolutionRow]:
+        """
+        Fetches the addresses the hostname targets resolved to. Each one
+        holds from its `since_ms` until the next row of the same target.
+
+        Args:
+            ip_address (str, optional): Only the addresses of this target.
+
+        Returns:
+            list[ResolutionRow]: The addresses, oldest first.
+        """
+        sql = _SELECT_RESOLUTIONS_SQL
+        params: list[str] = []
+        if ip_address is not None:
+            sql += " AND ip_address = ?"
+            params.append(ip_address)
+        conn = self._read_connection()
+        rows: list[ResolutionRow] = conn.execute(
+            sql + " ORDER BY since_ms, id", params
+        ).fetchall()
+        return rows
+
+    def saved_targets(self) -> list[str]:
+        """
+        Returns the entries of the target set saved by `save_targets`.
+
+        Returns:
+            list[str]: The addresses, CIDR ranges and hostnames, in the
+            order they were saved.
+        """
+        conn = self._read_connection()
+        return [row[0] for row in conn.execute(_SELECT_TARGETS_SQL)]
+
+    def save_targets(self, entries: Iterable[str]) -> None:
+        """
+        Replaces the saved target set, in one transaction. Entries are
+        stored as given, e.g. "10.0.0.0/22", not expanded.
+
+        Args:
+            entries (Iterable[str]): The entries, duplicates being ignored.
+
+        Raises:
+            Exception: If an error occurs while saving, it prints an error
+            message with the exception details.
+        """
+        try:
+            with self._write_connection() as conn, conn:
+                conn.execute("DELETE FROM ping_targets")
+                conn.executemany(
+                    _INSERT_TARGET_SQL, ((entry,) for entry in entries)
+                )
+        except Exception as e:
+            print(f"Error saving the targets: {e}")
+
+    def fetch_rollups(
+        self,
+        resolution: str,
+        ip_address: str | None = None,
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+    ) -> list[RollupRow]:
+        """
+        Fetches the aggregated logs of a time range, oldest bucket first.
+
+        Args:
+            resolution (str): "minute", "hour" or "day".
+            ip_address (str, optional): Only the rollups of this exact
+            address. Defaults to every address.
+            start_ms (int, optional): Only buckets starting at or after these
+            epoch milliseconds.
+            end_ms (int, optional): Only buckets starting before these epoch
+            milliseconds.
+
+        Returns:
+            list[RollupRow]: The rollups, ordered by bucket then address.
+
+        Raises:
+            ValueError: If the resolution is unknown.
+        """
+        try:
+            size = rollups.RESOLUTIONS[resolution]
+        except KeyError:
+            raise ValueError(
+                f"Unknown rollup resolution {resolution!r}, "
+                f"expected one of {', '.join(rollups.RESOLUTIONS)}"
+            ) from None
+        sql = _SELECT_ROLLUPS_SQL
+        params: list[str | int] = [
+            size,
+            -(2**63) if start_ms is None else start_ms,
+            2**63 - 1 if end_ms is None else end_ms,
+        ]
+        if ip_address is not None:
+            sql += " AND ip_address = ?"
+            params.append(ip_address)
+        conn = self._read_connection()
+        rows: list[RollupRow] = conn.execute(
+            sql + " ORDER BY bucket, ip_address", params
+        ).fetchall()
+        return rows
+
+    def rebuild_rollups(
+        self,
+        progress: Callable[[int, int], None] | None = None,
+        cancel: threading.Event | None = None,
+    ) -> int:
+        """
+        Recomputes the rollups, histograms and outages from the raw logs,
+        e.g. after logs were deleted or for a database written with
+        `maintain_rollups` off.
+
+        Only the days still holding raw logs are recomputed, one hour per
+        transaction, so the aggregates of expired logs are kept and the
+        probes are only blocked briefly, see `rollups.rebuild`. The pings
+        stored as runs are not replayed: on a database written in "runs"
+        storage mode, their aggregates on the days also holding raw logs
+        are lost.
+
+        Args:
+            progress (Callable[[int, int], None], optional): Called after
+            every hour with the milliseconds of logs replayed and the total.
+            cancel (threading.Event, optional): Stops after the current hour
+            once set.
+
+        Returns:
+            int: The number of hours holding logs that were replayed.
+        """
+        hours = rollups.rebuild(self._write_connection, progress, cancel)
+        with self._write_lock:
+            # Follow the outages recomputed by the rebuild
+            self._rollup_writer = None
+        return hours
+
+    def statistics(
+        self,
+        start: datetime,
+        end: datetime,
+        ip_address: str | None = None,
+    ) -> list[TargetStats]:
+        """
+        Computes the statistics of each target over a time window:
+        availability, packet loss, round-trip time extremes, mean, deviation
+        and percentiles (p50, p95, p99), jitter and longest outage.
+
+        Only the aggregate tables are read, so the cost depends on the
+        number of targets and days, not of pings; see `statistics.compute`
+        for the precision of each figure.
+
+        Args:
+            start (datetime): Start of the window.
+            end (datetime): End of the window (excluded).
+            ip_address (str, optional): Only this exact target.
+
+        Returns:
+            list[TargetStats]: The statistics of each target pinged during
+            the window, ordered by address.
+        """
+        return statistics.compute(
+            self._read_connection(),
+            int(start.timestamp() * 1000),
+            int(end.timestamp() * 1000),
+            ip_address,
+        )
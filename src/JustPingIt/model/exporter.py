@@ -0,0 +1,589 @@
+import csv
+import gzip
+import importlib
+import io
+import json
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections.abc import Callable, Iterator
+from dataclasses import replace
+from typing import IO, Any, BinaryIO, Protocol, cast
+
+from .database_logger import (
+    DatabaseLogger,
+    LogFilter,
+    TimedLogRow,
+    format_epoch_ms,
+)
+
+# ----------------- Constants -----------------
+
+EXPORT_COLUMNS = [
+    "Result",
+    "Timestamp",
+    "IP Address",
+    "RTT (us)",
+    "TTL",
+    "Sequence",
+]
+# (result, timestamp, ip_address, rtt_us, ttl, seq), as read back from any
+# export format; the timestamp is "YYYY-MM-DD HH:MM:SS" local time
+ExportRow = tuple[str, str, str, int | None, int | None, int | None]
+
+# Format names, by file extension; the longest matching suffix wins
+EXPORT_FORMATS = {
+    ".csv": "csv",
+    ".txt": "csv",
+    ".csv.gz": "csv.gz",
+    ".csv.zst": "csv.zst",
+    ".jsonl": "jsonl",
+    ".jsonl.gz": "jsonl.gz",
+    ".jsonl.zst": "jsonl.zst",
+    ".jplc": "columnar",
+}
+# Rows read from the cursor between two progress reports
+EXPORT_CHUNK_SIZE = 10000
+# Write buffer of the exported file
+_BUFFER_SIZE = 1024 * 1024
+# Favour speed: log dumps compress well even at the fastest levels
+_GZIP_LEVEL = 1
+_ZSTD_LEVEL = 3
+
+# Columnar format: the magic, then one block per chunk of rows. A block is
+# its row count, the strings added to the result and IP dictionaries, and
+# one zlib-compressed little-endian array per column.
+_COLUMNAR_MAGIC = b"JPLC\x01"
+_BLOCK_HEADER = struct.Struct("<III")
+_COLUMN_HEADER = struct.Struct("<I")
+_STRING_HEADER = struct.Struct("<H")
+_NULL = -(2**63)
+_SECONDS = [f"{second:02d}" for second in range(60)]
+
+
+# ----------------- Helper Classes -----------------
+
+
+class ExportCancelledError(Exception):
+    """
+    Raised by `export_logs` when the export is cancelled. The partial file
+    has been removed.
+    """
+
+
+class _RowWriter(Protocol):
+    """
+    Writes chunks of rows to an export file.
+    """
+
+    def write(self, rows: list[TimedLogRow]) -> None: ...
+
+
+class _CsvWriter:
+    """
+    Writes rows as CSV, with `EXPORT_COLUMNS` as header.
+    """
+
+    def __init__(self, f: IO[str]) -> None:
+        self._writer = csv.writer(f)
+        self._writer.writerow(EXPORT_COLUMNS)
+
+    def write(self, rows: list[TimedLogRow]) -> None:
+        # Skip the id and the epoch milliseconds
+        self._writer.writerows(row[1:7] for row in rows)
+
+
+class _JsonLinesWriter:
+    """
+    Writes one JSON object per row, with the timestamp both as local time
+    text and as epoch milliseconds.
+    """
+
+    def __init__(self, f: IO[str]) -> None:
+        self._f = f
+
+    def write(self, rows: list[TimedLogRow]) -> None:
+        # Formatting the fixed layout directly is several times faster than
+        # json.dumps of a dict; only the free-form strings need escaping
+        encode = json.encoder.encode_basestring_ascii
+        self._f.writelines(
+            f'{{"result":{encode(result)},"timestamp":"{timestamp}",'
+            f'"epoch_ms":{epoch_ms},"ip_address":{encode(ip_address)},'
+            f'"rtt_us":{_json_int(rtt_us)},"ttl":{_json_int(ttl)},'
+            f'"seq":{_json_int(seq)}}}\n'
+            for (
+                _,
+                result,
+                timestamp,
+                ip_address,
+                rtt_us,
+                ttl,
+                seq,
+                epoch_ms,
+            ) in rows
+        )
+
+
+class _ColumnarWriter:
+    """
+    Writes rows in the columnar format: typed integer columns and
+    dictionary-encoded result and IP address columns.
+    """
+
+    def __init__(self, f: BinaryIO) -> None:
+        self._f = f
+        self._results: dict[str, int] = {}
+        self._ips: dict[str, int] = {}
+        f.write(_COLUMNAR_MAGIC)
+
+    @staticmethod
+    def _encode(
+        values: tuple[str, ...], dictionary: dict[str, int]
+    ) -> tuple["array[int]", list[str]]:
+        """
+        Replaces strings with their dictionary codes, adding the new ones.
+
+        Args:
+            values (tuple[str, ...]): The column values.
+            dictionary (dict[str, int]): The codes assigned so far.
+
+        Returns:
+            tuple[array[int], list[str]]: The codes and the new strings.
+        """
+        added: list[str] = []
+        codes = array("I")
+        for value in values:
+            code = dictionary.get(value)
+            if code is None:
+                code = dictionary[value] = len(dictionary)
+                added.append(value)
+            codes.append(code)
+        return codes, added
+
+    def write(self, rows: list[TimedLogRow]) -> None:
+        _, results, _, ips, rtts, ttls, seqs, stamps = zip(*rows, strict=True)
+        result_codes, new_results = self._encode(results, self._results)
+        ip_codes, new_ips = self._encode(ips, self._ips)
+        columns = [
+            array("q", stamps),
+            result_codes,
+            ip_codes,
+            array("q", (_NULL if v is None else v for v in rtts)),
+            array("q", (_NULL if v is None else v for v in ttls)),
+            array("q", (_NULL if v is None else v for v in seqs)),
+        ]
+        out = [_BLOCK_HEADER.pack(len(rows), len(new_results), len(new_ips))]
+        for value in new_results + new_ips:
+            data = value.encode()
+            out += [_STRING_HEADER.pack(len(data)), data]
+        for column in columns:
+            if sys.byteorder == "big":
+                column.byteswap()
+            data = zlib.compress(column.tobytes(), 1)
+            out += [_COLUMN_HEADER.pack(len(data)), data]
+        self._f.write(b"".join(out))
+
+
+# ----------------- Helper Functions -----------------
+
+
+def _json_int(value: int | None) -> str:
+    """
+    Encodes an optional integer as JSON.
+
+    Args:
+        value (int | None): The integer.
+
+    Returns:
+        str: The integer, or "null".
+    """
+    return "null" if value is None else str(value)
+
+
+def detect_format(path: str) -> str:
+    """
+    Infers the export format from a file name.
+
+    Args:
+        path (str): The file name.
+
+    Returns:
+        str: One of the values of `EXPORT_FORMATS`.
+
+    Raises:
+        ValueError: If the extension is not a known format.
+    """
+    name = path.lower()
+    for suffix in sorted(EXPORT_FORMATS, key=len, reverse=True):
+        if name.endswith(suffix):
+            return EXPORT_FORMATS[suffix]
+    raise ValueError(f"Unknown export format for {path!r}")
+
+
+def _zstd_open(f: BinaryIO, mode: str) -> BinaryIO:
+    """
+    Wraps a file in a zstd (de)compressor, from the standard library on
+    Python 3.14 or from the optional `zstandard` package.
+
+    Args:
+        f (BinaryIO): The underlying file.
+        mode (str): "rb" or "wb".
+
+    Returns:
+        BinaryIO: The (de)compressing stream.
+
+    Raises:
+        ImportError: If no zstd implementation is available.
+    """
+    zstd: Any
+    try:
+        zstd = importlib.import_module("compression.zstd")
+        stream: BinaryIO = zstd.ZstdFile(
+            f, mode[0], level=_ZSTD_LEVEL if mode == "wb" else None
+        )
+        return stream
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "zstd export needs Python 3.14 or the 'zstandard' package "
+            "(pip install JustPingIt[zstd])"
+        ) from None
+    if mode == "rb":
+        stream = zstandard.ZstdDecompressor().stream_reader(f)
+    else:
+        stream = zstandard.ZstdCompressor(level=_ZSTD_LEVEL).stream_writer(f)
+    return stream
+
+
+def _open_binary(f: BinaryIO, fmt: str, mode: str) -> BinaryIO:
+    """
+    Adds the compression layer of a format on top of a file.
+
+    Args:
+        f (BinaryIO): The underlying file.
+        fmt (str): The export format.
+        mode (str): "rb" or "wb".
+
+    Returns:
+        BinaryIO: The stream to read or write the format from.
+    """
+    if fmt.endswith(".gz"):
+        return cast(
+            BinaryIO,
+            gzip.GzipFile(fileobj=f, mode=mode, compresslevel=_GZIP_LEVEL),
+        )
+    if fmt.endswith(".zst"):
+        return _zstd_open(f, mode)
+    return f
+
+
+def _to_int(value: str) -> int | None:
+    """
+    Converts an optional integer read back from a CSV export.
+
+    Args:
+        value (str): The integer, or "" when unknown.
+
+    Returns:
+        int | None: The integer, or None.
+    """
+    return int(value) if value else None
+
+
+def _create_writer(
+    stream: BinaryIO, fmt: str
+) -> tuple[_RowWriter, io.TextIOWrapper | None]:
+    """
+    Creates the row writer of a format.
+
+    Args:
+        stream (BinaryIO): The (compressing) stream to write to.
+        fmt (str): The export format.
+
+    Returns:
+        tuple[_RowWriter, io.TextIOWrapper | None]: The writer, and the text
+        layer it writes to for text formats, to be flushed and detached
+        once done.
+    """
+    if fmt == "columnar":
+        return _ColumnarWriter(stream), None
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if fmt.startswith("csv"):
+        return _CsvWriter(text), text
+    return _JsonLinesWriter(text), text
+
+
+# ----------------- Core Functions -----------------
+
+
+def export_logs(
+    logger: DatabaseLogger,
+    path: str,
+    log_filter: LogFilter | None = None,
+    progress: Callable[[int, int], None] | None = None,
+    cancel: threading.Event | None = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    fmt: str | None = None,
+) -> int:
+    """
+    Exports the filtered logs to a file, streaming them from the database
+    cursor.
+
+    The formats are CSV ("csv") and JSON Lines ("jsonl"), each optionally
+    compressed with gzip (".gz") or zstd (".zst"), and "columnar": typed
+    epoch-millisecond, RTT, TTL and sequence columns and dictionary-encoded
+    results and IP addresses, zlib-compressed in blocks of `chunk_size`
+    rows. `read_export` reads all of them back.
+
+    Only one chunk of rows is in memory at a time, so the export size is
+    bounded by the disk only. The rows are written to "<path>.part", which
+    replaces `path` once complete: a cancelled or failed export never leaves
+    a truncated file behind. Logs written after the export started are not
+    included.
+
+    Args:
+        logger (DatabaseLogger): The logger to read the logs from.
+        path (str): The file to write.
+        log_filter (LogFilter, optional): The filters. Defaults to all logs.
+        progress (Callable[[int, int], None], optional): Called after every
+        chunk with the number of rows written and the total.
+        cancel (threading.Event, optional): Stops the export once set.
+        chunk_size (int, optional): Number of rows per chunk.
+        fmt (str, optional): One of the values of `EXPORT_FORMATS`.
+        Inferred from the extension of `path` by default.
+
+    Returns:
+        int: The number of rows exported.
+
+    Raises:
+        ExportCancelledError: If `cancel` was set before the export
+        completed.
+        ValueError: If the format is unknown.
+        ImportError: If zstd is requested but not available.
+        OSError: If the file cannot be written.
+        sqlite3.Error: If the logs cannot be read.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in EXPORT_FORMATS.values():
+        raise ValueError(f"Unknown export format {fmt!r}")
+    log_filter = log_filter or LogFilter()
+    if log_filter.max_id is None:
+        log_filter = replace(log_filter, max_id=logger.last_id())
+    total = logger.count_logs(log_filter)
+    part_path = f"{path}.part"
+    written = 0
+    try:
+        with (
+            open(part_path, "wb", buffering=_BUFFER_SIZE) as raw,
+            _open_binary(raw, fmt, "wb") as stream,
+        ):
+            writer, text = _create_writer(stream, fmt)
+            for rows in logger.iter_timed_chunks(log_filter, chunk_size):
+                if cancel is not None and cancel.is_set():
+                    raise ExportCancelledError()
+                writer.write(rows)
+                written += len(rows)
+                if progress is not None:
+                    progress(written, total)
+            if text is not None:
+                # Leave closing the stream to the context managers
+                text.flush()
+                text.detach()
+        os.replace(part_path, path)
+    except BaseException:
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+        raise
+    return written
+
+
+def read_export(path: str, fmt: str | None = None) -> Iterator[ExportRow]:
+    """
+    Reads back a file written by `export_logs`, streaming its rows.
+
+    Args:
+        path (str): The exported file.
+        fmt (str, optional): One of the values of `EXPORT_FORMATS`.
+        Inferred from the extension of `path` by default.
+
+    Yields:
+        ExportRow: The rows, in the order they were exported.
+
+    Raises:
+        ValueError: If the format is unknown or the file is not valid.
+        ImportError: If the file is zstd-compressed and zstd is not
+        available.
+        OSError: If the file cannot be read.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in EXPORT_FORMATS.values():
+        raise ValueError(f"Unknown export format {fmt!r}")
+    with (
+        open(path, "rb", buffering=_BUFFER_SIZE) as raw,
+        _open_binary(raw, fmt, "rb") as stream,
+    ):
+        if fmt == "columnar":
+            yield from _read_columnar(stream)
+            return
+        text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        try:
+            if fmt.startswith("csv"):
+                yield from _read_csv(text)
+            else:
+                yield from _read_json_lines(text)
+        finally:
+            text.detach()
+
+
+def _read_csv(text: IO[str]) -> Iterator[ExportRow]:
+    """
+    Reads the rows of a CSV export.
+
+    Args:
+        text (IO[str]): The decoded file.
+
+    Yields:
+        ExportRow: The rows.
+
+    Raises:
+        ValueError: If the header is not `EXPORT_COLUMNS`.
+    """
+    reader = csv.reader(text)
+    if next(reader, None) != EXPORT_COLUMNS:
+        raise ValueError("Not a CSV log export")
+    for result, timestamp, ip_address, rtt_us, ttl, seq in reader:
+        yield (
+            result,
+            timestamp,
+            ip_address,
+            _to_int(rtt_us),
+            _to_int(ttl),
+            _to_int(seq),
+        )
+
+
+def _read_json_lines(text: IO[str]) -> Iterator[ExportRow]:
+    """
+    Reads the rows of a JSON Lines export.
+
+    Args:
+        text (IO[str]): The decoded file.
+
+    Yields:
+        ExportRow: The rows.
+    """
+    decode = json.JSONDecoder().decode
+    for line in text:
+        obj = decode(line)
+        yield (
+            obj["result"],
+            obj["timestamp"],
+            obj["ip_address"],
+            obj["rtt_us"],
+            obj["ttl"],
+            obj["seq"],
+        )
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    """
+    Reads exactly `size` bytes.
+
+    Args:
+        stream (BinaryIO): The stream.
+        size (int): Number of bytes.
+
+    Returns:
+        bytes: The data, empty at the end of the stream.
+
+    Raises:
+        ValueError: If the stream ends in the middle of the data.
+    """
+    data = stream.read(size)
+    if len(data) != size and (data or size == 0):
+        raise ValueError("Truncated columnar log export")
+    return data
+
+
+def _read_column(stream: BinaryIO, typecode: str, count: int) -> "array[int]":
+    """
+    Reads one compressed column of a columnar block.
+
+    Args:
+        stream (BinaryIO): The file, positioned at the column.
+        typecode (str): The `array` type of the column.
+        count (int): Number of rows of the block.
+
+    Returns:
+        array[int]: The column values.
+
+    Raises:
+        ValueError: If the column does not hold `count` values.
+    """
+    header = _read_exact(stream, _COLUMN_HEADER.size)
+    if not header:
+        raise ValueError("Truncated columnar log export")
+    (size,) = _COLUMN_HEADER.unpack(header)
+    column = array(typecode)
+    column.frombytes(zlib.decompress(_read_exact(stream, size)))
+    if sys.byteorder == "big":
+        column.byteswap()
+    if len(column) != count:
+        raise ValueError("Corrupted columnar log export")
+    return column
+
+
+def _read_columnar(stream: BinaryIO) -> Iterator[ExportRow]:
+    """
+    Reads the blocks of a columnar export.
+
+    Args:
+        stream (BinaryIO): The file, positioned at its start.
+
+    Yields:
+        ExportRow: The rows.
+
+    Raises:
+        ValueError: If the file is not a valid columnar export.
+    """
+    if stream.read(len(_COLUMNAR_MAGIC)) != _COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar log export")
+    results: list[str] = []
+    ips: list[str] = []
+    # Consecutive logs mostly share their minute: format each one once.
+    # Time zone offsets are whole minutes, so the seconds match UTC's.
+    last_minute, prefix = None, ""
+    while header := _read_exact(stream, _BLOCK_HEADER.size):
+        count, new_results, new_ips = _BLOCK_HEADER.unpack(header)
+        for dictionary, added in ((results, new_results), (ips, new_ips)):
+            for _ in range(added):
+                (size,) = _STRING_HEADER.unpack(
+                    _read_exact(stream, _STRING_HEADER.size)
+                )
+                dictionary.append(_read_exact(stream, size).decode())
+        stamps, result_codes, ip_codes, rtts, ttls, seqs = (
+            _read_column(stream, typecode, count)
+            for typecode in ("q", "I", "I", "q", "q", "q")
+        )
+        for i in range(count):
+            minute, second = divmod(stamps[i] // 1000, 60)
+            if minute != last_minute:
+                last_minute = minute
+                prefix = format_epoch_ms(minute * 60000)[:-2]
+            rtt_us, ttl, seq = rtts[i], ttls[i], seqs[i]
+            yield (
+                results[result_codes[i]],
+                prefix + _SECONDS[second],
+                ips[ip_codes[i]],
+                None if rtt_us == _NULL else rtt_us,
+                None if ttl == _NULL else ttl,
+                None if seq == _NULL else seq,
+            )
@@ -0,0 +1,459 @@
+import asyncio
+import itertools
+import os
+import selectors
+import socket
+import struct
+import sys
+import time
+from dataclasses import dataclass
+
+# ----------------- Constants -----------------
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+
+_ICMP_HEADER = struct.Struct("!BBHHH")
+# Linux value of IP_RECVTTL; the constant is not exposed by the socket module
+_IP_RECVTTL = getattr(socket, "IP_RECVTTL", 12)
+_identifiers = itertools.count()
+
+
+# ----------------- Helper Functions -----------------
+
+
+def checksum(data: bytes) -> int:
+    """
+    Computes the RFC 1071 internet checksum of the given bytes.
+
+    Args:
+        data (bytes): The ICMP header and payload, with the checksum field
+        set to zero.
+
+    Returns:
+        int: The 16-bit one's complement checksum.
+    """
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return int(~total & 0xFFFF)
+
+
+def build_echo_request(
+    identifier: int, sequence: int, payload: bytes
+) -> bytes:
+    """
+    Builds an ICMP echo request packet.
+
+    Args:
+        identifier (int): The 16-bit echo identifier.
+        sequence (int): The 16-bit echo sequence number.
+        payload (bytes): The data carried by the request.
+
+    Returns:
+        bytes: The encoded packet, checksum included.
+    """
+    header = _ICMP_HEADER.pack(ICMP_ECHO_REQUEST, 0, 0, identifier, sequence)
+    csum = checksum(header + payload)
+    header = _ICMP_HEADER.pack(
+        ICMP_ECHO_REQUEST, 0, csum, identifier, sequence
+    )
+    return header + payload
+
+
+# ----------------- Core Classes -----------------
+
+
+@dataclass(frozen=True, slots=True)
+class EchoReply:
+    """
+    An ICMP echo reply matched to one of our requests.
+
+    Attributes:
+        address (str): The address that answered.
+        sequence (int): The sequence number of the matched request.
+        rtt_us (int): The round-trip time in microseconds.
+        ttl (int | None): The TTL of the reply, when the socket reports it.
+    """
+
+    address: str
+    sequence: int
+    rtt_us: int
+    ttl: int | None
+
+
+class IcmpEngine:
+    """
+    A native ICMP echo engine multiplexing many targets over one socket.
+
+    The engine prefers the unprivileged ``SOCK_DGRAM``/``IPPROTO_ICMP``
+    socket available on Linux (subject to ``net.ipv4.ping_group_range``)
+    and falls back to a raw socket when that is not permitted. Replies are
+    matched to requests by identifier and sequence number, so a single
+    engine can serve thousands of targets.
+
+    Attributes:
+        sock (socket.socket): The ICMP socket.
+        privileged (bool): True if the engine runs on a raw socket.
+        identifier (int): The echo identifier used for requests. With a
+        datagram socket the kernel rewrites it to the socket port.
+        payload (bytes): The data carried by each request.
+    Methods:
+        send(address: str) -> int:
+            Sends an echo request and returns its sequence number.
+        receive() -> list[EchoReply]:
+            Drains the socket and returns the replies matched so far.
+        ping(address: str, timeout: float) -> EchoReply | None:
+            Pings one address and waits for its reply.
+        ping_many(addresses: list[str], timeout: float) -> dict:
+            Pings many addresses concurrently over the same socket.
+        close():
+            Closes the socket.
+    """
+
+    def __init__(
+        self, payload_size: int = 56, privileged: bool | None = None
+    ) -> None:
+        """
+        Opens the ICMP socket.
+
+        Args:
+            payload_size (int, optional): Size of the echo payload in bytes.
+            Defaults to 56, like the system ping.
+            privileged (bool | None, optional): Force a raw (True) or a
+            datagram (False) socket. By default the datagram socket is tried
+            first and the raw socket is used as a fallback.
+
+        Raises:
+            OSError: If no ICMP socket can be opened on this host.
+        """
+        self.sock, self.privileged = self._open_socket(privileged)
+        self.sock.setblocking(False)
+        if self.privileged:
+            self.identifier = (os.getpid() + next(_identifiers)) & 0xFFFF
+        else:
+            self.identifier = self.sock.getsockname()[1]
+            if sys.platform.startswith("linux"):
+                self.sock.setsockopt(socket.IPPROTO_IP, _IP_RECVTTL, 1)
+        # macOS hands the IP header to datagram ICMP sockets as well
+        self._has_ip_header = self.privileged or sys.platform == "darwin"
+        self.payload = bytes(i & 0xFF for i in range(payload_size))
+        self._sequence = itertools.count()
+        self._pending: dict[int, tuple[str, int]] = {}
+
+    @staticmethod
+    def _open_socket(
+        privileged: bool | None,
+    ) -> tuple[socket.socket, bool]:
+        """
+        Opens the best ICMP socket allowed on this host.
+
+        Args:
+            privileged (bool | None): The socket type to force, if any.
+
+        Returns:
+            tuple[socket.socket, bool]: The socket and whether it is raw.
+
+        Raises:
+            OSError: If none of the requested socket types can be opened.
+        """
+        kinds = {None: (False, True), False: (False,), True: (True,)}
+        error: OSError | None = None
+        for raw in kinds[privileged]:
+            sock_type = socket.SOCK_RAW if raw else socket.SOCK_DGRAM
+            try:
+                sock = socket.socket(
+                    socket.AF_INET, sock_type, socket.IPPROTO_ICMP
+                )
+            except OSError as e:
+                error = e
+                continue
+            return sock, raw
+        assert error is not None  # noqa: S101
+        raise error
+
+    def fileno(self) -> int:
+        """
+        Returns the file descriptor of the socket, for use with selectors.
+
+        Returns:
+            int: The socket file descriptor.
+        """
+        return self.sock.fileno()
+
+    def send(self, address: str) -> int:
+        """
+        Sends one echo request to an IPv4 address.
+
+        Args:
+            address (str): The IPv4 address literal to ping.
+
+        Returns:
+            int: The sequence number of the request.
+
+        Raises:
+            OSError: If the packet cannot be sent.
+        """
+        sequence = next(self._sequence) & 0xFFFF
+        packet = build_echo_request(self.identifier, sequence, self.payload)
+        self._pending[sequence] = (address, time.perf_counter_ns())
+        try:
+            self.sock.sendto(packet, (address, 0))
+        except OSError:
+            del self._pending[sequence]
+            raise
+        return sequence
+
+    def forget(self, sequence: int) -> None:
+        """
+        Drops an in-flight request, typically after it timed out.
+
+        Args:
+            sequence (int): The sequence number returned by `send`.
+        """
+        self._pending.pop(sequence, None)
+
+    def receive(self) -> list[EchoReply]:
+        """
+        Reads every packet queued on the socket without blocking.
+
+        Packets that are not replies to one of our in-flight requests
+        (other processes' traffic on a raw socket, late replies, echo
+        requests looped back to us) are discarded.
+
+        Returns:
+            list[EchoReply]: The replies matched to in-flight requests.
+        """
+        replies: list[EchoReply] = []
+        while True:
+            try:
+                data, ancdata, _, source = self.sock.recvmsg(
+                    65535, socket.CMSG_SPACE(4)
+                )
+            except (BlockingIOError, InterruptedError):
+                return replies
+            received = time.perf_counter_ns()
+            reply = self._parse(data, ancdata, source[0], received)
+            if reply is not None:
+                replies.append(reply)
+
+    def _parse(
+        self,
+        data: bytes,
+        ancdata: list[tuple[int, int, bytes]],
+        source: str,
+        received: int,
+    ) -> EchoReply | None:
+        """
+        Decodes one packet and matches it against the in-flight requests.
+
+        Args:
+            data (bytes): The packet as read from the socket.
+            ancdata (list): Ancillary data carrying the TTL, if any.
+            source (str): The address the packet came from.
+            received (int): The `perf_counter_ns` reception time.
+
+        Returns:
+            EchoReply | None: The matched reply, or None.
+        """
+        ttl = None
+        if self._has_ip_header:
+            if len(data) < 20:
+                return None
+            ttl = data[8]
+            data = data[(data[0] & 0x0F) * 4 :]
+        if len(data) < _ICMP_HEADER.size:
+            return None
+        icmp_type, _, _, identifier, sequence = _ICMP_HEADER.unpack_from(data)
+        if icmp_type != ICMP_ECHO_REPLY:
+            return None
+        if self.privileged and identifier != self.identifier:
+            return None
+        pending = self._pending.get(sequence)
+        if pending is None or pending[0] != source:
+            return None
+        del self._pending[sequence]
+        for level, kind, value in ancdata:
+            if level == socket.IPPROTO_IP and kind == socket.IP_TTL:
+                ttl = int.from_bytes(value[:4], sys.byteorder)
+        rtt_us = (received - pending[1]) // 1000
+        return EchoReply(source, sequence, rtt_us, ttl)
+
+    def ping(self, address: str, timeout: float = 3) -> EchoReply | None:
+        """
+        Pings a single host and waits for its reply.
+
+        Args:
+            address (str): The IPv4 address or hostname to ping.
+            timeout (float, optional): Seconds to wait for the reply.
+
+        Returns:
+            EchoReply | None: The reply, or None on timeout.
+        """
+        return self.ping_many([address], timeout)[address]
+
+    def ping_many(
+        self, addresses: list[str], timeout: float = 3
+    ) -> dict[str, EchoReply | None]:
+        """
+        Pings many hosts concurrently over the engine socket.
+
+        All requests are sent back to back and the replies are collected
+        with a selector until every host has answered or the timeout
+        expires.
+
+        Args:
+            addresses (list[str]): IPv4 addresses or hostnames to ping.
+            timeout (float, optional): Seconds to wait for the replies.
+
+        Returns:
+            dict[str, EchoReply | None]: The reply of each host, or None for
+            hosts that did not answer in time or could not be reached.
+        """
+        results: dict[str, EchoReply | None] = dict.fromkeys(addresses)
+        waiting: dict[int, str] = {}
+        for host in results:
+            try:
+                sequence = self.send(socket.gethostbyname(host))
+            except OSError:
+                continue
+            waiting[sequence] = host
+
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.sock, selectors.EVENT_READ)
+            while waiting:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if not selector.select(remaining):
+                    continue
+                for reply in self.receive():
+                    if reply.sequence in waiting:
+                        results[waiting.pop(reply.sequence)] = reply
+
+        for sequence in waiting:
+            self.forget(sequence)
+        return results
+
+    def close(self) -> None:
+        """
+        Closes the socket and drops every in-flight request.
+        """
+        self._pending.clear()
+        self.sock.close()
+
+    def __enter__(self) -> "IcmpEngine":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class AsyncIcmpEngine:
+    """
+    An asyncio front-end for `IcmpEngine`.
+
+    The engine socket is registered as a reader on the event loop and every
+    in-flight request waits on a future keyed by its sequence number, so any
+    number of concurrent pings share the one socket without extra threads.
+
+    Attributes:
+        engine (IcmpEngine): The engine owning the socket.
+    Methods:
+        ping(address: str, timeout: float) -> EchoReply | None:
+            Sends an echo request and waits for the matching reply.
+        close():
+            Unregisters the socket from the loop and cancels the waiters.
+    """
+
+    def __init__(
+        self, engine: IcmpEngine, loop: asyncio.AbstractEventLoop
+    ) -> None:
+        """
+        Registers the engine socket on the event loop.
+
+        Args:
+            engine (IcmpEngine): The engine to drive.
+            loop (asyncio.AbstractEventLoop): The loop the pings run on.
+        """
+        self.engine = engine
+        self._loop = loop
+        self._waiters: dict[int, asyncio.Future[EchoReply | None]] = {}
+        loop.add_reader(engine.fileno(), self._on_readable)
+
+    def _on_readable(self) -> None:
+        """
+        Resolves the futures of every reply queued on the socket.
+        """
+        for reply in self.engine.receive():
+            self._resolve(reply.sequence, reply)
+
+    def _resolve(self, sequence: int, reply: EchoReply | None) -> None:
+        """
+        Completes the waiter of a request, if it is still waiting.
+
+        Args:
+            sequence (int): The sequence number of the request.
+            reply (EchoReply | None): The reply, or None on timeout.
+        """
+        waiter = self._waiters.pop(sequence, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(reply)
+
+    async def ping(self, address: str, timeout: float = 3) -> EchoReply | None:
+        """
+        Pings an IPv4 address and waits for its reply.
+
+        Args:
+            address (str): The IPv4 address literal to ping.
+            timeout (float, optional): Seconds to wait for the reply.
+
+        Returns:
+            EchoReply | None: The reply, or None if the request could not be
+            sent or timed out.
+        """
+        try:
+            sequence = self.engine.send(address)
+        except OSError:
+            return None
+        waiter: asyncio.Future[EchoReply | None] = self._loop.create_future()
+        self._waiters[sequence] = waiter
+        expiry = self._loop.call_later(timeout, self._resolve, sequence, None)
+        try:
+            return await waiter
+        finally:
+            expiry.cancel()
+            self._waiters.pop(sequence, None)
+            self.engine.forget(sequence)
+
+    def close(self) -> None:
+        """
+        Unregisters the socket from the loop and cancels pending pings.
+
+        The engine itself is left open, as it may be shared.
+        """
+        self._loop.remove_reader(self.engine.fileno())
+        for waiter in self._waiters.values():
+            waiter.cancel()
+        self._waiters.clear()
+
+
+def open_engine() -> IcmpEngine | None:
+    """
+    Opens a native ICMP engine if the host allows it.
+
+    Returns:
+        IcmpEngine | None: The engine, or None if neither a datagram nor a
+        raw ICMP socket can be opened (e.g. ``net.ipv4.ping_group_range``
+        excluding our group and no raw-socket capability). Always None on
+        Windows, where ICMP sockets do not deliver echo replies reliably.
+    """
+    if sys.platform.startswith("win"):
+        return None
+    try:
+        return IcmpEngine()
+    except OSError:
+        return None
@@ -14,6 +14,7 @@ class AppPaths:
         dynamically.
         icon_filename (str): The filename of the application icon.
         db_filename (str): The filename of the database file.
+        sketches_filename (str): The filename of the saved latency sketches.
     Methods:
         _get_base_path():
             Determines the base path of the application. If running in a
@@ -29,6 +30,8 @@ class AppPaths:
             mode, it uses the base path. In production mode, it uses the
             application
             data directory, creating it if necessary.
+        get_sketches_path():
+            Returns the path of the latency sketches, next to the database.
     """
 
     def __init__(self) -> None:
@@ -46,11 +49,14 @@ class AppPaths:
             is "JPI.ico".
             db_filename (str): The filename of the database file, default is
             "ping_log.db".
+            sketches_filename (str): The filename of the saved latency
+            sketches, default is "latency_sketches.bin".
         """
         self.dev_mode = not hasattr(sys, "_MEIPASS")
         self.base_path = self._get_base_path()
         self.icon_filename = "JPI.ico"
         self.db_filename = "ping_log.db"
+        self.sketches_filename = "latency_sketches.bin"
 
     def _get_base_path(self) -> str:
         """
@@ -114,3 +120,18 @@ class AppPaths:
             os.makedirs(app_data, exist_ok=True)
             os.makedirs(data_folder, exist_ok=True)
             return os.path.join(data_folder, self.db_filename)
+
+    def get_sketches_path(self) -> str:
+        """
+        Returns the file path of the saved latency sketches, in the folder
+        of the database.
+
+        Returns:
+            str: The full file path to the sketches.
+
+        Raises:
+            OSError: If the AppData directory cannot be created.
+        """
+        return os.path.join(
+            os.path.dirname(self.get_db_path()), self.sketches_filename
+        )
@@ -1,38 +1,90 @@
+import time
 from datetime import datetime
 
+# A scheduled probe that was never sent: the target already had too many
+# probes in flight, or the scheduler fell behind its deadlines
+MISSED = "Missed"
+# Outcomes of a probe. TCP probes tell a connection refused by the host
+# and a timeout apart from the other failures.
+RESULTS = ("Success", "Failure", "Refused", "Timeout", MISSED)
+
 
 class Ping:
     """
     A class to represent the result of a ping operation.
 
     Attributes:
-        result (str): The result of the ping operation (e.g., success or
-        failure).
+        result (str): The result of the ping operation, one of `RESULTS`
+        (e.g., success or failure).
         timestamp (str): The timestamp when the Ping object was created,
         formatted as "YYYY-MM-DD HH:MM:SS".
+        epoch_ms (int): The same instant as Unix epoch milliseconds, as
+        stored in the database.
         ip_address (str): The IP address that was pinged.
+        rtt_us (int | None): The round-trip time in microseconds, if a reply
+        was received.
+        ttl (int | None): The TTL of the reply, if known.
+        seq (int | None): The sequence number of the probe for its target.
+        resolved (str | None): The address probed, when `ip_address` is a
+        hostname.
 
     Methods:
-        __init__(result: str, ip_address: str):
-            Initializes a Ping object with the given result and IP address,
-            and sets the timestamp to the current time.
+        __init__(result: str, ip_address: str, rtt_us: int = None,
+        ttl: int = None, seq: int = None, resolved: str = None):
+            Initializes a Ping object with the given result, IP address and
+            reply details, and sets the timestamp to the current time.
     """
 
-    def __init__(self, result: str, ip_address: str) -> None:
+    __slots__ = (
+        "result",
+        "timestamp",
+        "epoch_ms",
+        "ip_address",
+        "rtt_us",
+        "ttl",
+        "seq",
+        "resolved",
+    )
+
+    def __init__(
+        self,
+        result: str,
+        ip_address: str,
+        rtt_us: int | None = None,
+        ttl: int | None = None,
+        seq: int | None = None,
+        resolved: str | None = None,
+    ) -> None:
         """
         Initialize a new instance of the class.
 
         Args:
             result (str): The result of the operation or status.
             ip_address (str): The IP address associated with the instance.
+            rtt_us (int, optional): The round-trip time in microseconds.
+            ttl (int, optional): The TTL of the reply.
+            seq (int, optional): The sequence number of the probe.
+            resolved (str, optional): The address a hostname resolved to.
 
         Attributes:
             result (str): Stores the result of the operation or status.
             timestamp (str): The timestamp when the instance is created,
             formatted as "YYYY-MM-DD HH:MM:SS".
+            epoch_ms (int): The creation time as Unix epoch milliseconds.
             ip_address (str): Stores the IP address associated with the
             instance.
+            rtt_us (int | None): Stores the round-trip time.
+            ttl (int | None): Stores the TTL of the reply.
+            seq (int | None): Stores the probe sequence number.
+            resolved (str | None): Stores the resolved address.
         """
         self.result = result
-        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.epoch_ms = time.time_ns() // 1_000_000
+        self.timestamp = datetime.fromtimestamp(self.epoch_ms / 1000).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
         self.ip_address = ip_address
+        self.rtt_us = rtt_us
+        self.ttl = ttl
+        self.seq = seq
+        self.resolved = resolved
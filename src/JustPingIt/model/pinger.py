@@ -1,10 +1,18 @@
-import subprocess
-import sys
+import time
 
 from PySide6.QtCore import QMutex, QThread, QWaitCondition, Signal
 
+from .backends import (
+    ProbeBackend,
+    TcpBackend,
+    default_backend,
+    split_tcp_target,
+)
 from .database_logger import DatabaseLogger
-from .ping import Ping
+from .icmp import IcmpEngine
+from .ping import MISSED, Ping
+from .scheduler import PingScheduler, overdue_ticks
+from .sketches import LatencySketches
 
 # ----------------- Helper Classes -----------------
 
@@ -25,6 +33,12 @@ class Pinger(QThread):
         pinged.
         logger (DatabaseLogger): An instance of a logger to log the ping
         results.
+        engine (IcmpEngine, optional): A native ICMP engine used instead of
+        the system `ping` binary.
+        sketches (LatencySketches, optional): Streaming percentiles fed with
+        every result.
+        backend (ProbeBackend, optional): The probe backend, taking
+        precedence over `engine`.
     Methods:
         run():
             Executes the thread's main loop, periodically pinging the IP
@@ -39,7 +53,13 @@ class Pinger(QThread):
     ping_signal = Signal(Ping)
 
     def __init__(
-        self, ip_address: str, frequency: int, logger: DatabaseLogger
+        self,
+        ip_address: str,
+        frequency: int,
+        logger: DatabaseLogger,
+        engine: IcmpEngine | None = None,
+        sketches: LatencySketches | None = None,
+        backend: ProbeBackend | None = None,
     ) -> None:
         """
         Initializes a new instance of the class.
@@ -50,6 +70,12 @@ class Pinger(QThread):
             should be pinged.
             logger (DatabaseLogger): An instance of DatabaseLogger to log the
             ping results.
+            engine (IcmpEngine, optional): A native ICMP engine to probe
+            with. When None, the system `ping` command is used.
+            sketches (LatencySketches, optional): Streaming percentiles fed
+            with every result.
+            backend (ProbeBackend, optional): The probe backend. By default
+            the ICMP backend on `engine`, or the system `ping` command.
 
         Attributes:
             ip_address (str): The IP address to be monitored.
@@ -57,6 +83,14 @@ class Pinger(QThread):
             should be pinged.
             logger (DatabaseLogger): Logger instance for recording ping
             results.
+            backend (ProbeBackend): The backend sending the probes.
+            sketches (LatencySketches | None): The streaming percentiles, if
+            any.
+            last_reply (tuple[int | None, int | None]): Round-trip time in
+            microseconds and TTL of the last reply received by `ping_host`.
+            last_resolved (str | None): The address the hostname resolved
+            to for the last probe, if it is one.
+            _sequence (int): Number of ticks so far, probed or missed.
             _is_running (bool): Indicates whether the monitoring is currently
             active.
             _mutex (QMutex): Mutex for thread synchronization.
@@ -67,6 +101,11 @@ class Pinger(QThread):
         self.ip_address = ip_address
         self.frequency = frequency
         self.logger = logger
+        self.backend = backend or default_backend(engine)
+        self.sketches = sketches
+        self.last_reply: tuple[int | None, int | None] = (None, None)
+        self.last_resolved: str | None = None
+        self._sequence = 0
         self._is_running = True
         self._mutex = QMutex()
         self._wait_condition = QWaitCondition()
@@ -77,8 +116,13 @@ class Pinger(QThread):
         Continuously pings the specified IP address at a defined frequency
         while the `_is_running` flag is set to True. The results of each ping
         are logged and emitted as a signal.
-        The method uses a mutex and a wait condition to control the timing
-        of the loop based on the `frequency` attribute.
+        Probes start on fixed monotonic deadlines, `frequency` seconds
+        apart, so the time spent probing and logging does not stretch the
+        period. A probe running past the following deadlines makes those
+        ticks missed: they are logged and emitted as `MISSED` pings and the
+        next probe starts at once.
+        The method uses a mutex and a wait condition to wait for the next
+        deadline.
         Attributes:
             self.ip_address (str): The IP address to ping.
             self.frequency (int): The frequency (in seconds) at which to ping
@@ -95,16 +139,50 @@ class Pinger(QThread):
             Any exceptions raised by `ping_host` or other methods will
             propagate.
         """
+        due = time.monotonic()
         while self._is_running:
+            self.last_reply = (None, None)
             result = self.ping_host(self.ip_address)
-            ping = Ping(result, self.ip_address)
-            self.logger.log(ping)
-            self.ping_signal.emit(ping)
+            self._sequence += 1
+            rtt_us, ttl = self.last_reply
+            self._deliver(
+                Ping(
+                    result,
+                    self.ip_address,
+                    rtt_us,
+                    ttl,
+                    self._sequence,
+                    self.last_resolved,
+                )
+            )
+
+            due += self.frequency
+            skipped = overdue_ticks(due, time.monotonic(), self.frequency)
+            for _ in range(skipped):
+                self._sequence += 1
+                self._deliver(
+                    Ping(MISSED, self.ip_address, seq=self._sequence)
+                )
+            due += skipped * self.frequency
 
             self._mutex.lock()
-            self._wait_condition.wait(self._mutex, self.frequency * 1000)
+            delay_ms = int((due - time.monotonic()) * 1000)
+            if self._is_running and delay_ms > 0:
+                self._wait_condition.wait(self._mutex, delay_ms)
             self._mutex.unlock()
 
+    def _deliver(self, ping: Ping) -> None:
+        """
+        Logs a result, feeds it to the sketches and emits it.
+
+        Args:
+            ping (Ping): The result.
+        """
+        self.logger.log(ping)
+        if self.sketches is not None:
+            self.sketches.record(ping)
+        self.ping_signal.emit(ping)
+
     def stop(self) -> None:
         """
         Stops the execution of the current process.
@@ -121,54 +199,115 @@ class Pinger(QThread):
 
     def ping_host(self, ip_address: str) -> str:
         """
-        Pings a given IP address and returns the result as a string.
-        This method uses the system's `ping` command to check the reachability
-        of the specified IP address.
-        It supports both Windows and non-Windows platforms.
+        Pings a given IP address with the probe backend and returns the
+        result as a string. "host:port" targets are probed by connecting to
+        the port instead.
+        The round-trip time and TTL of a successful reply are stored in
+        `last_reply`, the address a hostname resolved to in `last_resolved`.
         Args:
             ip_address (str): The IP address to ping.
         Returns:
-            str: "Success" if the host is reachable, "Failure" otherwise.
-        Exceptions:
-            - Handles `subprocess.CalledProcessError` if the ping command
-            fails.
-            - Handles `subprocess.TimeoutExpired` if the ping command times
-            out.
-            - Handles any other unexpected exceptions and logs the error
-            message.
-        """
-        try:
-            if sys.platform.startswith("win"):
-                command = ["ping", "-n", "1", ip_address]
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                output = subprocess.check_output(  # noqa: S603
-                    command,
-                    stderr=subprocess.STDOUT,
-                    timeout=3,
-                    startupinfo=startupinfo,
-                    creationflags=subprocess.CREATE_NO_WINDOW,
-                ).decode()
-            else:
-                command = ["ping", "-c", "1", ip_address]
-                output = subprocess.check_output(  # noqa: S603
-                    command, stderr=subprocess.STDOUT, timeout=3
-                ).decode()
-
-            if (
-                "unreachable" in output
-                or "100% packet loss" in output
-                or "timed out" in output
-            ):
-                return "Failure"
-            elif "Reply from" in output or "bytes from" in output:
-                return "Success"
-            else:
-                return "Failure"
-        except subprocess.CalledProcessError:
-            return "Failure"
-        except subprocess.TimeoutExpired:
-            return "Failure"
-        except Exception as e:
-            print(f"Unexpected error during ping: {e}")
-            return "Failure"
+            str: "Success" if the host is reachable, "Failure" (or, for TCP,
+            "Refused" or "Timeout") otherwise.
+        """
+        backend = self.backend
+        if split_tcp_target(ip_address) is not None:
+            backend = TcpBackend()
+        ping = backend.ping(ip_address, timeout=3)
+        self.last_reply = (ping.rtt_us, ping.ttl)
+        self.last_resolved = ping.resolved
+        return ping.result
+
+
+class MultiPinger(QThread):
+    """
+    MultiPinger is a QThread hosting a `PingScheduler`, so any number of
+    targets are pinged from one worker thread and one asyncio event loop.
+    Attributes:
+        ping_signal (Signal): A signal emitted with a Ping object for every
+        probe of every target.
+        scheduler (PingScheduler): The scheduler running in the thread.
+    Args:
+        logger (DatabaseLogger): An instance of a logger to log the ping
+        results.
+        engine (IcmpEngine, optional): A native ICMP engine shared by all the
+        targets. When None, the system `ping` binary is used.
+        sketches (LatencySketches, optional): Streaming percentiles fed with
+        every result.
+        backend (ProbeBackend, optional): The probe backend, taking
+        precedence over `engine`.
+    Methods:
+        add_target(ip_address: str, frequency: int, timeout: float = 3):
+            Starts monitoring a host, or updates its frequency.
+        remove_target(ip_address: str):
+            Stops monitoring a host.
+        run():
+            Runs the scheduler event loop until `stop` is called.
+        stop():
+            Stops the scheduler and cancels in-flight probes.
+    """
+
+    ping_signal = Signal(Ping)
+
+    def __init__(
+        self,
+        logger: DatabaseLogger,
+        engine: IcmpEngine | None = None,
+        sketches: LatencySketches | None = None,
+        backend: ProbeBackend | None = None,
+    ) -> None:
+        """
+        Initializes the thread and its scheduler.
+
+        Args:
+            logger (DatabaseLogger): Logger instance for recording ping
+            results.
+            engine (IcmpEngine, optional): A native ICMP engine to probe
+            with.
+            sketches (LatencySketches, optional): Streaming percentiles fed
+            with every result.
+            backend (ProbeBackend, optional): The probe backend shared by
+            all the targets.
+        """
+        super().__init__()
+        self.scheduler = PingScheduler(
+            logger,
+            on_result=self.ping_signal.emit,
+            engine=engine,
+            sketches=sketches,
+            backend=backend,
+        )
+
+    def add_target(
+        self, ip_address: str, frequency: int, timeout: float = 3
+    ) -> None:
+        """
+        Starts monitoring a host. Can be called before or after `start`.
+
+        Args:
+            ip_address (str): The IP address or hostname to ping.
+            frequency (int): The frequency (in seconds) of the probes.
+            timeout (float, optional): Seconds to wait for each reply.
+        """
+        self.scheduler.add_target(ip_address, frequency, timeout)
+
+    def remove_target(self, ip_address: str) -> None:
+        """
+        Stops monitoring a host.
+
+        Args:
+            ip_address (str): The address given to `add_target`.
+        """
+        self.scheduler.remove_target(ip_address)
+
+    def run(self) -> None:
+        """
+        Runs the scheduler event loop in this thread until `stop` is called.
+        """
+        self.scheduler.run_forever()
+
+    def stop(self) -> None:
+        """
+        Stops the scheduler, cancelling the probes in flight.
+        """
+        self.scheduler.stop()
@@ -0,0 +1,149 @@
+import sqlite3
+from dataclasses import dataclass
+
+# ----------------- Constants -----------------
+
+_JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+_SYNCHRONOUS = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+_TEMP_STORE = {0: "DEFAULT", 1: "FILE", 2: "MEMORY"}
+
+
+# ----------------- Core Classes -----------------
+
+
+@dataclass(frozen=True)
+class DatabaseProfile:
+    """
+    A set of SQLite settings trading durability for throughput.
+
+    Attributes:
+        name (str): The name of the profile.
+        journal_mode (str): "WAL" lets readers and the writer work
+        concurrently; "DELETE" is the SQLite default rollback journal.
+        synchronous (str): "FULL" syncs on every commit, "NORMAL" only at
+        WAL checkpoints (a power loss may undo the last commits but never
+        corrupts the database), "OFF" leaves syncing to the OS.
+        mmap_size (int): Bytes of the database file read through mmap.
+        cache_size (int): Page cache size; negative values are KiB.
+        temp_store (str): Where temporary tables and indexes live.
+        checkpoint_interval_s (float): Seconds between two passive WAL
+        checkpoints run by the writer, 0 to rely on SQLite's automatic ones.
+    """
+
+    name: str
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size: int = -64 * 1024
+    temp_store: str = "MEMORY"
+    checkpoint_interval_s: float = 60
+
+    def __post_init__(self) -> None:
+        """
+        Validates the settings, which end up verbatim in PRAGMA statements.
+
+        Raises:
+            ValueError: If a mode is not one SQLite understands.
+        """
+        if self.journal_mode not in _JOURNAL_MODES:
+            raise ValueError(f"Invalid journal mode {self.journal_mode!r}")
+        if self.synchronous not in _SYNCHRONOUS.values():
+            raise ValueError(f"Invalid synchronous {self.synchronous!r}")
+        if self.temp_store not in _TEMP_STORE.values():
+            raise ValueError(f"Invalid temp store {self.temp_store!r}")
+
+
+PROFILES = {
+    "durable": DatabaseProfile(
+        "durable",
+        journal_mode="DELETE",
+        synchronous="FULL",
+        mmap_size=0,
+        cache_size=-2000,
+        temp_store="DEFAULT",
+        checkpoint_interval_s=0,
+    ),
+    "balanced": DatabaseProfile("balanced"),
+    "fast": DatabaseProfile(
+        "fast",
+        synchronous="OFF",
+        mmap_size=1024 * 1024 * 1024,
+        cache_size=-256 * 1024,
+        checkpoint_interval_s=300,
+    ),
+}
+
+
+# ----------------- Helper Functions -----------------
+
+
+def get_profile(profile: str | DatabaseProfile) -> DatabaseProfile:
+    """
+    Resolves a profile given by name.
+
+    Args:
+        profile (str | DatabaseProfile): A profile or the name of one of
+        `PROFILES`.
+
+    Returns:
+        DatabaseProfile: The profile.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if isinstance(profile, DatabaseProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(
+            f"Unknown database profile {profile!r}, "
+            f"expected one of {', '.join(PROFILES)}"
+        ) from None
+
+
+def apply_profile(
+    conn: sqlite3.Connection, profile: DatabaseProfile, writer: bool
+) -> None:
+    """
+    Applies a profile to a newly opened connection.
+
+    The journal mode is stored in the database file, so it is only set by
+    the writer connection; the other settings are per connection.
+
+    Args:
+        conn (sqlite3.Connection): The connection to configure.
+        profile (DatabaseProfile): The settings to apply.
+        writer (bool): True for the writer connection.
+    """
+    if writer:
+        conn.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {profile.synchronous}")
+    conn.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}")
+    conn.execute(f"PRAGMA cache_size = {int(profile.cache_size)}")
+    conn.execute(f"PRAGMA temp_store = {profile.temp_store}")
+
+
+def read_pragmas(conn: sqlite3.Connection) -> dict[str, str | int]:
+    """
+    Reads back the settings actually in effect on a connection.
+
+    Args:
+        conn (sqlite3.Connection): The connection to inspect.
+
+    Returns:
+        dict[str, str | int]: The journal mode, synchronous level, mmap
+        size, cache size and temp store, as reported by SQLite.
+    """
+
+    def pragma(name: str) -> int | str:
+        value: int | str = conn.execute(f"PRAGMA {name}").fetchone()[0]
+        return value
+
+    return {
+        "journal_mode": str(pragma("journal_mode")).upper(),
+        "synchronous": _SYNCHRONOUS.get(int(pragma("synchronous")), "?"),
+        "mmap_size": int(pragma("mmap_size")),
+        "cache_size": int(pragma("cache_size")),
+        "temp_store": _TEMP_STORE.get(int(pragma("temp_store")), "?"),
+    }
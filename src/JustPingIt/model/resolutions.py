@@ -0,0 +1,55 @@
+import sqlite3
+
+# ----------------- Constants -----------------
+
+# One row each time a hostname target starts resolving to another address:
+# the address holds from 'since_ms' until the next row of the target
+CREATE_RESOLUTIONS = """
+    CREATE TABLE IF NOT EXISTS ping_resolutions (
+        id INTEGER PRIMARY KEY,
+        ip_address TEXT NOT NULL,
+        resolved TEXT NOT NULL,
+        since_ms INTEGER NOT NULL
+    )
+"""
+CREATE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_ping_resolutions_ip_since "
+    "ON ping_resolutions (ip_address, since_ms)",
+)
+INSERT_SQL = """
+    INSERT INTO ping_resolutions (ip_address, resolved, since_ms)
+    VALUES (?, ?, ?)
+"""
+_SELECT_LATEST_SQL = """
+    SELECT ip_address, resolved FROM ping_resolutions
+    WHERE id IN (SELECT MAX(id) FROM ping_resolutions GROUP BY ip_address)
+"""
+
+
+# ----------------- Helper Functions -----------------
+
+
+def add_tables(conn: sqlite3.Connection) -> None:
+    """
+    Creates the resolutions table and its index, in the caller's
+    transaction.
+
+    Args:
+        conn (sqlite3.Connection): The writer connection.
+    """
+    conn.execute(CREATE_RESOLUTIONS)
+    for statement in CREATE_INDEXES:
+        conn.execute(statement)
+
+
+def latest(conn: sqlite3.Connection) -> dict[str, str]:
+    """
+    Reads the current address of every hostname target.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+
+    Returns:
+        dict[str, str]: The last address recorded for each target.
+    """
+    return dict(conn.execute(_SELECT_LATEST_SQL).fetchall())
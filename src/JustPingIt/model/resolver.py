@@ -0,0 +1,376 @@
+import asyncio
+import ipaddress
+import math
+import socket
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+# ----------------- Constants -----------------
+
+# Seconds a resolved address is reused. getaddrinfo() does not expose the
+# TTL of the DNS records, so it is a setting rather than the record's own.
+DEFAULT_TTL = 300
+# Seconds a failed lookup is remembered before the name is tried again
+DEFAULT_NEGATIVE_TTL = 30
+# Fraction of the TTL after which a lookup is refreshed in the background
+DEFAULT_REFRESH_AHEAD = 0.8
+
+# ----------------- Helper Classes -----------------
+
+
+@dataclass(frozen=True, slots=True)
+class CacheEntry:
+    """
+    The address of a name, as cached by `ResolverCache`.
+
+    Attributes:
+        address (str | None): The IPv4 address, None if the lookup failed.
+        refresh_at (float): Monotonic time after which a background lookup
+        refreshes the entry.
+        expires (float): Monotonic time after which the entry is stale.
+    """
+
+    address: str | None
+    refresh_at: float
+    expires: float
+
+
+# ----------------- Core Classes -----------------
+
+
+class ResolverCache:
+    """
+    Resolves target names once for all the probes of the process, instead
+    of once per probe.
+
+    A name is looked up on first use and its address reused for `ttl`
+    seconds. Once `refresh_ahead` of the TTL has elapsed, the next use
+    returns the cached address at once and starts a lookup in the
+    background, so a busy target never waits for the resolver. Failed
+    lookups are remembered for `negative_ttl` seconds. IP literals skip the
+    resolver altogether.
+
+    Lookups run on a small thread pool: many names resolve in parallel, and
+    a name wanted by several probes at once is only looked up once. Safe to
+    use from any thread and from any event loop.
+
+    Attributes:
+        ttl (float): Seconds an address is reused.
+        negative_ttl (float): Seconds a failed lookup is remembered.
+        refresh_ahead (float): Fraction of the TTL after which the address
+        is refreshed in the background.
+        max_workers (int): Maximum concurrent lookups.
+        lookups (int): Number of lookups started so far.
+    Methods:
+        resolve(host: str, timeout: float = None) -> str:
+            Returns the IPv4 address of a host.
+        resolve_async(host: str) -> str:
+            Same, without blocking the event loop.
+        resolve_many(hosts: Iterable[str], timeout: float = None)
+        -> dict[str, str | None]:
+            Resolves many hosts in parallel.
+        resolve_many_async(hosts: Iterable[str]) -> dict[str, str | None]:
+            Same, without blocking the event loop.
+        prefetch(hosts: Iterable[str]):
+            Starts resolving hosts that are not cached yet.
+        invalidate(host: str = None):
+            Forgets the address of a host, or of every host.
+        close():
+            Stops the lookup threads.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        refresh_ahead: float = DEFAULT_REFRESH_AHEAD,
+        max_workers: int = 16,
+    ) -> None:
+        """
+        Initializes an empty cache. The lookup threads are started on
+        demand.
+
+        Args:
+            ttl (float, optional): Seconds an address is reused.
+            negative_ttl (float, optional): Seconds a failed lookup is
+            remembered.
+            refresh_ahead (float, optional): Fraction of the TTL after which
+            the address is refreshed in the background, 1 to disable.
+            max_workers (int, optional): Maximum concurrent lookups.
+
+        Raises:
+            ValueError: If a duration is negative or `refresh_ahead` is not
+            within (0, 1].
+        """
+        if ttl < 0 or negative_ttl < 0:
+            raise ValueError("The TTLs must not be negative")
+        if not 0 < refresh_ahead <= 1:
+            raise ValueError("refresh_ahead must be within (0, 1]")
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.refresh_ahead = refresh_ahead
+        self.max_workers = max_workers
+        self.lookups = 0
+        self._entries: dict[str, CacheEntry] = {}
+        self._pending: dict[str, Future[str | None]] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _cached(self, host: str) -> CacheEntry | None:
+        """
+        Returns the entry of a host if it is still valid, starting a
+        background refresh once it is due.
+
+        Args:
+            host (str): The host.
+
+        Returns:
+            CacheEntry | None: The entry, or None if the host must be
+            looked up first.
+        """
+        entry = self._entries.get(host)
+        if entry is None:
+            try:
+                address = str(ipaddress.ip_address(host))
+            except ValueError:
+                return None
+            # Not stored, so sweeping a subnet does not fill the cache
+            return CacheEntry(address, math.inf, math.inf)
+        now = time.monotonic()
+        if now >= entry.expires:
+            return None
+        if now >= entry.refresh_at:
+            self._submit(host)
+        return entry
+
+    def _submit(self, host: str) -> "Future[str | None]":
+        """
+        Starts looking a host up, unless a lookup is already in flight.
+
+        Args:
+            host (str): The host.
+
+        Returns:
+            Future[str | None]: The lookup, resolving to the address or to
+            None if it failed.
+        """
+        with self._lock:
+            future = self._pending.get(host)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        self.max_workers, thread_name_prefix="resolver"
+                    )
+                future = self._executor.submit(self._lookup, host)
+                self._pending[host] = future
+                self.lookups += 1
+            return future
+
+    def _lookup(self, host: str) -> str | None:
+        """
+        Looks a host up and caches the outcome. A failed refresh keeps the
+        previous address until it expires.
+
+        Args:
+            host (str): The host.
+
+        Returns:
+            str | None: The IPv4 address, or None if the lookup failed.
+        """
+        address: str | None
+        try:
+            infos = socket.getaddrinfo(
+                host, None, family=socket.AF_INET, type=socket.SOCK_DGRAM
+            )
+            address = str(infos[0][4][0])
+        except (OSError, UnicodeError, IndexError):
+            address = None
+        now = time.monotonic()
+        with self._lock:
+            previous = self._entries.get(host)
+            if address is not None:
+                self._entries[host] = CacheEntry(
+                    address,
+                    now + self.ttl * self.refresh_ahead,
+                    now + self.ttl,
+                )
+            elif (
+                previous is not None
+                and previous.address is not None
+                and now < previous.expires
+            ):
+                retry = min(now + self.negative_ttl, previous.expires)
+                self._entries[host] = CacheEntry(
+                    previous.address, retry, previous.expires
+                )
+                address = previous.address
+            else:
+                expires = now + self.negative_ttl
+                self._entries[host] = CacheEntry(None, expires, expires)
+            self._pending.pop(host, None)
+        return address
+
+    @staticmethod
+    def _checked(host: str, address: str | None) -> str:
+        """
+        Turns a failed lookup into an error.
+
+        Args:
+            host (str): The host looked up.
+            address (str | None): The outcome of the lookup.
+
+        Returns:
+            str: The address.
+
+        Raises:
+            OSError: If the lookup failed.
+        """
+        if address is None:
+            raise OSError(f"Cannot resolve {host!r}")
+        return address
+
+    def resolve(self, host: str, timeout: float | None = None) -> str:
+        """
+        Returns the IPv4 address of a host, waiting for a lookup only if it
+        is not cached.
+
+        Args:
+            host (str): An IP address literal or a hostname.
+            timeout (float, optional): Seconds to wait for the lookup.
+
+        Returns:
+            str: The address.
+
+        Raises:
+            OSError: If the name cannot be resolved.
+            TimeoutError: If the lookup did not complete in time.
+        """
+        entry = self._cached(host)
+        if entry is not None:
+            return self._checked(host, entry.address)
+        return self._checked(host, self._submit(host).result(timeout))
+
+    async def resolve_async(self, host: str) -> str:
+        """
+        Returns the IPv4 address of a host without blocking the event loop.
+        A cached address is returned without yielding to the loop.
+
+        Args:
+            host (str): An IP address literal or a hostname.
+
+        Returns:
+            str: The address.
+
+        Raises:
+            OSError: If the name cannot be resolved.
+        """
+        entry = self._cached(host)
+        if entry is not None:
+            return self._checked(host, entry.address)
+        # Shielded: a cancelled probe must not cancel a shared lookup
+        lookup = asyncio.wrap_future(self._submit(host))
+        return self._checked(host, await asyncio.shield(lookup))
+
+    def resolve_many(
+        self, hosts: Iterable[str], timeout: float | None = None
+    ) -> dict[str, str | None]:
+        """
+        Resolves many hosts in parallel.
+
+        Args:
+            hosts (Iterable[str]): IP address literals or hostnames.
+            timeout (float, optional): Seconds to wait for all the lookups.
+
+        Returns:
+            dict[str, str | None]: The address of each host, None for the
+            hosts that cannot be resolved or were not resolved in time.
+        """
+        results: dict[str, str | None] = {}
+        lookups: dict[str, Future[str | None]] = {}
+        for host in hosts:
+            entry = self._cached(host)
+            if entry is None:
+                lookups[host] = self._submit(host)
+            else:
+                results[host] = entry.address
+        wait(lookups.values(), timeout)
+        for host, future in lookups.items():
+            results[host] = future.result() if future.done() else None
+        return results
+
+    async def resolve_many_async(
+        self, hosts: Iterable[str]
+    ) -> dict[str, str | None]:
+        """
+        Resolves many hosts in parallel without blocking the event loop.
+
+        Args:
+            hosts (Iterable[str]): IP address literals or hostnames.
+
+        Returns:
+            dict[str, str | None]: The address of each host, None for the
+            hosts that cannot be resolved.
+        """
+        hosts = list(dict.fromkeys(hosts))
+        addresses = await asyncio.gather(
+            *(self.resolve_async(host) for host in hosts),
+            return_exceptions=True,
+        )
+        return {
+            host: address if isinstance(address, str) else None
+            for host, address in zip(hosts, addresses, strict=True)
+        }
+
+    def prefetch(self, hosts: Iterable[str]) -> None:
+        """
+        Starts resolving the hosts that are not cached yet, without waiting.
+
+        Args:
+            hosts (Iterable[str]): IP address literals or hostnames.
+        """
+        for host in hosts:
+            if self._cached(host) is None:
+                self._submit(host)
+
+    def invalidate(self, host: str | None = None) -> None:
+        """
+        Forgets the address of a host, or of every host, so the next use
+        looks it up again.
+
+        Args:
+            host (str, optional): The host. Every host if None.
+        """
+        with self._lock:
+            if host is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(host, None)
+
+    def close(self) -> None:
+        """
+        Stops the lookup threads. Lookups not started yet are cancelled;
+        the cache restarts the threads if used again.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._pending.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ----------------- Shared Cache -----------------
+
+_SHARED = ResolverCache()
+
+
+def shared_resolver() -> ResolverCache:
+    """
+    The cache shared by the probe backends of the process.
+
+    Returns:
+        ResolverCache: The shared cache.
+    """
+    return _SHARED
@@ -0,0 +1,273 @@
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+from .database_logger import DatabaseLogger
+
+# ----------------- Constants -----------------
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+# ----------------- Helper Classes -----------------
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    How long the raw logs are kept.
+
+    Attributes:
+        days (float | None): Days of logs kept for every target, None to
+        keep them forever.
+        overrides (Mapping[str, float | None]): Days of logs kept for
+        specific IP addresses, None to keep theirs forever. They take
+        precedence over `days`.
+    """
+
+    days: float | None = None
+    overrides: Mapping[str, float | None] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        """
+        Validates the durations.
+
+        Raises:
+            ValueError: If a duration is not positive.
+        """
+        for days in (self.days, *self.overrides.values()):
+            if days is not None and days <= 0:
+                raise ValueError(f"Invalid retention of {days} days")
+
+    @property
+    def enabled(self) -> bool:
+        """
+        bool: True if the policy deletes anything.
+        """
+        return self.days is not None or any(
+            days is not None for days in self.overrides.values()
+        )
+
+    @classmethod
+    def parse(
+        cls, days: float | None, overrides: list[str] | None = None
+    ) -> "RetentionPolicy":
+        """
+        Builds a policy from overrides written as "ADDRESS=DAYS", as given
+        on the command line or stored in the settings. "ADDRESS=0" keeps the
+        logs of the address forever.
+
+        Args:
+            days (float | None): Days of logs kept for every target; None or
+            0 to keep them forever.
+            overrides (list[str], optional): The per-target overrides.
+
+        Returns:
+            RetentionPolicy: The policy.
+
+        Raises:
+            ValueError: If an override is malformed or a duration negative.
+        """
+        parsed: dict[str, float | None] = {}
+        for override in overrides or []:
+            address, sep, value = override.partition("=")
+            if not sep or not address.strip():
+                raise ValueError(
+                    f"Invalid retention override {override!r}, "
+                    "expected ADDRESS=DAYS"
+                )
+            parsed[address.strip()] = float(value) or None
+        return cls(days or None, parsed)
+
+    def cutoffs(
+        self, now_ms: int
+    ) -> tuple[int | None, dict[str, int | None]]:
+        """
+        Converts the durations to epoch milliseconds before which the logs
+        are expired.
+
+        Args:
+            now_ms (int): The current time in epoch milliseconds.
+
+        Returns:
+            tuple[int | None, dict[str, int | None]]: The cutoff of the
+            targets without override, and the cutoff of each override; None
+            where the logs are kept forever.
+        """
+
+        def cutoff(days: float | None) -> int | None:
+            return None if days is None else now_ms - int(days * DAY_MS)
+
+        return cutoff(self.days), {
+            address: cutoff(days) for address, days in self.overrides.items()
+        }
+
+
+# ----------------- Helper Functions -----------------
+
+
+def enforce_retention(
+    logger: DatabaseLogger,
+    policy: RetentionPolicy,
+    chunk_size: int = 1000,
+    max_chunks: int | None = None,
+    cancel: threading.Event | None = None,
+    now_ms: int | None = None,
+) -> int:
+    """
+    Deletes the logs expired under a policy.
+
+    Args:
+        logger (DatabaseLogger): The logger holding the logs.
+        policy (RetentionPolicy): The retention policy.
+        chunk_size (int, optional): Maximum number of rows deleted per
+        transaction.
+        max_chunks (int, optional): Chunks deleted per target before moving
+        on, leaving the rest for a later call. Unbounded by default.
+        cancel (threading.Event, optional): Stops after the current chunk
+        once set.
+        now_ms (int, optional): The current time in epoch milliseconds.
+        Defaults to the system clock.
+
+    Returns:
+        int: The number of rows deleted.
+
+    Raises:
+        sqlite3.Error: If a chunk cannot be deleted.
+    """
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+    default, overrides = policy.cutoffs(now_ms)
+    deleted = 0
+    if default is not None:
+        deleted += logger.delete_older_than(
+            default,
+            exclude=tuple(overrides),
+            chunk_size=chunk_size,
+            max_chunks=max_chunks,
+            cancel=cancel,
+        )
+    for address, cutoff in overrides.items():
+        if cutoff is not None:
+            deleted += logger.delete_older_than(
+                cutoff,
+                ip_address=address,
+                chunk_size=chunk_size,
+                max_chunks=max_chunks,
+                cancel=cancel,
+            )
+    return deleted
+
+
+# ----------------- Core Classes -----------------
+
+
+class RetentionPruner:
+    """
+    Enforces a retention policy in the background.
+
+    Every `interval_s` seconds a daemon thread deletes at most
+    `max_chunks` chunks of `chunk_size` expired rows per target, then
+    returns up to `vacuum_pages` free pages to the file system, so neither
+    step holds the write lock for long. A backlog of expired rows is worked
+    off over the following runs.
+
+    Attributes:
+        logger (DatabaseLogger): The logger holding the logs.
+        policy (RetentionPolicy): The retention policy.
+        interval_s (float): Seconds between two runs.
+        chunk_size (int): Maximum number of rows deleted per transaction.
+        max_chunks (int): Chunks deleted per target and run.
+        vacuum_pages (int): Pages released per run, 0 to never vacuum.
+        deleted (int): Rows deleted since the pruner started.
+    Methods:
+        start():
+            Starts the pruning thread; the first run is immediate.
+        run_once() -> int:
+            Runs one bounded pruning step on the calling thread.
+        stop():
+            Stops the thread after the current chunk and waits for it.
+    """
+
+    def __init__(
+        self,
+        logger: DatabaseLogger,
+        policy: RetentionPolicy,
+        interval_s: float = 300,
+        chunk_size: int = 1000,
+        max_chunks: int = 10,
+        vacuum_pages: int = 1000,
+    ) -> None:
+        """
+        Initializes the pruner. Call `start` to run it.
+
+        Args:
+            logger (DatabaseLogger): The logger holding the logs.
+            policy (RetentionPolicy): The retention policy.
+            interval_s (float, optional): Seconds between two runs.
+            chunk_size (int, optional): Maximum rows deleted per
+            transaction.
+            max_chunks (int, optional): Chunks deleted per target and run.
+            vacuum_pages (int, optional): Pages released per run.
+        """
+        self.logger = logger
+        self.policy = policy
+        self.interval_s = interval_s
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.vacuum_pages = vacuum_pages
+        self.deleted = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """
+        Starts the pruning thread. Does nothing if it is already running.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="RetentionPruner", daemon=True
+        )
+        self._thread.start()
+
+    def run_once(self) -> int:
+        """
+        Deletes one bounded batch of expired logs and releases free pages.
+
+        Returns:
+            int: The number of rows deleted.
+        """
+        deleted = enforce_retention(
+            self.logger,
+            self.policy,
+            chunk_size=self.chunk_size,
+            max_chunks=self.max_chunks,
+            cancel=self._stop,
+        )
+        self.deleted += deleted
+        if self.vacuum_pages and not self._stop.is_set():
+            self.logger.incremental_vacuum(self.vacuum_pages)
+        return deleted
+
+    def _run(self) -> None:
+        """
+        Main loop of the pruning thread.
+        """
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error enforcing retention: {e}")
+            self._stop.wait(self.interval_s)
+
+    def stop(self) -> None:
+        """
+        Stops the pruning thread after the current chunk and waits for it.
+        """
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join()
@@ -0,0 +1,520 @@
+import math
+import sqlite3
+import threading
+from collections.abc import Callable, Iterable
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
+
+from .ping import MISSED
+
+# ----------------- Constants -----------------
+
+# Bucket sizes in milliseconds. Buckets are aligned on the Unix epoch, so
+# days are UTC days and every minute and hour bucket lies within one day.
+RESOLUTIONS = {
+    "minute": 60 * 1000,
+    "hour": 60 * 60 * 1000,
+    "day": 24 * 60 * 60 * 1000,
+}
+MINUTE_MS = RESOLUTIONS["minute"]
+HOUR_MS = RESOLUTIONS["hour"]
+DAY_MS = RESOLUTIONS["day"]
+# Resolutions keeping a round-trip time histogram
+HISTOGRAM_RESOLUTIONS = (HOUR_MS, DAY_MS)
+# Ratio between the bounds of a histogram bin: a value read back from its
+# bin is within 2% of the round-trip time recorded
+BIN_GROWTH = 1.04
+
+CREATE_ROLLUPS = """
+    CREATE TABLE IF NOT EXISTS ping_rollups (
+        resolution INTEGER NOT NULL,
+        ip_address TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        successes INTEGER NOT NULL,
+        failures INTEGER NOT NULL,
+        rtt_count INTEGER NOT NULL,
+        rtt_min INTEGER,
+        rtt_max INTEGER,
+        rtt_sum INTEGER NOT NULL,
+        rtt_sum_sq INTEGER NOT NULL,
+        jitter_count INTEGER NOT NULL DEFAULT 0,
+        jitter_sum INTEGER NOT NULL DEFAULT 0,
+        missed INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (resolution, ip_address, bucket)
+    ) WITHOUT ROWID
+"""
+CREATE_RTT_BINS = """
+    CREATE TABLE IF NOT EXISTS ping_rtt_bins (
+        resolution INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        ip_address TEXT NOT NULL,
+        bin INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (resolution, bucket, ip_address, bin)
+    ) WITHOUT ROWID
+"""
+CREATE_OUTAGES = """
+    CREATE TABLE IF NOT EXISTS ping_outages (
+        id INTEGER PRIMARY KEY,
+        ip_address TEXT NOT NULL,
+        start_ms INTEGER NOT NULL,
+        end_ms INTEGER NOT NULL,
+        probes INTEGER NOT NULL,
+        recovered_ms INTEGER
+    )
+"""
+CREATE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_ping_rollups_bucket "
+    "ON ping_rollups (resolution, bucket)",
+    "CREATE INDEX IF NOT EXISTS idx_ping_outages_ip_start "
+    "ON ping_outages (ip_address, start_ms)",
+)
+
+# MIN() and MAX() with several arguments return NULL if any is NULL
+_UPSERT_SQL = """
+    INSERT INTO ping_rollups (
+        resolution, ip_address, bucket, count, successes, failures,
+        rtt_count, rtt_min, rtt_max, rtt_sum, rtt_sum_sq, jitter_count,
+        jitter_sum, missed
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (resolution, ip_address, bucket) DO UPDATE SET
+        count = count + excluded.count,
+        successes = successes + excluded.successes,
+        failures = failures + excluded.failures,
+        rtt_count = rtt_count + excluded.rtt_count,
+        rtt_min = COALESCE(MIN(rtt_min, excluded.rtt_min), rtt_min,
+                           excluded.rtt_min),
+        rtt_max = COALESCE(MAX(rtt_max, excluded.rtt_max), rtt_max,
+                           excluded.rtt_max),
+        rtt_sum = rtt_sum + excluded.rtt_sum,
+        rtt_sum_sq = rtt_sum_sq + excluded.rtt_sum_sq,
+        jitter_count = jitter_count + excluded.jitter_count,
+        jitter_sum = jitter_sum + excluded.jitter_sum,
+        missed = missed + excluded.missed
+"""
+_UPSERT_BIN_SQL = """
+    INSERT INTO ping_rtt_bins (resolution, bucket, ip_address, bin, count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (resolution, bucket, ip_address, bin) DO UPDATE SET
+        count = count + excluded.count
+"""
+_INSERT_OUTAGE_SQL = """
+    INSERT INTO ping_outages (ip_address, start_ms, end_ms, probes)
+    VALUES (?, ?, ?, 1)
+"""
+_EXTEND_OUTAGE_SQL = """
+    UPDATE ping_outages SET end_ms = ?, probes = probes + ? WHERE id = ?
+"""
+_RECOVER_OUTAGE_SQL = "UPDATE ping_outages SET recovered_ms = ? WHERE id = ?"
+_SELECT_RAW_SQL = """
+    SELECT result, timestamp, ip_address, rtt_us
+    FROM ping_logs
+    WHERE timestamp >= ? AND timestamp < ? AND id <= ?
+    ORDER BY timestamp, id
+"""
+
+# (result, epoch milliseconds, ip_address, rtt_us) of a ping
+RawPing = tuple[str, int, str, int | None]
+# (resolution, ip_address, bucket, count, successes, failures, rtt_count,
+# rtt_min, rtt_max, rtt_sum, rtt_sum_sq, jitter_count, jitter_sum, missed)
+RollupValues = tuple[
+    int,
+    str,
+    int,
+    int,
+    int,
+    int,
+    int,
+    int | None,
+    int | None,
+    int,
+    int,
+    int,
+    int,
+    int,
+]
+BucketKey = tuple[int, str, int]
+
+
+# ----------------- Helper Functions -----------------
+
+
+def rtt_bin(rtt_us: int) -> int:
+    """
+    Returns the histogram bin of a round-trip time.
+
+    Args:
+        rtt_us (int): The round-trip time in microseconds.
+
+    Returns:
+        int: The bin, whose bounds are ``BIN_GROWTH ** bin`` and
+        ``BIN_GROWTH ** (bin + 1)`` microseconds.
+    """
+    return int(math.log(max(rtt_us, 1), BIN_GROWTH))
+
+
+def bin_value(rtt_bin: int) -> float:
+    """
+    Returns the round-trip time standing for a histogram bin.
+
+    Args:
+        rtt_bin (int): The bin.
+
+    Returns:
+        float: The geometric middle of the bin, in microseconds.
+    """
+    return float(BIN_GROWTH ** (rtt_bin + 0.5))
+
+
+def add_tables(conn: sqlite3.Connection) -> None:
+    """
+    Creates the rollup, histogram and outage tables and their indexes, in
+    the caller's transaction.
+
+    Args:
+        conn (sqlite3.Connection): The writer connection.
+    """
+    for statement in (
+        CREATE_ROLLUPS,
+        CREATE_RTT_BINS,
+        CREATE_OUTAGES,
+        *CREATE_INDEXES,
+    ):
+        conn.execute(statement)
+
+
+def rebuild(
+    connect: Callable[[], AbstractContextManager[sqlite3.Connection]],
+    progress: Callable[[int, int], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> int:
+    """
+    Recomputes the rollups, histograms and outages from the raw logs.
+
+    The aggregates of the days still holding raw logs are deleted, then the
+    raw logs are replayed through a `RollupWriter`, one hour per
+    transaction, so a writer sharing the database is only blocked briefly.
+    Hours without logs are skipped. Logs written meanwhile are added by that
+    writer as usual; an outage in progress during the rebuild may be split
+    in two.
+
+    Args:
+        connect (Callable[[], AbstractContextManager[sqlite3.Connection]]):
+        Provides exclusive use of the writer connection.
+        progress (Callable[[int, int], None], optional): Called after every
+        hour with the milliseconds of logs replayed and the total, from the
+        first to the last day holding logs.
+        cancel (threading.Event, optional): Stops after the current hour
+        once set, leaving the following hours without aggregates.
+
+    Returns:
+        int: The number of hours replayed.
+    """
+    with connect() as conn, conn:
+        oldest, newest, last_id = conn.execute(
+            "SELECT MIN(timestamp), MAX(timestamp), MAX(id) FROM ping_logs"
+        ).fetchone()
+        if oldest is None:
+            return 0
+        first_day = oldest - oldest % DAY_MS
+        conn.execute(
+            "DELETE FROM ping_rollups WHERE bucket >= ?", (first_day,)
+        )
+        conn.execute(
+            "DELETE FROM ping_rtt_bins WHERE bucket >= ?", (first_day,)
+        )
+        conn.execute(
+            "DELETE FROM ping_outages "
+            "WHERE COALESCE(recovered_ms, end_ms) >= ?",
+            (first_day,),
+        )
+        writer = RollupWriter(conn)
+    span = newest - newest % DAY_MS + DAY_MS - first_day
+    hours = 0
+    position = first_day
+    while cancel is None or not cancel.is_set():
+        with connect() as conn, conn:
+            row = conn.execute(
+                "SELECT MIN(timestamp) FROM ping_logs "
+                "WHERE timestamp >= ? AND id <= ?",
+                (position, last_id),
+            ).fetchone()
+            if row[0] is None:
+                break
+            hour = row[0] - row[0] % HOUR_MS
+            position = hour + HOUR_MS
+            writer.add(
+                conn,
+                conn.execute(_SELECT_RAW_SQL, (hour, position, last_id)),
+            )
+        hours += 1
+        if progress is not None:
+            progress(position - first_day, span)
+    return hours
+
+
+# ----------------- Helper Classes -----------------
+
+
+@dataclass(slots=True)
+class _BatchSums:
+    """
+    The sums of a batch of pings per bucket, merged into the tables with
+    one upsert per bucket and bin.
+
+    Attributes:
+        sums (dict[BucketKey, list[int]]): The count, successes, failures,
+        rtt_count, rtt_sum, rtt_sum_sq, jitter_count, jitter_sum and missed
+        ticks of each bucket.
+        extremes (dict[BucketKey, tuple[int, int]]): The rtt_min and
+        rtt_max of each bucket.
+        bins (dict[tuple[int, int, str, int], int]): The count of each
+        histogram bin, by resolution, bucket, target and bin.
+    """
+
+    sums: dict[BucketKey, list[int]] = field(default_factory=dict)
+    extremes: dict[BucketKey, tuple[int, int]] = field(default_factory=dict)
+    bins: dict[tuple[int, int, str, int], int] = field(default_factory=dict)
+
+    def _bucket(self, key: BucketKey) -> list[int]:
+        """
+        The sums of a bucket, created empty on first use.
+
+        Args:
+            key (BucketKey): The resolution, target and bucket.
+
+        Returns:
+            list[int]: The sums.
+        """
+        acc = self.sums.get(key)
+        if acc is None:
+            acc = self.sums[key] = [0, 0, 0, 0, 0, 0, 0, 0, 0]
+        return acc
+
+    def add_missed(self, ip_address: str, epoch_ms: int) -> None:
+        """
+        Counts a tick missed by the scheduler.
+
+        Args:
+            ip_address (str): The target.
+            epoch_ms (int): The time of the tick.
+        """
+        for size in RESOLUTIONS.values():
+            key = (size, ip_address, epoch_ms - epoch_ms % size)
+            self._bucket(key)[8] += 1
+
+    def add_ping(
+        self,
+        ip_address: str,
+        epoch_ms: int,
+        success: bool,
+        rtt_us: int | None,
+        jitter: int | None,
+    ) -> None:
+        """
+        Adds a ping to the buckets of every resolution.
+
+        Args:
+            ip_address (str): The target.
+            epoch_ms (int): The time of the ping.
+            success (bool): Whether a reply was received.
+            rtt_us (int | None): The round-trip time, if any.
+            jitter (int | None): The difference with the previous
+            round-trip time, if any.
+        """
+        for size in RESOLUTIONS.values():
+            bucket = epoch_ms - epoch_ms % size
+            key = (size, ip_address, bucket)
+            acc = self._bucket(key)
+            acc[0] += 1
+            acc[1 if success else 2] += 1
+            if rtt_us is None:
+                continue
+            acc[3] += 1
+            acc[4] += rtt_us
+            acc[5] += rtt_us * rtt_us
+            if jitter is not None:
+                acc[6] += 1
+                acc[7] += jitter
+            low, high = self.extremes.get(key, (rtt_us, rtt_us))
+            self.extremes[key] = (min(low, rtt_us), max(high, rtt_us))
+            if size in HISTOGRAM_RESOLUTIONS:
+                bin_key = (size, bucket, ip_address, rtt_bin(rtt_us))
+                self.bins[bin_key] = self.bins.get(bin_key, 0) + 1
+
+    def values(self) -> list[RollupValues]:
+        """
+        The upsert parameters of every bucket.
+
+        Returns:
+            list[RollupValues]: One row per bucket.
+        """
+        values: list[RollupValues] = []
+        for key, acc in self.sums.items():
+            count, ok, failed, rtt_count, rtt_sum, rtt_sq = acc[:6]
+            jit_n, jit_sum, missed = acc[6:]
+            low, high = self.extremes.get(key, (None, None))
+            values.append(
+                (
+                    *key,
+                    count,
+                    ok,
+                    failed,
+                    rtt_count,
+                    low,
+                    high,
+                    rtt_sum,
+                    rtt_sq,
+                    jit_n,
+                    jit_sum,
+                    missed,
+                )
+            )
+        return values
+
+
+# ----------------- Core Classes -----------------
+
+
+class RollupWriter:
+    """
+    Adds written pings to the aggregate tables, in the transaction writing
+    them:
+
+    - 'ping_rollups': per target and per minute, hour and day, the number
+      of pings, successes and failures, the count, minimum, maximum, sum and
+      sum of squares of the round-trip times, the count and sum of the
+      absolute differences between consecutive round-trip times (jitter),
+      and the number of ticks missed by the scheduler. Missed ticks are
+      not pings: they count neither as sent nor as lost, and do not break
+      or extend an outage.
+    - 'ping_rtt_bins': per target and per hour and day, a histogram of the
+      round-trip times with bins `BIN_GROWTH` wide.
+    - 'ping_outages': every run of consecutive failures of a target, from
+      its first failure to the success ending it.
+
+    A batch is merged with one upsert per bucket and bin instead of one per
+    ping. The pings of a target must be added in time order. The writer
+    remembers the last round-trip time and the outage in progress of each
+    target; if the transaction is rolled back, discard the writer and
+    create a new one.
+
+    Attributes:
+        last_rtt (dict[str, int]): Last round-trip time of each target.
+        open_outages (dict[str, int]): Id of the outage in progress of each
+        failing target.
+    Methods:
+        add(conn: sqlite3.Connection, rows: Iterable[RawPing]):
+            Adds pings to the aggregates.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """
+        Initializes the writer with the outages still in progress.
+
+        Args:
+            conn (sqlite3.Connection): The writer connection.
+        """
+        self.last_rtt: dict[str, int] = {}
+        self.open_outages: dict[str, int] = {
+            ip_address: outage_id
+            for outage_id, ip_address in conn.execute(
+                "SELECT id, ip_address FROM ping_outages "
+                "WHERE recovered_ms IS NULL ORDER BY start_ms"
+            )
+        }
+
+    def add(self, conn: sqlite3.Connection, rows: Iterable[RawPing]) -> None:
+        """
+        Adds pings to the aggregates, in the caller's transaction.
+
+        Args:
+            conn (sqlite3.Connection): The writer connection.
+            rows (Iterable[RawPing]): The result, epoch milliseconds, IP
+            address and round-trip time of each ping.
+        """
+        batch = _BatchSums()
+        # Outage id -> (last failure, failures added)
+        extended: dict[int, tuple[int, int]] = {}
+        recovered: list[tuple[int, int]] = []
+        for result, epoch_ms, ip_address, rtt_us in rows:
+            if result == MISSED:
+                batch.add_missed(ip_address, epoch_ms)
+                continue
+            success = result == "Success"
+            self._track_outage(
+                conn, ip_address, epoch_ms, success, extended, recovered
+            )
+            jitter = self._jitter(ip_address, rtt_us)
+            batch.add_ping(ip_address, epoch_ms, success, rtt_us, jitter)
+
+        conn.executemany(_UPSERT_SQL, batch.values())
+        conn.executemany(
+            _UPSERT_BIN_SQL,
+            [(*key, count) for key, count in batch.bins.items()],
+        )
+        conn.executemany(
+            _EXTEND_OUTAGE_SQL,
+            [(end, added, oid) for oid, (end, added) in extended.items()],
+        )
+        conn.executemany(_RECOVER_OUTAGE_SQL, recovered)
+
+    def _jitter(self, ip_address: str, rtt_us: int | None) -> int | None:
+        """
+        Follows the round-trip times of a target.
+
+        Args:
+            ip_address (str): The target.
+            rtt_us (int | None): The round-trip time of its latest ping.
+
+        Returns:
+            int | None: The absolute difference with the previous round-trip
+            time, None if either is missing.
+        """
+        if rtt_us is None:
+            return None
+        previous = self.last_rtt.get(ip_address)
+        self.last_rtt[ip_address] = rtt_us
+        if previous is None:
+            return None
+        return abs(rtt_us - previous)
+
+    def _track_outage(
+        self,
+        conn: sqlite3.Connection,
+        ip_address: str,
+        epoch_ms: int,
+        success: bool,
+        extended: dict[int, tuple[int, int]],
+        recovered: list[tuple[int, int]],
+    ) -> None:
+        """
+        Follows the runs of failures of a target. Outages are inserted as
+        soon as they start, their extensions and recoveries are collected
+        to be written with the batch.
+
+        Args:
+            conn (sqlite3.Connection): The writer connection.
+            ip_address (str): The target.
+            epoch_ms (int): The time of the ping.
+            success (bool): Whether the ping succeeded.
+            extended (dict[int, tuple[int, int]]): Collects the last failure
+            and the number of failures added to each outage.
+            recovered (list[tuple[int, int]]): Collects the recovery time and
+            the id of the outages ended.
+        """
+        outage_id = self.open_outages.get(ip_address)
+        if success:
+            if outage_id is not None:
+                recovered.append((epoch_ms, outage_id))
+                del self.open_outages[ip_address]
+        elif outage_id is None:
+            cur = conn.execute(
+                _INSERT_OUTAGE_SQL, (ip_address, epoch_ms, epoch_ms)
+            )
+            self.open_outages[ip_address] = int(cur.lastrowid or 0)
+        else:
+            added = extended.get(outage_id, (0, 0))[1]
+            extended[outage_id] = (epoch_ms, added + 1)
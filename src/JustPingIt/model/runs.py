@@ -0,0 +1,558 @@
+import heapq
+import sqlite3
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import astuple, dataclass, replace
+
+# ----------------- Constants -----------------
+
+CREATE_RUNS = """
+    CREATE TABLE IF NOT EXISTS ping_runs (
+        id INTEGER PRIMARY KEY,
+        ip_address TEXT NOT NULL,
+        result TEXT NOT NULL,
+        start_ms INTEGER NOT NULL,
+        end_ms INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        rtt_count INTEGER NOT NULL,
+        rtt_min INTEGER,
+        rtt_max INTEGER,
+        rtt_sum INTEGER NOT NULL,
+        rtt_sum_sq INTEGER NOT NULL,
+        ttl INTEGER,
+        first_seq INTEGER,
+        last_seq INTEGER
+    )
+"""
+CREATE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_ping_runs_ip_start "
+    "ON ping_runs (ip_address, start_ms)",
+    "CREATE INDEX IF NOT EXISTS idx_ping_runs_end ON ping_runs (end_ms)",
+)
+# A run holding pings further apart than this many times its mean interval
+# is closed, so its pings can be spread evenly when it is expanded
+MAX_GAP_RATIO = 2
+
+_INSERT_RUN_SQL = """
+    INSERT INTO ping_runs (
+        ip_address, result, start_ms, end_ms, count, rtt_count, rtt_min,
+        rtt_max, rtt_sum, rtt_sum_sq, ttl, first_seq, last_seq
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_UPDATE_RUN_SQL = """
+    UPDATE ping_runs SET
+        end_ms = ?, count = ?, rtt_count = ?, rtt_min = ?, rtt_max = ?,
+        rtt_sum = ?, rtt_sum_sq = ?, ttl = ?, last_seq = ?
+    WHERE id = ?
+"""
+_SELECT_RUN_SQL = """
+    SELECT
+        id, ip_address, result, start_ms, end_ms, count, rtt_count, rtt_min,
+        rtt_max, rtt_sum, rtt_sum_sq, ttl, first_seq, last_seq
+    FROM ping_runs
+    WHERE id > ? AND id <= ?
+"""
+_DELETE_RUN_SQL = "DELETE FROM ping_runs WHERE id = ?"
+_TRIM_RUN_SQL = """
+    UPDATE ping_runs SET
+        start_ms = ?, end_ms = ?, count = ?, rtt_count = ?, rtt_sum = ?,
+        rtt_sum_sq = ?, first_seq = ?, last_seq = ?
+    WHERE id = ?
+"""
+_SELECT_OPEN_RUNS_SQL = """
+    SELECT
+        id, ip_address, result, start_ms, end_ms, count, rtt_count, rtt_min,
+        rtt_max, rtt_sum, rtt_sum_sq, ttl, first_seq, last_seq
+    FROM ping_runs
+    WHERE id IN (
+        SELECT id FROM (
+            SELECT id, MAX(end_ms) FROM ping_runs GROUP BY ip_address
+        )
+    )
+"""
+# Completed with the conditions on the runs, the keyset of the previous
+# batch and _PAGE_RUNS_ORDER_SQL: the runs that may hold pings up to a time
+_SELECT_PAGE_RUNS_SQL = """
+    SELECT
+        id, ip_address, result, start_ms, end_ms, count, rtt_count, rtt_min,
+        rtt_max, rtt_sum, rtt_sum_sq, ttl, first_seq, last_seq
+    FROM ping_runs
+    WHERE start_ms <= ?
+"""
+_PAGE_RUNS_KEYSET_SQL = " AND (end_ms < ? OR (end_ms = ? AND id < ?))"
+_PAGE_RUNS_ORDER_SQL = " ORDER BY end_ms DESC, id DESC LIMIT ?"
+# Completed with the conditions on the runs. Defines 'expanded_logs', the
+# rows of 'ping_logs' followed by one row per ping of each run, with the
+# id of the run negated, timestamps spread evenly from its start to its end
+# and its mean round-trip time.
+EXPAND_SQL = """
+    WITH RECURSIVE
+    probes (run_id, k, count) AS (
+        SELECT id, 0, count FROM ping_runs WHERE 1=1{runs}
+        UNION ALL
+        SELECT run_id, k + 1, count FROM probes WHERE k + 1 < count
+    ),
+    expanded_logs AS (
+        SELECT id, result, timestamp, ip_address, rtt_us, ttl, seq
+        FROM ping_logs
+        UNION ALL
+        SELECT
+            -r.id,
+            r.result,
+            r.start_ms + (r.end_ms - r.start_ms) * p.k / MAX(r.count - 1, 1),
+            r.ip_address,
+            CASE WHEN r.rtt_count > 0 THEN r.rtt_sum / r.rtt_count END,
+            r.ttl,
+            r.first_seq + p.k
+        FROM probes AS p JOIN ping_runs AS r ON r.id = p.run_id
+    )
+"""
+
+# (result, epoch milliseconds, ip_address, rtt_us, ttl, seq) of a ping
+RawPing = tuple[str, int, str, int | None, int | None, int | None]
+# (epoch milliseconds, negated run id, index in the run) of an expanded
+# ping; the log pages are sorted on it, newest first
+PingKey = tuple[int, int, int]
+# (negated run id, result, epoch milliseconds, ip_address, rtt_us, ttl, seq)
+# of an expanded ping, the columns of 'expanded_logs'
+ExpandedPing = tuple[int, str, int, str, int | None, int | None, int | None]
+
+
+# ----------------- Helper Classes -----------------
+
+
+@dataclass(slots=True)
+class Run:
+    """
+    A run of consecutive pings of a target with the same result, as stored
+    in 'ping_runs'.
+
+    Attributes:
+        id (int): The row id.
+        ip_address (str): The target.
+        result (str): The result shared by the pings.
+        start_ms (int): Time of the first ping, in epoch milliseconds.
+        end_ms (int): Time of the last ping.
+        count (int): Number of pings.
+        rtt_count (int): Number of round-trip times recorded.
+        rtt_min (int | None): Shortest round-trip time.
+        rtt_max (int | None): Longest round-trip time.
+        rtt_sum (int): Sum of the round-trip times.
+        rtt_sum_sq (int): Sum of their squares.
+        ttl (int | None): TTL of the last reply.
+        first_seq (int | None): Sequence number of the first ping.
+        last_seq (int | None): Sequence number of the last ping.
+    """
+
+    id: int
+    ip_address: str
+    result: str
+    start_ms: int
+    end_ms: int
+    count: int = 1
+    rtt_count: int = 0
+    rtt_min: int | None = None
+    rtt_max: int | None = None
+    rtt_sum: int = 0
+    rtt_sum_sq: int = 0
+    ttl: int | None = None
+    first_seq: int | None = None
+    last_seq: int | None = None
+
+    def continues(self, ping: RawPing) -> bool:
+        """
+        Checks whether a ping extends the run: same result, next sequence
+        number, and not later than `MAX_GAP_RATIO` mean intervals.
+
+        Args:
+            ping (RawPing): The next ping of the target.
+
+        Returns:
+            bool: True if the ping belongs to the run.
+        """
+        result, epoch_ms, _, _, _, seq = ping
+        if result != self.result:
+            return False
+        if seq is not None and self.last_seq is not None:
+            if seq != self.last_seq + 1:
+                return False
+        if self.count > 1:
+            interval = (self.end_ms - self.start_ms) / (self.count - 1)
+            return epoch_ms - self.end_ms <= MAX_GAP_RATIO * interval
+        return True
+
+    def add(self, ping: RawPing) -> None:
+        """
+        Adds a ping to the run.
+
+        Args:
+            ping (RawPing): A ping extending the run.
+        """
+        _, epoch_ms, _, rtt_us, ttl, seq = ping
+        self.end_ms = epoch_ms
+        self.count += 1
+        self.last_seq = seq
+        if ttl is not None:
+            self.ttl = ttl
+        if rtt_us is not None:
+            self.rtt_count += 1
+            if self.rtt_min is None or rtt_us < self.rtt_min:
+                self.rtt_min = rtt_us
+            if self.rtt_max is None or rtt_us > self.rtt_max:
+                self.rtt_max = rtt_us
+            self.rtt_sum += rtt_us
+            self.rtt_sum_sq += rtt_us * rtt_us
+
+    def ping_time(self, k: int) -> int:
+        """
+        The time of a ping of the run, spread evenly from its start to its
+        end as `EXPAND_SQL` does.
+
+        Args:
+            k (int): The index of the ping, from 0.
+
+        Returns:
+            int: The epoch milliseconds of the ping.
+        """
+        span = self.end_ms - self.start_ms
+        return self.start_ms + span * k // max(self.count - 1, 1)
+
+    def expanded(self, k: int) -> ExpandedPing:
+        """
+        A ping of the run, as `EXPAND_SQL` expands it.
+
+        Args:
+            k (int): The index of the ping, from 0.
+
+        Returns:
+            ExpandedPing: The ping, with the negated id of the run and its
+            mean round-trip time.
+        """
+        rtt_us = None
+        if self.rtt_count > 0:
+            rtt_us = self.rtt_sum // self.rtt_count
+        seq = None if self.first_seq is None else self.first_seq + k
+        return (
+            -self.id,
+            self.result,
+            self.ping_time(k),
+            self.ip_address,
+            rtt_us,
+            self.ttl,
+            seq,
+        )
+
+    def keys_below(
+        self,
+        after: PingKey | None,
+        start_ms: int,
+        end_ms: int,
+        limit: int,
+    ) -> list[PingKey]:
+        """
+        The newest pings of the run within a time range and before a page
+        token. The pings are located by bisection, without expanding the
+        ones after the token.
+
+        Args:
+            after (PingKey | None): Only pings sorting before this one.
+            start_ms (int): Start of the range.
+            end_ms (int): End of the range (excluded).
+            limit (int): Maximum number of pings returned.
+
+        Returns:
+            list[PingKey]: The keys of the pings, newest first.
+        """
+
+        def past(k: int) -> bool:
+            key = (self.ping_time(k), -self.id, k)
+            return key[0] >= end_ms or (after is not None and key >= after)
+
+        last = bisect_left(range(self.count), True, key=past)
+        keys = []
+        for k in range(last - 1, max(last - limit, 0) - 1, -1):
+            epoch_ms = self.ping_time(k)
+            if epoch_ms < start_ms:
+                break
+            keys.append((epoch_ms, -self.id, k))
+        return keys
+
+    def part(self, first: int, count: int) -> "Run":
+        """
+        A new run holding `count` pings of this one from index `first`.
+        Only the sums of the round-trip times are kept, so they are shared
+        out in proportion and the mean is preserved; the extremes are kept
+        as they are.
+
+        Args:
+            first (int): Index of the first ping kept.
+            count (int): Number of pings kept.
+
+        Returns:
+            Run: The part, with id 0.
+        """
+        ratio = count / self.count
+        first_seq = last_seq = None
+        if self.first_seq is not None:
+            first_seq = self.first_seq + first
+            last_seq = first_seq + count - 1
+        return replace(
+            self,
+            id=0,
+            start_ms=self.ping_time(first),
+            end_ms=self.ping_time(first + count - 1),
+            count=count,
+            rtt_count=round(self.rtt_count * ratio),
+            rtt_sum=round(self.rtt_sum * ratio),
+            rtt_sum_sq=round(self.rtt_sum_sq * ratio),
+            first_seq=first_seq,
+            last_seq=last_seq,
+        )
+
+    def without(self, start_ms: int, end_ms: int) -> list["Run"]:
+        """
+        The parts of the run left once its pings within a time range are
+        removed.
+
+        Args:
+            start_ms (int): Start of the range.
+            end_ms (int): End of the range (excluded).
+
+        Returns:
+            list[Run]: The pings before the range and those after it, as
+            up to two new runs.
+        """
+        times = [self.ping_time(k) for k in range(self.count)]
+        before = sum(1 for t in times if t < start_ms)
+        after = sum(1 for t in times if t >= end_ms)
+        parts = []
+        if before:
+            parts.append(self.part(0, before))
+        if after:
+            parts.append(self.part(self.count - after, after))
+        return parts
+
+
+# ----------------- Helper Functions -----------------
+
+
+def delete_runs(
+    conn: sqlite3.Connection,
+    after_id: int,
+    max_id: int,
+    clause: str,
+    params: list[str | int],
+    start_ms: int,
+    end_ms: int,
+    limit: int,
+) -> tuple[int, int]:
+    """
+    Removes the pings of the selected runs that fall within a time range,
+    in the caller's transaction. Runs entirely within the range are
+    deleted, runs crossing its edges are trimmed, or split in two when
+    the range lies inside them.
+
+    Args:
+        conn (sqlite3.Connection): The writer connection.
+        after_id (int): Only runs with a greater id, to resume a deletion.
+        max_id (int): Only runs with an id up to this one.
+        clause (str): " AND ..." conditions selecting the runs.
+        params (list[str | int]): The parameters of the conditions.
+        start_ms (int): Start of the range.
+        end_ms (int): End of the range (excluded).
+        limit (int): Maximum number of runs examined.
+
+    Returns:
+        tuple[int, int]: The number of pings removed, and the id of the
+        last run examined, or `max_id` once every run was examined.
+    """
+    selected = conn.execute(
+        _SELECT_RUN_SQL + clause + " ORDER BY id LIMIT ?",
+        [after_id, max_id, *params, limit],
+    ).fetchall()
+    removed = 0
+    for row in selected:
+        run = Run(*row)
+        parts = run.without(start_ms, end_ms)
+        kept = sum(part.count for part in parts)
+        if kept == run.count:
+            continue
+        removed += run.count - kept
+        if not parts:
+            conn.execute(_DELETE_RUN_SQL, (run.id,))
+            continue
+        # The last part keeps the row; the first one of a split is added
+        last = parts[-1]
+        conn.execute(
+            _TRIM_RUN_SQL,
+            (
+                last.start_ms,
+                last.end_ms,
+                last.count,
+                last.rtt_count,
+                last.rtt_sum,
+                last.rtt_sum_sq,
+                last.first_seq,
+                last.last_seq,
+                run.id,
+            ),
+        )
+        if len(parts) == 2:
+            conn.execute(_INSERT_RUN_SQL, astuple(parts[0])[1:])
+    if len(selected) < limit:
+        return removed, max_id
+    return removed, int(selected[-1][0])
+
+
+def page_pings(
+    conn: sqlite3.Connection,
+    clause: str,
+    params: list[str | int],
+    after: PingKey | None,
+    start_ms: int,
+    end_ms: int,
+    limit: int,
+) -> list[tuple[PingKey, Run]]:
+    """
+    Selects the newest pings of the runs before a page token, in the order
+    of the log pages, expanding only the pings returned.
+
+    The runs are read by latest end first, `limit` at a time with a keyset
+    on (end_ms, id), and each one gives at most `limit` pings. Reading
+    stops at the first run ending before all the pings kept, so a page
+    costs the runs it overlaps, however long they are.
+
+    Args:
+        conn (sqlite3.Connection): A connection to the database.
+        clause (str): " AND ..." conditions selecting the runs.
+        params (list[str | int]): The parameters of the conditions.
+        after (PingKey | None): The key of the last ping of the previous
+        page; None for the first page.
+        start_ms (int): Start of the time range of the pings.
+        end_ms (int): End of the range (excluded).
+        limit (int): Maximum number of pings returned.
+
+    Returns:
+        list[tuple[PingKey, Run]]: The key of each ping and its run, newest
+        first.
+    """
+    bound = end_ms if after is None else after[0]
+    # Min-heap of the pings kept, the oldest on top
+    kept: list[tuple[PingKey, Run]] = []
+    keyset = ""
+    keyset_params: list[int] = []
+    while True:
+        batch = [
+            Run(*row)
+            for row in conn.execute(
+                _SELECT_PAGE_RUNS_SQL + clause + keyset + _PAGE_RUNS_ORDER_SQL,
+                [bound, *params, *keyset_params, limit],
+            )
+        ]
+        for run in batch:
+            newest = min(run.end_ms, bound)
+            if len(kept) == limit and newest < kept[0][0][0]:
+                return sorted(kept, key=lambda ping: ping[0], reverse=True)
+            for key in run.keys_below(after, start_ms, end_ms, limit):
+                if len(kept) < limit:
+                    heapq.heappush(kept, (key, run))
+                elif key > kept[0][0]:
+                    heapq.heapreplace(kept, (key, run))
+                else:
+                    break
+        if len(batch) < limit:
+            return sorted(kept, key=lambda ping: ping[0], reverse=True)
+        last = batch[-1]
+        keyset = _PAGE_RUNS_KEYSET_SQL
+        keyset_params = [last.end_ms, last.end_ms, last.id]
+
+
+def add_tables(conn: sqlite3.Connection) -> None:
+    """
+    Creates the runs table and its indexes, in the caller's transaction.
+
+    Args:
+        conn (sqlite3.Connection): The writer connection.
+    """
+    conn.execute(CREATE_RUNS)
+    for statement in CREATE_INDEXES:
+        conn.execute(statement)
+
+
+# ----------------- Core Classes -----------------
+
+
+class RunWriter:
+    """
+    Stores pings as runs of identical results in 'ping_runs' instead of
+    one row each in 'ping_logs', in the transaction of the caller.
+
+    A ping with the same result as the last run of its target extends it;
+    any other starts a new run. A stable link thus costs one row per state
+    change instead of one per probe. The pings of a target must be added in
+    time order. The writer remembers the last run of each target; if the
+    transaction is rolled back, discard the writer and create a new one.
+
+    Attributes:
+        open_runs (dict[str, Run]): The last run of each target.
+    Methods:
+        add(conn: sqlite3.Connection, rows: Iterable[RawPing]):
+            Adds pings to the runs.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """
+        Initializes the writer with the last run of every target.
+
+        Args:
+            conn (sqlite3.Connection): The writer connection.
+        """
+        self.open_runs: dict[str, Run] = {
+            row[1]: Run(*row) for row in conn.execute(_SELECT_OPEN_RUNS_SQL)
+        }
+
+    def add(self, conn: sqlite3.Connection, rows: Iterable[RawPing]) -> None:
+        """
+        Adds pings to the runs, in the caller's transaction. New runs are
+        inserted as they start; the runs extended are updated once per
+        batch.
+
+        Args:
+            conn (sqlite3.Connection): The writer connection.
+            rows (Iterable[RawPing]): The result, epoch milliseconds, IP
+            address, round-trip time, TTL and sequence number of each ping.
+        """
+        extended: dict[int, Run] = {}
+        for ping in rows:
+            ip_address = ping[2]
+            run = self.open_runs.get(ip_address)
+            if run is not None and run.continues(ping):
+                run.add(ping)
+                extended[run.id] = run
+                continue
+            result, epoch_ms = ping[:2]
+            run = Run(0, ip_address, result, epoch_ms, epoch_ms, count=0)
+            run.first_seq = ping[5]
+            run.add(ping)
+            cur = conn.execute(_INSERT_RUN_SQL, astuple(run)[1:])
+            run.id = int(cur.lastrowid or 0)
+            self.open_runs[ip_address] = run
+        conn.executemany(
+            _UPDATE_RUN_SQL,
+            [
+                (
+                    run.end_ms,
+                    run.count,
+                    run.rtt_count,
+                    run.rtt_min,
+                    run.rtt_max,
+                    run.rtt_sum,
+                    run.rtt_sum_sq,
+                    run.ttl,
+                    run.last_seq,
+                    run.id,
+                )
+                for run in extended.values()
+            ],
+        )
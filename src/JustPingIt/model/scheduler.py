@@ -0,0 +1,419 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from .backends import (
+    ProbeBackend,
+    TcpBackend,
+    default_backend,
+    split_tcp_target,
+)
+from .database_logger import DatabaseLogger
+from .icmp import IcmpEngine
+from .ping import MISSED, Ping
+from .sketches import LatencySketches
+
+# ----------------- Constants -----------------
+
+# Probes of one target allowed in flight at once, e.g. a 3 s timeout on a
+# 1 s interval keeps three probes pending while the host is down
+MAX_IN_FLIGHT = 4
+# Fraction of the interval after its deadline beyond which a probe is late
+LATE_FRACTION = 0.1
+
+# ----------------- Helper Functions -----------------
+
+
+def overdue_ticks(due: float, now: float, interval: float) -> int:
+    """
+    Counts the deadlines of a fixed-rate schedule that passed before the
+    latest one, i.e. the ticks that can no longer be probed on time.
+
+    Args:
+        due (float): The earliest pending deadline, in monotonic seconds.
+        now (float): The current monotonic time.
+        interval (float): Seconds between two deadlines.
+
+    Returns:
+        int: The ticks from `due` that precede the latest deadline passed,
+        0 if at most one deadline passed.
+    """
+    return max(int((now - due) // interval), 0)
+
+
+# ----------------- Helper Classes -----------------
+
+
+@dataclass(slots=True)
+class Target:
+    """
+    A host monitored by the scheduler.
+
+    Attributes:
+        address (str): The IP address or hostname to ping.
+        interval (float): Seconds between two probes of the host.
+        timeout (float): Seconds to wait for a reply.
+        generation (int): Incremented when the target is replaced, so stale
+        entries of the schedule can be recognised and dropped.
+        sequence (int): Number of ticks of the target so far, sent or
+        missed.
+        in_flight (int): Probes of the target awaiting their result.
+        missed (int): Ticks recorded as missed.
+        late (int): Probes sent more than `LATE_FRACTION` of the interval
+        after their deadline.
+    """
+
+    address: str
+    interval: float
+    timeout: float = 3
+    generation: int = 0
+    sequence: int = 0
+    in_flight: int = 0
+    missed: int = 0
+    late: int = 0
+
+
+# ----------------- Core Classes -----------------
+
+
+class PingScheduler:
+    """
+    Probes many targets concurrently on a single asyncio event loop.
+
+    Each target keeps its own interval and timeout. The schedule is a heap of
+    due times, so only probes that are actually in flight hold a task: the
+    memory footprint is one `Target` per host and the whole scheduler runs in
+    whichever single thread calls `run_forever`.
+
+    Probes fire at a fixed rate on monotonic deadlines, whatever their
+    duration: a probe waiting for its timeout does not delay the next one,
+    up to `max_in_flight` probes per target. A tick that cannot be sent,
+    because that many probes are pending or the loop fell a whole interval
+    behind, is reported as a `MISSED` ping, so every interval of every
+    target holds exactly one result.
+
+    Attributes:
+        logger (DatabaseLogger | None): Logger receiving every result.
+        on_result (Callable[[Ping], None] | None): Callback receiving every
+        result, e.g. a Qt signal `emit`.
+        backend (ProbeBackend): The backend sending the probes, e.g. ICMP
+        sockets or the system `ping` command run as asyncio subprocesses.
+        tcp_backend (TcpBackend): The backend of the "host:port" targets,
+        connecting on the same event loop.
+        sketches (LatencySketches | None): Streaming percentiles fed with
+        every result.
+        max_in_flight (int): Probes of one target allowed in flight.
+        missed_ticks (int): Ticks reported as missed so far.
+        late_ticks (int): Probes sent late so far.
+    Methods:
+        add_target(address: str, interval: float, timeout: float = 3):
+            Adds or replaces a target. Safe to call from any thread.
+        remove_target(address: str):
+            Removes a target. Safe to call from any thread.
+        run_forever():
+            Runs the event loop until `stop` is called.
+        stop():
+            Stops the scheduler. Safe to call from any thread.
+    """
+
+    def __init__(
+        self,
+        logger: DatabaseLogger | None = None,
+        on_result: Callable[[Ping], None] | None = None,
+        engine: IcmpEngine | None = None,
+        sketches: LatencySketches | None = None,
+        backend: ProbeBackend | None = None,
+        max_in_flight: int = MAX_IN_FLIGHT,
+    ) -> None:
+        """
+        Initializes an empty scheduler.
+
+        Args:
+            logger (DatabaseLogger, optional): Logger receiving every result.
+            on_result (Callable[[Ping], None], optional): Callback receiving
+            every result.
+            engine (IcmpEngine, optional): Native ICMP engine to probe with.
+            sketches (LatencySketches, optional): Streaming percentiles fed
+            with every result.
+            backend (ProbeBackend, optional): The probe backend. By default
+            the ICMP backend on `engine`, or the system `ping` command.
+            max_in_flight (int, optional): Probes of one target allowed in
+            flight at once.
+
+        Raises:
+            ValueError: If `max_in_flight` is below 1.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.logger = logger
+        self.on_result = on_result
+        self.backend = backend or default_backend(engine)
+        self.tcp_backend = (
+            self.backend
+            if isinstance(self.backend, TcpBackend)
+            else TcpBackend()
+        )
+        self.sketches = sketches
+        self.max_in_flight = max_in_flight
+        self.missed_ticks = 0
+        self.late_ticks = 0
+        self._targets: dict[str, Target] = {}
+        self._schedule: list[tuple[float, int, str]] = []
+        self._generations = itertools.count(1)
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._stopping = False
+
+    @property
+    def targets(self) -> list[Target]:
+        """
+        The targets currently scheduled.
+
+        Returns:
+            list[Target]: A snapshot of the targets.
+        """
+        with self._lock:
+            return list(self._targets.values())
+
+    def add_target(
+        self, address: str, interval: float, timeout: float = 3
+    ) -> None:
+        """
+        Adds a target, or replaces the settings of an existing one.
+
+        The target is probed immediately and then every `interval` seconds,
+        on deadlines counted from its first probe.
+        Its hostname, if any, starts resolving right away, so adding many
+        targets resolves them in parallel.
+
+        Args:
+            address (str): The IP address or hostname to ping.
+            interval (float): Seconds between two probes.
+            timeout (float, optional): Seconds to wait for a reply.
+        """
+        target = Target(address, interval, timeout, next(self._generations))
+        self._backend_for(address).prefetch([address])
+        with self._lock:
+            self._targets[address] = target
+            heapq.heappush(
+                self._schedule,
+                (time.monotonic(), target.generation, address),
+            )
+        self._notify()
+
+    def remove_target(self, address: str) -> None:
+        """
+        Removes a target. A probe already in flight is allowed to finish.
+
+        Args:
+            address (str): The address given to `add_target`.
+        """
+        with self._lock:
+            self._targets.pop(address, None)
+        self._notify()
+
+    def stop(self) -> None:
+        """
+        Requests the scheduler to stop, cancelling in-flight probes.
+        """
+        self._stopping = True
+        self._notify()
+
+    def _notify(self) -> None:
+        """
+        Wakes the scheduling loop from any thread.
+        """
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass  # The loop closed in the meantime
+
+    def run_forever(self) -> None:
+        """
+        Runs the scheduler on a new event loop in the calling thread until
+        `stop` is called.
+        """
+        asyncio.run(self.run())
+
+    async def run(self) -> None:
+        """
+        The scheduling loop.
+
+        Starts a probe task for every target that is due and schedules its
+        next deadline, records the ticks that cannot be probed, then sleeps
+        until the next due time or until the schedule changes.
+        """
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+        self._loop, self._wakeup = loop, wakeup
+        probes: set[asyncio.Task[None]] = set()
+        try:
+            while not self._stopping:
+                now = time.monotonic()
+                delay = None
+                missed: list[Ping] = []
+                with self._lock:
+                    while self._schedule:
+                        due, generation, address = self._schedule[0]
+                        if due > now:
+                            delay = due - now
+                            break
+                        heapq.heappop(self._schedule)
+                        target = self._targets.get(address)
+                        if target is None or target.generation != generation:
+                            continue
+                        due = self._tick(target, due, now, missed, probes)
+                        heapq.heappush(
+                            self._schedule,
+                            (due + target.interval, generation, address),
+                        )
+                for ping in missed:
+                    self._deliver(ping)
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), delay)
+                except TimeoutError:
+                    pass
+        finally:
+            for probe in probes:
+                probe.cancel()
+            await asyncio.gather(*probes, return_exceptions=True)
+            self.backend.detach()
+            self.tcp_backend.detach()
+            self._loop, self._wakeup = None, None
+
+    def _tick(
+        self,
+        target: Target,
+        due: float,
+        now: float,
+        missed: list[Ping],
+        probes: set[asyncio.Task[None]],
+    ) -> float:
+        """
+        Handles the deadlines of a target that passed: the latest one is
+        probed unless too many probes are in flight, the earlier ones are
+        missed. Called with the lock held.
+
+        Args:
+            target (Target): The target due.
+            due (float): Its earliest pending deadline.
+            now (float): The current monotonic time.
+            missed (list[Ping]): Collects the missed ticks, to be reported
+            once the lock is released.
+            probes (set[asyncio.Task[None]]): The probe tasks in flight.
+
+        Returns:
+            float: The deadline handled, from which the next one follows.
+        """
+        if target.sequence == 0:
+            # The schedule starts with the first probe, however long the
+            # target waited for the loop to start
+            skipped, due = 0, now
+        else:
+            skipped = overdue_ticks(due, now, target.interval)
+            due += skipped * target.interval
+        for _ in range(skipped):
+            target.sequence += 1
+            missed.append(self._missed(target))
+        target.sequence += 1
+        if target.in_flight >= self.max_in_flight:
+            missed.append(self._missed(target))
+            return due
+        if now - due > target.interval * LATE_FRACTION:
+            target.late += 1
+            self.late_ticks += 1
+        target.in_flight += 1
+        probe = asyncio.get_running_loop().create_task(
+            self._probe(target, target.sequence)
+        )
+        probes.add(probe)
+        probe.add_done_callback(probes.discard)
+        return due
+
+    def _missed(self, target: Target) -> Ping:
+        """
+        Records the current tick of a target as missed.
+
+        Args:
+            target (Target): The target.
+
+        Returns:
+            Ping: A `MISSED` result for the tick.
+        """
+        target.missed += 1
+        self.missed_ticks += 1
+        return Ping(MISSED, target.address, seq=target.sequence)
+
+    async def _probe(self, target: Target, sequence: int) -> None:
+        """
+        Probes one target and reports the result.
+
+        Args:
+            target (Target): The target to probe.
+            sequence (int): The tick of the probe.
+        """
+        try:
+            ping = await self.ping_host(target.address, target.timeout)
+        finally:
+            target.in_flight -= 1
+        ping.seq = sequence
+        self._deliver(ping)
+
+    def _deliver(self, ping: Ping) -> None:
+        """
+        Hands a result to the logger, the sketches and the callback.
+
+        Args:
+            ping (Ping): The result.
+        """
+        if self.logger is not None:
+            self.logger.log(ping)
+        if self.sketches is not None:
+            self.sketches.record(ping)
+        if self.on_result is not None:
+            self.on_result(ping)
+
+    def _backend_for(self, address: str) -> ProbeBackend:
+        """
+        The backend probing a target.
+
+        Args:
+            address (str): The target.
+
+        Returns:
+            ProbeBackend: `tcp_backend` for "host:port" targets, `backend`
+            otherwise.
+        """
+        if split_tcp_target(address) is not None:
+            return self.tcp_backend
+        return self.backend
+
+    async def ping_host(self, address: str, timeout: float = 3) -> Ping:
+        """
+        Pings a host with the probe backend without blocking the event loop.
+        "host:port" targets are probed by connecting to the port instead.
+
+        Args:
+            address (str): The IP address or hostname to ping, or a
+            "host:port" TCP target.
+            timeout (float, optional): Seconds to wait for a reply.
+
+        Returns:
+            Ping: "Success" with the round-trip time and TTL if the host
+            replied in time, "Failure" (or, for TCP, "Refused" or
+            "Timeout") otherwise.
+        """
+        try:
+            return await self._backend_for(address).ping_async(
+                address, timeout
+            )
+        except OSError:
+            return Ping("Failure", address)
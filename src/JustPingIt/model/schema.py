@@ -0,0 +1,377 @@
+import sqlite3
+from contextlib import nullcontext
+
+from . import resolutions, rollups, runs
+
+# ----------------- Constants -----------------
+
+SCHEMA_VERSION = 9
+
+_CREATE_PING_LOGS = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        result TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        ip_address TEXT NOT NULL,
+        rtt_us INTEGER,
+        ttl INTEGER,
+        seq INTEGER
+    )
+"""
+# The entries of the monitored target set (addresses, CIDR ranges,
+# hostnames), in the order they were given
+CREATE_TARGETS = """
+    CREATE TABLE IF NOT EXISTS ping_targets (
+        position INTEGER PRIMARY KEY,
+        entry TEXT NOT NULL UNIQUE
+    )
+"""
+_CREATE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_ping_logs_ip_timestamp "
+    "ON ping_logs (ip_address, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_ping_logs_timestamp "
+    "ON ping_logs (timestamp)",
+)
+
+
+# ----------------- Helper Functions -----------------
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    """
+    Reads the schema version stored in the database header.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+
+    Returns:
+        int: The value of ``PRAGMA user_version``.
+    """
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def _set_version(conn: sqlite3.Connection, version: int) -> None:
+    """
+    Stores the schema version in the database header.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+        version (int): The version to store.
+    """
+    conn.execute(f"PRAGMA user_version = {int(version)}")
+
+
+def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    """
+    Checks whether a table exists.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+        table (str): The table name.
+
+    Returns:
+        bool: True if the table exists.
+    """
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (table,),
+    ).fetchone()
+    return row is not None
+
+
+def _create_latest(conn: sqlite3.Connection) -> None:
+    """
+    Creates the current schema in an empty database.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(_CREATE_PING_LOGS.format(table="ping_logs"))
+    for statement in _CREATE_INDEXES:
+        conn.execute(statement)
+    rollups.add_tables(conn)
+    runs.add_tables(conn)
+    resolutions.add_tables(conn)
+    conn.execute(CREATE_TARGETS)
+    _set_version(conn, SCHEMA_VERSION)
+    conn.commit()
+    # The tables are still empty, so the VACUUM is instant
+    _enable_incremental_vacuum(conn)
+
+
+def _enable_incremental_vacuum(conn: sqlite3.Connection) -> None:
+    """
+    Switches the database to ``auto_vacuum = INCREMENTAL``.
+
+    On a database that already holds pages (even just the header written
+    when the journal mode is set) the change only takes effect after a full
+    VACUUM, which rewrites the file and holds the write lock meanwhile.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database, with
+        no transaction in progress.
+    """
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("VACUUM")
+
+
+# ----------------- Migrations -----------------
+
+
+def _migrate_to_v1(conn: sqlite3.Connection, chunk_size: int) -> None:
+    """
+    Version 1: adds the reply detail columns (rtt_us, ttl, seq) to a
+    'ping_logs' table created before they existed. Old rows keep NULL in
+    the new columns.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+        chunk_size (int): Unused, the change only touches the schema.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(ping_logs)")}
+    for column in ("rtt_us", "ttl", "seq"):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE ping_logs ADD COLUMN {column} INTEGER")
+    _set_version(conn, 1)
+    conn.commit()
+
+
+def _migrate_to_v2(conn: sqlite3.Connection, chunk_size: int) -> None:
+    """
+    Version 2: stores timestamps as integer epoch milliseconds (UTC) instead
+    of local-time text, and indexes (ip_address, timestamp) and (timestamp).
+
+    Rows are copied into a new table in chunks of `chunk_size`, each chunk in
+    its own transaction, so the write lock is only held briefly and an
+    interrupted migration resumes where it stopped. The new table replaces
+    the old one in a final transaction.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+        chunk_size (int): Number of rows copied per transaction.
+    """
+    conn.execute(_CREATE_PING_LOGS.format(table="ping_logs_v2"))
+    conn.commit()
+    last_id = conn.execute(
+        "SELECT COALESCE(MAX(id), 0) FROM ping_logs_v2"
+    ).fetchone()[0]
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        # The text timestamps were written in local time: the 'utc' modifier
+        # converts them to UTC before taking the epoch.
+        copied = conn.execute(
+            """
+            INSERT INTO ping_logs_v2
+                (id, result, timestamp, ip_address, rtt_us, ttl, seq)
+            SELECT
+                id,
+                result,
+                COALESCE(
+                    CAST(strftime('%s', timestamp, 'utc') AS INTEGER), 0
+                ) * 1000,
+                ip_address,
+                rtt_us,
+                ttl,
+                seq
+            FROM ping_logs
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+            """,
+            (last_id, chunk_size),
+        ).rowcount
+        conn.commit()
+        if not copied:
+            break
+        row = conn.execute("SELECT MAX(id) FROM ping_logs_v2").fetchone()
+        last_id = row[0]
+
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DROP TABLE ping_logs")
+    conn.execute("ALTER TABLE ping_logs_v2 RENAME TO ping_logs")
+    for statement in _CREATE_INDEXES:
+        conn.execute(statement)
+    _set_version(conn, 2)
+    conn.commit()
+
+
+def _migrate_to_v3(conn: sqlite3.Connection, chunk_size: int) -> None:
+    """
+    Version 3: switches the database to ``auto_vacuum = INCREMENTAL``, so
+    the pages freed by deletions can be returned to the file system a few
+    at a time with ``PRAGMA incremental_vacuum`` instead of a full VACUUM.
+
+    The change requires one full VACUUM of the existing database, which
+    only runs once.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+        chunk_size (int): Unused, VACUUM cannot be split.
+    """
+    _enable_incremental_vacuum(conn)
+    _set_version(conn, 3)
+    conn.commit()
+
+
+def _migrate_to_v4(conn: sqlite3.Connection, chunk_size: int) -> None:
+    """
+    Version 4: adds the 'ping_rollups' table, holding per-target counts and
+    round-trip time sums per minute, hour and day. It is filled by the
+    version 5 migration.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+        chunk_size (int): Unused, the change only touches the schema.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(rollups.CREATE_ROLLUPS)
+    _set_version(conn, 4)
+    conn.commit()
+
+
+def _migrate_to_v5(conn: sqlite3.Connection, chunk_size: int) -> None:
+    """
+    Version 5: adds the jitter sums to 'ping_rollups', the round-trip time
+    histograms ('ping_rtt_bins') and the outages ('ping_outages'), then
+    computes them all from the existing logs.
+
+    The logs are replayed one hour per transaction, see `rollups.rebuild`;
+    an interrupted migration replays them all again.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+        chunk_size (int): Unused, the logs are replayed per hour.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    columns = {
+        row[1] for row in conn.execute("PRAGMA table_info(ping_rollups)")
+    }
+    for column in ("jitter_count", "jitter_sum"):
+        if column not in columns:
+            conn.execute(
+                f"ALTER TABLE ping_rollups ADD COLUMN {column} "
+                "INTEGER NOT NULL DEFAULT 0"
+            )
+    rollups.add_tables(conn)
+    conn.commit()
+    rollups.rebuild(lambda: nullcontext(conn))
+    _set_version(conn, 5)
+    conn.commit()
+
+
+def _migrate_to_v6(conn: sqlite3.Connection, chunk_size: int) -> None:
+    """
+    Version 6: adds the 'ping_runs' table, storing runs of identical
+    results instead of one row per ping, see `runs.RunWriter`.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+        chunk_size (int): Unused, the change only touches the schema.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    runs.add_tables(conn)
+    _set_version(conn, 6)
+    conn.commit()
+
+
+def _migrate_to_v7(conn: sqlite3.Connection, chunk_size: int) -> None:
+    """
+    Version 7: adds the 'ping_resolutions' table, recording the address
+    each hostname target resolved to over time.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+        chunk_size (int): Unused, the change only touches the schema.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    resolutions.add_tables(conn)
+    _set_version(conn, 7)
+    conn.commit()
+
+
+def _migrate_to_v8(conn: sqlite3.Connection, chunk_size: int) -> None:
+    """
+    Version 8: adds the 'ping_targets' table, holding the target set that
+    used to be a single address in the application settings.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+        chunk_size (int): Unused, the change only touches the schema.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(CREATE_TARGETS)
+    _set_version(conn, 8)
+    conn.commit()
+
+
+def _migrate_to_v9(conn: sqlite3.Connection, chunk_size: int) -> None:
+    """
+    Version 9: adds the number of ticks missed by the scheduler to
+    'ping_rollups'. Earlier logs hold no missed tick, so nothing needs to
+    be recomputed.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+        chunk_size (int): Unused, the change only touches the schema.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    columns = {
+        row[1] for row in conn.execute("PRAGMA table_info(ping_rollups)")
+    }
+    if "missed" not in columns:
+        conn.execute(
+            "ALTER TABLE ping_rollups ADD COLUMN missed "
+            "INTEGER NOT NULL DEFAULT 0"
+        )
+    _set_version(conn, 9)
+    conn.commit()
+
+
+_MIGRATIONS = {
+    1: _migrate_to_v1,
+    2: _migrate_to_v2,
+    3: _migrate_to_v3,
+    4: _migrate_to_v4,
+    5: _migrate_to_v5,
+    6: _migrate_to_v6,
+    7: _migrate_to_v7,
+    8: _migrate_to_v8,
+    9: _migrate_to_v9,
+}
+
+
+def migrate(conn: sqlite3.Connection, chunk_size: int = 50000) -> int:
+    """
+    Brings the database schema to `SCHEMA_VERSION`.
+
+    An empty database gets the current schema directly. Databases created
+    by earlier versions are upgraded in place, one version at a time; the
+    version reached is recorded in ``PRAGMA user_version`` after each step.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the database, with
+        no transaction in progress.
+        chunk_size (int, optional): Number of rows copied per transaction by
+        migrations rewriting the table.
+
+    Returns:
+        int: The schema version of the database.
+
+    Raises:
+        sqlite3.Error: If a step fails. Its transaction is rolled back and
+        the steps already completed are kept.
+    """
+    version = get_version(conn)
+    try:
+        if version == 0 and not _table_exists(conn, "ping_logs"):
+            _create_latest(conn)
+            return SCHEMA_VERSION
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            _MIGRATIONS[target](conn, chunk_size)
+    except Exception:
+        conn.rollback()
+        raise
+    return get_version(conn)
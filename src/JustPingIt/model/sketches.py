@@ -0,0 +1,590 @@
+import math
+import os
+import struct
+import threading
+import time
+from array import array
+
+from .ping import Ping
+from .rollups import BIN_GROWTH, bin_value, rtt_bin
+
+# ----------------- Constants -----------------
+
+# Round-trip times above this land in the last bin
+MAX_RTT_US = 60 * 1000 * 1000
+NUM_BINS = rtt_bin(MAX_RTT_US) + 1
+# Sliding windows kept per target: (length in seconds, number of slots).
+# A window slides by one slot at a time, so it covers between
+# `length - length / slots` and `length` seconds of pings.
+WINDOWS = {
+    "1m": (60, 6),
+    "15m": (15 * 60, 15),
+    "1h": (60 * 60, 12),
+}
+
+# Magic, bin growth, count, sum of the round-trip times, non-empty bins
+_SKETCH_HEADER = struct.Struct("<4sdQQH")
+_SKETCH_BIN = struct.Struct("<HI")
+# Magic, slot length in seconds, number of slots
+_WINDOW_HEADER = struct.Struct("<4sdH")
+# Slot number since the epoch, size of its sketch
+_WINDOW_SLOT = struct.Struct("<qI")
+# Magic, number of targets
+_FILE_HEADER = struct.Struct("<4sI")
+_LENGTH = struct.Struct("<I")
+
+
+# ----------------- Helper Classes -----------------
+
+
+class LatencySketch:
+    """
+    A mergeable histogram of round-trip times with a fixed memory footprint.
+
+    The times are counted in the log-scale bins of the rollup histograms,
+    so a percentile read back is within 2% of the exact value whatever the
+    number of samples, and two sketches merge by adding their bins.
+
+    Attributes:
+        counts (array): The count of each bin.
+        count (int): Number of round-trip times recorded.
+        total (int): Sum of the round-trip times, in microseconds.
+    Methods:
+        add(rtt_us: int):
+            Records a round-trip time.
+        merge(other: LatencySketch):
+            Adds the counts of another sketch.
+        quantile(q: float) -> float | None:
+            Returns the round-trip time below which a fraction q of them lie.
+        to_bytes() -> bytes:
+            Serializes the sketch.
+        from_bytes(data: bytes) -> LatencySketch:
+            Deserializes a sketch.
+    """
+
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty sketch.
+        """
+        self.counts = array("I", bytes(4 * NUM_BINS))
+        self.count = 0
+        self.total = 0
+
+    @property
+    def mean(self) -> float | None:
+        """
+        float | None: The mean round-trip time, None if empty.
+        """
+        return self.total / self.count if self.count else None
+
+    def add(self, rtt_us: int) -> None:
+        """
+        Records a round-trip time.
+
+        Args:
+            rtt_us (int): The round-trip time in microseconds.
+        """
+        self.counts[min(rtt_bin(rtt_us), NUM_BINS - 1)] += 1
+        self.count += 1
+        self.total += rtt_us
+
+    def merge(self, other: "LatencySketch") -> None:
+        """
+        Adds the counts of another sketch to this one.
+
+        Args:
+            other (LatencySketch): The sketch to merge.
+        """
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.count += other.count
+        self.total += other.total
+
+    def subtract(self, other: "LatencySketch") -> None:
+        """
+        Removes the counts of a sketch previously merged into this one.
+
+        Args:
+            other (LatencySketch): The sketch to remove.
+        """
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] -= count
+        self.count -= other.count
+        self.total -= other.total
+
+    def clear(self) -> None:
+        """
+        Empties the sketch, keeping its memory.
+        """
+        if self.count:
+            self.counts[:] = array("I", bytes(4 * NUM_BINS))
+            self.count = 0
+            self.total = 0
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Returns the round-trip time below which a fraction of them lie. The
+        time taken does not depend on the number of samples.
+
+        Args:
+            q (float): The fraction, between 0 and 1.
+
+        Returns:
+            float | None: The round-trip time in microseconds, within 2% of
+            the exact value, or None if the sketch is empty.
+        """
+        if not self.count:
+            return None
+        rank = max(math.ceil(q * self.count), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return bin_value(index)
+        return bin_value(NUM_BINS - 1)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the sketch, storing only the non-empty bins.
+
+        Returns:
+            bytes: The serialized sketch.
+        """
+        bins = [
+            _SKETCH_BIN.pack(index, count)
+            for index, count in enumerate(self.counts)
+            if count
+        ]
+        header = _SKETCH_HEADER.pack(
+            b"JPSK", BIN_GROWTH, self.count, self.total, len(bins)
+        )
+        return header + b"".join(bins)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LatencySketch":
+        """
+        Deserializes a sketch written by `to_bytes`.
+
+        Args:
+            data (bytes): The serialized sketch.
+
+        Returns:
+            LatencySketch: The sketch.
+
+        Raises:
+            ValueError: If the data is not a sketch with the same bins.
+        """
+        try:
+            magic, growth, count, total, size = _SKETCH_HEADER.unpack_from(
+                data
+            )
+            if magic != b"JPSK" or growth != BIN_GROWTH:
+                raise ValueError("Not a latency sketch with the same bins")
+            sketch = cls()
+            for index, bin_count in _SKETCH_BIN.iter_unpack(
+                data[_SKETCH_HEADER.size :]
+            ):
+                sketch.counts[index] = bin_count
+        except (struct.error, IndexError) as e:
+            raise ValueError(f"Corrupted latency sketch: {e}") from e
+        if size != len(data[_SKETCH_HEADER.size :]) // _SKETCH_BIN.size:
+            raise ValueError("Corrupted latency sketch: truncated bins")
+        sketch.count = count
+        sketch.total = total
+        return sketch
+
+
+class WindowedSketch:
+    """
+    A latency sketch over a sliding time window.
+
+    The window is split into a ring of slots aligned on the Unix epoch, each
+    a `LatencySketch`, plus a running total from which the oldest slot is
+    subtracted as it expires. Memory is fixed and a percentile is read from
+    the total alone. Slots aligned on the epoch let windows recorded on
+    different machines, or before a restart, be merged slot by slot.
+
+    Attributes:
+        window_s (float): Length of the window in seconds.
+        slot_s (float): Length of a slot in seconds.
+        slots (list[LatencySketch]): The ring of slots.
+        slot_ids (list[int]): Number of each slot since the epoch, -1 when
+        unused.
+        total (LatencySketch): The sum of the live slots.
+    Methods:
+        add(rtt_us: int, now: float):
+            Records a round-trip time.
+        sketch(now: float) -> LatencySketch:
+            Returns the sketch of the window ending now.
+        merge(other: WindowedSketch):
+            Adds the slots of another window of the same layout.
+        to_bytes() -> bytes:
+            Serializes the live slots.
+        from_bytes(data: bytes) -> WindowedSketch:
+            Deserializes a window.
+    """
+
+    def __init__(self, window_s: float, slot_count: int) -> None:
+        """
+        Initializes an empty window.
+
+        Args:
+            window_s (float): Length of the window in seconds.
+            slot_count (int): Number of slots the window slides by.
+        """
+        self.window_s = window_s
+        self.slot_s = window_s / slot_count
+        self.slots = [LatencySketch() for _ in range(slot_count)]
+        self.slot_ids = [-1] * slot_count
+        self.total = LatencySketch()
+
+    def _expire(self, now: float) -> int:
+        """
+        Empties the slots that slid out of the window.
+
+        Args:
+            now (float): The current time in epoch seconds.
+
+        Returns:
+            int: The number of the current slot since the epoch.
+        """
+        current = int(now // self.slot_s)
+        oldest = current - len(self.slots) + 1
+        for position, slot_id in enumerate(self.slot_ids):
+            if slot_id != -1 and not oldest <= slot_id <= current:
+                self.total.subtract(self.slots[position])
+                self.slots[position].clear()
+                self.slot_ids[position] = -1
+        return current
+
+    def add(self, rtt_us: int, now: float) -> None:
+        """
+        Records a round-trip time.
+
+        Args:
+            rtt_us (int): The round-trip time in microseconds.
+            now (float): The time of the ping in epoch seconds.
+        """
+        current = self._expire(now)
+        position = current % len(self.slots)
+        self.slot_ids[position] = current
+        self.slots[position].add(rtt_us)
+        self.total.add(rtt_us)
+
+    def sketch(self, now: float) -> LatencySketch:
+        """
+        Returns the sketch of the pings within the window ending now.
+
+        Args:
+            now (float): The current time in epoch seconds.
+
+        Returns:
+            LatencySketch: The running total. It is not copied: read it
+            before recording more pings.
+        """
+        self._expire(now)
+        return self.total
+
+    def merge(self, other: "WindowedSketch") -> None:
+        """
+        Adds the slots of another window. A slot older than ours at the same
+        position is ignored; a newer one replaces ours.
+
+        Args:
+            other (WindowedSketch): A window with the same layout.
+
+        Raises:
+            ValueError: If the windows have different slots.
+        """
+        if (other.slot_s, len(other.slots)) != (
+            self.slot_s,
+            len(self.slots),
+        ):
+            raise ValueError("Cannot merge windows with different slots")
+        for position, slot_id in enumerate(other.slot_ids):
+            if slot_id == -1 or slot_id < self.slot_ids[position]:
+                continue
+            if slot_id > self.slot_ids[position]:
+                self.total.subtract(self.slots[position])
+                self.slots[position].clear()
+                self.slot_ids[position] = slot_id
+            self.slots[position].merge(other.slots[position])
+            self.total.merge(other.slots[position])
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the window with its slot numbers.
+
+        Returns:
+            bytes: The serialized window.
+        """
+        parts = [_WINDOW_HEADER.pack(b"JPSW", self.slot_s, len(self.slots))]
+        for slot_id, slot in zip(self.slot_ids, self.slots, strict=True):
+            data = slot.to_bytes() if slot_id != -1 else b""
+            parts.append(_WINDOW_SLOT.pack(slot_id, len(data)))
+            parts.append(data)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "WindowedSketch":
+        """
+        Deserializes a window written by `to_bytes`.
+
+        Args:
+            data (bytes): The serialized window.
+
+        Returns:
+            WindowedSketch: The window.
+
+        Raises:
+            ValueError: If the data is not a serialized window.
+        """
+        try:
+            magic, slot_s, slot_count = _WINDOW_HEADER.unpack_from(data)
+            if magic != b"JPSW" or not slot_count:
+                raise ValueError("Not a windowed latency sketch")
+            window = cls(slot_s * slot_count, slot_count)
+            offset = _WINDOW_HEADER.size
+            for position in range(slot_count):
+                slot_id, size = _WINDOW_SLOT.unpack_from(data, offset)
+                offset += _WINDOW_SLOT.size
+                if slot_id != -1:
+                    slot = LatencySketch.from_bytes(
+                        data[offset : offset + size]
+                    )
+                    window.slots[position] = slot
+                    window.slot_ids[position] = slot_id
+                    window.total.merge(slot)
+                offset += size
+        except struct.error as e:
+            raise ValueError(f"Corrupted windowed sketch: {e}") from e
+        return window
+
+
+# ----------------- Core Classes -----------------
+
+
+class LatencySketches:
+    """
+    Streaming round-trip time percentiles of every target over the sliding
+    `WINDOWS`, fed with each ping as it is probed.
+
+    Memory is fixed per target, whatever the rate of the pings, and reading
+    a percentile never touches the database. The sketches can be saved to a
+    file to survive restarts, and merged with those of other probe machines.
+    The methods are thread-safe.
+
+    Methods:
+        record(ping: Ping):
+            Adds the round-trip time of a ping to its target's windows.
+        targets() -> list[str]:
+            Returns the targets with recorded pings.
+        percentiles(ip_address: str, window: str, quantiles, now)
+        -> list[float | None]:
+            Reads percentiles of a target over a window.
+        merge(other: LatencySketches):
+            Adds the sketches of another instance.
+        to_bytes() -> bytes / from_bytes(data: bytes):
+            Serializes and deserializes every sketch.
+        save(path: str) / load(path: str):
+            Writes and reads the sketches to and from a file.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the sketches without any target.
+        """
+        self._windows: dict[str, dict[str, WindowedSketch]] = {}
+        self._lock = threading.Lock()
+
+    def _target(self, ip_address: str) -> dict[str, WindowedSketch]:
+        """
+        Returns the windows of a target, creating them if needed. Called
+        with the lock held.
+
+        Args:
+            ip_address (str): The target.
+
+        Returns:
+            dict[str, WindowedSketch]: The windows by name.
+        """
+        windows = self._windows.get(ip_address)
+        if windows is None:
+            windows = {
+                name: WindowedSketch(window_s, slot_count)
+                for name, (window_s, slot_count) in WINDOWS.items()
+            }
+            self._windows[ip_address] = windows
+        return windows
+
+    def record(self, ping: Ping) -> None:
+        """
+        Adds the round-trip time of a ping to every window of its target.
+        Pings without a round-trip time are ignored.
+
+        Args:
+            ping (Ping): The result of a probe.
+        """
+        if ping.rtt_us is None:
+            return
+        now = ping.epoch_ms / 1000
+        with self._lock:
+            for window in self._target(ping.ip_address).values():
+                window.add(ping.rtt_us, now)
+
+    def targets(self) -> list[str]:
+        """
+        Returns the targets with recorded pings.
+
+        Returns:
+            list[str]: The targets, sorted.
+        """
+        with self._lock:
+            return sorted(self._windows)
+
+    def percentiles(
+        self,
+        ip_address: str,
+        window: str = "1m",
+        quantiles: tuple[float, ...] = (0.50, 0.95, 0.99),
+        now: float | None = None,
+    ) -> list[float | None]:
+        """
+        Reads percentiles of the round-trip times of a target.
+
+        Args:
+            ip_address (str): The target.
+            window (str, optional): One of the `WINDOWS`.
+            quantiles (tuple[float, ...], optional): The fractions to read.
+            now (float, optional): The end of the window in epoch seconds.
+            Defaults to the system clock.
+
+        Returns:
+            list[float | None]: One round-trip time in microseconds per
+            fraction, None when no reply was received within the window.
+
+        Raises:
+            KeyError: If the window is unknown.
+        """
+        if window not in WINDOWS:
+            raise KeyError(f"Unknown window {window!r}")
+        if now is None:
+            now = time.time()
+        with self._lock:
+            windows = self._windows.get(ip_address)
+            if windows is None:
+                return [None] * len(quantiles)
+            sketch = windows[window].sketch(now)
+            return [sketch.quantile(q) for q in quantiles]
+
+    def merge(self, other: "LatencySketches") -> None:
+        """
+        Adds the sketches of another instance, e.g. loaded from another
+        probe machine.
+
+        Args:
+            other (LatencySketches): The sketches to merge.
+        """
+        with other._lock:
+            incoming = {
+                address: dict(windows)
+                for address, windows in other._windows.items()
+            }
+        with self._lock:
+            for address, windows in incoming.items():
+                target = self._target(address)
+                for name, window in windows.items():
+                    target[name].merge(window)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the windows of every target.
+
+        Returns:
+            bytes: The serialized sketches.
+        """
+        with self._lock:
+            parts = [_FILE_HEADER.pack(b"JPLS", len(self._windows))]
+            for address, windows in self._windows.items():
+                name = address.encode()
+                parts.append(_LENGTH.pack(len(name)) + name)
+                for window_name in WINDOWS:
+                    data = windows[window_name].to_bytes()
+                    parts.append(_LENGTH.pack(len(data)) + data)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LatencySketches":
+        """
+        Deserializes sketches written by `to_bytes`.
+
+        Args:
+            data (bytes): The serialized sketches.
+
+        Returns:
+            LatencySketches: The sketches.
+
+        Raises:
+            ValueError: If the data is corrupted or uses other windows.
+        """
+        sketches = cls()
+        try:
+            magic, count = _FILE_HEADER.unpack_from(data)
+            if magic != b"JPLS":
+                raise ValueError("Not a latency sketches file")
+            offset = _FILE_HEADER.size
+            for _ in range(count):
+                (size,) = _LENGTH.unpack_from(data, offset)
+                offset += _LENGTH.size
+                address = data[offset : offset + size].decode()
+                offset += size
+                target = sketches._target(address)
+                for name in WINDOWS:
+                    (size,) = _LENGTH.unpack_from(data, offset)
+                    offset += _LENGTH.size
+                    target[name].merge(
+                        WindowedSketch.from_bytes(data[offset : offset + size])
+                    )
+                    offset += size
+        except (struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"Corrupted latency sketches: {e}") from e
+        return sketches
+
+    def save(self, path: str) -> None:
+        """
+        Writes the sketches to a file, atomically replacing it.
+
+        Args:
+            path (str): The file.
+
+        Raises:
+            OSError: If the file cannot be written.
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(self.to_bytes())
+        os.replace(temp_path, path)
+
+    def load(self, path: str) -> None:
+        """
+        Merges the sketches saved in a file. A missing file is ignored.
+
+        Args:
+            path (str): The file.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If the file is corrupted.
+        """
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return
+        self.merge(self.from_bytes(data))
@@ -0,0 +1,301 @@
+import math
+import sqlite3
+from dataclasses import dataclass
+from itertools import accumulate
+
+from .rollups import DAY_MS, HOUR_MS, MINUTE_MS, bin_value
+
+# ----------------- Constants -----------------
+
+PERCENTILES = (0.50, 0.95, 0.99)
+
+_SUMS_SQL = """
+    SELECT
+        ip_address,
+        SUM(count),
+        SUM(successes),
+        SUM(failures),
+        SUM(rtt_count),
+        MIN(rtt_min),
+        MAX(rtt_max),
+        TOTAL(rtt_sum),
+        TOTAL(rtt_sum_sq),
+        SUM(jitter_count),
+        TOTAL(jitter_sum),
+        SUM(missed)
+    FROM ping_rollups
+    WHERE ({tiles}){target}
+    GROUP BY ip_address
+"""
+_BINS_SQL = """
+    SELECT ip_address, bin, SUM(count)
+    FROM ping_rtt_bins
+    WHERE ({tiles}){target}
+    GROUP BY ip_address, bin
+    ORDER BY ip_address, bin
+"""
+# SQLite returns the other columns from the row holding the MAX()
+_OUTAGES_SQL = """
+    SELECT ip_address, MAX(duration), start_ms
+    FROM (
+        SELECT
+            ip_address,
+            start_ms,
+            MIN(COALESCE(recovered_ms, end_ms), ?) - MAX(start_ms, ?)
+                AS duration
+        FROM ping_outages
+        WHERE start_ms < ? AND COALESCE(recovered_ms, end_ms) >= ?{target}
+    )
+    GROUP BY ip_address
+"""
+_TILE_SQL = "(resolution = ? AND bucket >= ? AND bucket < ?)"
+
+# (resolution, first bucket, end) of a range of buckets
+Tile = tuple[int, int, int]
+
+
+# ----------------- Helper Classes -----------------
+
+
+@dataclass(frozen=True)
+class TargetStats:
+    """
+    The statistics of a target over a time window.
+
+    Attributes:
+        ip_address (str): The target.
+        probes (int): Number of pings sent.
+        successes (int): Number of replies.
+        failures (int): Number of pings lost.
+        availability (float): Percentage of pings answered.
+        loss (float): Percentage of pings lost.
+        missed (int): Number of scheduled pings never sent. They count
+        neither as answered nor as lost.
+        sampling (float): Percentage of the scheduled pings actually sent.
+        rtt_min_us (int | None): Shortest round-trip time.
+        rtt_max_us (int | None): Longest round-trip time.
+        rtt_mean_us (float | None): Mean round-trip time.
+        rtt_stddev_us (float | None): Standard deviation of the round-trip
+        times.
+        rtt_p50_us (float | None): Median round-trip time.
+        rtt_p95_us (float | None): 95th percentile of the round-trip times.
+        rtt_p99_us (float | None): 99th percentile of the round-trip times.
+        jitter_us (float | None): Mean absolute difference between two
+        consecutive round-trip times.
+        longest_outage_ms (int): Duration of the longest run of failures
+        within the window, from its first failure to the next reply (or
+        the last failure while it lasts), 0 if none.
+        longest_outage_start_ms (int | None): Start of that run, in epoch
+        milliseconds.
+    """
+
+    ip_address: str
+    probes: int
+    successes: int
+    failures: int
+    availability: float
+    loss: float
+    missed: int = 0
+    sampling: float = 100.0
+    rtt_min_us: int | None = None
+    rtt_max_us: int | None = None
+    rtt_mean_us: float | None = None
+    rtt_stddev_us: float | None = None
+    rtt_p50_us: float | None = None
+    rtt_p95_us: float | None = None
+    rtt_p99_us: float | None = None
+    jitter_us: float | None = None
+    longest_outage_ms: int = 0
+    longest_outage_start_ms: int | None = None
+
+
+# ----------------- Helper Functions -----------------
+
+
+def tiles(start_ms: int, end_ms: int, sizes: tuple[int, ...]) -> list[Tile]:
+    """
+    Covers a window with as few buckets as possible: whole buckets of the
+    largest size, then of the next sizes towards the edges. The window is
+    first widened to whole buckets of the smallest size.
+
+    Args:
+        start_ms (int): Start of the window, in epoch milliseconds.
+        end_ms (int): End of the window (excluded).
+        sizes (tuple[int, ...]): The bucket sizes, largest first; each a
+        multiple of the next.
+
+    Returns:
+        list[Tile]: The ranges of buckets of each size.
+    """
+    smallest = sizes[-1]
+    start_ms -= start_ms % smallest
+    end_ms = -(-end_ms // smallest) * smallest
+    result: list[Tile] = []
+
+    def cover(low: int, high: int, index: int) -> None:
+        if low >= high:
+            return
+        size = sizes[index]
+        if index == len(sizes) - 1:
+            result.append((size, low, high))
+            return
+        first = -(-low // size) * size
+        last = high - high % size
+        if first >= last:
+            cover(low, high, index + 1)
+            return
+        result.append((size, first, last))
+        cover(low, first, index + 1)
+        cover(last, high, index + 1)
+
+    cover(start_ms, end_ms, 0)
+    return result
+
+
+def _where(
+    window: list[Tile], ip_address: str | None
+) -> tuple[str, str, list[str | int]]:
+    """
+    Builds the conditions selecting the buckets of a window.
+
+    Args:
+        window (list[Tile]): The buckets.
+        ip_address (str | None): Only this target, if given.
+
+    Returns:
+        tuple[str, str, list[str | int]]: The bucket conditions, the target
+        condition and their parameters.
+    """
+    params: list[str | int] = [value for tile in window for value in tile]
+    target = ""
+    if ip_address is not None:
+        target = " AND ip_address = ?"
+        params.append(ip_address)
+    return " OR ".join([_TILE_SQL] * len(window)), target, params
+
+
+def _percentiles(
+    bins: list[tuple[int, int]], low: int | None, high: int | None
+) -> list[float | None]:
+    """
+    Reads the `PERCENTILES` from a histogram.
+
+    Args:
+        bins (list[tuple[int, int]]): The bins and their counts, in order.
+        low (int | None): The smallest value recorded, to clamp to.
+        high (int | None): The largest value recorded, to clamp to.
+
+    Returns:
+        list[float | None]: One value per percentile, None without data.
+    """
+    total = sum(count for _, count in bins)
+    if not total:
+        return [None] * len(PERCENTILES)
+    running = list(accumulate(count for _, count in bins))
+    values: list[float | None] = []
+    for q in PERCENTILES:
+        rank = q * total
+        # The first bin reaching the rank; the last one holds the total
+        chosen = next(
+            (
+                rtt_bin
+                for (rtt_bin, _), seen in zip(bins, running, strict=True)
+                if seen >= rank
+            ),
+            bins[-1][0],
+        )
+        value = bin_value(chosen)
+        if low is not None and high is not None:
+            value = min(max(value, low), high)
+        values.append(value)
+    return values
+
+
+def compute(
+    conn: sqlite3.Connection,
+    start_ms: int,
+    end_ms: int,
+    ip_address: str | None = None,
+) -> list[TargetStats]:
+    """
+    Computes the statistics of every target over a window from the
+    aggregate tables maintained by `rollups.RollupWriter`, without reading
+    the raw logs.
+
+    The counts, extremes, mean, deviation and jitter are summed over the
+    day, hour and minute rollups covering the window widened to whole
+    minutes. The percentiles are read from the hour and day histograms, so
+    the partial hours at the edges of the window are counted whole, and
+    are within 2% of the exact values. Outages are clipped to the window.
+
+    Args:
+        conn (sqlite3.Connection): A connection to the database.
+        start_ms (int): Start of the window, in epoch milliseconds.
+        end_ms (int): End of the window (excluded).
+        ip_address (str, optional): Only this exact target.
+
+    Returns:
+        list[TargetStats]: The statistics of each target pinged during the
+        window, ordered by address.
+    """
+    if end_ms <= start_ms:
+        return []
+    window = tiles(start_ms, end_ms, (DAY_MS, HOUR_MS, MINUTE_MS))
+    clause, target, params = _where(window, ip_address)
+    sums = conn.execute(
+        _SUMS_SQL.format(tiles=clause, target=target), params
+    ).fetchall()
+
+    bins: dict[str, list[tuple[int, int]]] = {}
+    window = tiles(start_ms, end_ms, (DAY_MS, HOUR_MS))
+    clause, target, params = _where(window, ip_address)
+    for address, rtt_bin, count in conn.execute(
+        _BINS_SQL.format(tiles=clause, target=target), params
+    ):
+        bins.setdefault(address, []).append((rtt_bin, count))
+
+    params = [end_ms, start_ms, end_ms, start_ms]
+    if ip_address is not None:
+        params.append(ip_address)
+    outages = {
+        address: (duration, outage_start)
+        for address, duration, outage_start in conn.execute(
+            _OUTAGES_SQL.format(target=target), params
+        )
+    }
+
+    stats = []
+    for row in sums:
+        address, probes, successes, failures, rtt_count, low, high = row[:7]
+        rtt_sum, rtt_sum_sq, jitter_count, jitter_sum, missed = row[7:]
+        mean = stddev = jitter = None
+        if rtt_count:
+            mean = rtt_sum / rtt_count
+            stddev = math.sqrt(max(rtt_sum_sq / rtt_count - mean * mean, 0))
+        if jitter_count:
+            jitter = jitter_sum / jitter_count
+        p50, p95, p99 = _percentiles(bins.get(address, []), low, high)
+        duration, outage_start = outages.get(address, (0, None))
+        stats.append(
+            TargetStats(
+                ip_address=address,
+                probes=probes,
+                successes=successes,
+                failures=failures,
+                availability=100 * successes / probes if probes else 0.0,
+                loss=100 * failures / probes if probes else 0.0,
+                missed=missed,
+                sampling=100 * probes / (probes + missed),
+                rtt_min_us=low,
+                rtt_max_us=high,
+                rtt_mean_us=mean,
+                rtt_stddev_us=stddev,
+                rtt_p50_us=p50,
+                rtt_p95_us=p95,
+                rtt_p99_us=p99,
+                jitter_us=jitter,
+                longest_outage_ms=duration,
+                longest_outage_start_ms=outage_start,
+            )
+        )
+    return sorted(stats, key=lambda s: s.ip_address)
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from .backends import ProbeBackend, TcpBackend, split_tcp_target
+from .ping import Ping
+
+# ----------------- Constants -----------------
+
+# Results showing that a host is up: a reset still comes from a live host
+LIVE_RESULTS = ("Success", "Refused")
+
+# ----------------- Helper Classes -----------------
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    """
+    The outcome of a sweep.
+
+    Attributes:
+        live (tuple[Ping, ...]): The results of the hosts that answered, in
+        the order the targets were given.
+        probed (int): Number of targets probed.
+        elapsed (float): Seconds the sweep took.
+    """
+
+    live: tuple[Ping, ...]
+    probed: int
+    elapsed: float
+
+
+# ----------------- Sweep Functions -----------------
+
+
+async def sweep_async(
+    addresses: Iterable[str],
+    backend: ProbeBackend,
+    timeout: float = 1,
+    concurrency: int = 512,
+    on_result: Callable[[Ping], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> SweepResult:
+    """
+    Probes every target once, concurrently, on the running event loop.
+
+    A fixed pool of `concurrency` workers pulls the targets from the
+    iterable, so a whole subnet costs that many tasks at most and the
+    addresses are generated as they are probed. "host:port" targets are
+    probed over TCP.
+
+    Args:
+        addresses (Iterable[str]): The targets, e.g. a `TargetSet`.
+        backend (ProbeBackend): The backend probing the hosts.
+        timeout (float, optional): Seconds to wait for each reply.
+        concurrency (int, optional): Maximum probes in flight.
+        on_result (Callable[[Ping], None], optional): Called with every
+        result as it arrives, e.g. to report progress.
+        cancel (threading.Event, optional): Set from another thread to stop
+        the sweep; the probes in flight still complete.
+
+    Returns:
+        SweepResult: The live hosts, among the targets probed before the
+        sweep was cancelled.
+    """
+    started = time.perf_counter()
+    targets = enumerate(addresses)
+    tcp_backend = backend if isinstance(backend, TcpBackend) else None
+    live: list[tuple[int, Ping]] = []
+    probed = 0
+
+    async def worker() -> None:
+        nonlocal probed, tcp_backend
+        # The iterator is shared: each target goes to exactly one worker
+        for index, address in targets:
+            if cancel is not None and cancel.is_set():
+                return
+            probe_backend = backend
+            if split_tcp_target(address) is not None:
+                if tcp_backend is None:
+                    tcp_backend = TcpBackend()
+                probe_backend = tcp_backend
+            try:
+                ping = await probe_backend.ping_async(address, timeout)
+            except OSError:
+                ping = Ping("Failure", address)
+            probed += 1
+            if ping.result in LIVE_RESULTS:
+                live.append((index, ping))
+            if on_result is not None:
+                on_result(ping)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+    finally:
+        if tcp_backend is not None and tcp_backend is not backend:
+            tcp_backend.detach()
+    live.sort(key=lambda item: item[0])
+    return SweepResult(
+        tuple(ping for _, ping in live),
+        probed,
+        time.perf_counter() - started,
+    )
+
+
+def sweep(
+    addresses: Iterable[str],
+    backend: ProbeBackend,
+    timeout: float = 1,
+    concurrency: int = 512,
+    on_result: Callable[[Ping], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> SweepResult:
+    """
+    Probes every target once, concurrently, on a new event loop in the
+    calling thread. See `sweep_async`.
+
+    Args:
+        addresses (Iterable[str]): The targets, e.g. a `TargetSet`.
+        backend (ProbeBackend): The backend probing the hosts.
+        timeout (float, optional): Seconds to wait for each reply.
+        concurrency (int, optional): Maximum probes in flight.
+        on_result (Callable[[Ping], None], optional): Called with every
+        result as it arrives.
+        cancel (threading.Event, optional): Set to stop the sweep.
+
+    Returns:
+        SweepResult: The live hosts.
+    """
+
+    async def run() -> SweepResult:
+        try:
+            return await sweep_async(
+                addresses, backend, timeout, concurrency, on_result, cancel
+            )
+        finally:
+            backend.detach()
+
+    return asyncio.run(run())
@@ -0,0 +1,94 @@
+import re
+import subprocess
+import sys
+from typing import Any
+
+# ----------------- Constants -----------------
+
+# "time=0.123 ms" on Linux/macOS, "time=14ms" or "time<1ms" on Windows
+_RTT_PATTERN = re.compile(r"time[=<]\s*(\d+(?:\.\d+)?)\s*ms")
+# "ttl=64" on Linux/macOS, "TTL=117" on Windows
+_TTL_PATTERN = re.compile(r"ttl=(\d+)", re.IGNORECASE)
+
+# ----------------- Helper Functions -----------------
+
+
+def ping_command(ip_address: str) -> list[str]:
+    """
+    Builds the system `ping` command sending a single echo request.
+
+    Args:
+        ip_address (str): The IP address or hostname to ping.
+
+    Returns:
+        list[str]: The command line for the current platform.
+    """
+    if sys.platform.startswith("win"):
+        return ["ping", "-n", "1", ip_address]
+    return ["ping", "-c", "1", ip_address]
+
+
+def subprocess_options() -> dict[str, Any]:
+    """
+    Returns the extra `subprocess` keyword arguments for the system `ping`.
+
+    On Windows the console window of the child process is hidden; on other
+    platforms no option is needed.
+
+    Returns:
+        dict[str, Any]: Keyword arguments for `subprocess` calls.
+    """
+    if sys.platform.startswith("win"):
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        return {
+            "startupinfo": startupinfo,
+            "creationflags": subprocess.CREATE_NO_WINDOW,
+        }
+    return {}
+
+
+def parse_ping_output(output: str) -> str:
+    """
+    Interprets the output of the system `ping` command.
+
+    Args:
+        output (str): The decoded standard output of the command.
+
+    Returns:
+        str: "Success" if a reply was received, "Failure" otherwise.
+    """
+    if (
+        "unreachable" in output
+        or "100% packet loss" in output
+        or "timed out" in output
+    ):
+        return "Failure"
+    elif "Reply from" in output or "bytes from" in output:
+        return "Success"
+    else:
+        return "Failure"
+
+
+def parse_ping_reply(output: str) -> tuple[int | None, int | None]:
+    """
+    Extracts the round-trip time and TTL from the system `ping` output.
+
+    Windows reports sub-millisecond replies as "time<1ms", which is recorded
+    as 1000 microseconds.
+
+    Args:
+        output (str): The decoded standard output of a successful command.
+
+    Returns:
+        tuple[int | None, int | None]: The round-trip time in microseconds
+        and the TTL, each None if not found in the output.
+    """
+    rtt_us = ttl = None
+    match = _RTT_PATTERN.search(output)
+    if match is not None:
+        rtt_us = round(float(match[1]) * 1000)
+    match = _TTL_PATTERN.search(output)
+    if match is not None:
+        ttl = int(match[1])
+    return rtt_us, ttl
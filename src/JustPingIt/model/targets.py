@@ -0,0 +1,295 @@
+import ipaddress
+import re
+import socket
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from .backends import split_tcp_target
+
+# ----------------- Constants -----------------
+
+# Most addresses a target set may expand to, e.g. a /16; larger ranges are
+# almost always a typo such as /8 instead of /24
+MAX_TARGETS = 65536
+
+# Entries are separated by commas, semicolons or white space; "#" starts a
+# comment running to the end of the line
+_SEPARATORS = re.compile(r"[\s,;]+")
+_HOSTNAME = re.compile(
+    r"(?=.{1,253}\.?$)"
+    r"[A-Za-z0-9_](?:[A-Za-z0-9_-]{0,61}[A-Za-z0-9_])?"
+    r"(?:\.[A-Za-z0-9_](?:[A-Za-z0-9_-]{0,61}[A-Za-z0-9_])?)*\.?"
+)
+
+# (IP version, first address, last address) of a range of addresses
+AddressRange = tuple[int, int, int]
+
+# ----------------- Helper Functions -----------------
+
+
+def split_entries(text: str) -> list[str]:
+    """
+    Splits a pasted list or the content of a target file into entries.
+
+    Args:
+        text (str): Entries separated by commas, semicolons, spaces or new
+        lines. "#" starts a comment.
+
+    Returns:
+        list[str]: The entries, in order.
+    """
+    entries: list[str] = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0]
+        entries.extend(entry for entry in _SEPARATORS.split(line) if entry)
+    return entries
+
+
+def parse_entry(entry: str) -> tuple[str, AddressRange | None]:
+    """
+    Parses one entry of a target list: an IP address, a CIDR range, a
+    hostname or a "host:port" TCP target.
+
+    The range of a CIDR entry holds its usable hosts, as given by
+    `ipaddress`: an IPv4 range excludes its network and broadcast
+    addresses, except for /31 and /32.
+
+    Args:
+        entry (str): The entry.
+
+    Returns:
+        tuple[str, AddressRange | None]: The normalized entry, and the
+        range of addresses it covers, None for hostnames and TCP targets.
+
+    Raises:
+        ValueError: If the entry is none of these.
+    """
+    if "/" in entry:
+        try:
+            network = ipaddress.ip_network(entry, strict=False)
+        except ValueError:
+            raise ValueError(f"Invalid CIDR range {entry!r}") from None
+        first = int(network.network_address)
+        last = int(network.broadcast_address)
+        if network.version == 4 and network.prefixlen < 31:
+            first, last = first + 1, last - 1
+        elif network.version == 6 and network.prefixlen < 127:
+            first += 1  # The Subnet-Router anycast address
+        return str(network), (network.version, first, last)
+    try:
+        address = ipaddress.ip_address(entry)
+    except ValueError:
+        pass
+    else:
+        return str(address), (address.version, int(address), int(address))
+    endpoint = split_tcp_target(entry)
+    host = endpoint[0] if endpoint is not None else entry
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        if not _HOSTNAME.fullmatch(host):
+            raise ValueError(f"Invalid target {entry!r}") from None
+    return entry.lower(), None
+
+
+def merge_ranges(ranges: Iterable[AddressRange]) -> list[AddressRange]:
+    """
+    Merges overlapping and adjacent address ranges.
+
+    Args:
+        ranges (Iterable[AddressRange]): The ranges, in any order.
+
+    Returns:
+        list[AddressRange]: Disjoint ranges, sorted by version then
+        address.
+    """
+    merged: list[AddressRange] = []
+    for version, first, last in sorted(ranges):
+        if merged:
+            same_version, start, end = merged[-1]
+            if same_version == version and first <= end + 1:
+                merged[-1] = (version, start, max(last, end))
+                continue
+        merged.append((version, first, last))
+    return merged
+
+
+def _format_address(version: int, value: int) -> str:
+    """
+    Formats an address of a range.
+
+    Args:
+        version (int): The IP version.
+        value (int): The address as an integer.
+
+    Returns:
+        str: The address literal.
+    """
+    if version == 4:
+        return socket.inet_ntoa(value.to_bytes(4, "big"))
+    return str(ipaddress.IPv6Address(value))
+
+
+# ----------------- Core Classes -----------------
+
+
+@dataclass(frozen=True)
+class TargetSet:
+    """
+    A deduplicated set of targets, built from hosts and CIDR ranges.
+
+    Ranges are kept as (first, last) pairs and merged, so deduplicating and
+    counting cost one sort of the entries whatever the size of the ranges;
+    addresses are only generated when iterated.
+
+    Attributes:
+        entries (tuple[str, ...]): The normalized entries, without
+        duplicates, in the order given. This is what is saved.
+        hosts (tuple[str, ...]): The hostnames and TCP targets.
+        ranges (tuple[AddressRange, ...]): The disjoint address ranges.
+    Methods:
+        parse(text: str, max_targets: int = MAX_TARGETS) -> TargetSet:
+            Builds a set from a pasted list.
+        from_entries(entries: Iterable[str], max_targets: int = MAX_TARGETS)
+        -> TargetSet:
+            Builds a set from entries.
+        read(path: str, max_targets: int = MAX_TARGETS) -> TargetSet:
+            Builds a set from a target file.
+        addresses() -> Iterator[str]:
+            Generates every target.
+        text() -> str:
+            Formats the entries for an input field.
+    """
+
+    entries: tuple[str, ...] = ()
+    hosts: tuple[str, ...] = ()
+    ranges: tuple[AddressRange, ...] = ()
+
+    @classmethod
+    def from_entries(
+        cls, entries: Iterable[str], max_targets: int = MAX_TARGETS
+    ) -> "TargetSet":
+        """
+        Builds a target set from entries.
+
+        Args:
+            entries (Iterable[str]): IP addresses, CIDR ranges, hostnames and
+            "host:port" TCP targets.
+            max_targets (int, optional): Most targets the entries may
+            expand to.
+
+        Returns:
+            TargetSet: The deduplicated targets.
+
+        Raises:
+            ValueError: If an entry is invalid, or the entries expand to
+            more than `max_targets` targets.
+        """
+        normalized: dict[str, None] = {}
+        hosts: dict[str, None] = {}
+        ranges = []
+        for entry in entries:
+            name, address_range = parse_entry(entry)
+            normalized[name] = None
+            if address_range is None:
+                hosts[name] = None
+            else:
+                ranges.append(address_range)
+        target_set = cls(
+            tuple(normalized), tuple(hosts), tuple(merge_ranges(ranges))
+        )
+        if len(target_set) > max_targets:
+            raise ValueError(
+                f"{len(target_set)} targets, more than the {max_targets} "
+                "allowed"
+            )
+        return target_set
+
+    @classmethod
+    def parse(cls, text: str, max_targets: int = MAX_TARGETS) -> "TargetSet":
+        """
+        Builds a target set from a pasted list, see `split_entries`.
+
+        Args:
+            text (str): The list.
+            max_targets (int, optional): Most targets it may expand to.
+
+        Returns:
+            TargetSet: The deduplicated targets.
+
+        Raises:
+            ValueError: If an entry is invalid or there are too many
+            targets.
+        """
+        return cls.from_entries(split_entries(text), max_targets)
+
+    @classmethod
+    def read(cls, path: str, max_targets: int = MAX_TARGETS) -> "TargetSet":
+        """
+        Builds a target set from a file listing entries, e.g. one per line.
+
+        Args:
+            path (str): The file.
+            max_targets (int, optional): Most targets it may expand to.
+
+        Returns:
+            TargetSet: The deduplicated targets.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If an entry is invalid or there are too many
+            targets.
+        """
+        with open(path, encoding="utf-8") as file:
+            return cls.parse(file.read(), max_targets)
+
+    def __len__(self) -> int:
+        """
+        The number of targets.
+
+        Returns:
+            int: The addresses of the ranges plus the hosts.
+        """
+        return len(self.hosts) + sum(
+            last - first + 1 for _, first, last in self.ranges
+        )
+
+    def __bool__(self) -> bool:
+        """
+        Whether the set holds any target.
+
+        Returns:
+            bool: True if it is not empty.
+        """
+        return bool(self.hosts or self.ranges)
+
+    def addresses(self) -> Iterator[str]:
+        """
+        Generates every target once: the addresses of the ranges in numeric
+        order, then the hosts.
+
+        Yields:
+            str: An IP address, hostname or "host:port" TCP target.
+        """
+        for version, first, last in self.ranges:
+            for value in range(first, last + 1):
+                yield _format_address(version, value)
+        yield from self.hosts
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterates over the targets, see `addresses`.
+
+        Returns:
+            Iterator[str]: The targets.
+        """
+        return self.addresses()
+
+    def text(self) -> str:
+        """
+        Formats the entries for an input field.
+
+        Returns:
+            str: The entries separated by commas.
+        """
+        return ", ".join(self.entries)
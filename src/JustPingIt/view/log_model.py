@@ -0,0 +1,336 @@
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any
+
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    QObject,
+    QPersistentModelIndex,
+    Qt,
+)
+
+from JustPingIt.model.database_logger import (
+    DatabaseLogger,
+    LogFilter,
+    LogRow,
+    PageToken,
+)
+from JustPingIt.model.ping import Ping
+
+LOG_COLUMNS = ["Result", "Timestamp", "IP Address", "RTT (ms)", "TTL"]
+
+ModelIndex = QModelIndex | QPersistentModelIndex
+
+
+# ----------------- Helper Functions -----------------
+
+
+def format_rtt(rtt_us: int | None) -> str:
+    """
+    Formats a round-trip time for display.
+
+    Args:
+        rtt_us (int | None): The round-trip time in microseconds.
+
+    Returns:
+        str: The time in milliseconds, or an empty string if unknown.
+    """
+    return "" if rtt_us is None else f"{rtt_us / 1000:.3f}"
+
+
+def display_values(row: LogRow) -> list[str]:
+    """
+    Formats a log row for the table, without its id and probe sequence.
+
+    Args:
+        row (LogRow): A row returned by the `DatabaseLogger` queries.
+
+    Returns:
+        list[str]: One string per column of `LOG_COLUMNS`.
+    """
+    _, result, timestamp, ip_address, rtt_us, ttl, _ = row
+    return [
+        result,
+        timestamp,
+        ip_address,
+        format_rtt(rtt_us),
+        "" if ttl is None else str(ttl),
+    ]
+
+
+# ----------------- Core Classes -----------------
+
+
+class LogTableModel(QAbstractTableModel):
+    """
+    A read-only table model showing the filtered logs, newest first, without
+    ever loading them all.
+
+    The rows are read in pages of `page_size` by keyset pagination. Only the
+    start token of each page discovered so far is kept, plus an LRU cache of
+    at most `cache_pages` pages: scrolling back to an evicted page re-reads
+    it from its token. Memory therefore stays bounded by the cache, plus one
+    small token per page, however many rows the filter matches.
+
+    The model grows through `canFetchMore`/`fetchMore`, which the view calls
+    when the user scrolls near the last loaded row. Rows written after the
+    filter was set are excluded (see `LogFilter.max_id`), so pages never
+    shift under the view; new pings are instead inserted at the top with
+    `prepend_pings`, up to `max_live_rows` of them.
+
+    Attributes:
+        logger (DatabaseLogger): The logger queried for the rows.
+        page_size (int): Number of rows per query.
+        cache_pages (int): Number of pages kept in memory.
+        prefetch_pages (int): Number of pages read ahead of a page requested
+        by the view.
+        max_live_rows (int): Number of pings `prepend_pings` keeps in memory
+        before asking for a reload.
+        log_filter (LogFilter): The filters of the rows shown.
+    Methods:
+        set_filter(log_filter: LogFilter):
+            Shows the logs matching new filters.
+        prepend_pings(pings: list[Ping]) -> bool:
+            Inserts the new pings matching the filters at the top.
+        row_at(row: int) -> LogRow | None:
+            Returns the log shown at a row.
+    """
+
+    def __init__(
+        self,
+        logger: DatabaseLogger,
+        page_size: int = 500,
+        cache_pages: int = 16,
+        prefetch_pages: int = 1,
+        max_live_rows: int = 10000,
+        parent: QObject | None = None,
+    ) -> None:
+        """
+        Initializes an empty model. Call `set_filter` to show logs.
+
+        Args:
+            logger (DatabaseLogger): The logger queried for the rows.
+            page_size (int, optional): Number of rows per query.
+            cache_pages (int, optional): Number of pages kept in memory.
+            prefetch_pages (int, optional): Number of pages read ahead.
+            max_live_rows (int, optional): Number of pings inserted by
+            `prepend_pings` kept in memory.
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+        self.logger = logger
+        self.page_size = page_size
+        self.cache_pages = max(cache_pages, prefetch_pages + 1)
+        self.prefetch_pages = prefetch_pages
+        self.max_live_rows = max_live_rows
+        self.log_filter = LogFilter(max_id=0)
+        self._page_starts: list[PageToken | None] = []
+        self._pages: OrderedDict[int, list[LogRow]] = OrderedDict()
+        self._row_count = 0
+        self._exhausted = True
+        # Pings received since the filter was set, oldest first
+        self._live: list[LogRow] = []
+
+    def set_filter(self, log_filter: LogFilter) -> None:
+        """
+        Shows the logs matching new filters, reading only the first page.
+
+        Args:
+            log_filter (LogFilter): The filters. Its `max_id` is replaced by
+            the last id of the table.
+        """
+        self.beginResetModel()
+        self.log_filter = replace(log_filter, max_id=self.logger.last_id())
+        self._page_starts = [None]
+        self._pages.clear()
+        self._live.clear()
+        self._exhausted = False
+        self._row_count = len(self._fetch(0))
+        self.endResetModel()
+
+    def _fetch(self, page: int) -> list[LogRow]:
+        """
+        Reads a page and stores it in the cache, evicting the least recently
+        used pages beyond `cache_pages`.
+
+        Args:
+            page (int): The page number, whose start token must be known.
+
+        Returns:
+            list[LogRow]: The rows of the page.
+        """
+        rows: list[LogRow]
+        rows, token = self.logger.fetch_page(
+            self.log_filter, self._page_starts[page], self.page_size
+        )
+        if page == len(self._page_starts) - 1 and not self._exhausted:
+            if token is None:
+                self._exhausted = True
+            else:
+                self._page_starts.append(token)
+        self._pages[page] = rows
+        self._pages.move_to_end(page)
+        while len(self._pages) > self.cache_pages:
+            self._pages.popitem(last=False)
+        return rows
+
+    def _page(self, page: int) -> list[LogRow]:
+        """
+        Returns a page from the cache, reading it and the following
+        `prefetch_pages` pages on a miss.
+
+        Args:
+            page (int): The page number.
+
+        Returns:
+            list[LogRow]: The rows of the page.
+        """
+        rows = self._pages.get(page)
+        if rows is not None:
+            self._pages.move_to_end(page)
+            return rows
+        rows = self._fetch(page)
+        last = self._row_count // self.page_size
+        for ahead in range(page + 1, page + 1 + self.prefetch_pages):
+            if ahead >= last or ahead in self._pages:
+                break
+            self._fetch(ahead)
+        self._pages.move_to_end(page)
+        return rows
+
+    def prepend_pings(self, pings: list[Ping]) -> bool:
+        """
+        Inserts the pings matching the filters at the top of the table, in
+        a single row insertion.
+
+        The pings are shown as they were received, with id 0, without
+        reading the database.
+
+        Args:
+            pings (list[Ping]): The new pings, oldest first.
+
+        Returns:
+            bool: False if the pings were not inserted because the model
+            already holds `max_live_rows` of them: the caller should set the
+            filter again to read them from the database.
+        """
+        rows: list[LogRow] = [
+            (
+                0,
+                ping.result,
+                ping.timestamp,
+                ping.ip_address,
+                ping.rtt_us,
+                ping.ttl,
+                ping.seq,
+            )
+            for ping in pings
+            if self.log_filter.matches(ping)
+        ]
+        if not rows:
+            return True
+        if len(self._live) + len(rows) > self.max_live_rows:
+            return False
+        self.beginInsertRows(QModelIndex(), 0, len(rows) - 1)
+        self._live.extend(rows)
+        self.endInsertRows()
+        return True
+
+    def row_at(self, row: int) -> LogRow | None:
+        """
+        Returns the log shown at a row.
+
+        Args:
+            row (int): The row number.
+
+        Returns:
+            LogRow | None: The log, or None if the row does not exist, e.g.
+            because it was deleted since the page was counted.
+        """
+        if 0 <= row < len(self._live):
+            return self._live[-1 - row]
+        row -= len(self._live)
+        if not 0 <= row < self._row_count:
+            return None
+        rows = self._page(row // self.page_size)
+        offset = row % self.page_size
+        return rows[offset] if offset < len(rows) else None
+
+    # ----------------- QAbstractTableModel -----------------
+
+    def rowCount(  # noqa: N802
+        self, parent: ModelIndex = QModelIndex()
+    ) -> int:
+        """
+        Returns the number of rows loaded so far.
+        """
+        return 0 if parent.isValid() else len(self._live) + self._row_count
+
+    def columnCount(  # noqa: N802
+        self, parent: ModelIndex = QModelIndex()
+    ) -> int:
+        """
+        Returns the number of columns.
+        """
+        return 0 if parent.isValid() else len(LOG_COLUMNS)
+
+    def canFetchMore(  # noqa: N802
+        self, parent: ModelIndex = QModelIndex()
+    ) -> bool:
+        """
+        Tells the view whether more rows can be loaded.
+        """
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(  # noqa: N802
+        self, parent: ModelIndex = QModelIndex()
+    ) -> None:
+        """
+        Loads the next page of rows.
+        """
+        if parent.isValid() or self._exhausted:
+            return
+        page = self._row_count // self.page_size
+        if page >= len(self._page_starts):
+            self._exhausted = True
+            return
+        rows = self._fetch(page)
+        if not rows:
+            return
+        first = len(self._live) + self._row_count
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._row_count += len(rows)
+        self.endInsertRows()
+
+    def data(self, index: ModelIndex, role: int = 0) -> Any:
+        """
+        Returns the text of a cell, centered.
+        """
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        row = self.row_at(index.row())
+        if row is None:
+            return None
+        return display_values(row)[index.column()]
+
+    def headerData(  # noqa: N802
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = 0,
+    ) -> Any:
+        """
+        Returns the column titles of `LOG_COLUMNS`.
+        """
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+            and 0 <= section < len(LOG_COLUMNS)
+        ):
+            return LOG_COLUMNS[section]
+        return None
@@ -1,9 +1,8 @@
-import csv
 import os
 from datetime import datetime
+from functools import cache
 
-import markdown  # type: ignore
-from PySide6.QtCore import QDate, QSettings, Qt
+from PySide6.QtCore import QDate, QSettings, Qt, QTimer, Slot
 from PySide6.QtGui import QAction, QCloseEvent, QIcon
 from PySide6.QtWidgets import (
     QComboBox,
@@ -17,55 +16,58 @@ from PySide6.QtWidgets import (
     QMainWindow,
     QMenu,
     QMessageBox,
+    QPlainTextEdit,
+    QProgressDialog,
     QPushButton,
     QSizePolicy,
     QSpacerItem,
     QSpinBox,
     QSystemTrayIcon,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QTextBrowser,
     QVBoxLayout,
     QWidget,
 )
 
-from JustPingIt.model.database_logger import DatabaseLogger
+from JustPingIt.model.backends import ProbeBackend, open_backend
+from JustPingIt.model.database_logger import (
+    STORAGE_MODES,
+    DatabaseLogger,
+    LogFilter,
+)
 from JustPingIt.model.path import AppPaths
-from JustPingIt.model.ping import Ping
-from JustPingIt.model.pinger import Pinger
-
-
-class AboutDialog(QDialog):
-    """
-    A dialog window that displays information about the JustPingIt application.
-    This dialog provides details such as the application's name, author,
-    version, license, GitHub repository, website, and contact information.
-    It also includes a button to close the dialog.
-    Attributes:
-        parent (QWidget, optional): The parent widget of the dialog. Defaults
-        to None.
-    Methods:
-        __init__(parent=None):
-            Initializes the AboutDialog with the specified parent widget.
-    """
-
-    def __init__(self, parent: QWidget | None = None) -> None:
-        """
-        Initializes the About dialog for the JustPingIt application.
-        This dialog displays information about the application, including
-        the author, version, license, GitHub repository, website, and contact
-        details.
-        It also provides an "OK" button to close the dialog.
-        Args:
-            parent (QWidget, optional): The parent widget of the dialog.
-            Defaults to None.
-        """
-        super().__init__(parent)
-        self.setWindowTitle("About JustPingIt")
-        self.setMinimumSize(500, 600)
+from JustPingIt.model.ping import RESULTS, Ping
+from JustPingIt.model.pinger import MultiPinger
+from JustPingIt.model.retention import RetentionPolicy, RetentionPruner
+from JustPingIt.model.sketches import LatencySketches
+from JustPingIt.model.sweep import SweepResult
+from JustPingIt.model.targets import TargetSet
+
+from .log_model import LOG_COLUMNS, LogTableModel, format_rtt
+from .workers import (
+    DatabaseOpener,
+    DeleteWorker,
+    ExportWorker,
+    LogTaskWorker,
+    SweepWorker,
+)
 
-        # Testo markdown (potresti anche leggere da un file README.md)
-        md_text = """
+# Minimum delay between two live updates of the log table
+LIVE_INTERVAL_MS = 250
+# Live hosts listed in the sweep report; the count covers the rest
+SWEEP_REPORT_HOSTS = 50
+# File dialog filters of the export formats, with their extension
+EXPORT_FILTERS = {
+    "CSV Files (*.csv)": ".csv",
+    "Text Files (*.txt)": ".txt",
+    "Gzip CSV Files (*.csv.gz)": ".csv.gz",
+    "Zstd CSV Files (*.csv.zst)": ".csv.zst",
+    "JSON Lines Files (*.jsonl)": ".jsonl",
+    "Gzip JSON Lines Files (*.jsonl.gz)": ".jsonl.gz",
+    "Columnar Files (*.jplc)": ".jplc",
+}
+# Content of the About dialog, rendered from Markdown on first use
+ABOUT_MARKDOWN = """
 
 <img src="./data/img/logo_transparent.png" width="150" />
 
@@ -127,9 +129,52 @@ sqlite3 module.
 ---
 """
 
-        html = markdown.markdown(md_text)
+
+@cache
+def about_html() -> str:
+    """
+    Renders the About dialog once. `markdown` is only imported here, so it
+    stays out of the application startup.
+
+    Returns:
+        str: The HTML of `ABOUT_MARKDOWN`.
+    """
+    import markdown  # type: ignore
+
+    return str(markdown.markdown(ABOUT_MARKDOWN))
+
+
+class AboutDialog(QDialog):
+    """
+    A dialog window that displays information about the JustPingIt application.
+    This dialog provides details such as the application's name, author,
+    version, license, GitHub repository, website, and contact information.
+    It also includes a button to close the dialog.
+    Attributes:
+        parent (QWidget, optional): The parent widget of the dialog. Defaults
+        to None.
+    Methods:
+        __init__(parent=None):
+            Initializes the AboutDialog with the specified parent widget.
+    """
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        """
+        Initializes the About dialog for the JustPingIt application.
+        This dialog displays information about the application, including
+        the author, version, license, GitHub repository, website, and contact
+        details.
+        It also provides an "OK" button to close the dialog.
+        Args:
+            parent (QWidget, optional): The parent widget of the dialog.
+            Defaults to None.
+        """
+        super().__init__(parent)
+        self.setWindowTitle("About JustPingIt")
+        self.setMinimumSize(500, 600)
+
         text_browser = QTextBrowser()
-        text_browser.setHtml(html)
+        text_browser.setHtml(about_html())
         text_browser.setOpenExternalLinks(True)
 
         ok_btn = QPushButton("OK")
@@ -145,6 +190,11 @@ class LogViewer(QWidget):
     LogViewer is a QWidget-based class that provides a graphical interface for
     viewing, filtering,
     exporting, and deleting logs stored in a database.
+
+    Live pings are inserted at the top of the table at most once every
+    `LIVE_INTERVAL_MS`; the database is only queried again when the filters
+    are applied.
+
     Attributes:
         logger (DatabaseLogger): An instance of the logger used to fetch and
         manage log entries.
@@ -157,13 +207,17 @@ class LogViewer(QWidget):
         filter_to (QDateEdit): Date picker for specifying the end date of the
         filter range.
         filter_button (QPushButton): Button to apply the selected filters.
-        log_table (QTableWidget): Table widget for displaying the filtered
-        logs.
+        log_model (LogTableModel): Model paging the filtered logs from the
+        database.
+        log_table (QTableView): Table view displaying the model.
         export_button (QPushButton): Button to export the displayed logs to a
         file.
         delete_button (QPushButton): Button to delete the displayed logs from
         the database.
-        current_logs (list): A list of logs currently displayed in the table.
+        live_timer (QTimer): Single-shot timer coalescing the pings received
+        by `append_ping` into one table update every `LIVE_INTERVAL_MS`.
+        worker (LogTaskWorker | None): The export or deletion in progress,
+        if any.
     Methods:
         __init__(logger: DatabaseLogger, icon_path: str = None):
             Initializes the LogViewer widget with the specified logger and
@@ -171,14 +225,20 @@ class LogViewer(QWidget):
         init_ui():
             Sets up the user interface, including filters, log table, and
             action buttons.
+        current_filter() -> LogFilter:
+            Builds the filters from the filter inputs.
         load_logs():
-            Loads logs from the database based on the current filter settings
-            and displays them in the table.
+            Shows the logs matching the current filter settings in the table.
+        append_ping(ping: Ping):
+            Adds a new ping at the top of the table, if it matches the filters.
         export_logs():
-            Exports the currently displayed logs to a CSV or text file.
+            Exports the logs matching the filters to a CSV or text file in
+            the background.
+        stop_background_tasks():
+            Cancels the export or deletion in progress and waits for it.
         delete_logs():
-            Deletes the currently displayed logs from the database after user
-            confirmation.
+            Deletes the logs matching the filters from the database in the
+            background after user confirmation.
     """
 
     def __init__(
@@ -201,6 +261,14 @@ class LogViewer(QWidget):
         if icon_path and os.path.exists(icon_path):
             self.setWindowIcon(QIcon(icon_path))
 
+        self.worker: LogTaskWorker | None = None
+        self._progress_dialog: QProgressDialog | None = None
+        self._pending_pings: list[Ping] = []
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(LIVE_INTERVAL_MS)
+        self.live_timer.timeout.connect(self._apply_pending_pings)
+
         self.main_layout = QVBoxLayout(self)
         self.init_ui()
 
@@ -214,12 +282,14 @@ class LogViewer(QWidget):
         - Filter Section:
             - A QLineEdit for filtering logs by IP address.
             - A QComboBox for filtering logs by result
-            ("All", "Success", "Failure").
+            ("All" or one of the probe results).
             - Two QDateEdit widgets for specifying a date range (from and to).
             - A QPushButton to apply the filters.
         - Log Table:
-            - A QTableWidget to display log entries with three columns:
-            "Result", "Timestamp", and "IP Address".
+            - A QTableView showing a `LogTableModel`, with the columns
+            "Result", "Timestamp", "IP Address", "RTT (ms)" and "TTL".
+            - The model only reads the rows around the visible ones, and
+            the rows have a fixed height so the view never measures them.
             - The table is non-editable and allows row selection.
             - The header sections are set to stretch for better visibility.
         - Bottom Buttons:
@@ -240,7 +310,7 @@ class LogViewer(QWidget):
 
         self.filter_result = QComboBox()
         self.filter_result.addItem("All")
-        self.filter_result.addItems(["Success", "Failure"])
+        self.filter_result.addItems(list(RESULTS))
 
         self.filter_from = QDateEdit()
         self.filter_from.setCalendarPopup(True)
@@ -258,20 +328,20 @@ class LogViewer(QWidget):
         filter_layout.addWidget(self.filter_to)
         filter_layout.addWidget(self.filter_button)
 
-        self.log_table = QTableWidget()
-        self.log_table.setColumnCount(3)
-        self.log_table.setHorizontalHeaderLabels(
-            ["Result", "Timestamp", "IP Address"]
-        )
-        self.log_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.log_model = LogTableModel(self.logger, parent=self)
+        self.log_table = QTableView()
+        self.log_table.setModel(self.log_model)
+        self.log_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.log_table.setSelectionBehavior(
-            QTableWidget.SelectionBehavior.SelectRows
+            QTableView.SelectionBehavior.SelectRows
         )
         header = self.log_table.horizontalHeader()
         header.setStretchLastSection(True)
-        for i in range(3):
+        for i in range(len(LOG_COLUMNS)):
             header.setSectionResizeMode(i, QHeaderView.ResizeMode.Stretch)
-        self.log_table.verticalHeader().setVisible(False)
+        vertical_header = self.log_table.verticalHeader()
+        vertical_header.setVisible(False)
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
 
         self.main_layout.addLayout(filter_layout)
         self.main_layout.addWidget(self.log_table)
@@ -295,27 +365,18 @@ class LogViewer(QWidget):
         self.export_button.clicked.connect(self.export_logs)
         self.delete_button.clicked.connect(self.delete_logs)
 
-    def load_logs(self) -> None:
+    def current_filter(self) -> LogFilter:
         """
-        Loads logs from the logger based on the specified filters and populates
-        the log table.
+        Builds the filters from the filter inputs.
         Filters:
             - IP address: Retrieved from the `filter_ip` text input.
             - Result: Retrieved from the `filter_result` dropdown. If "All" is
             selected, no filter is applied.
             - Date range: Retrieved from the `filter_from` and `filter_to` date
             inputs.
-        The method fetches logs from the logger using the specified filters and
-        updates the `log_table` widget
-        with the retrieved data. Each log entry is displayed in a row,
-        excluding the ID column.
-        Steps:
-            1. Retrieve filter values from the UI components.
-            2. Fetch logs from the logger using the filters.
-            3. Populate the `log_table` with the fetched logs.
-        Note:
-            - The ID column (row[0]) is skipped when populating the table to
-             avoid displaying it.
+        The runs are expanded to pings when the logger stores them as runs.
+        Returns:
+            LogFilter: The filters.
         """
         ip = self.filter_ip.text().strip()
         result = self.filter_result.currentText()
@@ -327,67 +388,104 @@ class LogViewer(QWidget):
             qdate_from.year(), qdate_from.month(), qdate_from.day()
         )
         to_date = datetime(qdate_to.year(), qdate_to.month(), qdate_to.day())
-        self.current_logs = self.logger.fetch_logs(
+        return LogFilter(
             ip_filter=ip,
             result_filter=result,
             from_date=from_date,
             to_date=to_date,
+            expand_runs=self.logger.storage == "runs",
         )
 
-        self.log_table.setRowCount(len(self.current_logs))
-        for row_idx, row in enumerate(self.current_logs):
-            for col_idx, value in enumerate(
-                row[1:]
-            ):  # Skip ID (row[0]) to avoid index in rapresentation
-                item = QTableWidgetItem(str(value))
-                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.log_table.setItem(row_idx, col_idx, item)
+    def load_logs(self) -> None:
+        """
+        Shows the logs matching the filter inputs in the log table.
+
+        The model only reads the first page of the logs; the following pages
+        are read as the user scrolls. The logger is not flushed, which would
+        block the GUI thread: the pings it still queues show up on the next
+        reload.
+        """
+        self._pending_pings.clear()
+        self.live_timer.stop()
+        self.log_model.set_filter(self.current_filter())
+
+    def append_ping(self, ping: Ping) -> None:
+        """
+        Queues a new ping for the table. The queued pings are inserted
+        together when `live_timer` fires, so a burst of results costs a
+        single repaint.
+
+        Args:
+            ping (Ping): The ping, as emitted by the pinger.
+        """
+        self._pending_pings.append(ping)
+        if not self.live_timer.isActive():
+            self.live_timer.start()
+
+    def _apply_pending_pings(self) -> None:
+        """
+        Inserts the queued pings matching the filters at the top of the
+        table, or reloads the table when it holds too many live rows.
+        """
+        pings, self._pending_pings = self._pending_pings, []
+        if not self.log_model.prepend_pings(pings):
+            self.load_logs()
 
     def export_logs(self) -> None:
         """
-        Exports the current logs to a file selected by the user.
+        Exports the logs matching the filters to a file selected by the user.
 
-        This method allows the user to save the current logs to a file in
-        either CSV or plain text format. The user is prompted to select the
-        file location and name through a file dialog. If the user cancels the
-        dialog or no logs are available, the method exits without performing
-        any action.
+        This method allows the user to save the logs to a file in CSV, plain
+        text, JSON Lines (both optionally gzip or zstd compressed) or columnar
+        format. The user is prompted to select the file location, name and
+        format through a file dialog. If the user cancels the dialog, no
+        logs are shown or an export is already running, the method exits
+        without performing any action.
 
-        The exported file contains a header row with the following columns:
+        The exported CSV file contains a header row with the following
+        columns:
         - "Result"
         - "Timestamp"
         - "IP Address"
+        - "RTT (us)"
+        - "TTL"
+        - "Sequence"
 
         Each subsequent row corresponds to a log entry, excluding the ID field.
-
-        Raises:
-            Exception: If an error occurs while writing to the file, a critical
-            message box is displayed with the error details.
+        The logs are streamed from the database by an `ExportWorker` thread,
+        while a progress dialog lets the user cancel the export.
         """
-        if not self.current_logs:
+        if not self.log_model.rowCount() or self.worker is not None:
             return
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Export Logs", "", "CSV Files (*.csv);;Text Files (*.txt)"
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Logs", "", ";;".join(EXPORT_FILTERS)
         )
         if not file_path:
             return
+        from JustPingIt.model.exporter import detect_format
+
         try:
-            with open(file_path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["Result", "Timestamp", "IP Address"])
-                for row in self.current_logs:
-                    writer.writerow(row[1:])  # Skip ID
-        except Exception as e:
-            QMessageBox.critical(self, "Export Error", str(e))
+            detect_format(file_path)
+        except ValueError:
+            file_path += EXPORT_FILTERS.get(selected_filter, ".csv")
+
+        self._start_worker(
+            ExportWorker(
+                self.logger, file_path, self.log_model.log_filter, parent=self
+            ),
+            "Export Logs",
+            "Exporting logs...",
+        )
 
     def delete_logs(self) -> None:
         """
-        Deletes the current log entries after user confirmation.
+        Deletes the logs matching the filters after user confirmation.
 
-        If there are no current logs, the method returns immediately.
-        Otherwise, it prompts the user with a confirmation dialog to delete
-        the specified number of log entries. If the user confirms, the logs
-        are deleted by their IDs, and the log list is reloaded.
+        If no logs are shown or a background task is running, the method
+        returns immediately. Otherwise, it prompts the user with a
+        confirmation dialog. If the user confirms, a `DeleteWorker` deletes
+        the logs by filter, in chunks, while a progress dialog lets the user
+        stop it; the log list is reloaded once it is done.
 
         Raises:
             None
@@ -395,18 +493,86 @@ class LogViewer(QWidget):
         Returns:
             None
         """
-        if not self.current_logs:
+        if not self.log_model.rowCount() or self.worker is not None:
             return
         reply = QMessageBox.question(
             self,
             "Confirm Deletion",
-            f"Confirm deletion of {len(self.current_logs)} log entries?",
+            "Confirm deletion of the log entries matching the filters?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
         )
         if reply == QMessageBox.StandardButton.Yes:
-            ids_to_delete = [row[0] for row in self.current_logs]
-            self.logger.delete_logs_by_ids(ids_to_delete)
-            self.load_logs()
+            worker = DeleteWorker(
+                self.logger, self.log_model.log_filter, parent=self
+            )
+            worker.completed.connect(self.load_logs)
+            self._start_worker(worker, "Delete Logs", "Deleting logs...")
+
+    def _start_worker(
+        self, worker: LogTaskWorker, title: str, label: str
+    ) -> None:
+        """
+        Starts a background task behind a cancellable progress dialog.
+
+        Args:
+            worker (LogTaskWorker): The task.
+            title (str): The title of the progress dialog.
+            label (str): The text of the progress dialog.
+        """
+        dialog = QProgressDialog(label, "Cancel", 0, 0, self)
+        dialog.setWindowTitle(title)
+        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.setMinimumDuration(500)
+        dialog.canceled.connect(worker.cancel)
+        worker.progress.connect(self._update_progress)
+        worker.failed.connect(self._show_worker_error)
+        worker.finished.connect(self._finish_worker)
+        self.worker, self._progress_dialog = worker, dialog
+        worker.start()
+
+    @Slot(int, int)
+    def _update_progress(self, done: int, total: int) -> None:
+        """
+        Shows the progress reported by the background task.
+
+        Args:
+            done (int): Number of rows processed so far.
+            total (int): Number of rows to process.
+        """
+        if self._progress_dialog is not None:
+            self._progress_dialog.setMaximum(max(total, done))
+            self._progress_dialog.setValue(done)
+
+    @Slot(str)
+    def _show_worker_error(self, error: str) -> None:
+        """
+        Shows the error that stopped the background task.
+
+        Args:
+            error (str): The error message.
+        """
+        QMessageBox.critical(self, "Error", error)
+
+    @Slot()
+    def _finish_worker(self) -> None:
+        """
+        Closes the progress dialog and releases the finished worker.
+        """
+        if self._progress_dialog is not None:
+            self._progress_dialog.reset()
+            self._progress_dialog.deleteLater()
+        if self.worker is not None:
+            self.worker.deleteLater()
+        self.worker, self._progress_dialog = None, None
+
+    def stop_background_tasks(self) -> None:
+        """
+        Cancels a running export or deletion and waits for its thread to
+        finish, so the logger can be closed.
+        """
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
 
 
 class MainUI(QMainWindow):
@@ -417,12 +583,29 @@ class MainUI(QMainWindow):
     Attributes:
         paths (AppPaths): An instance of AppPaths to manage application paths.
         settings (QSettings): Stores and retrieves application settings.
-        logger (DatabaseLogger): Handles logging of ping results to a database.
-        pinger (Pinger): The thread responsible for performing ping operations.
+        logger (DatabaseLogger | None): Handles logging of ping results to a
+        database, None until `db_opener` has opened it.
+        db_opener (DatabaseOpener | None): Opens the database in the
+        background after the window is first shown.
+        backend (ProbeBackend): The probe backend shared by the pingers.
+        pinger (MultiPinger): The thread responsible for performing ping
+        operations for every monitored host.
+        pruner (RetentionPruner | None): Deletes the expired logs in the
+        background when a retention is configured.
+        sweeper (SweepWorker | None): The sweep in progress, if any.
+        target_count (int): Number of targets being pinged.
+        sketches (LatencySketches): Streaming round-trip time percentiles of
+        every target, saved across restarts.
         tray_icon (QSystemTrayIcon): The system tray icon for the application.
-        log_viewer (LogViewer): A dialog for viewing the ping logs.
-        ip_input (QLineEdit): Input field for the IP address to ping.
+        log_viewer (LogViewer): A dialog for viewing the ping logs, created
+        the first time it is shown.
+        about_dialog (AboutDialog | None): The About dialog, created the
+        first time it is shown.
+        ip_input (QPlainTextEdit): Input field for the targets to ping:
+        addresses, CIDR ranges and hostnames, saved in the database.
         freq_input (QSpinBox): Input field for the ping frequency in seconds.
+        load_button (QPushButton): Button to add the targets of a file.
+        sweep_button (QPushButton): Button to probe every target once.
         start_button (QPushButton): Button to start the pinging process.
         stop_button (QPushButton): Button to stop the pinging process.
         view_logs_button (QPushButton): Button to open the log viewer.
@@ -434,17 +617,37 @@ class MainUI(QMainWindow):
             application paths.
         init_ui():
             Sets up the user interface components and layout.
+        open_backend() -> ProbeBackend:
+            Opens the probe backend of the application settings.
+        open_database():
+            Opens the database on a worker thread.
+        database_opened(logger: DatabaseLogger):
+            Enables logging once the database is open.
+        load_targets():
+            Shows the target set saved in the database.
+        target_set() -> TargetSet:
+            Parses the targets of the input field.
+        load_target_file():
+            Adds the targets listed in a file.
+        start_sweep():
+            Probes every target once and reports the live hosts.
+        sweep_finished(result: SweepResult):
+            Reports the live hosts found by a sweep.
         show_about_dialog():
             Displays the About dialog with application information.
         load_settings():
-            Loads the saved IP address and ping frequency from application
-            settings.
+            Loads the saved ping frequency from application settings.
+        retention_policy() -> RetentionPolicy:
+            Reads the retention policy from the application settings.
+        start_pruner():
+            Starts the retention pruner if a retention is configured.
+        load_sketches():
+            Restores the latency sketches saved by the last session.
         save_settings():
-            Saves the current IP address and ping frequency to application
-            settings.
+            Saves the ping frequency to application settings and the
+            targets to the database.
         start_pinging():
-            Starts the pinging process with the specified IP address and
-            frequency.
+            Starts pinging every target at the specified frequency.
         stop_pinging():
             Stops the ongoing pinging process.
         display_result(ping: Ping):
@@ -473,29 +676,69 @@ class MainUI(QMainWindow):
         Attributes:
             paths (AppPaths): Stores the application paths.
             settings (QSettings): Manages application settings.
-            logger (DatabaseLogger): Handles logging to a database.
+            logger (DatabaseLogger | None): Handles logging to a database,
+            in buffered mode so probes never wait for a disk commit, and in
+            the storage mode of the "storage/mode" setting ("rows" or
+            "runs"). It is opened in the background once the event loop
+            runs, so the window paints before the database is created or
+            migrated; pinging and the logs are enabled then.
+            backend (ProbeBackend): The probe backend of the
+            "probe/backend" setting, by default the fastest one the host
+            supports.
             pinger (None): Placeholder for the pinger functionality
             (to be initialized later).
+            pruner (RetentionPruner | None): The retention pruner, started
+            when the settings configure a retention.
+            sweeper (SweepWorker | None): The sweep in progress, if any.
+            sketches (LatencySketches): The streaming latency percentiles,
+            restored from the last session.
             tray_icon (QSystemTrayIcon): The system tray icon for the
             application.
-            log_viewer (LogViewer): A viewer for displaying logs.
+            log_viewer (LogViewer): A viewer for displaying logs, created on
+            first use.
         """
         super().__init__()
         self.paths = app_paths
         self.settings = QSettings("JustPingIt", "PingApp")
-        self.logger = DatabaseLogger(self.paths.get_db_path())
-        self.pinger: Pinger | None = None
+        self.logger: DatabaseLogger | None = None
+        self.db_opener: DatabaseOpener | None = None
+        self.backend = self.open_backend()
+        self.pinger: MultiPinger | None = None
+        self.pruner: RetentionPruner | None = None
+        self.sweeper: SweepWorker | None = None
+        self.target_count = 0
+        self.sketches = LatencySketches()
         self.tray_icon = tray_icon
-        self.log_viewer = LogViewer(
-            self.logger, icon_path=self.paths.get_icon_path()
-        )
+        self._log_viewer: LogViewer | None = None
+        self.about_dialog: AboutDialog | None = None
 
         self.setWindowIcon(QIcon(self.paths.get_icon_path()))
         self.setWindowTitle("JustPingIt")
-        self.setFixedSize(300, 230)
+        self.setFixedSize(300, 330)
 
         self.init_ui()
         self.load_settings()
+        self.load_sketches()
+        QTimer.singleShot(0, self.open_database)
+
+    @property
+    def log_viewer(self) -> LogViewer:
+        """
+        The log viewer, created the first time it is needed.
+
+        Returns:
+            LogViewer: The log viewer.
+
+        Raises:
+            RuntimeError: If the database is not open yet.
+        """
+        if self._log_viewer is None:
+            if self.logger is None:
+                raise RuntimeError("The database is not open yet")
+            self._log_viewer = LogViewer(
+                self.logger, icon_path=self.paths.get_icon_path()
+            )
+        return self._log_viewer
 
     def init_ui(self) -> None:
         """
@@ -508,17 +751,22 @@ class MainUI(QMainWindow):
         - Menu Bar:
             - Help menu with an "About" action.
         - Central Widget:
-            - Input fields for IP Address and Ping Rate (in seconds).
+            - Input fields for the Targets and Ping Rate (in seconds).
+            - Load File and Sweep buttons for the targets.
             - Start and Stop buttons for controlling the pinging process.
             - A button to view logs.
             - A label to display results or messages.
         Button Actions:
+        - `Load File...` button: Adds the targets listed in a file.
+        - `Sweep` button: Probes every target once.
         - `Start` button: Starts the pinging process.
         - `Stop` button: Stops the pinging process.
         - `View Logs` button: Opens the log viewer.
         Note:
         - The "Stop" button is initially disabled and becomes enabled when the
         pinging process starts.
+        - The "Start" and "View Logs" buttons are enabled once the database
+        is open.
         """
         menu_bar = self.menuBar()
 
@@ -540,10 +788,21 @@ class MainUI(QMainWindow):
         self.setCentralWidget(widget)
         layout = QVBoxLayout(widget)
 
-        layout.addWidget(QLabel("IP Address:"))
-        self.ip_input = QLineEdit()
+        layout.addWidget(QLabel("Targets:"))
+        self.ip_input = QPlainTextEdit()
+        self.ip_input.setPlaceholderText(
+            "Addresses, CIDR ranges (10.0.0.0/24) or hostnames"
+        )
+        self.ip_input.setFixedHeight(70)
         layout.addWidget(self.ip_input)
 
+        target_layout = QHBoxLayout()
+        self.load_button = QPushButton("Load File...")
+        self.sweep_button = QPushButton("Sweep")
+        target_layout.addWidget(self.load_button)
+        target_layout.addWidget(self.sweep_button)
+        layout.addLayout(target_layout)
+
         layout.addWidget(QLabel("Ping Rate (seconds):"))
         self.freq_input = QSpinBox()
         self.freq_input.setMinimum(1)
@@ -551,6 +810,7 @@ class MainUI(QMainWindow):
 
         button_layout = QHBoxLayout()
         self.start_button = QPushButton("Start")
+        self.start_button.setEnabled(False)
         self.stop_button = QPushButton("Stop")
         self.stop_button.setEnabled(False)
         button_layout.addWidget(self.start_button)
@@ -558,102 +818,384 @@ class MainUI(QMainWindow):
         layout.addLayout(button_layout)
 
         self.view_logs_button = QPushButton("View Logs")
+        self.view_logs_button.setEnabled(False)
         layout.addWidget(self.view_logs_button)
 
-        self.result_display = QLabel(" ")
+        self.result_display = QLabel("Opening the database...")
         layout.addWidget(self.result_display)
 
+        self.load_button.clicked.connect(self.load_target_file)
+        self.sweep_button.clicked.connect(self.start_sweep)
         self.start_button.clicked.connect(self.start_pinging)
         self.stop_button.clicked.connect(self.stop_pinging)
         self.view_logs_button.clicked.connect(self.show_log_viewer)
 
+    def open_backend(self) -> ProbeBackend:
+        """
+        Opens the probe backend named by the "probe/backend" setting: "icmp",
+        "system", "tcp", "fake", or "auto" (the default) for the fastest one
+        the host supports.
+
+        Returns:
+            ProbeBackend: The backend, chosen automatically if the setting
+            is invalid or the backend unavailable.
+        """
+        name = str(self.settings.value("probe/backend", "auto"))
+        try:
+            return open_backend(name)
+        except (OSError, ValueError) as e:
+            print(f"Error opening the {name!r} probe backend: {e}")
+            return open_backend()
+
+    def open_database(self) -> None:
+        """
+        Opens the database on a `DatabaseOpener` thread, in the storage mode
+        of the "storage/mode" setting. `database_opened` is called once it
+        is open. Does nothing if the database is open or being opened.
+        """
+        if self.logger is not None or self.db_opener is not None:
+            return
+        storage = str(self.settings.value("storage/mode", "rows"))
+        if storage not in STORAGE_MODES:
+            print(f"Invalid storage mode {storage!r}, storing rows")
+            storage = "rows"
+        self.db_opener = DatabaseOpener(
+            self.paths.get_db_path(), storage, parent=self
+        )
+        self.db_opener.opened.connect(self.database_opened)
+        self.db_opener.failed.connect(self._show_database_error)
+        self.db_opener.start()
+
+    @Slot(object)
+    def database_opened(self, logger: DatabaseLogger) -> None:
+        """
+        Starts using the database opened by `db_opener`: shows the saved
+        targets, enables pinging and the logs, and starts the retention
+        pruner.
+
+        Args:
+            logger (DatabaseLogger): The open logger.
+        """
+        if self.logger is not None:
+            return
+        self.logger = logger
+        if self.db_opener is not None:
+            self.db_opener.wait()
+            self.db_opener = None
+        self.load_targets()
+        self.result_display.setText(" ")
+        self.start_button.setEnabled(self.pinger is None)
+        self.view_logs_button.setEnabled(True)
+        self.start_pruner()
+
+    @Slot(str)
+    def _show_database_error(self, error: str) -> None:
+        """
+        Reports a database that could not be opened.
+
+        Args:
+            error (str): The error message.
+        """
+        print(f"Error opening the database: {error}")
+        self.result_display.setText("Cannot open the database.")
+        self.result_display.setStyleSheet("color: red;")
+
     def show_about_dialog(self) -> None:
         """
         Displays the "About" dialog for the application.
 
-        This method creates an instance of the AboutDialog class, passing the
-        current object as its parent, and executes it as a modal dialog.
+        The dialog is created on first use, with the current object as its
+        parent, and executed as a modal dialog; later calls show it again.
 
         Returns:
             None
         """
-        AboutDialog(self).exec()
+        if self.about_dialog is None:
+            self.about_dialog = AboutDialog(self)
+        self.about_dialog.exec()
 
     def load_settings(self) -> None:
         """
         Load application settings and update the input fields with stored
         values.
 
-        This method retrieves the saved IP address and frequency values from
-        the
+        This method retrieves the saved frequency value from the
         application's settings storage and populates the corresponding input
-        fields
-        in the user interface.
+        field in the user interface. The targets are saved in the database
+        and shown by `load_targets` once it is open.
 
-        - The IP address is set in the `ip_input` field.
         - The frequency value is set in the `freq_input` field, defaulting to 1
         if no value is stored.
 
         """
-        self.ip_input.setText(str(self.settings.value("ip", "")))
         self.freq_input.setValue(int(str(self.settings.value("frequency", 1))))
 
-    def save_settings(self) -> None:
+    def load_targets(self) -> None:
+        """
+        Shows the target set saved in the database, unless targets were
+        typed while it was opening.
+
+        The single address saved in the "ip" setting by earlier versions is
+        moved to the database the first time.
+        """
+        if self.logger is None:
+            return
+        entries = self.logger.saved_targets()
+        legacy = str(self.settings.value("ip", "")).strip()
+        if legacy:
+            if not entries:
+                entries = [legacy]
+                self.logger.save_targets(entries)
+            self.settings.remove("ip")
+        if not self.ip_input.toPlainText().strip():
+            self.ip_input.setPlainText("\n".join(entries))
+
+    def target_set(self) -> TargetSet:
+        """
+        Parses the targets of the input field.
+
+        Returns:
+            TargetSet: The deduplicated targets.
+
+        Raises:
+            ValueError: If an entry is invalid or there are too many
+            targets.
+        """
+        return TargetSet.parse(self.ip_input.toPlainText())
+
+    def _show_warning(self, text: str) -> None:
+        """
+        Shows a warning in the result display.
+
+        Args:
+            text (str): The warning.
+        """
+        self.result_display.setText(text)
+        self.result_display.setStyleSheet("color: orange;")
+
+    def load_target_file(self) -> None:
+        """
+        Asks for a file listing targets (addresses, CIDR ranges, hostnames,
+        one or more per line, "#" starting a comment) and adds its entries
+        to the input field.
+        """
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Load Targets", "", "Text Files (*.txt);;All Files (*)"
+        )
+        if not path:
+            return
+        try:
+            targets = TargetSet.read(path)
+        except (OSError, ValueError) as e:
+            self._show_warning(str(e))
+            return
+        text = self.ip_input.toPlainText().strip()
+        entries = "\n".join(targets.entries)
+        self.ip_input.setPlainText(f"{text}\n{entries}" if text else entries)
+        self.result_display.setText(f"{len(targets)} targets loaded.")
+        self.result_display.setStyleSheet("")
+
+    def start_sweep(self) -> None:
+        """
+        Probes every target once on a `SweepWorker`, with a one second
+        timeout, and reports the live hosts when done.
+        """
+        if self.sweeper is not None:
+            return
+        try:
+            targets = self.target_set()
+        except ValueError as e:
+            self._show_warning(str(e))
+            return
+        if not targets:
+            self._show_warning("Please enter an IP address.")
+            return
+        self.sweeper = SweepWorker(
+            targets,
+            str(self.settings.value("probe/backend", "auto")),
+            parent=self,
+        )
+        self.sweeper.progress.connect(self._sweep_progress)
+        self.sweeper.completed.connect(self.sweep_finished)
+        self.sweeper.failed.connect(self._sweep_failed)
+        self.sweep_button.setEnabled(False)
+        self.result_display.setText(f"Sweeping {len(targets)} targets...")
+        self.result_display.setStyleSheet("")
+        self.sweeper.start()
+
+    @Slot(int, int)
+    def _sweep_progress(self, done: int, total: int) -> None:
+        """
+        Shows the progress of the sweep.
+
+        Args:
+            done (int): Targets probed so far.
+            total (int): Targets to probe.
+        """
+        self.result_display.setText(f"Sweeping... {done}/{total}")
+
+    def _end_sweep(self) -> None:
+        """
+        Releases the finished sweep worker.
+        """
+        if self.sweeper is not None:
+            self.sweeper.wait()
+            self.sweeper = None
+        self.sweep_button.setEnabled(True)
+
+    @Slot(str)
+    def _sweep_failed(self, error: str) -> None:
+        """
+        Reports a sweep that could not run.
+
+        Args:
+            error (str): The error message.
         """
-        Saves the current settings for IP address and frequency.
+        self._end_sweep()
+        self._show_warning(f"Sweep failed: {error}")
 
-        This method retrieves the values from the input fields for the IP
-        address
-        and frequency, processes them (e.g., strips whitespace from the IP
-        address),
-        and stores them persistently using the settings object.
+    @Slot(object)
+    def sweep_finished(self, result: SweepResult) -> None:
+        """
+        Reports the live hosts found by a sweep, in the result display and
+        in a message box listing the first `SWEEP_REPORT_HOSTS` of them.
 
-        The following settings are saved:
-        - "ip": The IP address entered in the ip_input field.
-        - "frequency": The frequency value entered in the freq_input field.
+        Args:
+            result (SweepResult): The outcome of the sweep.
+        """
+        self._end_sweep()
+        summary = (
+            f"{len(result.live)} of {result.probed} hosts up "
+            f"({result.elapsed:.1f} s)"
+        )
+        self.result_display.setText(summary)
+        self.result_display.setStyleSheet(
+            f"color: {'green' if result.live else 'red'};"
+        )
+        lines = [
+            ping.ip_address
+            if ping.rtt_us is None
+            else f"{ping.ip_address} ({format_rtt(ping.rtt_us)} ms)"
+            for ping in result.live[:SWEEP_REPORT_HOSTS]
+        ]
+        if len(result.live) > SWEEP_REPORT_HOSTS:
+            lines.append(f"... and {len(result.live) - SWEEP_REPORT_HOSTS}")
+        QMessageBox.information(
+            self, "Sweep", "\n".join([summary, "", *lines]).strip()
+        )
+
+    def retention_policy(self) -> RetentionPolicy:
+        """
+        Reads the retention policy from the application settings.
+
+        "retention/days" holds the days of logs kept for every target and
+        "retention/overrides" a list of "ADDRESS=DAYS" overrides; 0 keeps
+        the logs forever, which is the default.
+
+        Returns:
+            RetentionPolicy: The policy, keeping everything if the settings
+            are invalid.
+        """
+        value = self.settings.value("retention/overrides", [])
+        # QSettings returns a lone string for a single-item list
+        if isinstance(value, str):
+            value = [value] if value else []
+        overrides: list[object] = value if isinstance(value, list) else []
+        try:
+            return RetentionPolicy.parse(
+                float(str(self.settings.value("retention/days", 0))),
+                [str(override) for override in overrides],
+            )
+        except ValueError as e:
+            print(f"Invalid retention settings: {e}")
+            return RetentionPolicy()
+
+    def start_pruner(self) -> None:
+        """
+        Starts deleting the expired logs in the background, if the settings
+        configure a retention.
+        """
+        policy = self.retention_policy()
+        if policy.enabled and self.logger is not None:
+            self.pruner = RetentionPruner(self.logger, policy)
+            self.pruner.start()
+
+    def load_sketches(self) -> None:
+        """
+        Restores the latency sketches saved when the application last
+        exited. A missing or unreadable file starts them empty.
+        """
+        try:
+            self.sketches.load(self.paths.get_sketches_path())
+        except (OSError, ValueError) as e:
+            print(f"Error loading the latency sketches: {e}")
+
+    def save_settings(self) -> None:
+        """
+        Saves the current targets and frequency.
+
+        The frequency entered in the freq_input field is stored as the
+        "frequency" setting. The targets entered in the ip_input field are
+        deduplicated and saved in the database, ranges unexpanded; they are
+        left unsaved if invalid or before the database is open.
         """
-        self.settings.setValue("ip", self.ip_input.text().strip())
         self.settings.setValue("frequency", self.freq_input.value())
+        if self.logger is None:
+            return
+        try:
+            targets = self.target_set()
+        except ValueError as e:
+            print(f"Targets not saved: {e}")
+            return
+        self.logger.save_targets(targets.entries)
 
     def start_pinging(self) -> None:
         """
-        Starts the pinging process with the specified IP address and frequency.
+        Starts pinging every target at the specified frequency.
 
-        This method retrieves the IP address and frequency from the user
-        inputs,
-        validates the IP address, and initializes a Pinger object to perform
-        the
-        pinging operation. It also updates the UI elements to reflect the
-        current
-        state of the application.
+        This method retrieves the targets and frequency from the user
+        inputs, expands and deduplicates the targets, and initializes a
+        MultiPinger to perform the pinging operation. It also updates the UI
+        elements to reflect the current state of the application.
 
         Steps:
-        1. Retrieves and validates the IP address from the input field.
-        2. Saves the current settings.
-        3. Stops any existing Pinger instance if running.
-        4. Creates a new Pinger instance with the provided IP address and
+        1. Retrieves and validates the targets from the input field.
+        2. Saves the current settings and targets.
+        3. Stops any existing MultiPinger instance if running.
+        4. Creates a new MultiPinger and adds every target with the
         frequency.
-        5. Connects the Pinger's signal to the result display method.
-        6. Starts the Pinger thread.
+        5. Connects the MultiPinger's signal to the result display method.
+        6. Starts the MultiPinger thread.
         7. Updates the UI to disable inputs and enable the stop button.
 
         Returns:
             None
         """
-        ip_address = self.ip_input.text().strip()
         frequency = self.freq_input.value()
-        if not ip_address:
-            self.result_display.setText("Please enter an IP address.")
-            self.result_display.setStyleSheet("color: orange;")
+        if self.logger is None:
+            return
+        try:
+            targets = self.target_set()
+        except ValueError as e:
+            self._show_warning(str(e))
+            return
+        if not targets:
+            self._show_warning("Please enter an IP address.")
             return
         self.save_settings()
         if self.pinger:
             self.pinger.stop()
             self.pinger.wait()
-        self.pinger = Pinger(ip_address, frequency, self.logger)
+        self.pinger = MultiPinger(
+            self.logger, backend=self.backend, sketches=self.sketches
+        )
+        for address in targets:
+            self.pinger.add_target(address, frequency)
+        self.target_count = len(targets)
         self.pinger.ping_signal.connect(self.display_result)
         self.pinger.start()
         self.ip_input.setEnabled(False)
+        self.load_button.setEnabled(False)
         self.freq_input.setEnabled(False)
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
@@ -675,14 +1217,15 @@ class MainUI(QMainWindow):
             self.pinger.wait()
             self.pinger = None
         self.ip_input.setEnabled(True)
+        self.load_button.setEnabled(True)
         self.freq_input.setEnabled(True)
-        self.start_button.setEnabled(True)
+        self.start_button.setEnabled(self.logger is not None)
         self.stop_button.setEnabled(False)
 
     def display_result(self, ping: Ping) -> None:
         """
         Updates the result display with the outcome of a ping operation and
-        refreshes the log viewer if visible.
+        adds it to the log viewer if visible.
 
         Args:
             ping (Ping): An instance of the Ping class containing the result
@@ -691,23 +1234,35 @@ class MainUI(QMainWindow):
         Behavior:
             - Sets the text color of the result display to green if the ping
             was successful, otherwise red.
-            - Updates the result display with the ping result and timestamp.
-            - If the log viewer is visible, reloads the logs in the log viewer.
+            - Updates the result display with the ping result, timestamp and
+            round-trip time, prefixed by the target when several are
+            pinged.
+            - If the log viewer was created and is visible, hands the ping
+            to the log viewer, which inserts it without querying the
+            database.
         """
         color = "green" if ping.result == "Success" else "red"
         self.result_display.setStyleSheet(f"color: {color};")
-        self.result_display.setText(f"{ping.result} at {ping.timestamp}")
-        if self.log_viewer.isVisible():
-            self.log_viewer.load_logs()
+        text = f"{ping.result} at {ping.timestamp}"
+        if self.target_count > 1:
+            text = f"{ping.ip_address}: {text}"
+        if ping.rtt_us is not None:
+            text += f" ({format_rtt(ping.rtt_us)} ms)"
+        self.result_display.setText(text)
+        if self._log_viewer is not None and self._log_viewer.isVisible():
+            self._log_viewer.append_ping(ping)
 
     def show_log_viewer(self) -> None:
         """
         Displays the log viewer by loading the logs and making the viewer
         visible.
 
-        This method first loads the logs into the log viewer and then displays
-        the log viewer window to the user.
+        This method first loads the logs into the log viewer, creating it on
+        first use, and then displays the log viewer window to the user.
+        Nothing happens before the database is open.
         """
+        if self.logger is None:
+            return
         self.log_viewer.load_logs()
         self.log_viewer.show()
 
@@ -737,11 +1292,35 @@ class MainUI(QMainWindow):
         Perform cleanup operations for the application.
 
         This method stops the pinger process if it is running, waits for it to
-        terminate,
-        closes the log viewer, and then closes the main application window.
+        terminate, cancels the sweep and the exports of the log viewer, stops
+        the retention pruner, waits for the database if it is still being
+        opened, flushes the pings still queued for the database, saves the
+        latency sketches, releases the probe backend, closes the log viewer,
+        and then closes the main application window.
         """
         if self.pinger:
             self.pinger.stop()
             self.pinger.wait()
-        self.log_viewer.close()
+        if self.sweeper is not None:
+            self.sweeper.cancel()
+            self.sweeper.wait()
+            self.sweeper = None
+        if self._log_viewer is not None:
+            self._log_viewer.stop_background_tasks()
+        if self.pruner:
+            self.pruner.stop()
+        if self.db_opener is not None:
+            # The opened signal is no longer delivered
+            self.db_opener.wait()
+            self.logger = self.logger or self.db_opener.logger
+            self.db_opener = None
+        if self.logger is not None:
+            self.logger.close()
+        try:
+            self.sketches.save(self.paths.get_sketches_path())
+        except OSError as e:
+            print(f"Error saving the latency sketches: {e}")
+        self.backend.close()
+        if self._log_viewer is not None:
+            self._log_viewer.close()
         self.close()
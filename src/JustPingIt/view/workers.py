@@ -0,0 +1,319 @@
+import threading
+from abc import abstractmethod
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from JustPingIt.model.backends import open_backend
+from JustPingIt.model.database_logger import DatabaseLogger, LogFilter
+from JustPingIt.model.ping import Ping
+from JustPingIt.model.sweep import sweep
+from JustPingIt.model.targets import TargetSet
+
+# The exporter, and the csv, gzip and json modules it needs, are imported by
+# the workers on first use, to keep them out of the application startup.
+
+# ----------------- Core Classes -----------------
+
+
+class DatabaseOpener(QThread):
+    """
+    DatabaseOpener opens a `DatabaseLogger` on a worker thread, so creating
+    or migrating a large database never delays the first paint of the
+    window.
+    Attributes:
+        opened (Signal): Emitted with the logger once it is open.
+        failed (Signal): Emitted with the error message if the database
+        cannot be opened.
+        db_path (str): The database file.
+        storage (str): The storage mode of the logger.
+        logger (DatabaseLogger | None): The logger, once opened. Read it
+        after `wait` if the event loop is no longer running.
+    Methods:
+        run():
+            Opens the logger and emits the outcome.
+    """
+
+    opened = Signal(object)
+    failed = Signal(str)
+
+    def __init__(
+        self, db_path: str, storage: str, parent: QObject | None = None
+    ) -> None:
+        """
+        Initializes the worker. Call `start` to open the database.
+
+        Args:
+            db_path (str): The database file.
+            storage (str): The storage mode of the logger.
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+        self.db_path = db_path
+        self.storage = storage
+        self.logger: DatabaseLogger | None = None
+
+    def run(self) -> None:
+        """
+        Opens a buffered logger, creating or migrating the database, and
+        emits `opened` or `failed`.
+        """
+        try:
+            logger = DatabaseLogger(
+                self.db_path, buffered=True, storage=self.storage
+            )
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        logger.close_reader()
+        self.logger = logger
+        self.opened.emit(logger)
+
+
+class SweepWorker(QThread):
+    """
+    SweepWorker probes every target of a set once, concurrently, on a
+    worker thread, with a probe backend of its own so the running pingers
+    are not disturbed.
+    Attributes:
+        progress (Signal): Emitted with the number of targets probed and the
+        total number of targets, about every percent.
+        completed (Signal): Emitted with the `SweepResult`.
+        failed (Signal): Emitted with the error message if the backend
+        cannot be opened.
+        targets (TargetSet): The targets to probe.
+        backend_name (str): The probe backend, as given to `open_backend`.
+        timeout (float): Seconds to wait for each reply.
+    Methods:
+        run():
+            Runs the sweep and emits the outcome.
+        cancel():
+            Stops the sweep once the probes in flight complete. Safe to
+            call from any thread.
+    """
+
+    progress = Signal(int, int)
+    completed = Signal(object)
+    failed = Signal(str)
+
+    def __init__(
+        self,
+        targets: TargetSet,
+        backend_name: str = "auto",
+        timeout: float = 1,
+        parent: QObject | None = None,
+    ) -> None:
+        """
+        Initializes the worker. Call `start` to run the sweep.
+
+        Args:
+            targets (TargetSet): The targets to probe.
+            backend_name (str, optional): The probe backend.
+            timeout (float, optional): Seconds to wait for each reply.
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+        self.targets = targets
+        self.backend_name = backend_name
+        self.timeout = timeout
+        self._cancel = threading.Event()
+        self._probed = 0
+
+    def run(self) -> None:
+        """
+        Opens the backend, sweeps the targets and emits `completed` or
+        `failed`.
+        """
+        try:
+            backend = open_backend(self.backend_name)
+        except (OSError, ValueError):
+            try:
+                backend = open_backend()
+            except OSError as e:
+                self.failed.emit(str(e))
+                return
+        total = len(self.targets)
+        step = max(total // 100, 1)
+        self._probed = 0
+
+        def count(ping: Ping) -> None:
+            self._probed += 1
+            if self._probed % step == 0 or self._probed == total:
+                self.progress.emit(self._probed, total)
+
+        try:
+            result = sweep(
+                self.targets,
+                backend,
+                self.timeout,
+                on_result=count,
+                cancel=self._cancel,
+            )
+        finally:
+            backend.close()
+        self.completed.emit(result)
+
+    def cancel(self) -> None:
+        """
+        Requests the sweep to stop.
+        """
+        self._cancel.set()
+
+
+class LogTaskWorker(QThread):
+    """
+    LogTaskWorker is a QThread-based base class running a long operation on
+    the filtered logs, so the GUI stays responsive. Subclasses implement
+    `process`.
+    Attributes:
+        progress (Signal): Emitted after every chunk with the number of rows
+        processed and the total number of rows.
+        completed (Signal): Emitted with the number of rows processed.
+        cancelled (Signal): Emitted when the operation was cancelled and
+        undone.
+        failed (Signal): Emitted with the error message if the operation
+        failed.
+        logger (DatabaseLogger): The logger holding the logs.
+        log_filter (LogFilter): The filters of the logs processed.
+    Methods:
+        run():
+            Runs `process` and emits the outcome.
+        process(cancel: threading.Event) -> int:
+            The operation, implemented by subclasses.
+        cancel():
+            Stops the operation after the current chunk. Safe to call from
+            any thread.
+    """
+
+    progress = Signal(int, int)
+    completed = Signal(int)
+    cancelled = Signal()
+    failed = Signal(str)
+
+    def __init__(
+        self,
+        logger: DatabaseLogger,
+        log_filter: LogFilter,
+        parent: QObject | None = None,
+    ) -> None:
+        """
+        Initializes the worker. Call `start` to run the operation.
+
+        Args:
+            logger (DatabaseLogger): The logger holding the logs.
+            log_filter (LogFilter): The filters of the logs processed.
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+        self.logger: DatabaseLogger = logger
+        self.log_filter: LogFilter = log_filter
+        self._cancel = threading.Event()
+
+    def run(self) -> None:
+        """
+        Runs the operation on the worker thread and emits `completed`,
+        `cancelled` or `failed`.
+        """
+        from JustPingIt.model.exporter import ExportCancelledError
+
+        try:
+            count = self.process(self._cancel)
+        except ExportCancelledError:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.completed.emit(count)
+        finally:
+            self.logger.close_reader()
+
+    @abstractmethod
+    def process(self, cancel: threading.Event) -> int:
+        """
+        Runs the operation. The Qt metaclass of `QThread` cannot be combined
+        with `ABCMeta`, so the type checker enforces the override.
+
+        Args:
+            cancel (threading.Event): Set when the operation should stop.
+
+        Returns:
+            int: The number of rows processed.
+        """
+
+    def cancel(self) -> None:
+        """
+        Requests the operation to stop.
+        """
+        self._cancel.set()
+
+
+class ExportWorker(LogTaskWorker):
+    """
+    ExportWorker exports the filtered logs to a file on a worker thread. A
+    cancelled export removes its partial file.
+    Attributes:
+        path (str): The file to write, in the format of its extension.
+    """
+
+    def __init__(
+        self,
+        logger: DatabaseLogger,
+        path: str,
+        log_filter: LogFilter,
+        parent: QObject | None = None,
+    ) -> None:
+        """
+        Initializes the worker. Call `start` to run the export.
+
+        Args:
+            logger (DatabaseLogger): The logger to read the logs from.
+            path (str): The file to write.
+            log_filter (LogFilter): The filters of the exported logs.
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(logger, log_filter, parent)
+        self.path = path
+
+    def process(self, cancel: threading.Event) -> int:
+        """
+        Exports the logs.
+
+        Args:
+            cancel (threading.Event): Set when the export should stop.
+
+        Returns:
+            int: The number of rows exported.
+        """
+        from JustPingIt.model.exporter import export_logs
+
+        exported: int = export_logs(
+            self.logger,
+            self.path,
+            self.log_filter,
+            progress=self.progress.emit,
+            cancel=cancel,
+        )
+        return exported
+
+
+class DeleteWorker(LogTaskWorker):
+    """
+    DeleteWorker deletes the filtered logs in chunks on a worker thread,
+    leaving the database to the probes between chunks. The chunks deleted
+    before a cancellation stay deleted: a cancelled deletion emits
+    `completed` with the number of rows deleted so far.
+    """
+
+    def process(self, cancel: threading.Event) -> int:
+        """
+        Deletes the logs.
+
+        Args:
+            cancel (threading.Event): Set when the deletion should stop.
+
+        Returns:
+            int: The number of rows deleted.
+        """
+        deleted: int = self.logger.delete_logs(
+            self.log_filter, progress=self.progress.emit, cancel=cancel
+        )
+        return deleted
@@ -0,0 +1,191 @@
+import asyncio
+import socket
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from JustPingIt.model import backends
+from JustPingIt.model.backends import (
+    FakeBackend,
+    HostCapabilities,
+    IcmpBackend,
+    ProbeBackend,
+    SystemPingBackend,
+    TcpBackend,
+    open_backend,
+    split_tcp_target,
+)
+from JustPingIt.model.icmp import EchoReply
+from JustPingIt.model.ping import Ping
+from JustPingIt.model.scheduler import PingScheduler
+
+
+@pytest.fixture
+def listener() -> Iterator[int]:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen()
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+def closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def test_ping_group_range(tmp_path: Path) -> None:
+    path = tmp_path / "ping_group_range"
+    path.write_text("0\t2147483647\n")
+    with patch.object(backends.sys, "platform", "linux"):
+        assert backends.ping_group_allowed(str(path))
+        path.write_text("1\t0\n")
+        assert not backends.ping_group_allowed(str(path))
+        assert not backends.ping_group_allowed(str(tmp_path / "missing"))
+
+
+def test_raw_socket_capability(tmp_path: Path) -> None:
+    status = tmp_path / "status"
+    status.write_text("Name:\tpython\nCapEff:\t0000000000002000\n")
+    with patch.object(backends.os, "geteuid", return_value=1000):
+        assert backends.raw_socket_allowed(str(status))
+        status.write_text("CapEff:\t0000000000000000\n")
+        assert not backends.raw_socket_allowed(str(status))
+
+
+def test_auto_selects_the_fastest_available_backend() -> None:
+    none = HostCapabilities(False, False, None)
+    assert isinstance(open_backend(capabilities=none), TcpBackend)
+    system = HostCapabilities(False, False, "/bin/ping")
+    assert isinstance(open_backend(capabilities=system), SystemPingBackend)
+
+    icmp = HostCapabilities(True, False, "/bin/ping")
+    with patch.object(backends, "IcmpEngine") as engine_class:
+        backend = open_backend(capabilities=icmp)
+        assert isinstance(backend, IcmpBackend)
+        backend.close()
+        engine_class.return_value.close.assert_called_once()
+        # The sysctl allowed it but the socket still cannot be opened
+        engine_class.side_effect = PermissionError
+        backend = open_backend(capabilities=icmp)
+        assert isinstance(backend, SystemPingBackend)
+
+
+def test_open_backend_by_name() -> None:
+    assert isinstance(open_backend("fake"), FakeBackend)
+    assert isinstance(open_backend("tcp"), TcpBackend)
+    with pytest.raises(ValueError):
+        open_backend("carrier-pigeon")
+
+
+def test_backend_without_async_probe_cannot_be_created() -> None:
+    class SyncOnlyBackend(ProbeBackend):
+        def ping(self, address: str, timeout: float = 3) -> Ping:
+            return Ping("Success", address)
+
+    with pytest.raises(TypeError):
+        SyncOnlyBackend()  # type: ignore[abstract]
+
+
+def test_icmp_backend_leaves_a_shared_engine_open() -> None:
+    engine = MagicMock()
+    engine.ping.return_value = EchoReply("10.0.0.1", 1, 250, 64)
+    backend = IcmpBackend(engine)
+    ping = backend.ping("10.0.0.1")
+    assert (ping.result, ping.rtt_us, ping.ttl) == ("Success", 250, 64)
+    backend.close()
+    engine.close.assert_not_called()
+
+
+def test_split_tcp_target() -> None:
+    assert split_tcp_target("example.com:443") == ("example.com", 443)
+    assert split_tcp_target("[::1]:22") == ("::1", 22)
+    assert split_tcp_target("10.0.0.1") is None
+    assert split_tcp_target("fe80::1") is None
+    assert split_tcp_target("10.0.0.1:0") is None
+
+
+def test_tcp_backend_outcomes(listener: int) -> None:
+    backend = TcpBackend()
+    ping = backend.ping(f"127.0.0.1:{listener}", timeout=2)
+    assert ping.result == "Success"
+    assert ping.rtt_us is not None
+    ping = backend.ping(f"127.0.0.1:{closed_port()}", timeout=2)
+    assert ping.result == "Refused"
+    assert ping.rtt_us is not None
+
+    ping = asyncio.run(backend.ping_async(f"127.0.0.1:{listener}", 2))
+    assert ping.result == "Success"
+    ping = asyncio.run(backend.ping_async("host.invalid:80", 2))
+    assert ping.result == "Failure"
+
+
+def test_tcp_backend_timeout() -> None:
+    async def no_answer(*args: object) -> None:
+        await asyncio.sleep(10)
+
+    with patch.object(asyncio.SelectorEventLoop, "sock_connect", no_answer):
+        ping = asyncio.run(TcpBackend().ping_async("127.0.0.1:80", 0.05))
+    assert (ping.result, ping.rtt_us) == ("Timeout", None)
+
+
+def test_thousands_of_concurrent_connects_share_one_thread() -> None:
+    port = closed_port()
+    backend = TcpBackend(max_in_flight=200)
+    threads = threading.active_count()
+
+    async def sweep() -> list[str]:
+        pings = await asyncio.gather(
+            *(backend.ping_async(f"127.0.0.1:{port}", 5) for _ in range(2000))
+        )
+        assert threading.active_count() == threads
+        return [ping.result for ping in pings]
+
+    assert set(asyncio.run(sweep())) == {"Refused"}
+
+
+def test_scheduler_probes_with_the_fake_backend() -> None:
+    backend = FakeBackend(rtt_us=500, unreachable={"10.0.0.2"})
+    results = []
+
+    def on_result(ping: object) -> None:
+        results.append(ping)
+        if len(results) == 2:
+            scheduler.stop()
+
+    scheduler = PingScheduler(on_result=on_result, backend=backend)
+    scheduler.add_target("10.0.0.1", 60)
+    scheduler.add_target("10.0.0.2", 60)
+    scheduler.run_forever()
+
+    outcomes = {(p.ip_address, p.result, p.rtt_us) for p in results}
+    assert outcomes == {
+        ("10.0.0.1", "Success", 500),
+        ("10.0.0.2", "Failure", None),
+    }
+    assert backend.probes == 2
+
+
+def test_scheduler_connects_to_tcp_targets(listener: int) -> None:
+    results = []
+
+    def on_result(ping: object) -> None:
+        results.append(ping)
+        if len(results) == 2:
+            scheduler.stop()
+
+    scheduler = PingScheduler(on_result=on_result, backend=FakeBackend())
+    scheduler.add_target("10.0.0.1", 60)
+    scheduler.add_target(f"127.0.0.1:{listener}", 60)
+    scheduler.run_forever()
+
+    outcomes = {(p.ip_address, p.result) for p in results}
+    assert outcomes == {
+        ("10.0.0.1", "Success"),
+        (f"127.0.0.1:{listener}", "Success"),
+    }
+    assert scheduler.backend.probes == 1  # type: ignore[attr-defined]
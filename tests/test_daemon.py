@@ -0,0 +1,103 @@
+import asyncio
+import io
+import os
+import signal
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from JustPingIt.daemon import ProbeDaemon, TargetConfig, build_targets, main
+from JustPingIt.model.database_logger import DatabaseLogger
+from JustPingIt.model.ping import Ping
+
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+
+
+async def fake_ping_host(address: str, timeout: float = 3) -> Ping:
+    await asyncio.sleep(0)
+    return Ping("Success", address, rtt_us=1500, ttl=64)
+
+
+def test_daemon_never_imports_qt() -> None:
+    code = (
+        "import sys, JustPingIt, JustPingIt.daemon, JustPingIt.maintenance\n"
+        "assert not [m for m in sys.modules if m.startswith('PySide6')]\n"
+    )
+    env = {**os.environ, "PYTHONPATH": SRC}
+    # The current interpreter runs a fixed snippet, no untrusted input
+    subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], check=True, env=env
+    )
+
+
+def test_targets_from_config_and_command_line() -> None:
+    targets = build_targets(
+        ["10.0.0.2"],
+        ["10.0.0.2", {"address": "10.0.0.1", "interval": 5}],
+        interval=1,
+        timeout=3,
+    )
+    assert targets == [
+        TargetConfig("10.0.0.2", 1, 3),
+        TargetConfig("10.0.0.1", 5, 3),
+    ]
+    with pytest.raises(ValueError):
+        build_targets([], [{"interval": 5}], 1, 3)
+    with pytest.raises(ValueError):
+        build_targets(["10.0.0.1"], [], 0, 3)
+
+
+def test_cidr_targets_are_expanded() -> None:
+    targets = build_targets(
+        ["10.0.0.2"], [{"address": "10.0.0.0/30", "interval": 5}], 1, 3
+    )
+    assert targets == [
+        TargetConfig("10.0.0.1", 5, 3),
+        TargetConfig("10.0.0.2", 1, 3),
+    ]
+
+
+def test_sweep_prints_the_live_hosts(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    path = tmp_path / "targets.txt"
+    path.write_text("10.0.0.0/29\n", encoding="utf-8")
+    arguments = ["--targets-file", str(path), "--sweep", "--backend", "fake"]
+    assert main(arguments) == 0
+    captured = capsys.readouterr()
+    assert captured.out.splitlines()[0].startswith("10.0.0.1\tSuccess")
+    assert "6 of 6 hosts up" in captured.err
+
+
+def test_sigterm_flushes_pending_writes(tmp_path: Path) -> None:
+    logger = DatabaseLogger(str(tmp_path / "logs.db"), buffered=True)
+    out = io.StringIO()
+    daemon = ProbeDaemon(
+        logger, [TargetConfig("10.0.0.1", 0.01)], stats_interval=0.05, out=out
+    )
+    daemon.scheduler.ping_host = fake_ping_host  # type: ignore
+    timer = threading.Timer(0.3, os.kill, (os.getpid(), signal.SIGTERM))
+    timer.start()
+
+    assert daemon.run() == 0
+    timer.join()
+    lines = out.getvalue().splitlines()
+    assert len(lines) >= 2
+    assert "targets=1" in lines[0] and "loss=0.0%" in lines[0]
+    assert logger.count_logs() > 5
+    assert logger.writer_stats().pending == 0
+    assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+    logger.close()
+
+
+def test_main_without_target_fails(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    assert main(["--db", str(tmp_path / "logs.db")]) == 2
+    assert "no target" in capsys.readouterr().err
+    config = tmp_path / "daemon.toml"
+    config.write_text("targets = [")
+    assert main(["--config", str(config)]) == 2
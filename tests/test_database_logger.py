@@ -1,14 +1,21 @@
 import contextlib
 import gc
 import os
+import sqlite3
 import tempfile
+import threading
+import time
 from collections.abc import Iterator
 from datetime import datetime, timedelta
-from typing import cast
+from typing import Any, cast
 
 import pytest
 
-from JustPingIt.model.database_logger import DatabaseLogger
+from JustPingIt.model.database_logger import (
+    DatabaseLogger,
+    LogFilter,
+    format_epoch_ms,
+)
 from JustPingIt.model.ping import Ping
 
 
@@ -130,3 +137,583 @@ def test_log_invalid_data_handling(db_logger: DatabaseLogger) -> None:
     assert logs == []
     logs = db_logger.fetch_logs()
     assert logs == []  # Shouldn't log invalid entries
+
+
+def test_log_reply_details(db_logger: DatabaseLogger) -> None:
+    db_logger.log(Ping("Success", "10.0.0.1", rtt_us=1234, ttl=64, seq=7))
+    db_logger.log(Ping("Failure", "10.0.0.1", seq=8))
+
+    logs = sorted(db_logger.fetch_logs(), key=lambda row: row[0])
+    assert logs[0][4:] == (1234, 64, 7)
+    assert logs[1][4:] == (None, None, 8)
+
+
+def test_migrates_legacy_table(temp_db_path: str) -> None:
+    conn = sqlite3.connect(temp_db_path)
+    with conn:
+        conn.execute(
+            """
+            CREATE TABLE ping_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                result TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                ip_address TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "INSERT INTO ping_logs (result, timestamp, ip_address) "
+            "VALUES ('Success', '2024-01-01 10:00:00', '10.0.0.1')"
+        )
+    conn.close()
+
+    logger = DatabaseLogger(temp_db_path)
+    logger.log(Ping("Success", "10.0.0.1", rtt_us=500, ttl=60, seq=1))
+
+    logs = sorted(logger.fetch_logs(), key=lambda row: row[0])
+    assert logs[0][1:] == (
+        "Success",
+        "2024-01-01 10:00:00",
+        "10.0.0.1",
+        None,
+        None,
+        None,
+    )
+    assert logs[1][4:] == (500, 60, 1)
+
+
+def test_buffered_log_writes_in_batches(temp_db_path: str) -> None:
+    logger = DatabaseLogger(
+        temp_db_path, buffered=True, batch_size=10, flush_interval_ms=60000
+    )
+    for i in range(25):
+        logger.log(Ping("Success", "10.0.0.1", seq=i))
+    logger.flush()
+
+    stats = logger.writer_stats()
+    assert stats.enqueued == 25
+    assert stats.written == 25
+    assert stats.batches == 3
+    assert stats.pending == 0
+    assert len(logger.fetch_logs()) == 25
+    logger.close()
+
+
+def test_buffered_log_flushes_on_interval(temp_db_path: str) -> None:
+    logger = DatabaseLogger(temp_db_path, buffered=True, flush_interval_ms=50)
+    logger.log(Ping("Success", "10.0.0.1"))
+
+    deadline = time.monotonic() + 5
+    while not logger.fetch_logs() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(logger.fetch_logs()) == 1
+    logger.close()
+
+
+def test_close_flushes_and_falls_back_to_direct_writes(
+    temp_db_path: str,
+) -> None:
+    logger = DatabaseLogger(
+        temp_db_path, buffered=True, flush_interval_ms=60000
+    )
+    logger.log(Ping("Success", "10.0.0.1"))
+    logger.close()
+    assert len(logger.fetch_logs()) == 1
+
+    logger.log(Ping("Failure", "10.0.0.1"))
+    assert len(logger.fetch_logs()) == 2
+
+
+def test_buffered_backpressure_drops_when_full(
+    temp_db_path: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    release = threading.Event()
+    logger = DatabaseLogger(
+        temp_db_path,
+        buffered=True,
+        batch_size=1,
+        max_queue=2,
+        enqueue_timeout=0.01,
+    )
+    write_batch = logger._write_batch
+
+    def slow_write(batch: list[Any]) -> None:
+        release.wait(5)
+        write_batch(batch)
+
+    monkeypatch.setattr(logger, "_write_batch", slow_write)
+    for _ in range(6):
+        logger.log(Ping("Success", "10.0.0.1"))
+
+    stats = logger.writer_stats()
+    assert stats.dropped > 0
+    assert stats.blocked >= stats.dropped
+    assert stats.high_water == 2
+
+    release.set()
+    logger.close()
+    stats = logger.writer_stats()
+    assert stats.written == stats.enqueued
+
+
+def test_connections_are_reused(db_logger: DatabaseLogger) -> None:
+    db_logger.log(Ping("Success", "10.0.0.1"))
+    db_logger.fetch_logs()
+    reader = db_logger._read_connection()
+    with db_logger._write_connection() as writer:
+        pass
+
+    db_logger.log(Ping("Success", "10.0.0.1"))
+    assert len(db_logger.fetch_logs()) == 2
+    assert db_logger._read_connection() is reader
+    with db_logger._write_connection() as conn:
+        assert conn is writer
+    assert reader is not writer
+
+
+def test_reader_connections_are_per_thread_and_read_only(
+    db_logger: DatabaseLogger,
+) -> None:
+    readers: list[sqlite3.Connection] = []
+    thread = threading.Thread(
+        target=lambda: readers.append(db_logger._read_connection())
+    )
+    thread.start()
+    thread.join()
+
+    reader = db_logger._read_connection()
+    assert readers[0] is not reader
+    with pytest.raises(sqlite3.OperationalError):
+        reader.execute("DELETE FROM ping_logs")
+
+
+def test_close_releases_connections(db_logger: DatabaseLogger) -> None:
+    db_logger.log(Ping("Success", "10.0.0.1"))
+    reader = db_logger._read_connection()
+    db_logger.close()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        reader.execute("SELECT 1")
+    # The logger reopens connections on demand after closing
+    db_logger.log(Ping("Success", "10.0.0.1"))
+    assert len(db_logger.fetch_logs()) == 2
+    db_logger.close()
+
+
+def _log_many(logger: DatabaseLogger, count: int) -> None:
+    with logger._write_connection() as conn, conn:
+        conn.executemany(
+            "INSERT INTO ping_logs (result, timestamp, ip_address, seq) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                # Pairs of rows share a timestamp to exercise the id tiebreak
+                (
+                    "Success" if i % 3 else "Failure",
+                    1_700_000_000_000 + i // 2,
+                    "10.0.0.1" if i % 2 else "10.0.0.2",
+                    i,
+                )
+                for i in range(count)
+            ],
+        )
+
+
+def test_iter_logs_streams_filtered_rows(db_logger: DatabaseLogger) -> None:
+    _log_many(db_logger, 250)
+
+    rows = list(db_logger.iter_logs(chunk_size=7))
+    assert rows == db_logger.fetch_logs()
+
+    log_filter = LogFilter(ip_filter="10.0.0.2", result_filter="Failure")
+    streamed = list(db_logger.iter_logs(log_filter, chunk_size=7))
+    assert streamed == db_logger.fetch_logs(
+        ip_filter="10.0.0.2", result_filter="Failure"
+    )
+    assert streamed and all(row[3] == "10.0.0.2" for row in streamed)
+
+
+def test_fetch_page_walks_every_row_once(db_logger: DatabaseLogger) -> None:
+    _log_many(db_logger, 250)
+
+    pages = []
+    token = None
+    while True:
+        page, token = db_logger.fetch_page(after=token, page_size=40)
+        pages.append(page)
+        if token is None:
+            break
+    assert [len(page) for page in pages] == [40] * 6 + [10]
+    assert [row for page in pages for row in page] == db_logger.fetch_logs()
+
+
+def test_fetch_page_with_filter(db_logger: DatabaseLogger) -> None:
+    _log_many(db_logger, 100)
+    log_filter = LogFilter(result_filter="Success")
+
+    first, token = db_logger.fetch_page(log_filter, page_size=50)
+    assert token is not None
+    second, token = db_logger.fetch_page(log_filter, token, page_size=50)
+    assert token is None
+    assert first + second == db_logger.fetch_logs(result_filter="Success")
+
+
+def test_fetch_page_empty(db_logger: DatabaseLogger) -> None:
+    assert db_logger.fetch_page() == ([], None)
+
+
+def test_log_filter_matches_unwritten_pings() -> None:
+    ping = Ping("Success", "192.168.1.10")
+    today = datetime.now()
+    assert LogFilter().matches(ping)
+    assert LogFilter(ip_filter="168.1", result_filter="Success").matches(ping)
+    assert not LogFilter(ip_filter="10.0").matches(ping)
+    assert not LogFilter(result_filter="Failure").matches(ping)
+    assert LogFilter(from_date=today, to_date=today).matches(ping)
+    assert not LogFilter(to_date=today - timedelta(days=1)).matches(ping)
+    assert not LogFilter(from_date=today + timedelta(days=1)).matches(ping)
+
+
+def test_count_logs_and_chunks(db_logger: DatabaseLogger) -> None:
+    _log_many(db_logger, 25)
+    assert db_logger.count_logs() == 25
+    assert db_logger.count_logs(LogFilter(ip_filter="10.0.0.2")) == 13
+    chunks = list(db_logger.iter_log_chunks(chunk_size=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+
+
+def test_close_reader_releases_thread_connection(
+    db_logger: DatabaseLogger,
+) -> None:
+    reader = db_logger._read_connection()
+    db_logger.close_reader()
+    assert db_logger._readers == []
+    with pytest.raises(sqlite3.ProgrammingError):
+        reader.execute("SELECT 1")
+    assert db_logger._read_connection() is not reader
+
+
+def test_delete_logs_by_filter_in_chunks(db_logger: DatabaseLogger) -> None:
+    _log_many(db_logger, 25)
+    reports: list[tuple[int, int]] = []
+
+    deleted = db_logger.delete_logs(
+        LogFilter(ip_filter="10.0.0.2"),
+        chunk_size=5,
+        progress=lambda done, total: reports.append((done, total)),
+        pause_s=0,
+    )
+    assert deleted == 13
+    assert reports == [(5, 13), (10, 13), (13, 13)]
+    assert db_logger.count_logs() == 12
+    assert db_logger.count_logs(LogFilter(ip_filter="10.0.0.2")) == 0
+
+
+def test_delete_logs_cancelled_keeps_remaining_rows(
+    db_logger: DatabaseLogger,
+) -> None:
+    _log_many(db_logger, 20)
+    cancel = threading.Event()
+
+    deleted = db_logger.delete_logs(
+        LogFilter(),
+        chunk_size=5,
+        progress=lambda done, total: cancel.set(),
+        cancel=cancel,
+        pause_s=0,
+    )
+    assert deleted == 5
+    assert db_logger.count_logs() == 15
+
+
+def test_delete_older_than_per_target(db_logger: DatabaseLogger) -> None:
+    _log_many(db_logger, 20)
+    # The ten oldest rows alternate between 10.0.0.2 and 10.0.0.1
+    cutoff = 1_700_000_000_005
+    assert db_logger.delete_older_than(cutoff, exclude=("10.0.0.2",)) == 5
+    deleted = db_logger.delete_older_than(
+        cutoff, ip_address="10.0.0.2", chunk_size=2, max_chunks=2
+    )
+    assert deleted == 4
+    assert db_logger.count_logs() == 11
+
+
+def test_incremental_vacuum_releases_free_pages(
+    db_logger: DatabaseLogger,
+) -> None:
+    _log_many(db_logger, 5000)
+    db_logger.delete_logs(LogFilter(), pause_s=0)
+    assert db_logger.incremental_vacuum(5) == 5
+    assert db_logger.incremental_vacuum(0) > 0
+    assert db_logger.incremental_vacuum(0) == 0
+
+
+def test_writes_maintain_rollups(temp_db_path: str) -> None:
+    logger = DatabaseLogger(temp_db_path, buffered=True, batch_size=3)
+    for rtt in (100, 300, None):
+        logger.log(
+            Ping("Success" if rtt else "Failure", "10.0.0.1", rtt_us=rtt)
+        )
+    logger.close()
+    logger.log(Ping("Success", "10.0.0.2", rtt_us=50))
+
+    days = logger.fetch_rollups("day")
+    assert [row[0] for row in days] == ["10.0.0.1", "10.0.0.2"]
+    assert days[0][2:] == (3, 2, 1, 2, 100, 300, 400, 100000, 1, 200)
+    assert logger.fetch_rollups("minute", ip_address="10.0.0.2")[0][2] == 1
+    with pytest.raises(ValueError):
+        logger.fetch_rollups("week")
+    logger.close()
+
+
+def test_rebuild_rollups_after_delete(db_logger: DatabaseLogger) -> None:
+    _log_many(db_logger, 20)
+    assert db_logger.fetch_rollups("day") == []
+
+    assert db_logger.rebuild_rollups() == 1
+    total = sum(row[2] for row in db_logger.fetch_rollups("hour"))
+    assert total == 20
+    db_logger.delete_logs(LogFilter(ip_filter="10.0.0.1"), pause_s=0)
+    # Deleting raw logs leaves the rollups alone until they are rebuilt
+    assert sum(row[2] for row in db_logger.fetch_rollups("day")) == 20
+    db_logger.rebuild_rollups()
+    assert [row[:3] for row in db_logger.fetch_rollups("day")] == [
+        ("10.0.0.2", 1_699_920_000_000, 10)
+    ]
+
+
+def test_statistics_from_aggregates(db_logger: DatabaseLogger) -> None:
+    start = datetime.now()
+    for rtt in (1000, 2000, None, None, 3000, 1000):
+        db_logger.log(
+            Ping("Success" if rtt else "Failure", "10.0.0.1", rtt_us=rtt)
+        )
+    db_logger.log(Ping("Failure", "10.0.0.2"))
+    end = datetime.now() + timedelta(seconds=1)
+
+    first, second = db_logger.statistics(start, end)
+    assert (first.ip_address, first.probes, first.failures) == (
+        "10.0.0.1",
+        6,
+        2,
+    )
+    assert first.availability == pytest.approx(100 * 4 / 6)
+    assert first.rtt_mean_us == 1750
+    assert first.jitter_us == pytest.approx(4000 / 3)
+    assert first.rtt_p50_us == pytest.approx(1000, rel=0.02)
+    assert first.longest_outage_ms >= 0
+    assert first.longest_outage_start_ms is not None
+    assert (second.loss, second.rtt_mean_us) == (100, None)
+    assert db_logger.statistics(start, end, "10.0.0.2") == [second]
+
+
+def test_statistics_use_the_probes_sent(db_logger: DatabaseLogger) -> None:
+    start = datetime.now()
+    for result in ("Success", "Missed", "Failure", "Missed", "Success"):
+        db_logger.log(Ping(result, "10.0.0.1", seq=1))
+    db_logger.log(Ping("Missed", "10.0.0.2"))
+    end = datetime.now() + timedelta(seconds=1)
+
+    first, second = db_logger.statistics(start, end)
+    assert (first.probes, first.missed) == (3, 2)
+    assert first.loss == pytest.approx(100 / 3)
+    assert first.sampling == pytest.approx(60)
+    assert (second.probes, second.loss, second.sampling) == (0, 0, 0)
+
+
+def test_runs_storage_expands_to_pings(temp_db_path: str) -> None:
+    logger = DatabaseLogger(temp_db_path, storage="runs")
+    for seq in range(1, 11):
+        failed = seq in (7, 8)
+        ping = Ping(
+            "Failure" if failed else "Success",
+            "10.0.0.1",
+            rtt_us=None if failed else 1000,
+            seq=seq,
+        )
+        ping.epoch_ms = 1_700_000_000_000 + seq * 1000
+        logger.log(ping)
+
+    assert logger.fetch_logs() == []
+    assert [run[2:6] for run in logger.fetch_runs()] == [
+        ("Success", 1_700_000_001_000, 1_700_000_006_000, 6),
+        ("Failure", 1_700_000_007_000, 1_700_000_008_000, 2),
+        ("Success", 1_700_000_009_000, 1_700_000_010_000, 2),
+    ]
+    rows = logger.fetch_logs(expand_runs=True)
+    assert [row[6] for row in rows] == list(range(10, 0, -1))
+    assert [row[4] for row in rows[2:4]] == [None, None]
+    log_filter = LogFilter(result_filter="Success", expand_runs=True)
+    assert logger.count_logs(log_filter) == 8
+    page, token = logger.fetch_page(log_filter, page_size=5)
+    rest, _ = logger.fetch_page(log_filter, token, page_size=5)
+    assert [row[6] for row in page + rest] == [10, 9, 6, 5, 4, 3, 2, 1]
+
+    assert logger.delete_older_than(1_700_000_007_000) == 1
+    assert len(logger.fetch_runs()) == 2
+    with pytest.raises(ValueError):
+        DatabaseLogger(temp_db_path, storage="columns")
+    logger.close()
+
+
+def test_fetch_page_pages_runs_without_expanding_them(
+    temp_db_path: str,
+) -> None:
+    logger = DatabaseLogger(temp_db_path, storage="runs")
+    start = 1_700_000_000_000
+    count = 2_592_000  # 30 days at 1 Hz
+    end = start + (count - 1) * 1000
+    with logger._write_connection() as conn, conn:
+        conn.executemany(
+            "INSERT INTO ping_runs (ip_address, result, start_ms, end_ms,"
+            " count, rtt_count, rtt_sum, rtt_sum_sq, first_seq, last_seq)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                ("10.0.0.1", "Success", start, end, count, count)
+                + (count * 1000, count * 10**6, 1, count),
+                # Interleaved with the end of the first run
+                ("10.0.0.2", "Failure", end - 4500, end - 500, 5, 0)
+                + (0, 0, 1, 5),
+                # More pings than milliseconds: they share timestamps
+                ("10.0.0.3", "Success", start, start + 3, 10, 0)
+                + (0, 0, 1, 10),
+            ],
+        )
+        conn.execute(
+            "INSERT INTO ping_logs (result, timestamp, ip_address, seq)"
+            " VALUES ('Success', ?, '10.0.0.4', 1)",
+            (end - 250,),
+        )
+    log_filter = LogFilter(expand_runs=True)
+
+    pages = []
+    token = None
+    for _ in range(4):
+        page, token = logger.fetch_page(log_filter, token, page_size=4)
+        pages.append([(row[0], row[6]) for row in page])
+        if len(pages) == 1:
+            # The second page starts in the middle of the first run
+            assert token == (end - 1000, -1, count - 2)
+            assert page[0] == (
+                -1,
+                "Success",
+                format_epoch_ms(end),
+                "10.0.0.1",
+                1000,
+                None,
+                count,
+            )
+    assert pages == [
+        [(-1, count), (1, 1), (-2, 5), (-1, count - 1)],
+        [(-2, 4), (-1, count - 2), (-2, 3), (-1, count - 3)],
+        [(-2, 2), (-1, count - 4), (-2, 1), (-1, count - 5)],
+        [(-1, count - 6), (-1, count - 7), (-1, count - 8), (-1, count - 9)],
+    ]
+
+    first_run = LogFilter(ip_filter="10.0.0.1", expand_runs=True)
+    page, token = logger.fetch_page(
+        first_run, (start + 2000, -1, 2), page_size=4
+    )
+    assert ([row[6] for row in page], token) == ([2, 1], None)
+
+    third_run = LogFilter(ip_filter="10.0.0.3", expand_runs=True)
+    seqs: list[list[int | None]] = []
+    token = None
+    while True:
+        page, token = logger.fetch_page(third_run, token, page_size=3)
+        seqs.append([row[6] for row in page])
+        if token is None:
+            break
+    assert seqs == [[10, 9, 8], [7, 6, 5], [4, 3, 2], [1]]
+    logger.close()
+
+
+def test_delete_logs_in_runs_storage(temp_db_path: str) -> None:
+    logger = DatabaseLogger(temp_db_path, storage="runs")
+    day = datetime(2024, 3, 4)
+    midnight = int(day.timestamp() * 1000)
+    hour = 3_600_000
+
+    def log(seq: int) -> None:
+        ping = Ping("Success", "10.0.0.1", rtt_us=1000, seq=seq)
+        ping.epoch_ms = midnight + (6 + 12 * (seq - 1)) * hour
+        logger.log(ping)
+
+    # Two pings a day for three days, one run
+    for seq in range(1, 7):
+        log(seq)
+    second_day = LogFilter(
+        from_date=day + timedelta(days=1),
+        to_date=day + timedelta(days=1),
+        expand_runs=True,
+    )
+    reports: list[tuple[int, int]] = []
+
+    deleted = logger.delete_logs(
+        second_day,
+        progress=lambda done, total: reports.append((done, total)),
+        pause_s=0,
+    )
+    assert deleted == 2
+    assert reports[-1] == (2, 2)
+    assert logger.count_logs(second_day) == 0
+    runs = logger.fetch_runs()
+    assert [(run[5], run[12], run[13]) for run in runs] == [
+        (2, 1, 2),
+        (2, 5, 6),
+    ]
+    assert runs[0][9] == 2000
+
+    # The trimmed last run still takes the next ping
+    log(7)
+    assert [run[5] for run in logger.fetch_runs()] == [2, 3]
+    assert logger.delete_logs(LogFilter(expand_runs=True), pause_s=0) == 5
+    assert logger.fetch_runs() == []
+    logger.close()
+
+
+def test_records_each_new_address_of_a_hostname(temp_db_path: str) -> None:
+    addresses = ["10.0.0.1", "10.0.0.1", "10.0.0.2", None, "10.0.0.2"]
+    logger = DatabaseLogger(temp_db_path)
+    for resolved in addresses:
+        logger.log(Ping("Success", "example.com", resolved=resolved))
+    logger.log(Ping("Success", "10.0.0.9"))
+    logger.close()
+
+    # A new logger picks up the last address recorded
+    logger = DatabaseLogger(temp_db_path, buffered=True)
+    logger.log(Ping("Success", "example.com", resolved="10.0.0.2"))
+    logger.close()
+    rows = logger.fetch_resolutions()
+    assert [row[:2] for row in rows] == [
+        ("example.com", "10.0.0.1"),
+        ("example.com", "10.0.0.2"),
+    ]
+    assert rows[0][2] <= rows[1][2]
+    assert logger.fetch_resolutions("10.0.0.9") == []
+    assert len(logger.fetch_logs()) == 7
+
+
+def test_save_and_load_targets(db_logger: DatabaseLogger) -> None:
+    assert db_logger.saved_targets() == []
+    db_logger.save_targets(["10.0.0.0/22", "example.com", "10.0.0.0/22"])
+    assert db_logger.saved_targets() == ["10.0.0.0/22", "example.com"]
+    db_logger.save_targets(["10.0.1.1"])
+    assert db_logger.saved_targets() == ["10.0.1.1"]
+
+
+def test_buffered_resolutions_are_written_with_the_batch(
+    temp_db_path: str,
+) -> None:
+    logger = DatabaseLogger(
+        temp_db_path, buffered=True, flush_interval_ms=60_000
+    )
+    with logger._write_connection():
+        # The writer lock is busy: logging must not wait for it
+        logger.log(Ping("Success", "example.com", resolved="10.0.0.1"))
+    assert logger.fetch_resolutions() == []
+    assert logger.flush(timeout=5)
+    assert [row[:2] for row in logger.fetch_resolutions()] == [
+        ("example.com", "10.0.0.1")
+    ]
+    assert logger.writer_stats().written == 1
+    logger.close()
@@ -0,0 +1,149 @@
+import csv
+import threading
+from pathlib import Path
+
+import pytest
+
+from JustPingIt.model.database_logger import DatabaseLogger, LogFilter
+from JustPingIt.model.exporter import (
+    EXPORT_COLUMNS,
+    ExportCancelledError,
+    detect_format,
+    export_logs,
+    read_export,
+)
+
+
+@pytest.fixture
+def logger(tmp_path: Path) -> DatabaseLogger:
+    logger = DatabaseLogger(str(tmp_path / "logs.sqlite"))
+    with logger._write_connection() as conn, conn:
+        conn.executemany(
+            "INSERT INTO ping_logs (result, timestamp, ip_address, rtt_us, "
+            "ttl, seq) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    "Success" if i % 4 else "Failure",
+                    1_700_000_000_000 + i,
+                    "10.0.0.1",
+                    None if i % 4 == 0 else 1000 + i,
+                    64,
+                    i,
+                )
+                for i in range(2500)
+            ],
+        )
+    return logger
+
+
+def test_export_streams_every_row(
+    tmp_path: Path, logger: DatabaseLogger
+) -> None:
+    path = tmp_path / "export.csv"
+    reports: list[tuple[int, int]] = []
+    count = export_logs(
+        logger,
+        str(path),
+        progress=lambda written, total: reports.append((written, total)),
+        chunk_size=1000,
+    )
+
+    assert count == 2500
+    assert reports == [(1000, 2500), (2000, 2500), (2500, 2500)]
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == EXPORT_COLUMNS
+    expected = [
+        ["" if v is None else str(v) for v in row[1:]]
+        for row in logger.fetch_logs()
+    ]
+    assert rows[1:] == expected
+    assert not (tmp_path / "export.csv.part").exists()
+
+
+def test_export_applies_filter(tmp_path: Path, logger: DatabaseLogger) -> None:
+    path = tmp_path / "failures.csv"
+    count = export_logs(logger, str(path), LogFilter(result_filter="Failure"))
+    assert count == 625
+    with open(path, newline="", encoding="utf-8") as f:
+        assert all(row[0] == "Failure" for row in list(csv.reader(f))[1:])
+
+
+def test_export_cancel_removes_partial_file(
+    tmp_path: Path, logger: DatabaseLogger
+) -> None:
+    path = tmp_path / "export.csv"
+    cancel = threading.Event()
+
+    def progress(written: int, total: int) -> None:
+        cancel.set()
+
+    with pytest.raises(ExportCancelledError):
+        export_logs(
+            logger, str(path), progress=progress, cancel=cancel, chunk_size=10
+        )
+    assert not path.exists()
+    assert not (tmp_path / "export.csv.part").exists()
+
+
+def _zstd_available() -> bool:
+    try:
+        import compression.zstd  # noqa: F401
+    except ImportError:
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            return False
+    return True
+
+
+def test_detect_format() -> None:
+    assert detect_format("logs.CSV") == "csv"
+    assert detect_format("logs.txt") == "csv"
+    assert detect_format("logs.csv.gz") == "csv.gz"
+    assert detect_format("logs.jsonl.zst") == "jsonl.zst"
+    assert detect_format("logs.jplc") == "columnar"
+    with pytest.raises(ValueError):
+        detect_format("logs.xlsx")
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "export.csv",
+        "export.csv.gz",
+        "export.csv.zst",
+        "export.jsonl",
+        "export.jsonl.gz",
+        "export.jplc",
+    ],
+)
+def test_formats_round_trip(
+    tmp_path: Path, logger: DatabaseLogger, name: str
+) -> None:
+    if name.endswith(".zst") and not _zstd_available():
+        pytest.skip("zstd is not available")
+    path = tmp_path / name
+    assert export_logs(logger, str(path), chunk_size=700) == 2500
+
+    expected = [row[1:] for row in logger.fetch_logs()]
+    assert list(read_export(str(path))) == expected
+    assert not (tmp_path / f"{name}.part").exists()
+
+
+def test_columnar_is_compact(tmp_path: Path, logger: DatabaseLogger) -> None:
+    csv_path, columnar_path = tmp_path / "a.csv", tmp_path / "a.jplc"
+    export_logs(logger, str(csv_path))
+    export_logs(logger, str(columnar_path))
+    assert columnar_path.stat().st_size * 4 < csv_path.stat().st_size
+
+
+def test_read_export_rejects_other_files(tmp_path: Path) -> None:
+    path = tmp_path / "other.jplc"
+    path.write_bytes(b"not an export")
+    with pytest.raises(ValueError):
+        list(read_export(str(path)))
+    path = tmp_path / "other.csv"
+    path.write_text("a,b\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(read_export(str(path)))
@@ -0,0 +1,74 @@
+import struct
+from collections.abc import Iterator
+from unittest.mock import MagicMock
+
+import pytest
+
+from JustPingIt.model.icmp import (
+    ICMP_ECHO_REQUEST,
+    EchoReply,
+    IcmpEngine,
+    build_echo_request,
+    checksum,
+    open_engine,
+)
+from JustPingIt.model.pinger import Pinger
+
+
+@pytest.fixture
+def engine() -> Iterator[IcmpEngine]:
+    engine = open_engine()
+    if engine is None:
+        pytest.skip("ICMP sockets are not available on this host")
+    yield engine
+    engine.close()
+
+
+def test_checksum_known_vector() -> None:
+    # RFC 1071 example: the words sum to 0xddf2, complemented 0x220d
+    data = bytes([0x00, 0x01, 0xF2, 0x03, 0xF4, 0xF5, 0xF6, 0xF7])
+    assert checksum(data) == 0x220D
+
+
+def test_build_echo_request_is_valid() -> None:
+    packet = build_echo_request(0x1234, 7, b"abc")
+    icmp_type, code, _, identifier, sequence = struct.unpack(
+        "!BBHHH", packet[:8]
+    )
+    assert (icmp_type, code) == (ICMP_ECHO_REQUEST, 0)
+    assert (identifier, sequence) == (0x1234, 7)
+    assert packet[8:] == b"abc"
+    # A packet carrying its own checksum sums to zero
+    assert checksum(packet) == 0
+
+
+def test_ping_loopback(engine: IcmpEngine) -> None:
+    reply = engine.ping("127.0.0.1", timeout=2)
+    assert isinstance(reply, EchoReply)
+    assert reply.address == "127.0.0.1"
+    assert reply.rtt_us >= 0
+    assert reply.ttl is not None
+
+
+def test_ping_many_matches_each_target(engine: IcmpEngine) -> None:
+    targets = ["127.0.0.1", "127.0.0.2", "127.0.0.3"]
+    results = engine.ping_many(targets, timeout=2)
+    assert set(results) == set(targets)
+    sequences = {r.sequence for r in results.values() if r is not None}
+    assert len(sequences) == len(targets)
+    assert not engine._pending
+
+
+def test_ping_many_unresolvable_host(engine: IcmpEngine) -> None:
+    results = engine.ping_many(["host.invalid"], timeout=0.1)
+    assert results == {"host.invalid": None}
+
+
+def test_pinger_uses_engine() -> None:
+    engine = MagicMock()
+    engine.ping.return_value = EchoReply("10.0.0.1", 1, 250, 64)
+    pinger = Pinger("10.0.0.1", 1, MagicMock(), engine=engine)
+    assert pinger.ping_host("10.0.0.1") == "Success"
+
+    engine.ping.return_value = None
+    assert pinger.ping_host("10.0.0.1") == "Failure"
@@ -0,0 +1,115 @@
+from pathlib import Path
+
+import pytest
+from PySide6.QtCore import Qt
+from pytestqt.qtbot import QtBot
+
+from JustPingIt.model.database_logger import DatabaseLogger, LogFilter
+from JustPingIt.model.ping import Ping
+from JustPingIt.view.log_model import (
+    LOG_COLUMNS,
+    LogTableModel,
+    display_values,
+    format_rtt,
+)
+
+
+@pytest.fixture
+def logger(tmp_path: Path) -> DatabaseLogger:
+    logger = DatabaseLogger(str(tmp_path / "logs.sqlite"))
+    with logger._write_connection() as conn, conn:
+        conn.executemany(
+            "INSERT INTO ping_logs (result, timestamp, ip_address, rtt_us, "
+            "ttl, seq) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                ("Success", 1_700_000_000_000 + i, "10.0.0.1", i, 64, i)
+                for i in range(1000)
+            ],
+        )
+    return logger
+
+
+def test_format_rtt() -> None:
+    assert format_rtt(None) == ""
+    assert format_rtt(1234) == "1.234"
+
+
+def test_display_values() -> None:
+    row = (1, "Success", "2024-01-01 10:00:00", "10.0.0.1", 1500, 64, 3)
+    assert display_values(row) == [
+        "Success",
+        "2024-01-01 10:00:00",
+        "10.0.0.1",
+        "1.500",
+        "64",
+    ]
+
+
+def test_model_loads_pages_on_demand(
+    qtbot: QtBot, logger: DatabaseLogger
+) -> None:
+    model = LogTableModel(logger, page_size=100, cache_pages=3)
+    model.set_filter(LogFilter())
+    assert model.rowCount() == 100
+    assert model.columnCount() == len(LOG_COLUMNS)
+    assert model.headerData(0, Qt.Orientation.Horizontal) == "Result"
+
+    while model.canFetchMore():
+        model.fetchMore()
+    assert model.rowCount() == 1000
+    assert len(model._pages) <= 3
+
+    # Newest first: the first row has the largest sequence
+    assert model.data(model.index(0, 4)) == "64"
+    first = model.row_at(0)
+    last = model.row_at(999)
+    assert first is not None and first[6] == 999
+    assert last is not None and last[6] == 0
+    assert model.row_at(1000) is None
+    assert len(model._pages) <= 3
+
+
+def test_model_ignores_rows_written_after_filter(
+    qtbot: QtBot, logger: DatabaseLogger
+) -> None:
+    model = LogTableModel(logger, page_size=600)
+    model.set_filter(LogFilter())
+    logger.log(Ping("Failure", "10.0.0.1"))
+
+    model.fetchMore()
+    assert model.rowCount() == 1000
+    assert not model.canFetchMore()
+
+
+def test_model_applies_filters(qtbot: QtBot, logger: DatabaseLogger) -> None:
+    model = LogTableModel(logger)
+    model.set_filter(LogFilter(result_filter="Failure"))
+    assert model.rowCount() == 0
+    assert not model.canFetchMore()
+
+
+def test_prepend_pings_inserts_matching_rows_on_top(
+    qtbot: QtBot, logger: DatabaseLogger
+) -> None:
+    model = LogTableModel(logger, page_size=100, max_live_rows=3)
+    model.set_filter(LogFilter(ip_filter="10.0.0.1"))
+
+    pings = [Ping("Failure", "10.0.0.1", seq=-1), Ping("Success", "10.9.9.9")]
+    with qtbot.waitSignal(model.rowsInserted):
+        assert model.prepend_pings(pings)
+    assert model.rowCount() == 101
+    live = model.row_at(0)
+    assert live is not None and live[1] == "Failure" and live[6] == -1
+    first_db_row = model.row_at(1)
+    assert first_db_row is not None and first_db_row[6] == 999
+
+    model.fetchMore()
+    assert model.rowCount() == 201
+    last = model.row_at(200)
+    assert last is not None and last[6] == 800
+
+    # Beyond max_live_rows the caller has to reload
+    assert not model.prepend_pings([Ping("Success", "10.0.0.1")] * 3)
+    assert model.rowCount() == 201
+    model.set_filter(model.log_filter)
+    assert model.rowCount() == 100
@@ -0,0 +1,53 @@
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+from JustPingIt.maintenance import main
+from JustPingIt.model.database_logger import DatabaseLogger
+from JustPingIt.model.ping import Ping
+from JustPingIt.model.retention import DAY_MS
+
+
+def test_maintenance_enforces_retention(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    db_path = str(tmp_path / "logs.sqlite")
+    logger = DatabaseLogger(db_path)
+    logger.log(Ping("Success", "10.0.0.1"))
+    logger.close()
+    old = int(time.time() * 1000) - 40 * DAY_MS
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO ping_logs (result, timestamp, ip_address) "
+            "VALUES ('Success', ?, ?)",
+            [(old, "10.0.0.1"), (old, "10.0.0.2")],
+        )
+    conn.close()
+
+    assert main(["--db", db_path, "--days", "30", "--keep", "10.0.0.2=0"]) == 0
+    assert "Deleted 1 expired logs" in capsys.readouterr().out
+    logger = DatabaseLogger(db_path)
+    assert logger.count_logs() == 2
+    logger.close()
+
+
+def test_maintenance_rejects_invalid_policy(tmp_path: Path) -> None:
+    db_path = str(tmp_path / "logs.sqlite")
+    assert main(["--db", db_path, "--keep", "10.0.0.2"]) == 2
+
+
+def test_maintenance_rebuilds_rollups(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    db_path = str(tmp_path / "logs.sqlite")
+    logger = DatabaseLogger(db_path, maintain_rollups=False)
+    logger.log(Ping("Success", "10.0.0.1"))
+    logger.close()
+
+    assert main(["--db", db_path, "--rebuild-rollups"]) == 0
+    assert "Rebuilt the rollups of 1 hours" in capsys.readouterr().out
+    logger = DatabaseLogger(db_path)
+    assert logger.fetch_rollups("day")[0][2] == 1
+    logger.close()
@@ -28,3 +28,11 @@ def test_ping_initialization() -> None:
     assert (
         diff >= 0 and diff < 5
     )  # Il test dovrebbe essere eseguito entro 5 secondi dalla creazione
+
+
+def test_ping_epoch_matches_timestamp() -> None:
+    ping = Ping("Success", "192.168.0.1")
+    as_text = datetime.fromtimestamp(ping.epoch_ms / 1000).strftime(
+        "%Y-%m-%d %H:%M:%S"
+    )
+    assert as_text == ping.timestamp
@@ -1,4 +1,5 @@
 import subprocess
+import time
 from typing import Any
 from unittest.mock import MagicMock, patch
 
@@ -18,7 +19,7 @@ def pinger_instance(mock_logger: MagicMock) -> Pinger:
     return Pinger(ip_address="192.168.1.1", frequency=1, logger=mock_logger)
 
 
-@patch("JustPingIt.model.pinger.subprocess.check_output")
+@patch("JustPingIt.model.backends.subprocess.check_output")
 def test_ping_host_success_unix(
     mock_check_output: MagicMock, pinger_instance: Pinger
 ) -> None:
@@ -27,9 +28,10 @@ def test_ping_host_success_unix(
     )
     result = pinger_instance.ping_host("192.168.1.1")
     assert result == "Success"
+    assert pinger_instance.last_reply == (123, 64)
 
 
-@patch("JustPingIt.model.pinger.subprocess.check_output")
+@patch("JustPingIt.model.backends.subprocess.check_output")
 def test_ping_host_failure_unreachable(
     mock_check_output: MagicMock, pinger_instance: Pinger
 ) -> None:
@@ -39,7 +41,7 @@ def test_ping_host_failure_unreachable(
 
 
 @patch(
-    "JustPingIt.model.pinger.subprocess.check_output",
+    "JustPingIt.model.backends.subprocess.check_output",
     side_effect=subprocess.CalledProcessError(1, "ping"),
 )
 def test_ping_host_called_process_error(
@@ -50,7 +52,7 @@ def test_ping_host_called_process_error(
 
 
 @patch(
-    "JustPingIt.model.pinger.subprocess.check_output",
+    "JustPingIt.model.backends.subprocess.check_output",
     side_effect=subprocess.TimeoutExpired("ping", 3),
 )
 def test_ping_host_timeout(
@@ -61,7 +63,7 @@ def test_ping_host_timeout(
 
 
 @patch(
-    "JustPingIt.model.pinger.subprocess.check_output",
+    "JustPingIt.model.backends.subprocess.check_output",
     side_effect=Exception("Unexpected"),
 )
 def test_ping_host_unexpected_error(
@@ -115,4 +117,30 @@ def test_run_emits_signal_and_logs(qtbot: Any, mock_logger: MagicMock) -> None:
     assert isinstance(ping, Ping)
     assert ping.result == "Success"
     assert ping.ip_address == ip_address
+    assert ping.seq == 1
     mock_logger.log.assert_called_once()
+
+
+def test_slow_probe_records_missed_ticks(mock_logger: MagicMock) -> None:
+    pinger = Pinger("192.168.1.1", 0.2, mock_logger)  # type: ignore
+    calls = []
+
+    # The first probe overruns three deadlines, the second one stops
+    def slow_ping(*args: Any, **kwargs: Any) -> str:
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(0.7)
+        else:
+            pinger.stop()
+        return "Failure"
+
+    pinger.ping_host = MagicMock(side_effect=slow_ping)
+    pinger.run()
+
+    logged = [call.args[0] for call in mock_logger.log.call_args_list]
+    assert [(ping.result, ping.seq) for ping in logged] == [
+        ("Failure", 1),
+        ("Missed", 2),
+        ("Missed", 3),
+        ("Failure", 4),
+    ]
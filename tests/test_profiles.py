@@ -0,0 +1,100 @@
+import gc
+import os
+import sqlite3
+import tempfile
+from collections.abc import Iterator
+
+import pytest
+
+from JustPingIt.model.database_logger import DatabaseLogger
+from JustPingIt.model.ping import Ping
+from JustPingIt.model.profiles import (
+    PROFILES,
+    DatabaseProfile,
+    get_profile,
+    read_pragmas,
+)
+
+
+@pytest.fixture
+def temp_db_path() -> Iterator[str]:
+    with tempfile.NamedTemporaryFile(delete=False) as tf:
+        db_path = tf.name
+
+    yield db_path
+
+    gc.collect()
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(db_path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def test_get_profile_by_name() -> None:
+    assert get_profile("balanced") is PROFILES["balanced"]
+    custom = DatabaseProfile("custom", mmap_size=0)
+    assert get_profile(custom) is custom
+
+
+def test_get_profile_unknown_name() -> None:
+    with pytest.raises(ValueError):
+        get_profile("turbo")
+
+
+def test_profile_rejects_invalid_modes() -> None:
+    with pytest.raises(ValueError):
+        DatabaseProfile("bad", journal_mode="WAL; DROP TABLE ping_logs")
+    with pytest.raises(ValueError):
+        DatabaseProfile("bad", synchronous="SOMETIMES")
+
+
+def test_default_profile_is_applied(temp_db_path: str) -> None:
+    logger = DatabaseLogger(temp_db_path)
+    report = logger.pragma_report()
+    assert report == {
+        "profile": "balanced",
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,
+        "temp_store": "MEMORY",
+    }
+
+    logger.log(Ping("Success", "10.0.0.1"))
+    assert len(logger.fetch_logs()) == 1
+    reader = read_pragmas(logger._read_connection())
+    assert reader["journal_mode"] == "WAL"
+    assert reader["cache_size"] == -64 * 1024
+    logger.close()
+
+
+def test_durable_profile_keeps_rollback_journal(temp_db_path: str) -> None:
+    logger = DatabaseLogger(temp_db_path, profile="durable")
+    report = logger.pragma_report()
+    assert report["journal_mode"] == "DELETE"
+    assert report["synchronous"] == "FULL"
+    assert report["mmap_size"] == 0
+    logger.close()
+
+
+def test_journal_mode_persists_in_file(temp_db_path: str) -> None:
+    DatabaseLogger(temp_db_path, profile="fast").close()
+    conn = sqlite3.connect(temp_db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+def test_periodic_checkpoint(temp_db_path: str) -> None:
+    profile = DatabaseProfile("eager", checkpoint_interval_s=0.001)
+    logger = DatabaseLogger(temp_db_path, profile=profile)
+    logger._last_checkpoint = 0
+    logger.log(Ping("Success", "10.0.0.1"))
+    assert logger._last_checkpoint > 0
+
+    busy, wal_pages, checkpointed = logger.checkpoint("TRUNCATE")
+    assert busy == 0
+    assert wal_pages == checkpointed == 0
+    with pytest.raises(ValueError):
+        logger.checkpoint("SOMETIMES")
+    logger.close()
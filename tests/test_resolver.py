@@ -0,0 +1,161 @@
+import asyncio
+import socket
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from JustPingIt.model import resolver
+from JustPingIt.model.backends import SystemPingBackend, TcpBackend
+from JustPingIt.model.resolver import ResolverCache
+
+
+class FakeDns:
+    """
+    Stands in for getaddrinfo, counting the lookups of each name.
+    """
+
+    def __init__(self, delay: float = 0) -> None:
+        self.addresses = {"example.com": "93.184.216.34"}
+        self.delay = delay
+        self.calls: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, host: str, *args: Any, **kwargs: Any) -> list[Any]:
+        with self.lock:
+            self.calls[host] = self.calls.get(host, 0) + 1
+        time.sleep(self.delay)
+        address = self.addresses.get(host)
+        if address is None and host.startswith("host"):
+            address = f"10.0.0.{host[4:]}"
+        if address is None:
+            raise socket.gaierror(socket.EAI_NONAME, "unknown")
+        return [(socket.AF_INET, socket.SOCK_DGRAM, 0, "", (address, 0))]
+
+
+@pytest.fixture
+def dns() -> Iterator[FakeDns]:
+    fake = FakeDns()
+    with patch.object(resolver.socket, "getaddrinfo", fake):
+        yield fake
+
+
+@pytest.fixture
+def clock() -> Iterator[list[float]]:
+    now = [1000.0]
+    with patch.object(resolver.time, "monotonic", lambda: now[0]):
+        yield now
+
+
+def test_literals_skip_the_resolver(dns: FakeDns) -> None:
+    cache = ResolverCache()
+    assert cache.resolve("10.0.0.1") == "10.0.0.1"
+    assert cache.resolve("::1") == "::1"
+    assert cache.resolve_many(["10.0.0.2"]) == {"10.0.0.2": "10.0.0.2"}
+    assert dns.calls == {}
+    assert cache.lookups == 0
+
+
+def test_names_are_cached_for_the_ttl(
+    dns: FakeDns, clock: list[float]
+) -> None:
+    cache = ResolverCache(ttl=60, refresh_ahead=1)
+    assert cache.resolve("example.com") == "93.184.216.34"
+    clock[0] += 59
+    assert cache.resolve("example.com") == "93.184.216.34"
+    assert dns.calls == {"example.com": 1}
+
+    dns.addresses["example.com"] = "93.184.216.35"
+    clock[0] += 1
+    assert cache.resolve("example.com") == "93.184.216.35"
+    assert dns.calls == {"example.com": 2}
+    cache.close()
+
+
+def test_refreshes_ahead_of_expiry(dns: FakeDns, clock: list[float]) -> None:
+    cache = ResolverCache(ttl=100, refresh_ahead=0.5)
+    cache.resolve("example.com")
+    dns.addresses["example.com"] = "93.184.216.35"
+    clock[0] += 60
+    # Served from the cache while the refresh runs in the background
+    assert cache.resolve("example.com") == "93.184.216.34"
+    deadline = time.time() + 5
+    while cache.resolve("example.com") != "93.184.216.35":
+        assert time.time() < deadline
+        time.sleep(0.01)
+    assert dns.calls == {"example.com": 2}
+    cache.close()
+
+
+def test_failed_lookups_are_remembered(
+    dns: FakeDns, clock: list[float]
+) -> None:
+    cache = ResolverCache(negative_ttl=10)
+    for _ in range(3):
+        with pytest.raises(OSError):
+            cache.resolve("nowhere.invalid")
+    assert dns.calls == {"nowhere.invalid": 1}
+    clock[0] += 10
+    with pytest.raises(OSError):
+        cache.resolve("nowhere.invalid")
+    assert dns.calls == {"nowhere.invalid": 2}
+    cache.close()
+
+
+def test_many_names_resolve_in_parallel() -> None:
+    dns = FakeDns(delay=0.2)
+    cache = ResolverCache(max_workers=50)
+    hosts = [f"host{n}" for n in range(50)]
+    with patch.object(resolver.socket, "getaddrinfo", dns):
+        started = time.perf_counter()
+        addresses = cache.resolve_many([*hosts, *hosts, "nowhere.invalid"])
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 2
+        assert addresses["host7"] == "10.0.0.7"
+        assert addresses["nowhere.invalid"] is None
+        assert set(dns.calls.values()) == {1}
+
+        async def resolve_all() -> dict[str, str | None]:
+            return await cache.resolve_many_async(["host60", "host60"])
+
+        assert asyncio.run(resolve_all()) == {"host60": "10.0.0.60"}
+    cache.close()
+
+
+def test_concurrent_probes_share_one_lookup() -> None:
+    dns = FakeDns(delay=0.1)
+    cache = ResolverCache()
+
+    async def probes() -> list[str]:
+        return await asyncio.gather(
+            *(cache.resolve_async("example.com") for _ in range(100))
+        )
+
+    with patch.object(resolver.socket, "getaddrinfo", dns):
+        assert set(asyncio.run(probes())) == {"93.184.216.34"}
+    assert dns.calls == {"example.com": 1}
+    cache.close()
+
+
+@patch("JustPingIt.model.backends.subprocess.check_output")
+def test_backends_probe_the_cached_address(
+    check_output: MagicMock, dns: FakeDns
+) -> None:
+    check_output.return_value = b"64 bytes: icmp_seq=1 ttl=56 time=9.5 ms"
+    backend = SystemPingBackend(ResolverCache())
+    for _ in range(3):
+        ping = backend.ping("example.com")
+        assert (ping.ip_address, ping.resolved) == (
+            "example.com",
+            "93.184.216.34",
+        )
+        assert "93.184.216.34" in check_output.call_args.args[0]
+    assert dns.calls == {"example.com": 1}
+    assert backend.ping("10.0.0.1").resolved is None
+
+    ping = TcpBackend(resolver=ResolverCache()).ping("nowhere.invalid:80")
+    assert (ping.result, ping.resolved) == ("Failure", None)
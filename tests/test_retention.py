@@ -0,0 +1,88 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from JustPingIt.model.database_logger import DatabaseLogger
+from JustPingIt.model.retention import (
+    DAY_MS,
+    RetentionPolicy,
+    RetentionPruner,
+    enforce_retention,
+)
+
+NOW_MS = int(time.time() * 1000)
+
+
+@pytest.fixture
+def logger(tmp_path: Path) -> DatabaseLogger:
+    logger = DatabaseLogger(str(tmp_path / "logs.sqlite"))
+    # One row per day and address, from 0 to 9 days old
+    with logger._write_connection() as conn, conn:
+        conn.executemany(
+            "INSERT INTO ping_logs (result, timestamp, ip_address) "
+            "VALUES ('Success', ?, ?)",
+            [
+                (NOW_MS - age * DAY_MS - 1, address)
+                for age in range(10)
+                for address in ("10.0.0.1", "10.0.0.2", "10.0.0.3")
+            ],
+        )
+    return logger
+
+
+def addresses(logger: DatabaseLogger) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for row in logger.iter_logs():
+        counts[row[3]] = counts.get(row[3], 0) + 1
+    return counts
+
+
+def test_parse_policy() -> None:
+    policy = RetentionPolicy.parse(30, ["10.0.0.1=90", " 10.0.0.2 = 0"])
+    assert policy == RetentionPolicy(30, {"10.0.0.1": 90, "10.0.0.2": None})
+    assert policy.enabled
+    assert not RetentionPolicy.parse(0).enabled
+    with pytest.raises(ValueError):
+        RetentionPolicy.parse(30, ["10.0.0.1"])
+    with pytest.raises(ValueError):
+        RetentionPolicy.parse(-1)
+
+
+def test_enforce_retention_with_overrides(logger: DatabaseLogger) -> None:
+    policy = RetentionPolicy(5, {"10.0.0.2": 2, "10.0.0.3": None})
+
+    deleted = enforce_retention(logger, policy, chunk_size=2, now_ms=NOW_MS)
+    assert deleted == 5 + 8
+    assert addresses(logger) == {"10.0.0.1": 5, "10.0.0.2": 2, "10.0.0.3": 10}
+    assert enforce_retention(logger, policy, now_ms=NOW_MS) == 0
+    logger.close()
+
+
+def test_enforce_retention_is_bounded(logger: DatabaseLogger) -> None:
+    policy = RetentionPolicy(1)
+    deleted = enforce_retention(
+        logger, policy, chunk_size=4, max_chunks=2, now_ms=NOW_MS
+    )
+    assert deleted == 8
+    logger.close()
+
+
+def test_pruner_runs_in_background(logger: DatabaseLogger) -> None:
+    pruner = RetentionPruner(logger, RetentionPolicy(1), interval_s=60)
+    done = threading.Event()
+    run_once = pruner.run_once
+
+    def run_and_signal() -> int:
+        deleted = run_once()
+        done.set()
+        return deleted
+
+    pruner.run_once = run_and_signal  # type: ignore[method-assign]
+    pruner.start()
+    assert done.wait(5)
+    pruner.stop()
+    assert pruner.deleted == 27
+    assert logger.count_logs() == 3
+    logger.close()
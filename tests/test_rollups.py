@@ -0,0 +1,164 @@
+import sqlite3
+from collections.abc import Iterator
+from contextlib import nullcontext
+from pathlib import Path
+
+import pytest
+
+from JustPingIt.model import rollups, schema
+
+DAY = rollups.DAY_MS
+HOUR = rollups.HOUR_MS
+MINUTE = rollups.MINUTE_MS
+
+
+@pytest.fixture
+def conn(tmp_path: Path) -> Iterator[sqlite3.Connection]:
+    conn = sqlite3.connect(tmp_path / "ping_log.db")
+    schema.migrate(conn)
+    yield conn
+    conn.close()
+
+
+def stored(conn: sqlite3.Connection, size: int) -> list[tuple[int, ...]]:
+    return conn.execute(
+        "SELECT ip_address, bucket, count, successes, failures, rtt_count, "
+        "rtt_min, rtt_max, rtt_sum, rtt_sum_sq, jitter_count, jitter_sum "
+        "FROM ping_rollups WHERE resolution = ? ORDER BY ip_address, bucket",
+        (size,),
+    ).fetchall()
+
+
+def outages(conn: sqlite3.Connection) -> list[tuple[int, ...]]:
+    return conn.execute(
+        "SELECT ip_address, start_ms, end_ms, probes, recovered_ms "
+        "FROM ping_outages ORDER BY ip_address, start_ms"
+    ).fetchall()
+
+
+def test_bins_are_within_two_percent() -> None:
+    for rtt in (1, 250, 1234, 98765, 3_000_000):
+        assert abs(rollups.bin_value(rollups.rtt_bin(rtt)) - rtt) <= max(
+            0.02 * rtt, 1
+        )
+
+
+def test_writer_sums_each_bucket(conn: sqlite3.Connection) -> None:
+    writer = rollups.RollupWriter(conn)
+    writer.add(
+        conn,
+        [
+            ("Success", DAY + 1000, "10.0.0.1", 200),
+            ("Success", DAY + 2000, "10.0.0.1", 100),
+        ],
+    )
+    writer.add(conn, [("Failure", DAY + MINUTE, "10.0.0.1", None)])
+    writer.add(conn, [("Success", DAY + HOUR, "10.0.0.1", 160)])
+
+    assert stored(conn, MINUTE)[:2] == [
+        ("10.0.0.1", DAY, 2, 2, 0, 2, 100, 200, 300, 50000, 1, 100),
+        ("10.0.0.1", DAY + MINUTE, 1, 0, 1, 0, None, None, 0, 0, 0, 0),
+    ]
+    assert stored(conn, DAY) == [
+        ("10.0.0.1", DAY, 4, 3, 1, 3, 100, 200, 460, 75600, 2, 160)
+    ]
+    bins = conn.execute(
+        "SELECT SUM(count) FROM ping_rtt_bins WHERE resolution = ?", (DAY,)
+    ).fetchone()[0]
+    assert bins == 3
+    assert outages(conn) == [
+        ("10.0.0.1", DAY + MINUTE, DAY + MINUTE, 1, DAY + HOUR)
+    ]
+
+
+def test_writer_follows_outages_across_batches(
+    conn: sqlite3.Connection,
+) -> None:
+    writer = rollups.RollupWriter(conn)
+    writer.add(
+        conn,
+        [
+            ("Failure", 1000, "10.0.0.1", None),
+            ("Failure", 2000, "10.0.0.1", None),
+        ],
+    )
+    # A new writer resumes the outage in progress
+    writer = rollups.RollupWriter(conn)
+    writer.add(
+        conn,
+        [
+            ("Failure", 3000, "10.0.0.1", None),
+            ("Success", 4000, "10.0.0.1", 10),
+            ("Failure", 5000, "10.0.0.1", None),
+            ("Failure", 5000, "10.0.0.2", None),
+        ],
+    )
+    assert outages(conn) == [
+        ("10.0.0.1", 1000, 3000, 3, 4000),
+        ("10.0.0.1", 5000, 5000, 1, None),
+        ("10.0.0.2", 5000, 5000, 1, None),
+    ]
+
+
+def test_missed_ticks_are_not_pings(conn: sqlite3.Connection) -> None:
+    writer = rollups.RollupWriter(conn)
+    writer.add(
+        conn,
+        [
+            ("Failure", 1000, "10.0.0.1", None),
+            ("Missed", 2000, "10.0.0.1", None),
+            ("Missed", 3000, "10.0.0.1", None),
+            ("Failure", 4000, "10.0.0.1", None),
+            ("Missed", MINUTE, "10.0.0.1", None),
+        ],
+    )
+    assert conn.execute(
+        "SELECT bucket, count, failures, missed FROM ping_rollups "
+        "WHERE resolution = ? ORDER BY bucket",
+        (MINUTE,),
+    ).fetchall() == [(0, 2, 2, 2), (MINUTE, 0, 0, 1)]
+    assert outages(conn) == [("10.0.0.1", 1000, 4000, 2, None)]
+
+
+def test_rebuild_matches_incremental_aggregates(
+    conn: sqlite3.Connection,
+) -> None:
+    rows = [
+        (
+            "Failure" if i % 7 < 2 else "Success",
+            i * 7 * MINUTE,
+            f"10.0.0.{i % 3}",
+            None if i % 7 < 2 else 1000 + i,
+        )
+        for i in range(600)
+    ]
+    conn.executemany(
+        "INSERT INTO ping_logs (result, timestamp, ip_address, rtt_us) "
+        "VALUES (?, ?, ?, ?)",
+        rows,
+    )
+    rollups.RollupWriter(conn).add(conn, rows)
+    queries = {
+        "ping_rollups": "SELECT * FROM ping_rollups ORDER BY 1, 2, 3",
+        "ping_rtt_bins": "SELECT * FROM ping_rtt_bins ORDER BY 1, 2, 3",
+        "ping_outages": "SELECT * FROM ping_outages ORDER BY 1, 2, 3",
+    }
+    expected = [conn.execute(sql).fetchall() for sql in queries.values()]
+    reports: list[tuple[int, int]] = []
+
+    hours = rollups.rebuild(
+        lambda: nullcontext(conn),
+        progress=lambda done, total: reports.append((done, total)),
+    )
+    # 600 pings every 7 minutes fill 70 hours
+    assert hours == 70
+    assert reports[-1] == (70 * HOUR, 3 * DAY)
+    for (table, sql), rows_before in zip(
+        queries.items(), expected, strict=True
+    ):
+        rows_after = conn.execute(sql).fetchall()
+        if table == "ping_outages":
+            # Ids are reassigned
+            rows_after = [row[1:] for row in rows_after]
+            rows_before = [row[1:] for row in rows_before]
+        assert rows_after == rows_before
@@ -0,0 +1,71 @@
+import sqlite3
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from JustPingIt.model import runs, schema
+
+START = 1_700_000_000_000
+
+
+@pytest.fixture
+def conn(tmp_path: Path) -> Iterator[sqlite3.Connection]:
+    conn = sqlite3.connect(tmp_path / "ping_log.db")
+    schema.migrate(conn)
+    yield conn
+    conn.close()
+
+
+def stored(conn: sqlite3.Connection) -> list[tuple[int, ...]]:
+    return conn.execute(
+        "SELECT ip_address, result, start_ms, end_ms, count, rtt_count, "
+        "rtt_min, rtt_max, rtt_sum, first_seq, last_seq "
+        "FROM ping_runs ORDER BY id"
+    ).fetchall()
+
+
+def test_identical_results_share_a_run(conn: sqlite3.Connection) -> None:
+    writer = runs.RunWriter(conn)
+    writer.add(
+        conn,
+        [
+            ("Success", START, "10.0.0.1", 300, 64, 1),
+            ("Success", START + 1000, "10.0.0.1", 100, 64, 2),
+            ("Failure", START + 1000, "10.0.0.2", None, None, 1),
+        ],
+    )
+    # A new writer resumes the last run of each target
+    writer = runs.RunWriter(conn)
+    writer.add(conn, [("Success", START + 2000, "10.0.0.1", 200, 64, 3)])
+
+    first, second = stored(conn)
+    assert first == (
+        "10.0.0.1", "Success", START, START + 2000, 3, 3, 100, 300, 600, 1, 3
+    )
+    assert second[1:5] == ("Failure", START + 1000, START + 1000, 1)
+    assert second[6:] == (None, None, 0, 1, 1)
+
+
+def test_runs_break_on_changes_gaps_and_restarts(
+    conn: sqlite3.Connection,
+) -> None:
+    writer = runs.RunWriter(conn)
+    writer.add(
+        conn,
+        [
+            ("Success", START, "10.0.0.1", 100, 64, 1),
+            ("Success", START + 1000, "10.0.0.1", 100, 64, 2),
+            # More than twice the interval of the run
+            ("Success", START + 5000, "10.0.0.1", 100, 64, 3),
+            ("Failure", START + 6000, "10.0.0.1", None, None, 4),
+            # The prober restarted its sequence numbers
+            ("Failure", START + 7000, "10.0.0.1", None, None, 1),
+        ],
+    )
+    assert [row[2:5] for row in stored(conn)] == [
+        (START, START + 1000, 2),
+        (START + 5000, START + 5000, 1),
+        (START + 6000, START + 6000, 1),
+        (START + 7000, START + 7000, 1),
+    ]
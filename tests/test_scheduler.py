@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from JustPingIt.model.icmp import open_engine
+from JustPingIt.model.ping import Ping
+from JustPingIt.model.pinger import MultiPinger
+from JustPingIt.model.scheduler import PingScheduler, overdue_ticks
+from JustPingIt.model.sketches import LatencySketches
+
+
+def run_in_thread(scheduler: PingScheduler) -> threading.Thread:
+    thread = threading.Thread(target=scheduler.run_forever)
+    thread.start()
+    return thread
+
+
+def fake_ping_host(result: str = "Success") -> Any:
+    async def ping_host(address: str, timeout: float = 3) -> Ping:
+        await asyncio.sleep(0)
+        return Ping(result, address, rtt_us=1500, ttl=64)
+
+    return ping_host
+
+
+def test_per_target_intervals() -> None:
+    results: list[Ping] = []
+    done = threading.Event()
+
+    def on_result(ping: Ping) -> None:
+        results.append(ping)
+        if len(results) >= 12:
+            done.set()
+
+    scheduler = PingScheduler(on_result=on_result)
+    scheduler.ping_host = fake_ping_host()  # type: ignore[method-assign]
+    scheduler.add_target("fast", 0.05)
+    scheduler.add_target("slow", 10)
+    thread = run_in_thread(scheduler)
+    assert done.wait(5)
+    scheduler.stop()
+    thread.join(5)
+
+    counts = Counter(ping.ip_address for ping in results)
+    assert counts["slow"] == 1
+    assert counts["fast"] >= 11
+    fast = [ping.seq for ping in results if ping.ip_address == "fast"]
+    assert fast == list(range(1, len(fast) + 1))
+    assert not thread.is_alive()
+
+
+def test_overdue_ticks() -> None:
+    assert overdue_ticks(10, 9, 1) == 0
+    assert overdue_ticks(10, 10.5, 1) == 0
+    assert overdue_ticks(10, 13.2, 1) == 3
+
+
+def test_slow_probes_do_not_stretch_the_period() -> None:
+    results: list[Ping] = []
+    done = threading.Event()
+
+    async def slow_ping_host(address: str, timeout: float = 3) -> Ping:
+        await asyncio.sleep(0.25)
+        return Ping("Timeout", address)
+
+    def on_result(ping: Ping) -> None:
+        results.append(ping)
+        if {ping.seq for ping in results} >= set(range(1, 21)):
+            done.set()
+
+    scheduler = PingScheduler(on_result=on_result, max_in_flight=2)
+    scheduler.ping_host = slow_ping_host  # type: ignore[method-assign]
+    started = time.monotonic()
+    scheduler.add_target("10.0.0.1", 0.05)
+    thread = run_in_thread(scheduler)
+    # Twenty ticks 50 ms apart, plus the last probe
+    assert done.wait(5)
+    assert time.monotonic() - started < 20 * 0.05 + 0.25 + 0.5
+    scheduler.stop()
+    thread.join(5)
+
+    # One result per tick: the ticks beyond two probes in flight are missed
+    seqs = [ping.seq for ping in results]
+    assert len(seqs) == len(set(seqs))
+    missed = [ping for ping in results if ping.result == "Missed"]
+    assert len(missed) >= 10
+    assert all(ping.rtt_us is None for ping in missed)
+    assert scheduler.missed_ticks == len(missed)
+
+
+def test_results_are_logged() -> None:
+    logger = MagicMock()
+    done = threading.Event()
+    scheduler = PingScheduler(logger, on_result=lambda _: done.set())
+    scheduler.ping_host = fake_ping_host("Failure")  # type: ignore
+    scheduler.add_target("10.0.0.1", 1)
+    thread = run_in_thread(scheduler)
+    assert done.wait(5)
+    scheduler.stop()
+    thread.join(5)
+
+    logged = logger.log.call_args[0][0]
+    assert logged.result == "Failure"
+    assert logged.ip_address == "10.0.0.1"
+
+
+def test_results_feed_the_sketches() -> None:
+    sketches = LatencySketches()
+    done = threading.Event()
+    scheduler = PingScheduler(
+        on_result=lambda _: done.set(), sketches=sketches
+    )
+    scheduler.ping_host = fake_ping_host()  # type: ignore[method-assign]
+    scheduler.add_target("10.0.0.1", 1)
+    thread = run_in_thread(scheduler)
+    assert done.wait(5)
+    scheduler.stop()
+    thread.join(5)
+
+    (p50,) = sketches.percentiles("10.0.0.1", "1m", (0.5,))
+    assert p50 == pytest.approx(1500, rel=0.02)
+
+
+def test_remove_target_stops_probing() -> None:
+    scheduler = PingScheduler()
+    scheduler.add_target("10.0.0.1", 1)
+    scheduler.add_target("10.0.0.2", 1)
+    scheduler.remove_target("10.0.0.1")
+    assert [t.address for t in scheduler.targets] == ["10.0.0.2"]
+
+
+def test_thousands_of_targets_share_one_thread() -> None:
+    seen: set[str] = set()
+    done = threading.Event()
+    n_targets = 5000
+
+    def on_result(ping: Ping) -> None:
+        seen.add(ping.ip_address)
+        if len(seen) == n_targets:
+            done.set()
+
+    scheduler = PingScheduler(on_result=on_result)
+    scheduler.ping_host = fake_ping_host()  # type: ignore[method-assign]
+    for i in range(n_targets):
+        scheduler.add_target(f"10.0.{i // 256}.{i % 256}", 60)
+    threads_before = threading.active_count()
+    thread = run_in_thread(scheduler)
+    assert done.wait(10)
+    assert threading.active_count() == threads_before + 1
+    scheduler.stop()
+    thread.join(5)
+
+
+def test_native_engine_pings_loopback() -> None:
+    engine = open_engine()
+    if engine is None:
+        pytest.skip("ICMP sockets are not available on this host")
+    results: list[Ping] = []
+    done = threading.Event()
+
+    def on_result(ping: Ping) -> None:
+        results.append(ping)
+        done.set()
+
+    scheduler = PingScheduler(on_result=on_result, engine=engine)
+    scheduler.add_target("127.0.0.1", 1, timeout=2)
+    thread = run_in_thread(scheduler)
+    try:
+        assert done.wait(5)
+    finally:
+        scheduler.stop()
+        thread.join(5)
+        engine.close()
+    assert results[0].result == "Success"
+    assert results[0].rtt_us is not None
+
+
+def test_multi_pinger_emits_signal(qtbot: Any) -> None:
+    pinger = MultiPinger(MagicMock())
+    pinger.scheduler.ping_host = fake_ping_host()  # type: ignore
+    pinger.add_target("192.168.1.1", 1)
+
+    with qtbot.waitSignal(pinger.ping_signal, timeout=3000) as blocker:
+        pinger.start()
+    pinger.stop()
+    qtbot.waitUntil(lambda: not pinger.isRunning(), timeout=3000)
+
+    ping = blocker.args[0]
+    assert isinstance(ping, Ping)
+    assert ping.ip_address == "192.168.1.1"
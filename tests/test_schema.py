@@ -0,0 +1,136 @@
+import sqlite3
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from JustPingIt.model import schema
+
+LEGACY_TABLE = """
+    CREATE TABLE ping_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        result TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        ip_address TEXT NOT NULL
+    )
+"""
+
+
+@pytest.fixture
+def conn(tmp_path: Path) -> Iterator[sqlite3.Connection]:
+    conn = sqlite3.connect(tmp_path / "ping_log.db")
+    yield conn
+    conn.close()
+
+
+def legacy_rows(conn: sqlite3.Connection, count: int) -> None:
+    conn.execute(LEGACY_TABLE)
+    conn.executemany(
+        "INSERT INTO ping_logs (result, timestamp, ip_address) "
+        "VALUES (?, ?, ?)",
+        [
+            ("Success", f"2024-01-01 10:00:{i:02d}", "10.0.0.1")
+            for i in range(count)
+        ],
+    )
+    conn.commit()
+
+
+def index_names(conn: sqlite3.Connection) -> set[str]:
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index'"
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+def test_fresh_database_gets_latest_schema(conn: sqlite3.Connection) -> None:
+    assert schema.migrate(conn) == schema.SCHEMA_VERSION
+    assert schema.get_version(conn) == schema.SCHEMA_VERSION
+    assert {
+        "idx_ping_logs_ip_timestamp",
+        "idx_ping_logs_timestamp",
+    } <= index_names(conn)
+
+
+def test_legacy_database_is_migrated_in_chunks(
+    conn: sqlite3.Connection,
+) -> None:
+    legacy_rows(conn, 5)
+    assert schema.migrate(conn, chunk_size=2) == schema.SCHEMA_VERSION
+
+    rows = conn.execute(
+        "SELECT id, timestamp, rtt_us FROM ping_logs ORDER BY id"
+    ).fetchall()
+    expected = int(datetime(2024, 1, 1, 10, 0, 0).timestamp() * 1000)
+    assert [row[0] for row in rows] == [1, 2, 3, 4, 5]
+    assert [row[1] for row in rows] == [expected + i * 1000 for i in range(5)]
+    assert all(row[2] is None for row in rows)
+    assert "idx_ping_logs_timestamp" in index_names(conn)
+
+
+def test_interrupted_migration_resumes(conn: sqlite3.Connection) -> None:
+    legacy_rows(conn, 4)
+    schema._migrate_to_v1(conn, 100)
+    # Simulate a copy interrupted after the first two rows
+    conn.execute(schema._CREATE_PING_LOGS.format(table="ping_logs_v2"))
+    conn.execute(
+        "INSERT INTO ping_logs_v2 (id, result, timestamp, ip_address) "
+        "SELECT id, result, 0, ip_address FROM ping_logs WHERE id <= 2"
+    )
+    conn.commit()
+
+    assert schema.migrate(conn) == schema.SCHEMA_VERSION
+    count = conn.execute("SELECT COUNT(*) FROM ping_logs").fetchone()[0]
+    assert count == 4
+
+
+def test_migrated_database_is_up_to_date(conn: sqlite3.Connection) -> None:
+    schema.migrate(conn)
+    conn.execute(
+        "INSERT INTO ping_logs (result, timestamp, ip_address) "
+        "VALUES ('Success', 0, '10.0.0.1')"
+    )
+    conn.commit()
+    assert schema.migrate(conn) == schema.SCHEMA_VERSION
+    count = conn.execute("SELECT COUNT(*) FROM ping_logs").fetchone()[0]
+    assert count == 1
+
+
+def test_range_queries_use_the_timestamp_index(
+    conn: sqlite3.Connection,
+) -> None:
+    schema.migrate(conn)
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM ping_logs "
+        "WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp DESC",
+        (0, 1),
+    ).fetchall()
+    details = " ".join(row[-1] for row in plan)
+    assert "idx_ping_logs_timestamp" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_databases_use_incremental_auto_vacuum(
+    conn: sqlite3.Connection, tmp_path: Path
+) -> None:
+    schema.migrate(conn)
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+    legacy = sqlite3.connect(tmp_path / "legacy.db")
+    legacy_rows(legacy, 3)
+    schema.migrate(legacy)
+    assert legacy.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    count = legacy.execute("SELECT COUNT(*) FROM ping_logs").fetchone()[0]
+    assert count == 3
+    legacy.close()
+
+
+def test_migration_fills_the_rollups(conn: sqlite3.Connection) -> None:
+    legacy_rows(conn, 5)
+    schema.migrate(conn)
+    rows = conn.execute(
+        "SELECT resolution, count, failures FROM ping_rollups "
+        "ORDER BY resolution"
+    ).fetchall()
+    assert rows == [(60_000, 5, 0), (3_600_000, 5, 0), (86_400_000, 5, 0)]
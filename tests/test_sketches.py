@@ -0,0 +1,80 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from JustPingIt.model import sketches
+from JustPingIt.model.ping import Ping
+from JustPingIt.model.sketches import (
+    LatencySketch,
+    LatencySketches,
+    WindowedSketch,
+)
+
+NOW = 1_700_000_000.0
+
+
+def ping(address: str, rtt_us: int | None, at: float) -> Ping:
+    result = Ping("Success" if rtt_us else "Failure", address, rtt_us)
+    result.epoch_ms = int(at * 1000)
+    return result
+
+
+def test_quantiles_are_within_two_percent() -> None:
+    rng = random.Random(7)  # noqa: S311 - seeded test data, not security
+    values = sorted(int(rng.lognormvariate(9, 1)) for _ in range(10000))
+    sketch = LatencySketch()
+    for value in values:
+        sketch.add(value)
+
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * len(values)) - 1]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+    assert LatencySketch().quantile(0.5) is None
+
+
+def test_merge_equals_one_sketch_and_round_trips() -> None:
+    first, second, both = LatencySketch(), LatencySketch(), LatencySketch()
+    for value in range(1, 2000):
+        (first if value % 2 else second).add(value)
+        both.add(value)
+    first.merge(second)
+    restored = LatencySketch.from_bytes(first.to_bytes())
+
+    assert restored.counts == both.counts
+    assert (restored.count, restored.total) == (both.count, both.total)
+    with pytest.raises(ValueError):
+        LatencySketch.from_bytes(b"nope")
+
+
+def test_window_slides_with_fixed_memory() -> None:
+    window = WindowedSketch(60, 6)
+    for second in range(600):
+        window.add(1000 if second < 540 else 100_000, NOW + second)
+
+    sketch = window.sketch(NOW + 599)
+    assert sketch.count <= 60
+    assert sketch.quantile(0.5) == pytest.approx(100_000, rel=0.02)
+    assert len(window.slots) == 6
+    assert window.sketch(NOW + 3600).count == 0
+
+
+def test_sketches_survive_save_and_merge(tmp_path: Path) -> None:
+    here, there = LatencySketches(), LatencySketches()
+    for second in range(30):
+        here.record(ping("10.0.0.1", 1000, NOW + second))
+        there.record(ping("10.0.0.1", 3000, NOW + second))
+        there.record(ping("10.0.0.2", None, NOW + second))
+    path = str(tmp_path / "sketches.bin")
+    there.save(path)
+
+    here.load(path)
+    here.load(str(tmp_path / "missing.bin"))
+    assert here.targets() == ["10.0.0.1"]
+    p25, p75 = here.percentiles("10.0.0.1", "15m", (0.25, 0.75), NOW + 30)
+    assert p25 == pytest.approx(1000, rel=0.02)
+    assert p75 == pytest.approx(3000, rel=0.02)
+    assert here.percentiles("10.0.0.3", "1h", now=NOW) == [None] * 3
+    with pytest.raises(KeyError):
+        here.percentiles("10.0.0.1", "1d")
+    assert sketches.NUM_BINS < 500
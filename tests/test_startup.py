@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+# Time spent importing the GUI entry point, Qt itself excluded
+STARTUP_BUDGET_MS = 400
+# Only needed once the user opens the About dialog or exports logs
+DEFERRED_MODULES = ("markdown", "csv", "JustPingIt.model.exporter")
+
+
+def import_times(module: str) -> dict[str, int]:
+    env = {**os.environ, "PYTHONPATH": SRC}
+    # The current interpreter imports a module of this package
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def test_gui_startup_import_budget() -> None:
+    times = import_times("JustPingIt.main")
+
+    assert "JustPingIt.view.view" in times
+    for module in DEFERRED_MODULES:
+        assert module not in times
+    own_us = sum(
+        self_us
+        for name, self_us in times.items()
+        if name.split(".")[0] not in ("PySide6", "shiboken6")
+    )
+    assert own_us < STARTUP_BUDGET_MS * 1000
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import time
+
+from JustPingIt.model.backends import FakeBackend
+from JustPingIt.model.ping import Ping
+from JustPingIt.model.sweep import sweep
+from JustPingIt.model.targets import TargetSet
+
+
+class SlowBackend(FakeBackend):
+    """
+    Answers every probe after a delay, like a host on the network.
+    """
+
+    def __init__(self, delay: float, **kwargs: object) -> None:
+        super().__init__(**kwargs)  # type: ignore[arg-type]
+        self.delay = delay
+
+    async def ping_async(self, address: str, timeout: float = 3) -> Ping:
+        await asyncio.sleep(self.delay)
+        return self.ping(address, timeout)
+
+
+def test_sweep_reports_live_hosts_in_order() -> None:
+    targets = TargetSet.parse("10.0.0.0/24")
+    backend = FakeBackend(unreachable=[f"10.0.0.{n}" for n in range(3, 255)])
+    results: list[Ping] = []
+
+    result = sweep(targets, backend, on_result=results.append)
+
+    assert [ping.ip_address for ping in result.live] == [
+        "10.0.0.1",
+        "10.0.0.2",
+    ]
+    assert result.probed == len(results) == 254
+
+
+def test_sweep_probes_concurrently() -> None:
+    targets = TargetSet.parse("10.0.0.0/22")
+    backend = SlowBackend(0.2)
+
+    result = sweep(targets, backend, concurrency=1024)
+
+    assert len(result.live) == result.probed == 1022
+    assert result.elapsed < 2
+
+
+def test_sweep_can_be_cancelled() -> None:
+    cancel = threading.Event()
+    backend = SlowBackend(0.05)
+    timer = threading.Timer(0.1, cancel.set)
+    timer.start()
+    started = time.perf_counter()
+
+    result = sweep(
+        TargetSet.parse("10.0.0.0/16"), backend, concurrency=8, cancel=cancel
+    )
+
+    assert time.perf_counter() - started < 2
+    assert 0 < result.probed < 1000
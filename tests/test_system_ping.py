@@ -0,0 +1,48 @@
+import pytest
+
+from JustPingIt.model.system_ping import (
+    parse_ping_output,
+    parse_ping_reply,
+    ping_command,
+)
+
+LINUX_REPLY = """PING 192.168.1.1 (192.168.1.1) 56(84) bytes of data.
+64 bytes from 192.168.1.1: icmp_seq=1 ttl=64 time=0.123 ms
+
+--- 192.168.1.1 ping statistics ---
+1 packets transmitted, 1 received, 0% packet loss, time 0ms
+"""
+
+WINDOWS_REPLY = """Pinging 8.8.8.8 with 32 bytes of data:
+Reply from 8.8.8.8: bytes=32 time=14ms TTL=117
+"""
+
+
+def test_parse_ping_output() -> None:
+    assert parse_ping_output(LINUX_REPLY) == "Success"
+    assert parse_ping_output(WINDOWS_REPLY) == "Success"
+    assert parse_ping_output("Destination Host Unreachable") == "Failure"
+    assert parse_ping_output("1 packets, 100% packet loss") == "Failure"
+    assert parse_ping_output("") == "Failure"
+
+
+@pytest.mark.parametrize(
+    ("output", "expected"),
+    [
+        (LINUX_REPLY, (123, 64)),
+        (WINDOWS_REPLY, (14000, 117)),
+        ("Reply from 10.0.0.1: bytes=32 time<1ms TTL=128", (1000, 128)),
+        ("no reply at all", (None, None)),
+    ],
+)
+def test_parse_ping_reply(
+    output: str, expected: tuple[int | None, int | None]
+) -> None:
+    assert parse_ping_reply(output) == expected
+
+
+def test_ping_command_sends_one_request() -> None:
+    command = ping_command("10.0.0.1")
+    assert command[0] == "ping"
+    assert command[-1] == "10.0.0.1"
+    assert "1" in command
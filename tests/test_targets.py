@@ -0,0 +1,83 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from JustPingIt.model.targets import (
+    MAX_TARGETS,
+    TargetSet,
+    merge_ranges,
+    parse_entry,
+    split_entries,
+)
+
+
+def test_split_entries() -> None:
+    text = "10.0.0.1, 10.0.0.2;10.0.0.3\n# a comment\nexample.com  # web\n"
+    assert split_entries(text) == [
+        "10.0.0.1",
+        "10.0.0.2",
+        "10.0.0.3",
+        "example.com",
+    ]
+
+
+def test_parse_entry() -> None:
+    assert parse_entry("10.0.0.5/30") == (
+        "10.0.0.4/30",
+        (4, 0x0A000005, 0x0A000006),
+    )
+    assert parse_entry("10.0.0.8/31")[1] == (4, 0x0A000008, 0x0A000009)
+    assert parse_entry("Example.COM") == ("example.com", None)
+    assert parse_entry("example.com:443") == ("example.com:443", None)
+    assert parse_entry("[::1]:22") == ("[::1]:22", None)
+    assert parse_entry("::1")[1] == (6, 1, 1)
+    for entry in ("10.0.0.0/33", "not a host!", "-bad.example", "a..b"):
+        with pytest.raises(ValueError):
+            parse_entry(entry)
+
+
+def test_merge_ranges() -> None:
+    ranges = [(4, 10, 20), (4, 1, 5), (4, 6, 8), (6, 1, 1), (4, 15, 30)]
+    assert merge_ranges(ranges) == [(4, 1, 8), (4, 10, 30), (6, 1, 1)]
+
+
+def test_target_set_expands_and_deduplicates() -> None:
+    targets = TargetSet.parse(
+        "10.0.0.0/30\n10.0.0.2\n10.0.0.0/29\nexample.com\nEXAMPLE.com"
+    )
+    assert targets.entries == (
+        "10.0.0.0/30",
+        "10.0.0.2",
+        "10.0.0.0/29",
+        "example.com",
+    )
+    assert len(targets) == 7
+    assert list(targets) == [
+        *(f"10.0.0.{n}" for n in range(1, 7)),
+        "example.com",
+    ]
+    assert not TargetSet.parse(" # nothing\n")
+
+
+def test_large_ranges_are_counted_without_expanding() -> None:
+    started = time.perf_counter()
+    targets = TargetSet.parse("10.0.0.0/16\n10.0.0.0/22\n10.0.128.0/17")
+    assert time.perf_counter() - started < 0.1
+    assert len(targets) == 65534
+    assert targets.ranges == ((4, 0x0A000001, 0x0A00FFFE),)
+    addresses = targets.addresses()
+    assert next(addresses) == "10.0.0.1"
+    with pytest.raises(ValueError, match="more than"):
+        TargetSet.parse("10.0.0.0/8")
+    assert len(TargetSet.parse("10.0.0.0/8", max_targets=2**24)) > MAX_TARGETS
+
+
+def test_read_target_file(tmp_path: Path) -> None:
+    path = tmp_path / "targets.txt"
+    path.write_text("# lab\n192.168.1.0/24\nrouter.lan\n", encoding="utf-8")
+    targets = TargetSet.read(str(path))
+    assert len(targets) == 255
+    assert targets.text() == "192.168.1.0/24, router.lan"
+    with pytest.raises(OSError):
+        TargetSet.read(str(tmp_path / "missing.txt"))
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from pathlib import Path
 from typing import cast
 from unittest.mock import ANY, MagicMock, patch
@@ -7,8 +8,9 @@ from PySide6.QtCore import QSettings
 from PySide6.QtWidgets import QSystemTrayIcon
 from pytestqt.qtbot import QtBot
 
+from JustPingIt.model.database_logger import LogFilter
 from JustPingIt.model.ping import Ping
-from JustPingIt.view.view import AboutDialog, LogViewer, MainUI
+from JustPingIt.view.view import AboutDialog, LogViewer, MainUI, about_html
 
 
 @pytest.fixture
@@ -17,6 +19,7 @@ def mock_paths(tmp_path: Path) -> MagicMock:
 
     mock = MagicMock()
     mock.get_db_path.return_value = str(mock_db_path)
+    mock.get_sketches_path.return_value = str(tmp_path / "sketches.bin")
     mock.get_icon_path.return_value = ":/mock/icon.png"
     return mock
 
@@ -29,7 +32,7 @@ def tray_icon() -> MagicMock:
 @pytest.fixture
 def main_ui(
     qtbot: QtBot, tray_icon: MagicMock, mock_paths: MagicMock
-) -> MainUI:
+) -> Iterator[MainUI]:
     with (
         patch("JustPingIt.model.DatabaseLogger") as MockLogger,
         patch("JustPingIt.view.view.LogViewer") as MockLogViewer,
@@ -39,7 +42,8 @@ def main_ui(
         MockLogViewer.return_value = MagicMock()
         ui = MainUI(tray_icon, mock_paths)
         qtbot.addWidget(ui)
-        return ui
+        qtbot.waitUntil(lambda: ui.logger is not None, timeout=5000)
+        yield ui
 
 
 @pytest.fixture
@@ -52,6 +56,8 @@ def about_dialog(qtbot: QtBot) -> AboutDialog:
 @pytest.fixture
 def log_viewer(mock_paths: MagicMock) -> tuple[LogViewer, MagicMock]:
     logger_mock = MagicMock()
+    logger_mock.last_id.return_value = 0
+    logger_mock.fetch_page.return_value = ([], None)
     viewer = LogViewer(logger_mock, icon_path=mock_paths.get_icon_path())
     return viewer, logger_mock
 
@@ -64,21 +70,36 @@ def test_ui_initialization(main_ui: MainUI) -> None:
 
 
 def test_load_and_save_settings(main_ui: MainUI) -> None:
-    main_ui.ip_input.setText("192.168.1.1")
+    main_ui.logger = MagicMock()
+    main_ui.ip_input.setPlainText("192.168.1.1\n10.0.0.1/30, 192.168.1.1")
     main_ui.freq_input.setValue(5)
     main_ui.save_settings()
 
     settings = QSettings("JustPingIt", "PingApp")
-    assert settings.value("ip") == "192.168.1.1"
     assert cast(int, settings.value("frequency")) == 5
+    main_ui.logger.save_targets.assert_called_once_with(
+        ("192.168.1.1", "10.0.0.0/30")
+    )
+
+
+def test_legacy_address_moves_to_the_database(main_ui: MainUI) -> None:
+    main_ui.logger = MagicMock()
+    main_ui.logger.saved_targets.return_value = []
+    main_ui.settings.setValue("ip", "10.0.0.7")
+    main_ui.ip_input.setPlainText("")
+    main_ui.load_targets()
+
+    assert main_ui.ip_input.toPlainText() == "10.0.0.7"
+    main_ui.logger.save_targets.assert_called_once_with(["10.0.0.7"])
+    assert main_ui.settings.value("ip") is None
 
 
-@patch("JustPingIt.view.view.Pinger")
+@patch("JustPingIt.view.view.MultiPinger")
 def test_start_pinging(mock_pinger_class: MagicMock, main_ui: MainUI) -> None:
     mock_pinger = MagicMock()
     mock_pinger_class.return_value = mock_pinger
 
-    main_ui.ip_input.setText("8.8.8.8")
+    main_ui.ip_input.setPlainText("8.8.8.8")
     main_ui.freq_input.setValue(2)
     main_ui.start_pinging()
 
@@ -86,14 +107,15 @@ def test_start_pinging(mock_pinger_class: MagicMock, main_ui: MainUI) -> None:
     assert not main_ui.freq_input.isEnabled()
     assert not main_ui.start_button.isEnabled()
     assert main_ui.stop_button.isEnabled()
+    mock_pinger.add_target.assert_called_once_with("8.8.8.8", 2)
     mock_pinger.start.assert_called_once()
 
 
-@patch("JustPingIt.view.view.Pinger")
+@patch("JustPingIt.view.view.MultiPinger")
 def test_start_pinging_without_ip(
     mock_pinger_class: MagicMock, main_ui: MainUI
 ) -> None:
-    main_ui.ip_input.setText("")
+    main_ui.ip_input.setPlainText("")
     main_ui.start_pinging()
 
     assert "Please enter an IP address." in main_ui.result_display.text()
@@ -101,7 +123,35 @@ def test_start_pinging_without_ip(
     mock_pinger_class.assert_not_called()
 
 
-@patch("JustPingIt.view.view.Pinger")
+@patch("JustPingIt.view.view.MultiPinger")
+def test_start_pinging_a_subnet(
+    mock_pinger_class: MagicMock, main_ui: MainUI
+) -> None:
+    mock_pinger = MagicMock()
+    mock_pinger_class.return_value = mock_pinger
+    main_ui.ip_input.setPlainText("10.0.0.0/30\n10.0.0.2\nexample.com")
+    main_ui.freq_input.setValue(1)
+    main_ui.start_pinging()
+
+    targets = [c.args[0] for c in mock_pinger.add_target.call_args_list]
+    assert targets == ["10.0.0.1", "10.0.0.2", "example.com"]
+
+    main_ui.display_result(Ping("Success", "10.0.0.2"))
+    assert main_ui.result_display.text().startswith("10.0.0.2: Success")
+
+
+@patch("JustPingIt.view.view.MultiPinger")
+def test_invalid_target_is_reported(
+    mock_pinger_class: MagicMock, main_ui: MainUI
+) -> None:
+    main_ui.ip_input.setPlainText("10.0.0.0/33")
+    main_ui.start_pinging()
+
+    assert "Invalid CIDR range" in main_ui.result_display.text()
+    mock_pinger_class.assert_not_called()
+
+
+@patch("JustPingIt.view.view.MultiPinger")
 def test_stop_pinging(mock_pinger_class: MagicMock, main_ui: MainUI) -> None:
     mock_pinger = MagicMock()
     mock_pinger_class.return_value = mock_pinger
@@ -115,25 +165,26 @@ def test_stop_pinging(mock_pinger_class: MagicMock, main_ui: MainUI) -> None:
 
 
 def test_display_result_success(main_ui: MainUI) -> None:
+    log_viewer_mock = cast(MagicMock, main_ui.log_viewer)
     ping = Ping(result="Success", ip_address="192.168.1.1")
     main_ui.display_result(ping)
 
     assert "Success" in main_ui.result_display.text()
     assert main_ui.result_display.styleSheet() == "color: green;"
 
-    log_viewer_mock = cast(MagicMock, main_ui.log_viewer)
-    log_viewer_mock.load_logs.assert_called_once()
+    log_viewer_mock.append_ping.assert_called_once_with(ping)
+    log_viewer_mock.load_logs.assert_not_called()
 
 
 def test_display_result_failure(main_ui: MainUI) -> None:
+    log_viewer_mock = cast(MagicMock, main_ui.log_viewer)
     ping = Ping(result="Timeout", ip_address="192.168.1.1")
     main_ui.display_result(ping)
 
     assert "Timeout" in main_ui.result_display.text()
     assert main_ui.result_display.styleSheet() == "color: red;"
 
-    log_viewer_mock = cast(MagicMock, main_ui.log_viewer)
-    log_viewer_mock.load_logs.assert_called_once()
+    log_viewer_mock.append_ping.assert_called_once_with(ping)
 
 
 def test_show_log_viewer(main_ui: MainUI) -> None:
@@ -159,21 +210,32 @@ def test_close_event_tray_message(main_ui: MainUI) -> None:
 
 
 def test_cleanup_with_pinger(main_ui: MainUI) -> None:
+    log_viewer_mock = cast(MagicMock, main_ui.log_viewer)
     main_ui.pinger = MagicMock()
     main_ui.cleanup()
 
     main_ui.pinger.stop.assert_called_once()
     main_ui.pinger.wait.assert_called_once()
 
-    log_viewer_mock = cast(MagicMock, main_ui.log_viewer)
     log_viewer_mock.close.assert_called_once()
 
 
+def test_cleanup_flushes_logger(main_ui: MainUI) -> None:
+    assert main_ui.logger.buffered
+    main_ui.logger.log(Ping(result="Success", ip_address="192.168.1.1"))
+    main_ui.cleanup()
+
+    stats = main_ui.logger.writer_stats()
+    assert stats.written == 1
+    assert stats.pending == 0
+    assert len(main_ui.logger.fetch_logs()) == 1
+
+
 def test_cleanup_without_pinger(main_ui: MainUI) -> None:
+    log_viewer_mock = cast(MagicMock, main_ui.log_viewer)
     main_ui.pinger = None
     main_ui.cleanup()
 
-    log_viewer_mock = cast(MagicMock, main_ui.log_viewer)
     log_viewer_mock.close.assert_called_once()
 
 
@@ -183,6 +245,45 @@ def test_about_dialog_show(about_dialog: AboutDialog) -> None:
         mock_show.assert_called_once()
 
 
+def test_startup_defers_the_database_and_dialogs(
+    qtbot: QtBot, tray_icon: MagicMock, mock_paths: MagicMock
+) -> None:
+    with patch("JustPingIt.view.view.LogViewer") as MockLogViewer:
+        ui = MainUI(tray_icon, mock_paths)
+        qtbot.addWidget(ui)
+        # The window is built before the database is opened
+        assert ui.logger is None
+        assert not ui.start_button.isEnabled()
+        assert not ui.view_logs_button.isEnabled()
+
+        qtbot.waitUntil(lambda: ui.logger is not None, timeout=5000)
+        assert ui.start_button.isEnabled()
+        assert ui.view_logs_button.isEnabled()
+        ui.display_result(Ping(result="Success", ip_address="10.0.0.1"))
+        MockLogViewer.assert_not_called()
+        assert ui.about_dialog is None
+
+        with patch.object(AboutDialog, "exec"):
+            ui.show_about_dialog()
+            dialog = ui.about_dialog
+            ui.show_about_dialog()
+        assert ui.about_dialog is dialog
+        assert about_html() is about_html()
+        ui.cleanup()
+
+
+def test_cleanup_while_opening_the_database(
+    qtbot: QtBot, tray_icon: MagicMock, mock_paths: MagicMock
+) -> None:
+    ui = MainUI(tray_icon, mock_paths)
+    qtbot.addWidget(ui)
+    ui.open_database()
+    ui.cleanup()
+
+    assert ui.logger is not None
+    assert ui.logger.writer_stats().pending == 0
+
+
 def test_log_viewer_filters_and_loads_logs(
     qtbot: QtBot, log_viewer: tuple[LogViewer, MagicMock]
 ) -> None:
@@ -190,9 +291,34 @@ def test_log_viewer_filters_and_loads_logs(
     qtbot.addWidget(viewer)
     viewer.filter_ip.setText("192.168.1.1")
     viewer.filter_button.click()
-    logger_mock.fetch_logs.assert_called_with(
-        ip_filter="192.168.1.1",
-        result_filter="",
-        from_date=ANY,
-        to_date=ANY,
+    logger_mock.fetch_page.assert_called_with(
+        LogFilter(
+            ip_filter="192.168.1.1",
+            result_filter="",
+            from_date=ANY,
+            to_date=ANY,
+            max_id=0,
+        ),
+        None,
+        ANY,
     )
+
+
+def test_log_viewer_coalesces_live_pings(
+    qtbot: QtBot, log_viewer: tuple[LogViewer, MagicMock]
+) -> None:
+    viewer, logger_mock = log_viewer
+    qtbot.addWidget(viewer)
+    viewer.load_logs()
+    logger_mock.fetch_page.reset_mock()
+
+    for seq in range(3):
+        viewer.append_ping(Ping("Success", "192.168.1.1", seq=seq))
+    viewer.append_ping(Ping("Success", "10.0.0.1"))
+    viewer.log_model.log_filter = LogFilter(ip_filter="192.168", max_id=0)
+    assert viewer.log_model.rowCount() == 0
+
+    qtbot.waitUntil(lambda: viewer.log_model.rowCount() == 3)
+    row = viewer.log_model.row_at(0)
+    assert row is not None and row[6] == 2
+    logger_mock.fetch_page.assert_not_called()
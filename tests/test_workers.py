@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from pytestqt.qtbot import QtBot
+
+from JustPingIt.model.database_logger import DatabaseLogger, LogFilter
+from JustPingIt.model.ping import Ping
+from JustPingIt.view.workers import DeleteWorker, ExportWorker
+
+
+def test_export_worker_completes(qtbot: QtBot, tmp_path: Path) -> None:
+    logger = DatabaseLogger(str(tmp_path / "logs.sqlite"))
+    for seq in range(5):
+        logger.log(Ping("Success", "10.0.0.1", seq=seq))
+    path = tmp_path / "export.csv"
+
+    worker = ExportWorker(logger, str(path), LogFilter())
+    with qtbot.waitSignal(worker.completed, timeout=5000) as blocker:
+        worker.start()
+    worker.wait()
+    assert blocker.args == [5]
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 6
+    # The worker thread released its read connection
+    assert len(logger._readers) == 0
+    logger.close()
+
+
+def test_export_worker_cancel(qtbot: QtBot, tmp_path: Path) -> None:
+    logger = DatabaseLogger(str(tmp_path / "logs.sqlite"))
+    logger.log(Ping("Success", "10.0.0.1"))
+    path = tmp_path / "export.csv"
+
+    worker = ExportWorker(logger, str(path), LogFilter())
+    worker.cancel()
+    with qtbot.waitSignal(worker.cancelled, timeout=5000):
+        worker.start()
+    worker.wait()
+    assert not path.exists()
+    logger.close()
+
+
+def test_delete_worker_deletes_filtered_logs(
+    qtbot: QtBot, tmp_path: Path
+) -> None:
+    logger = DatabaseLogger(str(tmp_path / "logs.sqlite"))
+    for seq in range(4):
+        logger.log(Ping("Success", "10.0.0.1", seq=seq))
+    logger.log(Ping("Failure", "10.0.0.2"))
+
+    worker = DeleteWorker(logger, LogFilter(result_filter="Success"))
+    with qtbot.waitSignal(worker.completed, timeout=5000) as blocker:
+        worker.start()
+    worker.wait()
+    assert blocker.args == [4]
+    assert logger.count_logs() == 1
+    logger.close()